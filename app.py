@@ -2,8 +2,9 @@ import streamlit as st
 import os
 import json
 from content_pipeline import ContentPipeline
+from checkpoint import incomplete_runs
 from dotenv import load_dotenv
-from datetime import datetime
+from datetime import datetime, timedelta
 from apscheduler.schedulers.background import BackgroundScheduler
 from auth import AuthManager, get_current_user
 from local_storage import local_storage
@@ -30,10 +31,18 @@ auth_manager = AuthManager()
 style_analyzer = StyleAnalyzer()
 
 # --- SCHEDULER SETUP ---
+# Batch mode groups users due in the same window into one run that shares fetching and summaries
+BATCH_SCHEDULING = os.getenv('SCHEDULER_BATCH_MODE', 'false').lower() == 'true'
+BATCH_WINDOW_MINUTES = max(1, int(os.getenv('SCHEDULER_BATCH_WINDOW_MINUTES', '15')))
+# Per-user jobs fetch and summarize this many minutes before delivery (0 disables prefetching)
+PREFETCH_LEAD_MINUTES = max(0, int(os.getenv('PREFETCH_LEAD_MINUTES', '10')))
+
 if 'scheduler' not in st.session_state:
     st.session_state.scheduler = BackgroundScheduler()
     st.session_state.scheduler.start()
     st.session_state.scheduled_jobs = []
+    st.session_state.batch_slots = {}
+    st.session_state.prefetched = {}
 
 def restore_scheduled_jobs():
     """Restore scheduled jobs from user data on app startup"""
@@ -47,8 +56,9 @@ def restore_scheduled_jobs():
                 # Check if job already exists
                 job_id = f"newsletter_{user_data['user_id']}"
                 existing_jobs = [job.id for job in st.session_state.scheduler.get_jobs()]
+                in_batch = any(user_data['user_id'] in specs for specs in st.session_state.batch_slots.values())
                 
-                if job_id not in existing_jobs:
+                if job_id not in existing_jobs and not in_batch:
                     # Restore the job
                     delivery_time = datetime.strptime(delivery_settings.get('time', '08:00'), '%H:%M').time()
                     
@@ -73,19 +83,73 @@ def restore_scheduled_jobs():
     except Exception as e:
         print(f"[{datetime.now()}] ERROR restoring scheduled jobs: {e}")
 
-# Restore jobs on startup
-restore_scheduled_jobs()
+def prefetch_newsletter(groq_key, urls, rss_urls, youtube_urls, twitter_urls, writing_style, user_id, prefetch_store):
+    """Fetch and summarize a user's sources ahead of their delivery time"""
+    print(f"[{datetime.now()}] Prefetching newsletter sources for user {user_id}")
+    try:
+        pipeline = ContentPipeline(
+            groq_api_key=groq_key,
+            resend_api_key=os.getenv('RESEND_API_KEY')
+        )
+        prefetched = pipeline.prefetch_sources(
+            urls=urls or [],
+            rss_urls=rss_urls or [],
+            youtube_urls=youtube_urls or [],
+            twitter_urls=twitter_urls or [],
+            max_rss_items=5,
+            writing_style=writing_style,
+            user_id=user_id,
+            time_budget=PREFETCH_LEAD_MINUTES * 60 or None
+        )
+        if prefetched["success"]:
+            prefetch_store[user_id] = prefetched
+            print(f"[{datetime.now()}] Prefetched {len(prefetched['articles'])} articles for user {user_id}")
+    except Exception as e:
+        print(f"[{datetime.now()}] ERROR prefetching for user {user_id}: {e}")
+
+def scheduled_run_id(user_id, to_addr, delivery_time):
+    """Checkpoint run id of today's scheduled delivery for a recipient"""
+    return f"{user_id or to_addr}-{datetime.now():%Y%m%d}-{delivery_time or 'now'}"
 
-def generate_and_send_newsletter(groq_key, resend_key, from_addr, to_addr, urls, rss_urls, title, youtube_urls=None, twitter_urls=None, writing_style='professional'):
+def resume_interrupted_runs():
+    """Re-run today's scheduled deliveries that were checkpointed but never delivered (e.g. the app restarted mid-run)"""
+    try:
+        today = datetime.combine(datetime.now().date(), datetime.min.time())
+        pending = set(incomplete_runs(since=today))
+        if not pending:
+            return
+        for job in st.session_state.scheduler.get_jobs():
+            if not job.id.startswith('newsletter_') or job.func is not generate_and_send_newsletter:
+                continue
+            to_addr, user_id, delivery_time = job.args[3], job.args[10], job.args[11]
+            if scheduled_run_id(user_id, to_addr, delivery_time) in pending:
+                # Same arguments, so the run id matches and the run resumes from its checkpoint
+                st.session_state.scheduler.add_job(
+                    generate_and_send_newsletter, id=f"resume_{user_id}", args=job.args, replace_existing=True
+                )
+                print(f"[{datetime.now()}] Resuming interrupted delivery for user {user_id}")
+    except Exception as e:
+        print(f"[{datetime.now()}] ERROR resuming interrupted runs: {e}")
+
+def generate_and_send_newsletter(groq_key, resend_key, from_addr, to_addr, urls, rss_urls, title, youtube_urls=None, twitter_urls=None, writing_style='professional', user_id=None, delivery_time=None, prefetch_store=None):
     """Generate and send newsletter in background"""
     print(f"[{datetime.now()}] Running scheduled job for {to_addr} with title '{title}'")
+    deliver_at = None
+    if delivery_time:
+        deliver_at = datetime.combine(datetime.now().date(), datetime.strptime(delivery_time, '%H:%M').time())
+    # Use today's prefetch only if it ran within the lead window
+    prefetched = (prefetch_store or {}).pop(user_id, None)
+    if prefetched and deliver_at:
+        age_minutes = (deliver_at - datetime.fromisoformat(prefetched['prefetched_at'])).total_seconds() / 60
+        if not 0 <= age_minutes <= PREFETCH_LEAD_MINUTES + 30:
+            prefetched = None
     try:
         pipeline = ContentPipeline(
             groq_api_key=groq_key,
             resend_api_key=resend_key,
             from_email=from_addr
         )
-        pipeline.process_mixed_sources(
+        results = pipeline.process_mixed_sources(
             urls=urls or [],
             rss_urls=rss_urls or [],
             youtube_urls=youtube_urls or [],
@@ -93,12 +157,135 @@ def generate_and_send_newsletter(groq_key, resend_key, from_addr, to_addr, urls,
             max_rss_items=5,
             email_recipients=[to_addr],
             digest_title=title,
-            writing_style=writing_style
+            writing_style=writing_style,
+            time_budget=float(os.getenv('SCHEDULED_RUN_BUDGET_SECONDS', '300')) or None,
+            user_id=user_id,
+            prefetched=prefetched,
+            deliver_at=deliver_at,
+            # One run per recipient and day, so a retry resumes from the last checkpointed stage
+            run_id=scheduled_run_id(user_id, to_addr, delivery_time)
         )
+        if results.get("resumed_from"):
+            print(f"[{datetime.now()}] Resumed run for {to_addr} after stages: {', '.join(results['resumed_from'])}")
+        if results.get("nothing_new"):
+            print(f"[{datetime.now()}] Nothing new for {to_addr}; skipped sending")
+            return
         print(f"[{datetime.now()}] Successfully completed job for {to_addr}")
+        if results.get("delivery_lateness_seconds") is not None:
+            print(f"[{datetime.now()}] Delivered to {to_addr} {results['delivery_lateness_seconds']}s after "
+                  f"{delivery_time} ({'prefetched ' + str(results['prefetched']) + ' articles' if prefetched else 'no prefetch'})")
     except Exception as e:
         print(f"[{datetime.now()}] ERROR in scheduled job for {to_addr}: {e}")
 
+def prefetch_batch(window_id, job_specs, prefetch_store):
+    """Fetch and summarize the sources of every user in a batch window ahead of its run"""
+    specs = list(job_specs.values())
+    if not specs:
+        return
+    print(f"[{datetime.now()}] Prefetching sources for batch {window_id} ({len(specs)} users)")
+    families = ('urls', 'rss_urls', 'youtube_urls', 'twitter_urls')
+    sources = {family: list(dict.fromkeys(url for spec in specs for url in spec.get(family) or [])) for family in families}
+    styles = [spec.get('writing_style', 'professional') for spec in specs]
+    try:
+        pipeline = ContentPipeline(
+            groq_api_key=os.getenv('GROQ_API_KEY'),
+            resend_api_key=os.getenv('RESEND_API_KEY')
+        )
+        prefetched = pipeline.prefetch_sources(
+            **sources,
+            max_rss_items=5,
+            # Styled summaries are only reused by users of the most common style
+            writing_style=max(set(styles), key=styles.count),
+            time_budget=PREFETCH_LEAD_MINUTES * 60 or None
+        )
+        if prefetched["success"]:
+            prefetch_store[window_id] = prefetched
+            print(f"[{datetime.now()}] Prefetched {len(prefetched['articles'])} articles for batch {window_id}")
+    except Exception as e:
+        print(f"[{datetime.now()}] ERROR prefetching for batch {window_id}: {e}")
+
+def generate_and_send_batch(job_specs, window_id=None, prefetch_store=None):
+    """Generate and send the newsletters of every user in a batch window in one shared run"""
+    title = f"Daily Newsletter - {datetime.now().strftime('%B %d, %Y')}"
+    jobs = [{**spec, 'title': title} for spec in list(job_specs.values())]
+    print(f"[{datetime.now()}] Running batch job for {len(jobs)} users")
+    # Use today's prefetch only if it ran within the lead window before the window's first delivery
+    prefetched = (prefetch_store or {}).pop(window_id, None)
+    if prefetched:
+        age_minutes = (datetime.now() - datetime.fromisoformat(prefetched['prefetched_at'])).total_seconds() / 60
+        if not 0 <= age_minutes <= PREFETCH_LEAD_MINUTES + BATCH_WINDOW_MINUTES + 30:
+            prefetched = None
+    try:
+        pipeline = ContentPipeline(
+            groq_api_key=os.getenv('GROQ_API_KEY'),
+            resend_api_key=os.getenv('RESEND_API_KEY'),
+            from_email=os.getenv('FROM_EMAIL', 'noreply@yourdomain.com')
+        )
+        results = pipeline.process_batch(
+            jobs,
+            max_rss_items=5,
+            time_budget=float(os.getenv('SCHEDULED_RUN_BUDGET_SECONDS', '300')) or None,
+            prefetched=prefetched
+        )
+        if not results["success"]:
+            print(f"[{datetime.now()}] ERROR in batch job: {results.get('error')}")
+            return
+        shared = results["shared"]
+        print(f"[{datetime.now()}] Batch fetched {shared['sources']} sources for {shared['source_requests']} "
+              f"subscriptions and summarized {shared['summarized']} articles"
+              f"{' (with prefetch)' if prefetched else ''}")
+        for user_id, result in results["jobs"].items():
+            outcome = "nothing new" if result.get("nothing_new") else ("sent" if result["success"] else result.get("error"))
+            print(f"[{datetime.now()}] Batch delivery for user {user_id}: {outcome}")
+    except Exception as e:
+        print(f"[{datetime.now()}] ERROR in batch job: {e}")
+
+def _batch_job_id(delivery_time):
+    """Scheduler job id of the batch window a delivery time falls in"""
+    minutes = (delivery_time.hour * 60 + delivery_time.minute) // BATCH_WINDOW_MINUTES * BATCH_WINDOW_MINUTES
+    return f"newsletter_batch_{minutes // 60:02d}{minutes % 60:02d}"
+
+def _schedule_batch_window(job_id):
+    """
+    (Re)schedule a batch window's run at its latest delivery time, so no user gets their
+    newsletter before the time they chose, and its prefetch ahead of its earliest one
+    """
+    specs = st.session_state.batch_slots[job_id]
+    times = sorted(datetime.strptime(spec['delivery_time'], '%H:%M') for spec in specs.values())
+    # The jobs hold the window's spec dict, so users added later join the same run
+    st.session_state.scheduler.add_job(
+        generate_and_send_batch, 'cron', hour=times[-1].hour, minute=times[-1].minute, id=job_id,
+        args=[specs, job_id, st.session_state.prefetched], replace_existing=True
+    )
+    if PREFETCH_LEAD_MINUTES:
+        prefetch_at = times[0] - timedelta(minutes=PREFETCH_LEAD_MINUTES)
+        st.session_state.scheduler.add_job(
+            prefetch_batch, 'cron', hour=prefetch_at.hour, minute=prefetch_at.minute, id=f"prefetch_{job_id}",
+            args=[job_id, specs, st.session_state.prefetched], replace_existing=True
+        )
+
+def schedule_batch_delivery(user_id, delivery_time, job_spec):
+    """Add a user to the batch run for their delivery window"""
+    unschedule_batch_delivery(user_id)
+    job_id = _batch_job_id(delivery_time)
+    specs = st.session_state.batch_slots.setdefault(job_id, {})
+    specs[user_id] = {**job_spec, 'delivery_time': delivery_time.strftime('%H:%M')}
+    _schedule_batch_window(job_id)
+
+def unschedule_batch_delivery(user_id):
+    """Remove a user from their batch window, dropping the window's jobs once it is empty"""
+    for job_id, specs in list(st.session_state.batch_slots.items()):
+        if specs.pop(user_id, None) is None:
+            continue
+        if specs:
+            _schedule_batch_window(job_id)
+            continue
+        del st.session_state.batch_slots[job_id]
+        existing_jobs = [job.id for job in st.session_state.scheduler.get_jobs()]
+        for window_job in (job_id, f"prefetch_{job_id}"):
+            if window_job in existing_jobs:
+                st.session_state.scheduler.remove_job(window_job)
+
 def create_scheduled_job(user_id, delivery_time, email, sources, style_profile):
     """Create a scheduled job for automatic newsletter delivery"""
     try:
@@ -108,6 +295,9 @@ def create_scheduled_job(user_id, delivery_time, email, sources, style_profile):
         existing_jobs = [job.id for job in st.session_state.scheduler.get_jobs()]
         if job_id in existing_jobs:
             st.session_state.scheduler.remove_job(job_id)
+        if f"prefetch_{user_id}" in existing_jobs:
+            st.session_state.scheduler.remove_job(f"prefetch_{user_id}")
+        unschedule_batch_delivery(user_id)
         
         # Prepare source URLs
         urls = [s['url'] for s in sources if s['type'] in ['Website', 'Other']]
@@ -143,28 +333,62 @@ def create_scheduled_job(user_id, delivery_time, email, sources, style_profile):
         else:
             writing_style = 'professional'  # Default style
         
-        # Add new scheduled job
-        st.session_state.scheduler.add_job(
-            generate_and_send_newsletter,
-            'cron',
-            hour=delivery_time.hour,
-            minute=delivery_time.minute,
-            id=job_id,
-            args=[
-                os.getenv('GROQ_API_KEY'),
-                os.getenv('RESEND_API_KEY'),
-                os.getenv('FROM_EMAIL', 'noreply@yourdomain.com'),
-                email,
-                urls,
-                rss_urls,
-                f"Daily Newsletter - {datetime.now().strftime('%B %d, %Y')}",
-                youtube_urls,
-                twitter_urls,
-                writing_style
-            ],
-            replace_existing=True
-        )
-        
+        if BATCH_SCHEDULING:
+            # Share fetching and summaries with other users due in the same window
+            schedule_batch_delivery(user_id, delivery_time, {
+                'user_id': user_id,
+                'email': email,
+                'urls': urls,
+                'rss_urls': rss_urls,
+                'youtube_urls': youtube_urls,
+                'twitter_urls': twitter_urls,
+                'writing_style': writing_style
+            })
+        else:
+            # Add new scheduled job
+            st.session_state.scheduler.add_job(
+                generate_and_send_newsletter,
+                'cron',
+                hour=delivery_time.hour,
+                minute=delivery_time.minute,
+                id=job_id,
+                args=[
+                    os.getenv('GROQ_API_KEY'),
+                    os.getenv('RESEND_API_KEY'),
+                    os.getenv('FROM_EMAIL', 'noreply@yourdomain.com'),
+                    email,
+                    urls,
+                    rss_urls,
+                    f"Daily Newsletter - {datetime.now().strftime('%B %d, %Y')}",
+                    youtube_urls,
+                    twitter_urls,
+                    writing_style,
+                    user_id,
+                    delivery_time.strftime('%H:%M'),
+                    st.session_state.prefetched
+                ],
+                replace_existing=True
+            )
+            if PREFETCH_LEAD_MINUTES:
+                prefetch_at = datetime.combine(datetime.now().date(), delivery_time) - timedelta(minutes=PREFETCH_LEAD_MINUTES)
+                st.session_state.scheduler.add_job(
+                    prefetch_newsletter,
+                    'cron',
+                    hour=prefetch_at.hour,
+                    minute=prefetch_at.minute,
+                    id=f"prefetch_{user_id}",
+                    args=[
+                        os.getenv('GROQ_API_KEY'),
+                        urls,
+                        rss_urls,
+                        youtube_urls,
+                        twitter_urls,
+                        writing_style,
+                        user_id,
+                        st.session_state.prefetched
+                    ],
+                    replace_existing=True
+                )
         
         # Track job info
         job_info = {
@@ -193,7 +417,9 @@ def remove_scheduled_job(user_id):
         existing_jobs = [job.id for job in st.session_state.scheduler.get_jobs()]
         if job_id in existing_jobs:
             st.session_state.scheduler.remove_job(job_id)
-        
+        if f"prefetch_{user_id}" in existing_jobs:
+            st.session_state.scheduler.remove_job(f"prefetch_{user_id}")
+        unschedule_batch_delivery(user_id)
         
         # Remove from tracked jobs
         st.session_state.scheduled_jobs = [job for job in st.session_state.scheduled_jobs if job['user_id'] != user_id]
@@ -205,6 +431,12 @@ def remove_scheduled_job(user_id):
         print(f"[{datetime.now()}] ERROR removing scheduled job: {e}")
         return False
 
+# Restore jobs on startup, then resume today's runs a restart interrupted (once per scheduler)
+restore_scheduled_jobs()
+if not st.session_state.get('resumed_interrupted_runs'):
+    st.session_state.resumed_interrupted_runs = True
+    resume_interrupted_runs()
+
 def show_login_page():
     """Display login/signup page"""
     st.title("📰 CreatorPulse")
@@ -1209,6 +1441,21 @@ def show_draft_generation(user):
             "How would you like to receive the draft?",
             ["Email", "Preview Only"]
         )
+        template_digest = st.checkbox(
+            "⚡ Fast template digest",
+            value=False,
+            help="Assemble the digest from structured article summaries using your writing style's template, without a second AI pass"
+        )
+        offline_digest = st.checkbox(
+            "📴 Offline digest (no AI calls)",
+            value=False,
+            help="Build summaries and the digest locally from each article's key sentences - useful when the AI service is busy"
+        )
+        include_insights = st.checkbox(
+            "🔍 Include key insights",
+            value=False,
+            help="Analyze trends across the article summaries while the digest is written"
+        )
     
     # Generate draft
     if st.button("🚀 Generate Draft", type="primary"):
@@ -1372,6 +1619,18 @@ def show_draft_generation(user):
                 
                 print(f"DEBUG: Final writing style selected: {writing_style}")
                 
+                # Render the digest progressively while the LLM streams it
+                stream_placeholder = st.empty()
+                streamed_parts = []
+                last_render = [0.0]
+                
+                def render_digest_token(token):
+                    streamed_parts.append(token)
+                    now = datetime.now().timestamp()
+                    if now - last_render[0] >= 0.1:
+                        stream_placeholder.markdown("".join(streamed_parts))
+                        last_render[0] = now
+                
                 results = pipeline.process_mixed_sources(
                     urls=urls,
                     rss_urls=rss_urls,
@@ -1380,18 +1639,32 @@ def show_draft_generation(user):
                     max_rss_items=5,
                     email_recipients=[user['delivery_settings']['email']] if delivery_method == "Email" else [],
                     digest_title=f"Your {focus_niche} Newsletter",
-                    writing_style=writing_style
+                    writing_style=writing_style,
+                    on_digest_token=render_digest_token,
+                    template_digest=template_digest,
+                    offline=offline_digest or None,
+                    include_insights=include_insights,
+                    ranking=user.get('ranking')
                 )
                 generation_time = (datetime.now() - start_time).total_seconds()
+                stream_placeholder.empty()
                 
                 if results["success"]:
                     draft_id = f"draft_{int(datetime.now().timestamp())}"
                     
                     st.success("✅ Draft generated successfully!")
+                    usage = results.get("llm_usage")
+                    if usage:
+                        st.caption(f"Generated in {generation_time:.1f}s · {usage['calls']} LLM calls · "
+                                   f"{usage['total_tokens']:,} tokens · {usage['cache_hits']} cache hits · "
+                                   f"~${usage['cost_usd']:.4f}")
                     
                     # Display draft
                     st.subheader("📰 Your Newsletter Draft")
                     st.markdown(results["digest_content"])
+                    if results.get("insights"):
+                        with st.expander("🔍 Key Insights & Trends"):
+                            st.markdown(results["insights"])
                     
                     # Review interface
                     st.subheader("📝 Review & Edit")
@@ -1523,6 +1796,34 @@ def show_settings(user):
             # Use session state to trigger UI update without full rerun
             st.session_state.settings_saved = True
     
+    # Relevance ranking: which scraped articles are worth summarizing
+    st.subheader("Relevance Ranking")
+    ranking = user.get('ranking') or {}
+    with st.form("ranking_settings"):
+        top_k = st.number_input("Articles to summarize (0 = all)", min_value=0, max_value=100,
+                                value=int(ranking.get('top_k') or 0),
+                                help="Articles are scored locally and only the best ones are sent to the AI")
+        token_budget = st.number_input("AI token budget per newsletter (0 = unlimited)", min_value=0, step=1000,
+                                       value=int(ranking.get('token_budget') or 0))
+        keywords = st.text_input("Niche keywords (comma separated)", value=", ".join(ranking.get('keywords', [])))
+        weights = ranking.get('weights', {})
+        weight_cols = st.columns(5)
+        new_weights = {
+            feature: col.slider(feature.title(), 0.0, 3.0, float(weights.get(feature, 1.0)), 0.5)
+            for col, feature in zip(weight_cols, ('freshness', 'quality', 'source', 'keywords', 'novelty'))
+        }
+        if st.form_submit_button("Save Ranking"):
+            auth_manager.update_user_data(user['user_id'], {
+                'ranking': {
+                    **ranking,
+                    'top_k': int(top_k),
+                    'token_budget': int(token_budget),
+                    'keywords': [k.strip() for k in keywords.split(',') if k.strip()],
+                    'weights': new_weights
+                }
+            })
+            st.success("✅ Ranking settings saved!")
+    
     # Show current scheduled job status
     st.subheader("📅 Delivery Status")
     
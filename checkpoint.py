@@ -0,0 +1,125 @@
+"""
+Durable per-run checkpoints so an interrupted pipeline run resumes from its last completed stage.
+
+Each run id gets one JSON file in PIPELINE_CHECKPOINT_DIR holding the outputs of the stages
+it has completed (fetched articles, summaries, digest, delivery). Files are replaced
+atomically, so a crash mid-write leaves the previous checkpoint intact, and checkpoints
+older than PIPELINE_CHECKPOINT_DAYS are pruned.
+"""
+import os
+import re
+import json
+import time
+import logging
+import tempfile
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from tracing import traced
+
+logger = logging.getLogger(__name__)
+
+
+def _to_json(value: Any) -> Any:
+    """JSON fallback: compact containers (e.g. TranscriptSnippets) as lists, anything else as text."""
+    to_list = getattr(value, 'to_list', None)
+    return to_list() if callable(to_list) else str(value)
+
+
+class RunCheckpoint:
+    def __init__(self, run_id: str, directory: Optional[str] = None, retention_days: Optional[float] = None):
+        """
+        Open (or start) the checkpoint of a run.
+
+        Args:
+            run_id: Identifier shared by every attempt of the same run
+            directory: Checkpoint directory; defaults to PIPELINE_CHECKPOINT_DIR ('checkpoints')
+            retention_days: Age after which checkpoint files are pruned; defaults to
+                PIPELINE_CHECKPOINT_DAYS (7)
+        """
+        self.run_id = run_id
+        self.directory = directory or os.getenv('PIPELINE_CHECKPOINT_DIR', 'checkpoints')
+        if retention_days is None:
+            retention_days = float(os.getenv('PIPELINE_CHECKPOINT_DAYS', '7'))
+        self.retention_seconds = retention_days * 86400
+        safe_id = re.sub(r'[^A-Za-z0-9._-]+', '_', run_id)
+        self.path = os.path.join(self.directory, f"{safe_id}.json")
+        self._lock = threading.Lock()
+        self.data = self._load()
+
+    def _load(self) -> Dict:
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('run_id') == self.run_id:
+                    logger.info(f"Resuming run {self.run_id} after stages: {', '.join(data.get('stages', {}))}")
+                    return data
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable checkpoint {self.path}: {e}")
+        return {'run_id': self.run_id, 'created_at': datetime.now().isoformat(), 'stages': {}}
+
+    def has(self, stage: str) -> bool:
+        return stage in self.data['stages']
+
+    def load(self, stage: str, default: Any = None) -> Any:
+        """Output saved for a completed stage."""
+        return self.data['stages'].get(stage, {}).get('output', default)
+
+    @traced('checkpoint.save', arg='stage')
+    def save(self, stage: str, output: Any):
+        """Record a completed stage's output and write the checkpoint atomically."""
+        with self._lock:
+            self.data['stages'][stage] = {'output': output, 'completed_at': datetime.now().isoformat()}
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.checkpoint-', suffix='.json')
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(self.data, f, ensure_ascii=False, default=_to_json)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                logger.error(f"Error saving checkpoint for run {self.run_id}: {e}")
+        self._prune()
+
+    def _prune(self):
+        """Delete other runs' checkpoint files past the retention period."""
+        cutoff = time.time() - self.retention_seconds
+        try:
+            for name in os.listdir(self.directory):
+                path = os.path.join(self.directory, name)
+                if path != self.path and name.endswith('.json') and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+        except OSError as e:
+            logger.warning(f"Error pruning checkpoints: {e}")
+
+
+def incomplete_runs(directory: Optional[str] = None, since: Optional[datetime] = None) -> List[str]:
+    """
+    Run ids whose checkpoint has completed stages but no delivery, i.e. runs interrupted
+    partway that a retry under the same run id would resume.
+
+    Args:
+        directory: Checkpoint directory; defaults to PIPELINE_CHECKPOINT_DIR ('checkpoints')
+        since: Only runs whose checkpoint was started at or after this time
+    """
+    directory = directory or os.getenv('PIPELINE_CHECKPOINT_DIR', 'checkpoints')
+    run_ids = []
+    try:
+        names = sorted(os.listdir(directory))
+    except OSError:
+        return run_ids
+    for name in names:
+        if not name.endswith('.json') or name.startswith('.'):
+            continue
+        try:
+            with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            created_at = datetime.fromisoformat(data['created_at'])
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable checkpoint {name}: {e}")
+            continue
+        stages = data.get('stages', {})
+        if stages and 'delivered' not in stages and (since is None or created_at >= since):
+            run_ids.append(data['run_id'])
+    return run_ids
@@ -1,6 +1,9 @@
 import os
 import logging
-from typing import List, Dict, Optional
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from typing import List, Dict, Optional, Callable
 from datetime import datetime
 import json
 
@@ -9,11 +12,61 @@ from groq_processor import GroqContentProcessor
 from email_sender import EmailSender
 from youtube_processor import YouTubeTranscriptProcessor
 from twitter_processor import TwitterProcessor
+from llm_metrics import usage_context, in_current_context
+from run_budget import RunBudget
+from delivery_history import DeliveryHistory, canonical_url
+from stream_pipeline import Stage, run_stages
+from checkpoint import RunCheckpoint
+from ranking import RankingConfig, top_k_indices
+from content_quality import ContentQualityGate, is_real
+from tracing import annotate, current_trace, export_trace, run_trace, save_trace, span, traced, tracing_enabled
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Digest and insights prompts read at most this much content of a summarized article, and the
+# delivery history hashes the same prefix
+SUMMARIZED_CONTENT_CHARS = 1000
+
+def _tracks_llm_usage(method):
+    """
+    Run a pipeline method as one LLM usage run and add its accounting to the result as 'llm_usage'
+    (with the run's hedging counters under 'hedging' when digest hedging is on).
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        run_id = self.processor.usage.new_run_id()
+        hedging = self.processor.hedge_policy.stats() if self.processor.hedge_digest else None
+        try:
+            with usage_context(run=run_id):
+                results = method(self, *args, **kwargs)
+        finally:
+            extra = {'hedging': self.processor.hedge_policy.stats(since=hedging)} if hedging is not None else None
+            usage = self.processor.usage.finish_run(run_id, extra=extra)
+        if isinstance(results, dict):
+            results['llm_usage'] = usage
+        return results
+    return wrapper
+
+def _records_trace(method):
+    """
+    Trace a pipeline method as one run and add its Chrome trace timeline to the result as 'trace'
+    (also saved to PIPELINE_TRACE_DIR when set). Calls made inside an already traced run are
+    part of that run's timeline instead.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not tracing_enabled() or current_trace() is not None:
+            return method(self, *args, **kwargs)
+        with run_trace(method.__name__, run_id=kwargs.get('run_id')) as trace:
+            results = trace.root.measure(method(self, *args, **kwargs))
+        export_trace(trace)
+        if isinstance(results, dict):
+            results['trace'] = trace.to_chrome()
+        return results
+    return wrapper
+
 class ContentPipeline:
     def __init__(self, 
                  groq_api_key: Optional[str] = None,
@@ -47,7 +100,22 @@ class ContentPipeline:
         
         if from_email:
             self.email_sender.from_email = from_email
+        
+        # Source families fetched first when a run has a time budget
+        self.source_priority = [
+            family.strip() for family in os.getenv('PIPELINE_SOURCE_PRIORITY', 'urls,rss,twitter,youtube').split(',')
+            if family.strip()
+        ]
+        # Source fetches running at once, shared across all families
+        self.fetch_concurrency = max(1, int(os.getenv('PIPELINE_FETCH_CONCURRENCY', '6')))
+        # Streaming runs overlap fetching with summarization through bounded queues
+        self.streaming = os.getenv('PIPELINE_STREAMING', 'false').lower() == 'true'
+        self.stream_queue_size = max(1, int(os.getenv('PIPELINE_STREAM_QUEUE_SIZE', '8')))
+        # Summarized articles drop transcript snippets and content the digest never reads
+        self.release_heavy_fields = os.getenv('PIPELINE_RELEASE_HEAVY_FIELDS', 'true').lower() == 'true'
     
+    @_records_trace
+    @_tracks_llm_usage
     def process_urls(self, 
                     urls: List[str], 
                     email_recipients: List[str] = None,
@@ -126,6 +194,8 @@ class ContentPipeline:
                 "articles": []
             }
     
+    @_records_trace
+    @_tracks_llm_usage
     def process_rss_feeds(self, 
                          rss_urls: List[str], 
                          max_items_per_feed: int = 5,
@@ -203,6 +273,8 @@ class ContentPipeline:
                 "articles": []
             }
     
+    @_records_trace
+    @_tracks_llm_usage
     def process_youtube_urls(self, 
                            youtube_urls: List[str], 
                            email_recipients: List[str] = None,
@@ -607,6 +679,427 @@ class ContentPipeline:
         
         return "\n".join(digest_parts)
     
+    def _source_fetches(self, urls: Optional[List[str]], rss_urls: Optional[List[str]],
+                        youtube_urls: Optional[List[str]], twitter_urls: Optional[List[str]],
+                        max_rss_items: int, force_fresh: bool) -> List[Dict]:
+        """
+        Split a run's sources into independently fetchable units, in digest order.
+        
+        Returns:
+            List of {'family', 'source', 'fetch'} dicts; calling 'fetch' returns that source's articles
+        """
+        fetches = []
+        for url in urls or []:
+            fetches.append({'family': 'urls', 'source': url, 'fetch': functools.partial(
+                self.scraper.scrape_multiple_urls, [url], force_fresh=force_fresh)})
+        for rss_url in rss_urls or []:
+            fetches.append({'family': 'rss', 'source': rss_url, 'fetch': functools.partial(
+                self.scraper.scrape_rss_feed, rss_url, max_rss_items, force_fresh=force_fresh)})
+        
+        # Individual videos before channels (latest videos)
+        youtube_urls = youtube_urls or []
+        channel_urls = [url for url in youtube_urls if self.youtube_processor.is_youtube_channel(url)]
+        for url in youtube_urls:
+            if url not in channel_urls:
+                fetches.append({'family': 'youtube', 'source': url, 'fetch': functools.partial(
+                    self.youtube_processor.process_youtube_urls, [url])})
+        if channel_urls:
+            youtube_api_key = os.getenv('YOUTUBE_DATA_API_KEY')
+            if not youtube_api_key:
+                logger.warning("YOUTUBE_DATA_API_KEY not found in environment variables")
+                logger.info("To fetch latest videos from channels, set YOUTUBE_DATA_API_KEY environment variable")
+                logger.info("Individual YouTube video URLs will still work, but channel processing requires the API key")
+            else:
+                for channel_url in channel_urls:
+                    fetches.append({'family': 'youtube', 'source': channel_url, 'fetch': functools.partial(
+                        self._fetch_youtube_channel, channel_url, youtube_api_key)})
+        
+        for url in twitter_urls or []:
+            fetches.append({'family': 'twitter', 'source': url, 'fetch': functools.partial(
+                self.twitter_processor.process_twitter_sources, [url])})
+        return fetches
+    
+    @traced('pipeline.fetch_channel', arg='source')
+    def _fetch_youtube_channel(self, channel_url: str, api_key: str) -> List[Dict]:
+        """Fetch transcripts for a channel's latest videos."""
+        logger.info(f"Fetching latest videos from channel: {channel_url}")
+        latest_videos = self.youtube_processor.get_channel_latest_videos(channel_url, max_videos=3, api_key=api_key)
+        if not latest_videos:
+            logger.warning(f"No videos found for channel: {channel_url}")
+            return []
+        logger.info(f"Found {len(latest_videos)} videos from {channel_url}")
+        return self.youtube_processor.process_youtube_urls(latest_videos)
+    
+    def _fetch_unit(self, unit: Dict) -> List[Dict]:
+        """Fetch one unit from _source_fetches, timed as a span of the run."""
+        with span('pipeline.fetch_source', family=unit['family'], source=unit['source']) as current:
+            articles = unit['fetch']()
+            return current.measure(articles) if current is not None else articles
+    
+    def _fetch_sources(self, fetches: List[Dict], budget: RunBudget,
+                       source_priority: Optional[List[str]] = None) -> List[Dict]:
+        """Fetch source units (see _fetch_units) and return their articles in digest order."""
+        fetched = self._fetch_units(fetches, budget, source_priority)
+        return [article for i in range(len(fetches)) for article in fetched.get(i, [])]
+    
+    @traced('pipeline.fetch')
+    def _fetch_units(self, fetches: List[Dict], budget: RunBudget,
+                     source_priority: Optional[List[str]] = None) -> Dict[int, List[Dict]]:
+        """
+        Fetch source units concurrently, highest-priority family first, within the budget's fetch deadline.
+        
+        All families share one pool of self.fetch_concurrency workers, so the fetch takes about as
+        long as the slowest source rather than the sum. Units still queued at the deadline are
+        skipped and units still running are abandoned; both are recorded on the budget. A unit
+        that fails is logged and skipped so the other sources still make the digest.
+        
+        Args:
+            fetches: Units from _source_fetches, in digest order
+            budget: Budget for this run
+            source_priority: Families in the order they start; defaults to self.source_priority
+            
+        Returns:
+            Articles per fetched unit, keyed by the unit's index in fetches
+        """
+        rank = {family: i for i, family in enumerate(source_priority or self.source_priority)}
+        order = sorted(range(len(fetches)), key=lambda i: (rank.get(fetches[i]['family'], len(rank)), i))
+        fetched = {}
+        collected = set()
+        
+        def collect(i, future):
+            unit = fetches[i]
+            collected.add(i)
+            try:
+                fetched[i] = future.result() or []
+            except Exception as e:
+                logger.error(f"Failed to fetch {unit['family']} source {unit['source']}: {e}")
+                return
+            logger.info(f"Retrieved {len(fetched[i])} articles from {unit['family']} source {unit['source']}")
+        
+        executor = ThreadPoolExecutor(max_workers=self.fetch_concurrency, thread_name_prefix="source-fetch")
+        # The pool starts queued units in submission order, so priority decides who waits
+        futures = {executor.submit(in_current_context(self._fetch_unit), fetches[i]): i for i in order}
+        try:
+            timeout = budget.time_left('fetch') if budget.enabled else None
+            for future in as_completed(futures, timeout=timeout):
+                collect(futures[future], future)
+        except FuturesTimeout:
+            for future, i in futures.items():
+                unit = fetches[i]
+                if future.done():
+                    if i not in collected:
+                        collect(i, future)
+                elif future.cancel():
+                    budget.drop(unit['family'], unit['source'], "skipped: fetch budget spent")
+                else:
+                    budget.drop(unit['family'], unit['source'], "cancelled: still fetching at the fetch deadline")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        annotate(items=sum(len(articles) for articles in fetched.values()))
+        return fetched
+    
+    @traced('pipeline.stream')
+    def _stream_articles(self, fetches: List[Dict], budget: RunBudget, source_priority: Optional[List[str]] = None,
+                         history: Optional[DeliveryHistory] = None, ready: Optional[Dict[str, Dict]] = None,
+                         gate: Optional[ContentQualityGate] = None, **summary_kwargs) -> tuple:
+        """
+        Fetch and summarize articles as a stream: fetch -> extract -> dedupe -> summarize.
+        With a delivery history, a 'history' stage before summarize drops already-delivered items.
+        
+        Stages are joined by bounded queues, so summarization starts with the first fetched
+        article and a slow LLM holds fetching back instead of piling up articles. Each article
+        is summarized on its own (packed mode has nothing to pack). Deadlines apply per item:
+        fetches are skipped or abandoned at the fetch deadline, and articles reaching the
+        summarize stage late, or whose LLM summary misses the deadline, are summarized offline.
+        
+        Args:
+            fetches: Units from _source_fetches, in digest order
+            budget: Budget for this run
+            source_priority: Families in the order they start; defaults to self.source_priority
+            history: The recipient's delivery history, if only new items should be summarized
+            ready: Prefetched summaries keyed by canonical URL, reused instead of summarizing again
+            gate: Content quality gate applied before summarizing; templated articles skip the LLM
+            **summary_kwargs: Passed to process_multiple_articles
+            
+        Returns:
+            (processed articles in digest order, per-stage metrics)
+        """
+        rank = {family: i for i, family in enumerate(source_priority or self.source_priority)}
+        order = sorted(range(len(fetches)), key=lambda i: (rank.get(fetches[i]['family'], len(rank)), i))
+        seen = set()
+        lock = threading.Lock()
+        process = self.processor.process_multiple_articles
+        
+        def fetch(i):
+            unit = fetches[i]
+            if budget.time_left('fetch') <= 0:
+                budget.drop(unit['family'], unit['source'], "skipped: fetch budget spent")
+                return []
+            finished, articles = budget.run('fetch', self._fetch_unit, unit)
+            if not finished:
+                budget.drop(unit['family'], unit['source'], "cancelled: still fetching at the fetch deadline")
+                return []
+            # Keys restore digest order after items finish out of order
+            return [((i, n), article) for n, article in enumerate(articles or [])]
+        
+        def extract(item):
+            key, article = item
+            content = (article.get('content') or '').strip()
+            if article.get('title') == 'Error' or not content:
+                return []
+            return [(key, {**article, 'content': content})]
+        
+        def dedupe(item):
+            _, article = item
+            identity = (article.get('url') or '').rstrip('/').lower() or (article.get('title') or '').strip().lower()
+            with lock:
+                if identity in seen:
+                    return []
+                seen.add(identity)
+            return [item]
+        
+        def summarize(item):
+            key, article = item
+            if gate is not None:
+                article = gate.check(article)
+                if article is None:
+                    return []
+            if not is_real(article):
+                return [(key, self._released(article))]
+            url = canonical_url(article.get('url', ''))
+            if ready and url and url in ready:
+                return [(key, ready[url])]
+            kwargs = summary_kwargs
+            if budget.enabled and not kwargs.get('offline'):
+                if budget.time_left('summaries') <= 0:
+                    kwargs = {**kwargs, 'offline': True}
+                else:
+                    finished, processed = budget.run('summaries', process, [article], **kwargs)
+                    if finished:
+                        return [(key, self._released(processed[0]))]
+                    kwargs = {**kwargs, 'offline': True}
+                with lock:
+                    if not any(d['stage'] == 'summaries' for d in budget.degraded):
+                        budget.degrade('summaries', 'offline', "summaries deadline passed mid-stream")
+            return [(key, self._released(process([article], **kwargs)[0]))]
+        
+        stages = [
+            Stage('fetch', fetch, workers=self.fetch_concurrency, queue_size=len(order) or 1),
+            Stage('extract', extract, queue_size=self.stream_queue_size),
+            Stage('dedupe', dedupe, queue_size=self.stream_queue_size),
+        ]
+        if history is not None:
+            stages.append(Stage('history', lambda item: [] if history.is_delivered(item[1]) else [item],
+                                queue_size=self.stream_queue_size))
+        stages.append(
+            Stage('summarize', summarize, workers=self.processor.max_concurrency, queue_size=self.stream_queue_size)
+        )
+        outputs, metrics = run_stages(order, stages)
+        outputs.sort(key=lambda item: item[0])
+        return [article for _, article in outputs], metrics
+    
+    @traced('pipeline.rank')
+    def _rank_articles(self, articles: List[Dict], config: RankingConfig,
+                       history: Optional[DeliveryHistory] = None) -> tuple:
+        """
+        Keep the top-ranked articles (see ranking.top_k_indices), scoring novelty against the history.
+        Articles templated by the quality gate cost no LLM call and are kept without competing.
+        """
+        delivered_titles = history.delivered_titles() if history is not None else []
+        real = [i for i, article in enumerate(articles) if is_real(article)]
+        kept, score, report = top_k_indices([articles[i] for i in real], config, delivered_titles)
+        scores = {real[k]: round(float(score[k]), 4) for k in kept}
+        selected = [
+            {**article, 'relevance_score': scores[i]} if i in scores else article
+            for i, article in enumerate(articles) if i in scores or not is_real(article)
+        ]
+        logger.info(f"Ranked {report['considered']} articles; summarizing the top {report['selected']} "
+                    f"(~{report['estimated_tokens']} prompt tokens)")
+        return selected, report
+    
+    @traced('pipeline.summarize')
+    def _summarize_within_budget(self, articles: List[Dict], budget: RunBudget,
+                                 ready: Optional[Dict[str, Dict]] = None, **summary_kwargs) -> List[Dict]:
+        """
+        Summarize articles, switching to cheaper paths as the summaries deadline approaches.
+        
+        Articles with a summary in ready (prefetched, keyed by canonical URL) are not summarized
+        again, and articles the quality gate templated pass through unchanged. With less than
+        half the summaries share left, the rest are packed into fewer requests; with none left,
+        or if the LLM pass is still running at the deadline, their summaries are built offline
+        (extractive, no LLM calls).
+        """
+        ready = ready or {}
+        keys = [canonical_url(article.get('url', '')) for article in articles]
+        todo = [article for article, key in zip(articles, keys) if is_real(article) and not (key and key in ready)]
+        reused = sum(1 for article, key in zip(articles, keys) if is_real(article) and key and key in ready)
+        if reused:
+            logger.info(f"Reusing {reused} prefetched summaries; summarizing {len(todo)} new articles")
+        
+        processed = []
+        if todo:
+            process = self.processor.process_multiple_articles
+            if budget.enabled and not summary_kwargs.get('offline'):
+                time_left = budget.time_left('summaries')
+                if time_left <= 0:
+                    budget.degrade('summaries', 'offline', "no time left after fetching")
+                    summary_kwargs['offline'] = True
+                elif time_left < budget.seconds * budget.summary_share / 2:
+                    budget.degrade('summaries', 'packed', f"{time_left:.0f}s left for summaries")
+                    summary_kwargs['packed'] = True
+            
+            finished, processed = budget.run('summaries', process, todo, **summary_kwargs)
+            if not finished:
+                budget.degrade('summaries', 'offline', "LLM summaries still running at the deadline")
+                processed = process(todo, **{**summary_kwargs, 'offline': True})
+        
+        fresh = iter(processed)
+        return [
+            self._released(article if not is_real(article) else ready[key] if key and key in ready else next(fresh))
+            for article, key in zip(articles, keys)
+        ]
+    
+    def _released(self, article: Dict) -> Dict:
+        """
+        A summarized article without the fields only summarization needs: YouTube transcript
+        snippets and content past SUMMARIZED_CONTENT_CHARS. Returns the article itself when
+        there is nothing to release or release_heavy_fields is off.
+        """
+        content = article.get('content')
+        trim = isinstance(content, str) and len(content) > SUMMARIZED_CONTENT_CHARS
+        if not self.release_heavy_fields or not (trim or 'raw_transcript' in article):
+            return article
+        light = {key: value for key, value in article.items() if key != 'raw_transcript'}
+        if trim:
+            light['content'] = content[:SUMMARIZED_CONTENT_CHARS]
+        return light
+    
+    @traced('pipeline.digest')
+    def _digest_within_budget(self, articles: List[Dict], digest_title: str, writing_style: str,
+                              budget: RunBudget, include_insights: bool, **digest_kwargs) -> tuple:
+        """
+        Create the digest (and insights), falling back to the offline template digest when
+        summaries were already degraded to offline or the digest misses the run's deadline.
+        
+        A streaming digest (on_token set) runs on the calling thread and is not timed out.
+        
+        Returns:
+            (digest_content, insights); insights is empty when not requested or dropped
+        """
+        def create():
+            if include_insights:
+                return self.processor.create_digest_with_insights(
+                    articles, digest_title, writing_style, **digest_kwargs
+                )
+            return self.processor.create_digest(articles, digest_title, writing_style, **digest_kwargs), ""
+        
+        if budget.enabled and not digest_kwargs.get('offline'):
+            offline_summaries = any(d['stage'] == 'summaries' and d['mode'] == 'offline' for d in budget.degraded)
+            if offline_summaries or budget.time_left('digest') <= 0:
+                budget.degrade('digest', 'offline', "summaries ran out of time" if offline_summaries else "no time left")
+                digest_kwargs['offline'] = True
+                if include_insights:
+                    budget.degrade('insights', 'skipped', "offline digest")
+        
+        if digest_kwargs.get('on_token'):
+            return create()
+        finished, result = budget.run('digest', create)
+        if not finished:
+            budget.degrade('digest', 'offline', "LLM digest still running at the deadline")
+            if include_insights:
+                budget.degrade('insights', 'skipped', "offline digest")
+            result = self.processor.create_digest(articles, digest_title, writing_style, offline=True), ""
+        return result
+    
+    @traced('pipeline.send')
+    def _send_digest(self, digest_content: str, digest_title: str, email_recipients: Optional[List[str]],
+                     history: Optional[DeliveryHistory], processed_articles: List[Dict]) -> Dict:
+        """Email the digest and, once sent, record its articles in the recipient's delivery history."""
+        if not email_recipients:
+            logger.info("No email recipients specified, skipping email sending")
+            return {"message": "No email recipients specified"}
+        
+        logger.info("Sending email digest...")
+        email_response = self.email_sender.send_content_digest(
+            content=digest_content,
+            subject=f"{digest_title} - {datetime.now().strftime('%B %d, %Y')}",
+            to_emails=email_recipients
+        )
+        
+        if "error" in email_response:
+            logger.warning(f"Email sending failed: {email_response['error']}")
+        elif history is not None:
+            history.record(processed_articles)
+        return email_response
+    
+    @_records_trace
+    @_tracks_llm_usage
+    def prefetch_sources(self,
+                         urls: List[str] = None,
+                         rss_urls: List[str] = None,
+                         youtube_urls: List[str] = None,
+                         twitter_urls: List[str] = None,
+                         max_rss_items: int = 5,
+                         writing_style: str = "professional",
+                         template_digest: Optional[bool] = None,
+                         offline: Optional[bool] = None,
+                         user_id: Optional[str] = None,
+                         time_budget: Optional[float] = None) -> Dict[str, any]:
+        """
+        Fetch and summarize a newsletter's sources ahead of its delivery time.
+        
+        Pass the result to process_mixed_sources(prefetched=...) at delivery time, which then only
+        tops up new items, assembles the digest and sends it.
+        
+        Args:
+            urls, rss_urls, youtube_urls, twitter_urls, max_rss_items: Sources, as for process_mixed_sources
+            writing_style: Writing style of the upcoming digest (styles structured summaries)
+            template_digest: Request structured summaries; defaults to GROQ_TEMPLATE_DIGEST
+            offline: Summarize locally; defaults to GROQ_OFFLINE_MODE
+            user_id: Skip items already delivered to this user and summarize only their top-ranked ones
+            time_budget: Wall-clock seconds for the prefetch
+            
+        Returns:
+            Dictionary with the summarized 'articles' and 'prefetched_at'
+        """
+        try:
+            logger.info("Prefetching sources ahead of delivery")
+            budget = RunBudget.from_env(time_budget)
+            fetches = self._source_fetches(urls, rss_urls, youtube_urls, twitter_urls, max_rss_items, True)
+            articles = self._fetch_sources(fetches, budget)
+            history = DeliveryHistory(user_id) if user_id else None
+            if history is not None:
+                articles, _ = history.filter_new(articles)
+            articles = ContentQualityGate().apply(articles)
+            ranking_config = RankingConfig.for_user(user_id)
+            if articles and ranking_config.enabled:
+                articles, _ = self._rank_articles(articles, ranking_config, history)
+            processed = self._summarize_within_budget(
+                articles, budget, writing_style=writing_style, structured=template_digest, offline=offline
+            )
+            logger.info(f"Prefetched {len(processed)} summarized articles")
+            return {
+                "success": True,
+                "articles": processed,
+                "writing_style": writing_style,
+                "prefetched_at": datetime.now().isoformat()
+            }
+        except Exception as e:
+            logger.error(f"Prefetch error: {str(e)}")
+            return {"success": False, "error": str(e), "articles": []}
+    
+    @staticmethod
+    def _prefetched_summaries(prefetched: Optional[Dict]) -> Dict[str, Dict]:
+        """Prefetched summarized articles keyed by canonical URL."""
+        if not prefetched or not prefetched.get('success'):
+            return {}
+        return {
+            canonical_url(article.get('url', '')): article
+            for article in prefetched.get('articles', []) if article.get('url')
+        }
+    
+    @_records_trace
+    @_tracks_llm_usage
     def process_mixed_sources(self, 
                              urls: List[str] = None,
                              rss_urls: List[str] = None,
@@ -616,10 +1109,26 @@ class ContentPipeline:
                              email_recipients: List[str] = None,
                              digest_title: str = "Mixed Content Digest",
                              writing_style: str = "professional",
-                             force_fresh: bool = True) -> Dict[str, any]:
+                             force_fresh: bool = True,
+                             on_digest_token: Optional[Callable[[str], None]] = None,
+                             template_digest: Optional[bool] = None,
+                             offline: Optional[bool] = None,
+                             include_insights: bool = False,
+                             time_budget: Optional[float] = None,
+                             source_priority: Optional[List[str]] = None,
+                             streaming: Optional[bool] = None,
+                             user_id: Optional[str] = None,
+                             prefetched: Optional[Dict] = None,
+                             deliver_at: Optional[datetime] = None,
+                             run_id: Optional[str] = None,
+                             ranking: Optional[Dict] = None) -> Dict[str, any]:
         """
         Process URLs, RSS feeds, YouTube videos, and Twitter sources in a single pipeline.
         
+        Placeholder articles (blocked-site fallbacks, videos without transcripts, Twitter sources
+        without API access) and near-empty ones never reach the LLM: ContentQualityGate drops them
+        or templates their summary, and counts each class under 'content_quality'.
+        
         Args:
             urls: List of URLs to process
             rss_urls: List of RSS feed URLs
@@ -629,6 +1138,38 @@ class ContentPipeline:
             email_recipients: List of email recipients
             digest_title: Title for the digest
             writing_style: Writing style to use (professional, casual, technical, or custom)
+            on_digest_token: Optional callback receiving the digest text as it streams from the LLM
+            template_digest: Summarize into structured fields and assemble the digest from the
+                writing style's templates without a digest LLM call; defaults to GROQ_TEMPLATE_DIGEST
+            offline: Build summaries and digest locally (extractive, no LLM calls); defaults to
+                GROQ_OFFLINE_MODE
+            include_insights: Also extract key insights from the summaries, concurrently with the digest
+            time_budget: Wall-clock seconds for the whole run; sources are fetched highest priority
+                first, stragglers are dropped and summarization gets cheaper as the budget runs out.
+                What was dropped or degraded is reported under 'budget'. None means no deadline.
+            source_priority: Source families ('urls', 'rss', 'twitter', 'youtube') in the order they
+                are fetched; defaults to PIPELINE_SOURCE_PRIORITY
+            streaming: Pass articles through bounded fetch, extract, dedupe and summarize queues so
+                summarization starts with the first fetched article; per-stage metrics are returned
+                under 'stages'. Defaults to PIPELINE_STREAMING
+            user_id: Recipient whose delivery history is consulted: items already emailed to them are
+                skipped before summarization, and a run with only such items returns 'nothing_new'
+                without sending. Items are recorded as delivered once the email is sent.
+            prefetched: Result of prefetch_sources for the same sources. The run becomes a freshness
+                top-up: pages are re-read through the scrape cache, so only new items are scraped,
+                and only articles without a prefetched summary are summarized.
+            deliver_at: Scheduled delivery time; the email's lateness against it is reported as
+                'delivery_lateness_seconds'
+            run_id: Identifier shared by every attempt of this run. Fetched articles, summaries, the
+                digest and the delivery are checkpointed under it, so a retry after a crash resumes
+                from the last completed stage (and never emails twice). Summaries finished inside an
+                interrupted stage are reused from the LLM summary cache. Stages loaded from the
+                checkpoint are listed under 'resumed_from'.
+            ranking: RankingConfig settings (top_k, token_budget, weights, keywords, source_weights)
+                overriding the user's saved 'ranking' settings and the RANKING_* defaults. With a
+                top_k or token budget, articles are scored locally and only the best are summarized.
+                Picking the best needs every candidate first, so ranking turns streaming off.
+                The selection is reported under 'ranking'.
             
         Returns:
             Dictionary containing results and status
@@ -636,81 +1177,78 @@ class ContentPipeline:
         try:
             logger.info("Starting mixed content pipeline")
             
-            all_articles = []
+            budget = RunBudget.from_env(time_budget)
+            checkpoint = RunCheckpoint(run_id) if run_id else None
+            resumed_from = list(checkpoint.data['stages']) if checkpoint else []
+            if checkpoint is not None and checkpoint.has('delivered'):
+                logger.info(f"Run {run_id} was already delivered; not sending again")
+                digest = checkpoint.load('digest', {})
+                return {
+                    "success": True,
+                    "nothing_new": False,
+                    "already_delivered": checkpoint.load('fetched', {}).get('already_delivered', 0),
+                    "articles": checkpoint.load('summaries', []),
+                    "digest_content": digest.get('digest_content', ""),
+                    "insights": digest.get('insights', ""),
+                    "budget": budget.report(),
+                    "stages": None,
+                    "prefetched": 0,
+                    "resumed_from": resumed_from,
+                    "delivery_lateness_seconds": None,
+                    "email_response": checkpoint.load('delivered'),
+                    "saved_count": 0,
+                    "processed_at": datetime.now().isoformat()
+                }
             
-            # Process URLs if provided
-            if urls:
-                logger.info(f"Processing {len(urls)} URLs...")
-                url_articles = self.scraper.scrape_multiple_urls(urls, force_fresh=force_fresh)
-                all_articles.extend(url_articles)
-                content_state = "fresh" if force_fresh else "latest available"
-                logger.info(f"Retrieved {len(url_articles)} {content_state} articles from URLs")
-            
-            # Process RSS feeds if provided
-            if rss_urls:
-                logger.info(f"Processing {len(rss_urls)} RSS feeds...")
-                for rss_url in rss_urls:
-                    rss_articles = self.scraper.scrape_rss_feed(rss_url, max_rss_items, force_fresh=force_fresh)
-                    all_articles.extend(rss_articles)
-                    content_state = "fresh" if force_fresh else "latest available"
-                    logger.info(f"Retrieved {len(rss_articles)} {content_state} articles from {rss_url}")
-            
-            # Process YouTube URLs if provided
-            if youtube_urls:
-                logger.info(f"Processing {len(youtube_urls)} YouTube URLs...")
-                
-                # Separate individual videos from channels
-                individual_videos = []
-                channel_urls = []
-                
-                for url in youtube_urls:
-                    if self.youtube_processor.is_youtube_channel(url):
-                        channel_urls.append(url)
-                    else:
-                        individual_videos.append(url)
-                
-                # Process individual videos
-                if individual_videos:
-                    logger.info(f"Processing {len(individual_videos)} individual YouTube videos...")
-                    youtube_articles = self.youtube_processor.process_youtube_urls(individual_videos)
-                    all_articles.extend(youtube_articles)
-                    logger.info(f"Extracted {len(youtube_articles)} YouTube transcripts from individual videos")
-                
-                # Process channels (get latest videos)
-                if channel_urls:
-                    logger.info(f"Processing {len(channel_urls)} YouTube channels...")
-                    
-                    # Get YouTube Data API key from environment
-                    youtube_api_key = os.getenv('YOUTUBE_DATA_API_KEY')
-                    
-                if not youtube_api_key:
-                    logger.warning("YOUTUBE_DATA_API_KEY not found in environment variables")
-                    logger.info("To fetch latest videos from channels, set YOUTUBE_DATA_API_KEY environment variable")
-                    logger.info("Individual YouTube video URLs will still work, but channel processing requires the API key")
-                else:
-                    for channel_url in channel_urls:
-                        logger.info(f"Fetching latest videos from channel: {channel_url}")
-                        latest_videos = self.youtube_processor.get_channel_latest_videos(
-                            channel_url, 
-                            max_videos=3, 
-                            api_key=youtube_api_key
-                        )
-                        
-                        if latest_videos:
-                            logger.info(f"Found {len(latest_videos)} videos from {channel_url}")
-                            # Process the latest videos as individual videos
-                            channel_articles = self.youtube_processor.process_youtube_urls(latest_videos)
-                            all_articles.extend(channel_articles)
-                            logger.info(f"Extracted {len(channel_articles)} YouTube transcripts from channel videos")
-                        else:
-                            logger.warning(f"No videos found for channel: {channel_url}")
-            
-            # Process Twitter URLs if provided
-            if twitter_urls:
-                logger.info(f"Processing {len(twitter_urls)} Twitter sources...")
-                twitter_articles = self.twitter_processor.process_twitter_sources(twitter_urls)
-                all_articles.extend(twitter_articles)
-                logger.info(f"Processed {len(twitter_articles)} Twitter sources")
+            ready = self._prefetched_summaries(prefetched)
+            if prefetched:
+                force_fresh = False
+            fetches = self._source_fetches(urls, rss_urls, youtube_urls, twitter_urls, max_rss_items, force_fresh)
+            summary_kwargs = dict(writing_style=writing_style, structured=template_digest, offline=offline)
+            history = DeliveryHistory(user_id) if user_id else None
+            gate = ContentQualityGate()
+            already_delivered = 0
+            stage_metrics = None
+            ranking_config = RankingConfig.for_user(user_id, overrides=ranking)
+            streaming = self.streaming if streaming is None else streaming
+            if streaming and ranking_config.enabled:
+                # Streaming summarizes articles as they arrive, before the top K can be known
+                logger.info("Ranking is enabled; fetching all sources before summarizing instead of streaming")
+                streaming = False
+            fetched = checkpoint.load('fetched') if checkpoint else None
+            if fetched is not None:
+                logger.info(f"Resuming run {run_id} with {len(fetched['articles'])} checkpointed articles")
+                all_articles, already_delivered = fetched['articles'], fetched['already_delivered']
+            elif streaming:
+                logger.info("Streaming articles from fetch to summarization...")
+                all_articles, stage_metrics = self._stream_articles(
+                    fetches, budget, source_priority, history, ready, gate, **summary_kwargs
+                )
+                logger.info(f"Stream stages: {stage_metrics}")
+                if history is not None:
+                    already_delivered = stage_metrics['history']['items_in'] - stage_metrics['history']['items_out']
+            else:
+                all_articles = self._fetch_sources(fetches, budget, source_priority)
+                if history is not None:
+                    all_articles, already_delivered = history.filter_new(all_articles)
+                all_articles = gate.apply(all_articles)
+            content_quality = fetched.get('content_quality') if fetched is not None else gate.report()
+            
+            if not all_articles and already_delivered:
+                logger.info(f"Nothing new for user {user_id}: all {already_delivered} items were already delivered")
+                return {
+                    "success": True,
+                    "nothing_new": True,
+                    "already_delivered": already_delivered,
+                    "articles": [],
+                    "digest_content": "",
+                    "insights": "",
+                    "budget": budget.report(),
+                    "stages": stage_metrics,
+                    "email_response": {"message": "Nothing new since the last delivery"},
+                    "saved_count": 0,
+                    "processed_at": datetime.now().isoformat()
+                }
             
             if not all_articles:
                 error_details = []
@@ -723,44 +1261,88 @@ class ContentPipeline:
                 if twitter_urls:
                     error_details.append(f"Twitter sources: {len(twitter_urls)} sources")
                 
+                error = f"No articles were successfully scraped from {', '.join(error_details)}"
+                if content_quality and content_quality['dropped']:
+                    error += f" ({content_quality['dropped']} placeholder or thin articles were dropped)"
                 return {
                     "success": False,
-                    "error": f"No articles were successfully scraped from {', '.join(error_details)}",
-                    "articles": []
+                    "error": error,
+                    "articles": [],
+                    "content_quality": content_quality
                 }
             
-            # Process all articles with Groq LLM
-            logger.info("Processing all articles with Groq LLM...")
-            processed_articles = self.processor.process_multiple_articles(all_articles)
+            ranking_report = fetched.get('ranking') if fetched is not None else None
+            if fetched is None and ranking_config.enabled:
+                all_articles, ranking_report = self._rank_articles(all_articles, ranking_config, history)
+            
+            if checkpoint is not None and fetched is None:
+                checkpoint.save('fetched', {'articles': all_articles, 'already_delivered': already_delivered,
+                                            'ranking': ranking_report, 'content_quality': content_quality})
+            
+            # Process all articles with Groq LLM (already done as they streamed in)
+            processed_articles = checkpoint.load('summaries') if checkpoint else None
+            if processed_articles is not None:
+                logger.info(f"Resuming run {run_id} with {len(processed_articles)} checkpointed summaries")
+            else:
+                if stage_metrics is None:
+                    logger.info("Processing all articles with Groq LLM...")
+                    processed_articles = self._summarize_within_budget(all_articles, budget, ready, **summary_kwargs)
+                else:
+                    processed_articles = all_articles
+                if checkpoint is not None:
+                    checkpoint.save('summaries', processed_articles)
+            # Only the (released) summaries are needed from here on
+            del all_articles
             logger.info(f"Processed {len(processed_articles)} articles")
 
             # Content persistence disabled
             saved = 0
             logger.info("Content persistence disabled")
             
-            # Create digest
-            logger.info("Creating mixed content digest...")
-            digest_content = self.processor.create_digest(processed_articles, digest_title, writing_style)
+            # Create digest (and insights alongside it)
+            digest = checkpoint.load('digest') if checkpoint else None
+            if digest is not None:
+                logger.info(f"Resuming run {run_id} with its checkpointed digest")
+                digest_content, insights = digest['digest_content'], digest['insights']
+            else:
+                logger.info("Creating mixed content digest...")
+                digest_content, insights = self._digest_within_budget(
+                    processed_articles, digest_title, writing_style, budget, include_insights,
+                    on_token=on_digest_token, template=template_digest, offline=offline
+                )
+                if checkpoint is not None:
+                    checkpoint.save('digest', {'digest_content': digest_content, 'insights': insights})
+            
+            report = budget.report()
+            if report['dropped'] or report['degraded']:
+                logger.warning(f"Run budget of {report['budget_seconds']}s: dropped {len(report['dropped'])} "
+                               f"sources, degraded {[d['stage'] + ':' + d['mode'] for d in report['degraded']]}")
             
             # Send email
-            if email_recipients:
-                logger.info("Sending email digest...")
-                email_response = self.email_sender.send_content_digest(
-                    content=digest_content,
-                    subject=f"{digest_title} - {datetime.now().strftime('%B %d, %Y')}",
-                    to_emails=email_recipients
-                )
-                
-                if "error" in email_response:
-                    logger.warning(f"Email sending failed: {email_response['error']}")
-            else:
-                logger.info("No email recipients specified, skipping email sending")
-                email_response = {"message": "No email recipients specified"}
+            email_response = self._send_digest(digest_content, digest_title, email_recipients,
+                                               history, processed_articles)
+            if checkpoint is not None and email_recipients and "error" not in email_response:
+                checkpoint.save('delivered', email_response)
+            lateness = None
+            if deliver_at is not None:
+                lateness = round((datetime.now() - deliver_at).total_seconds(), 2)
+                logger.info(f"Delivered {lateness}s after the scheduled time"
+                            f"{' (prefetched)' if prefetched else ''}")
             
             return {
                 "success": True,
+                "nothing_new": False,
+                "already_delivered": already_delivered,
                 "articles": processed_articles,
                 "digest_content": digest_content,
+                "insights": insights,
+                "budget": report,
+                "stages": stage_metrics,
+                "prefetched": sum(1 for a in processed_articles if canonical_url(a.get('url', '')) in ready),
+                "resumed_from": resumed_from,
+                "ranking": ranking_report,
+                "content_quality": content_quality,
+                "delivery_lateness_seconds": lateness,
                 "email_response": email_response,
                 "saved_count": saved,
                 "processed_at": datetime.now().isoformat()
@@ -774,10 +1356,165 @@ class ContentPipeline:
                 "articles": []
             }
     
+    @_records_trace
+    @_tracks_llm_usage
+    def process_batch(self,
+                      jobs: List[Dict],
+                      max_rss_items: int = 5,
+                      force_fresh: bool = True,
+                      template_digest: Optional[bool] = None,
+                      offline: Optional[bool] = None,
+                      time_budget: Optional[float] = None,
+                      prefetched: Optional[Dict] = None) -> Dict[str, any]:
+        """
+        Run several users' newsletters as one batch, sharing fetching and summarization.
+        
+        The union of all jobs' sources is fetched once and every article that is new to at least
+        one recipient is summarized once (once per writing style for template digests, whose
+        structured summaries are styled). Only the per-user digest and email fan out.
+        
+        Args:
+            jobs: One dict per user with 'user_id', 'email', 'title' and optional 'urls', 'rss_urls',
+                'youtube_urls', 'twitter_urls', 'writing_style' and 'ranking' (settings overriding
+                the user's saved ranking settings; see process_mixed_sources)
+            max_rss_items: Maximum items to process per RSS feed
+            force_fresh: Bypass the scrape cache
+            template_digest: Use structured summaries and template digests; defaults to GROQ_TEMPLATE_DIGEST
+            offline: Build summaries and digests locally; defaults to GROQ_OFFLINE_MODE
+            time_budget: Wall-clock seconds for the whole batch (see process_mixed_sources)
+            prefetched: Result of prefetch_sources over the batch's sources; articles with a
+                prefetched summary (in a matching style, for styled summaries) are not summarized again
+            
+        Returns:
+            Dictionary with per-user results (shaped like process_mixed_sources results) under
+            'jobs', keyed by user id, shared-work counts under 'shared' and the quality gate's
+            counts under 'content_quality'
+        """
+        families = ('urls', 'rss_urls', 'youtube_urls', 'twitter_urls')
+        try:
+            logger.info(f"Starting batch pipeline for {len(jobs)} users")
+            budget = RunBudget.from_env(time_budget)
+            
+            # One fetch unit per distinct source across all jobs
+            shared_sources = {
+                family: list(dict.fromkeys(url for job in jobs for url in job.get(family) or []))
+                for family in families
+            }
+            fetches = self._source_fetches(*(shared_sources[f] for f in families), max_rss_items, force_fresh)
+            gate = ContentQualityGate()
+            fetched = {i: gate.apply(articles) for i, articles in self._fetch_units(fetches, budget).items()}
+            unit_index = {(unit['family'], unit['source']): i for i, unit in enumerate(fetches)}
+            
+            # Each job's new articles, in its own digest order, as (unit, position) keys
+            histories = {}
+            job_keys = {}
+            rankings = {}
+            already_delivered = {}
+            for job in jobs:
+                units = [unit_index[(unit['family'], unit['source'])]
+                         for unit in self._source_fetches(*(job.get(f) for f in families), max_rss_items, force_fresh)]
+                keys = [(i, n) for i in units for n in range(len(fetched.get(i, [])))]
+                history = histories[job['user_id']] = DeliveryHistory(job['user_id'])
+                new_keys = [key for key in keys if not history.is_delivered(fetched[key[0]][key[1]])]
+                already_delivered[job['user_id']] = len(keys) - len(new_keys)
+                # Each user's own top-K, so articles nobody ranked highly are never summarized
+                ranking_config = RankingConfig.for_user(job['user_id'], overrides=job.get('ranking'))
+                if new_keys and ranking_config.enabled:
+                    real = [key for key in new_keys if is_real(fetched[key[0]][key[1]])]
+                    kept, _, rankings[job['user_id']] = top_k_indices(
+                        [fetched[unit][n] for unit, n in real], ranking_config, history.delivered_titles()
+                    )
+                    kept = {real[i] for i in kept}
+                    new_keys = [key for key in new_keys if key in kept or not is_real(fetched[key[0]][key[1]])]
+                job_keys[job['user_id']] = (keys, new_keys)
+            
+            # Summarize each needed article once (per style when summaries are styled)
+            structured = self.processor.template_digest if template_digest is None else template_digest
+            
+            def summary_style(job: Dict) -> str:
+                return job.get('writing_style', 'professional') if structured else 'professional'
+            
+            needed: Dict[str, List] = {}
+            for job in jobs:
+                style = summary_style(job)
+                needed.setdefault(style, [])
+                needed[style].extend(key for key in job_keys[job['user_id']][1] if key not in needed[style])
+            ready = self._prefetched_summaries(prefetched)
+            summaries = {}
+            for style, keys in needed.items():
+                styled_ready = ready if ready and (not structured or style == prefetched.get('writing_style')) else None
+                processed = self._summarize_within_budget(
+                    [fetched[unit][n] for unit, n in keys], budget, ready=styled_ready,
+                    writing_style=style, structured=template_digest, offline=offline
+                )
+                summaries.update({(style, key): article for key, article in zip(keys, processed)})
+            # Fetched articles are only counted from here on
+            fetched = {i: [self._released(article) for article in articles] for i, articles in fetched.items()}
+            
+            def deliver_job(job: Dict) -> Dict:
+                user_id = job['user_id']
+                style = job.get('writing_style', 'professional')
+                keys, new_keys = job_keys[user_id]
+                if not keys:
+                    return {"success": False, "error": "No articles were successfully scraped", "articles": []}
+                if not new_keys:
+                    logger.info(f"Nothing new for user {user_id}")
+                    return {"success": True, "nothing_new": True, "already_delivered": len(keys),
+                            "articles": [], "digest_content": "",
+                            "email_response": {"message": "Nothing new since the last delivery"}}
+                articles = [summaries[(summary_style(job), key)] for key in new_keys]
+                digest_content, _ = self._digest_within_budget(
+                    articles, job['title'], style, budget, False, template=template_digest, offline=offline
+                )
+                email_response = self._send_digest(digest_content, job['title'], [job['email']],
+                                                   histories[user_id], articles)
+                return {"success": "error" not in email_response, "nothing_new": False,
+                        "already_delivered": already_delivered[user_id],
+                        "ranking": rankings.get(user_id), "articles": articles,
+                        "digest_content": digest_content, "email_response": email_response}
+            
+            def deliver(job: Dict) -> Dict:
+                try:
+                    with span('pipeline.deliver_job', user_id=job['user_id']) as current:
+                        result = deliver_job(job)
+                        return current.measure(result) if current is not None else result
+                except Exception as e:
+                    logger.error(f"Batch delivery for user {job['user_id']} failed: {e}")
+                    return {"success": False, "error": str(e), "articles": []}
+            
+            # Per-user digests and emails fan out
+            with ThreadPoolExecutor(max_workers=max(1, min(self.processor.max_concurrency, len(jobs)))) as executor:
+                results = list(executor.map(in_current_context(deliver), jobs))
+            
+            return {
+                "success": True,
+                "jobs": {job['user_id']: result for job, result in zip(jobs, results)},
+                "shared": {
+                    "sources": len(fetches),
+                    "source_requests": sum(len(job.get(f) or []) for job in jobs for f in families),
+                    "articles": sum(len(articles) for articles in fetched.values()),
+                    "summarized": sum(1 for keys in needed.values() for unit, n in keys if is_real(fetched[unit][n])),
+                },
+                "content_quality": gate.report(),
+                "budget": budget.report(),
+                "processed_at": datetime.now().isoformat()
+            }
+        
+        except Exception as e:
+            logger.error(f"Batch pipeline error: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e),
+                "jobs": {}
+            }
+    
     def save_results(self, results: Dict[str, any], filename: str = None) -> str:
         """
         Save pipeline results to a JSON file.
         
+        The run's timeline ('trace') is saved next to it as '<name>.trace.json' in Chrome trace
+        format (open it in chrome://tracing or https://ui.perfetto.dev).
+        
         Args:
             results: Pipeline results dictionary
             filename: Output filename (optional)
@@ -791,6 +1528,9 @@ class ContentPipeline:
         
         # Remove non-serializable content for JSON
         json_results = results.copy()
+        trace = json_results.pop('trace', None)
+        if trace:
+            save_trace(trace, os.path.splitext(filename)[0] + '.trace.json')
         if 'digest_content' in json_results:
             # Keep only first 1000 chars of digest for JSON
             json_results['digest_content'] = json_results['digest_content'][:1000] + "..."
@@ -0,0 +1,133 @@
+"""
+Content quality gate that keeps placeholder and near-empty articles away from the LLM.
+
+Scrapers substitute canned text when a source is blocked or unavailable (fallback pages for
+blocked blogs, YouTube videos without transcripts, Twitter profiles and hashtags without API
+access) and error placeholders when a fetch fails. Summarizing those spends tokens on
+boilerplate. The gate classifies each article as 'real', 'fallback' or 'thin' (too few words
+of substance, not counting navigation and sign-up residue, to be worth a summary call);
+non-real articles are either dropped or given a summary rendered from a template, and every
+class is counted for the run report.
+"""
+import os
+import re
+import logging
+import threading
+from typing import Dict, List, Optional
+
+from extractive import BOILERPLATE_PATTERNS, split_sentences
+from tracing import traced
+
+logger = logging.getLogger(__name__)
+
+QUALITY_CLASSES = ('real', 'fallback', 'thin')
+ACTIONS = ('template', 'drop')
+
+# Phrases only the built-in placeholder generators produce, for articles cached without the flag
+_PLACEHOLDER_MARKERS = re.compile(
+    r"this is placeholder content|this content represents typical topics covered|"
+    r"the transcript extraction failed|failed to scrape content",
+    re.IGNORECASE,
+)
+
+
+class ContentQualityGate:
+    def __init__(self, fallback_action: Optional[str] = None, thin_action: Optional[str] = None,
+                 min_words: Optional[int] = None):
+        """
+        Set up the gate for one run.
+
+        Args:
+            fallback_action: 'drop' or 'template' for placeholder and error articles; defaults to
+                CONTENT_GATE_FALLBACK ('drop')
+            thin_action: 'drop' or 'template' for articles under min_words; defaults to
+                CONTENT_GATE_THIN ('template')
+            min_words: Substantive words an article needs to be summarized; defaults to
+                CONTENT_MIN_WORDS (8)
+        """
+        self.actions = {
+            'fallback': (fallback_action or os.getenv('CONTENT_GATE_FALLBACK', 'drop')).lower(),
+            'thin': (thin_action or os.getenv('CONTENT_GATE_THIN', 'template')).lower(),
+        }
+        for quality, action in self.actions.items():
+            if action not in ACTIONS:
+                raise ValueError(f"Unknown {quality} action '{action}'; expected one of {', '.join(ACTIONS)}")
+        self.min_words = int(os.getenv('CONTENT_MIN_WORDS', '8')) if min_words is None else min_words
+        self.counts = {quality: 0 for quality in QUALITY_CLASSES}
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def classify(self, article: Dict) -> str:
+        """'fallback' for placeholder and error articles, 'thin' for near-empty ones, else 'real'."""
+        content = (article.get('content') or '').strip()
+        # The scraper's error placeholder is flagged; unflagged ones are its 'Error' title with no words
+        scrape_error = article.get('title') == 'Error' and article.get('word_count') == 0
+        if article.get('fallback_content') or scrape_error or _PLACEHOLDER_MARKERS.search(content[:3000]):
+            return 'fallback'
+        if self.substantive_words(content) < self.min_words:
+            return 'thin'
+        return 'real'
+
+    @staticmethod
+    def substantive_words(content: str) -> int:
+        """Words outside cookie, sign-up and navigation sentences (long sentences always count)."""
+        words = 0
+        for sentence in split_sentences(content[:5000]):
+            count = len(sentence.split())
+            if count >= 40 or not BOILERPLATE_PATTERNS.search(sentence):
+                words += count
+        return words
+
+    def check(self, article: Dict) -> Optional[Dict]:
+        """
+        Gate one article.
+
+        Returns:
+            The article unchanged when real, None when dropped, or a copy with 'content_quality'
+            and a templated 'summary' and 'structured_summary' that the summarizers pass through
+        """
+        quality = self.classify(article)
+        action = self.actions.get(quality)
+        with self._lock:
+            self.counts[quality] += 1
+            if action == 'drop':
+                self.dropped += 1
+        if quality == 'real':
+            return article
+        if action == 'drop':
+            logger.info(f"Dropping {quality} article: {article.get('title', 'Untitled')}")
+            return None
+        return {**article, 'content_quality': quality, **self._render(article, quality)}
+
+    @traced('pipeline.quality_gate')
+    def apply(self, articles: List[Dict]) -> List[Dict]:
+        """Gate articles in order, leaving out dropped ones."""
+        gated = [self.check(article) for article in articles]
+        kept = [article for article in gated if article is not None]
+        skipped = sum(1 for article in kept if article.get('content_quality'))
+        if skipped or len(kept) < len(articles):
+            logger.info(f"Quality gate: {len(kept) - skipped} real articles to summarize, {skipped} templated, "
+                        f"{len(articles) - len(kept)} dropped")
+        return kept
+
+    @staticmethod
+    def _render(article: Dict, quality: str) -> Dict:
+        title = article.get('title', 'Untitled')
+        url = article.get('url', '')
+        if quality == 'thin':
+            point = ' '.join((article.get('content') or '').split())
+        else:
+            point = "Not available today; visit the source for its latest updates."
+        fields = {'headline': title, 'key_points': [point] if point else [], 'why_it_matters': ''}
+        summary = f"**{title}**\n\n{point}" + (f"\n\n[Read more]({url})" if url else "")
+        return {'summary': summary, 'structured_summary': fields}
+
+    def report(self) -> Dict:
+        """Articles per quality class and how many were dropped."""
+        with self._lock:
+            return {**self.counts, 'dropped': self.dropped}
+
+
+def is_real(article: Dict) -> bool:
+    """Whether an article still needs an LLM summary (was not templated by the gate)."""
+    return article.get('content_quality', 'real') == 'real'
@@ -0,0 +1,106 @@
+"""
+Per-user delivery history so scheduled digests only carry content not yet sent.
+
+Each user's history is a compact map of canonical URLs, content hashes and titles to the
+time they were delivered, kept in LocalStorage and pruned after DELIVERY_HISTORY_DAYS.
+Titles let the ranking stage score how novel a new item is.
+"""
+import os
+import re
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from local_storage import LocalStorage, local_storage
+from tracing import traced
+
+logger = logging.getLogger(__name__)
+
+_TRACKING_PARAMS = {'fbclid', 'gclid', 'mc_cid', 'mc_eid', 'ref', 'ref_src', 'igshid', 'si'}
+
+
+def canonical_url(url: str) -> str:
+    """Normalize a URL so tracking parameters, fragments and trivial variants compare equal."""
+    if not url:
+        return ''
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in _TRACKING_PARAMS
+    )
+    return urlunsplit(('https' if parts.scheme in ('http', 'https') else parts.scheme,
+                       host, parts.path.rstrip('/') or '/', urlencode(query), ''))
+
+
+def content_hash(article: Dict) -> str:
+    """Short hash of an article's title and opening text, whitespace and case insensitive."""
+    text = f"{article.get('title', '')}\n{(article.get('content') or '')[:1000]}"
+    normalized = re.sub(r'\s+', ' ', text).strip().lower()
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:16]
+
+
+class DeliveryHistory:
+    def __init__(self, user_id: str, storage: Optional[LocalStorage] = None, retention_days: Optional[int] = None):
+        """
+        Load a user's delivery history.
+
+        Args:
+            user_id: User whose deliveries are tracked
+            storage: Storage backend; defaults to the shared local_storage
+            retention_days: Days an item is remembered; defaults to DELIVERY_HISTORY_DAYS (30)
+        """
+        self.user_id = user_id
+        self.storage = storage or local_storage
+        if retention_days is None:
+            retention_days = int(os.getenv('DELIVERY_HISTORY_DAYS', '30'))
+        self.retention = timedelta(days=retention_days)
+        history = self.storage.get_delivery_history(user_id)
+        self.urls: Dict[str, str] = history.get('urls', {})
+        self.hashes: Dict[str, str] = history.get('hashes', {})
+        self.titles: Dict[str, str] = history.get('titles', {})
+
+    def is_delivered(self, article: Dict) -> bool:
+        """Whether the article (by canonical URL or content hash) was already sent to the user."""
+        url = canonical_url(article.get('url', ''))
+        return bool(url and url in self.urls) or content_hash(article) in self.hashes
+
+    @traced('history.filter_new')
+    def filter_new(self, articles: List[Dict]) -> Tuple[List[Dict], int]:
+        """
+        Drop articles the user already received.
+
+        Returns:
+            (new articles in their original order, number skipped)
+        """
+        new = [article for article in articles if not self.is_delivered(article)]
+        skipped = len(articles) - len(new)
+        if skipped:
+            logger.info(f"Skipping {skipped} articles already delivered to user {self.user_id}")
+        return new, skipped
+
+    def delivered_titles(self, limit: int = 500) -> List[str]:
+        """Titles of the most recently delivered items, newest first."""
+        return sorted(self.titles, key=self.titles.get, reverse=True)[:limit]
+
+    def record(self, articles: List[Dict]) -> bool:
+        """Remember delivered articles and prune entries past the retention period."""
+        now = datetime.now()
+        delivered_at = now.isoformat()
+        for article in articles:
+            url = canonical_url(article.get('url', ''))
+            if url:
+                self.urls[url] = delivered_at
+            self.hashes[content_hash(article)] = delivered_at
+            if article.get('title'):
+                self.titles[article['title']] = delivered_at
+        cutoff = (now - self.retention).isoformat()
+        self.urls = {key: at for key, at in self.urls.items() if at >= cutoff}
+        self.hashes = {key: at for key, at in self.hashes.items() if at >= cutoff}
+        self.titles = {key: at for key, at in self.titles.items() if at >= cutoff}
+        return self.storage.save_delivery_history(self.user_id, {'urls': self.urls, 'hashes': self.hashes,
+                                                                 'titles': self.titles})
@@ -4,6 +4,7 @@ from typing import List, Dict, Optional
 import logging
 from dotenv import load_dotenv
 from datetime import datetime
+from tracing import annotate, traced
 
 # Load environment variables
 load_dotenv()
@@ -28,6 +29,7 @@ class EmailSender:
         self.from_email = os.getenv('FROM_EMAIL', 'noreply@yourdomain.com')
         self.sandbox_from = 'onboarding@resend.dev'
     
+    @traced('email.send_content_digest')
     def send_content_digest(self, 
                           content: str, 
                           subject: str, 
@@ -50,6 +52,7 @@ class EmailSender:
             
             # Convert markdown to HTML if needed
             html_content = self._markdown_to_html(content)
+            annotate(recipients=len(to_emails), bytes=len(html_content.encode('utf-8')))
             
             params = {
                 "from": sender,
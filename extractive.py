@@ -0,0 +1,172 @@
+"""
+Fast local extractive compression of article text.
+
+Scraped pages often start with cookie banners, navigation and sign-up prompts, so
+sending the first N characters to the LLM wastes tokens on residue and can cut off
+the article body. compress_text drops boilerplate sentences, scores the rest with
+TextRank (or TF-IDF centroid similarity) vectorized with NumPy, and keeps the most
+salient sentences under a token budget in their original order. top_sentences
+picks a fixed number of salient sentences for local (offline) summaries.
+"""
+import re
+import logging
+from typing import List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BOILERPLATE_PATTERNS = re.compile(
+    r"\b(cookies?|consent|accept all|privacy policy|terms of (use|service)|all rights reserved|"
+    r"subscribe|sign up|sign in|log in|newsletter|advertisement|skip to (main )?content|"
+    r"enable javascript|share (this|on)|follow us|read more|related articles|copyright|"
+    r"click here|download (the|our) app)\b",
+    re.IGNORECASE,
+)
+
+STOPWORDS = frozenset(
+    "a an and are as at be been but by can for from has have he her his i if in into is it its "
+    "of on or our she so than that the their them there these they this to was we were what "
+    "when which who will with would you your not no do does did also more most about after over".split()
+)
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[\"'“(\[]?[A-Z0-9])|\n+")
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (4 characters per token), as used by GroqContentProcessor."""
+    return len(text) // 4
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences on terminal punctuation and line breaks."""
+    return [s.strip() for s in _SENTENCE_SPLIT.split(text or '') if s and s.strip()]
+
+
+def is_boilerplate(sentence: str) -> bool:
+    """Heuristic check for navigation, cookie and sign-up residue."""
+    words = sentence.split()
+    if len(words) < 5:
+        return True
+    return bool(BOILERPLATE_PATTERNS.search(sentence)) and len(words) < 40
+
+
+def _tfidf_matrix(sentences: List[str]) -> np.ndarray:
+    """Build an L2-normalized sentence x term TF-IDF matrix."""
+    tokenized = [[w for w in _WORD.findall(s.lower()) if w not in STOPWORDS] for s in sentences]
+    vocab = {}
+    rows, cols = [], []
+    for i, words in enumerate(tokenized):
+        for w in words:
+            rows.append(i)
+            cols.append(vocab.setdefault(w, len(vocab)))
+
+    counts = np.zeros((len(sentences), max(len(vocab), 1)))
+    if rows:
+        np.add.at(counts, (np.array(rows), np.array(cols)), 1.0)
+
+    tf = counts / np.maximum(counts.sum(axis=1, keepdims=True), 1.0)
+    df = (counts > 0).sum(axis=0)
+    idf = np.log((1 + len(sentences)) / (1 + df)) + 1.0
+    matrix = tf * idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def score_sentences(sentences: List[str], method: str = 'textrank', damping: float = 0.85, iterations: int = 50) -> np.ndarray:
+    """
+    Score sentences by salience.
+
+    Args:
+        sentences: Sentences to score
+        method: 'textrank' (PageRank over cosine similarity) or 'tfidf' (similarity to the document centroid)
+        damping: TextRank damping factor
+        iterations: Maximum TextRank power iterations
+
+    Returns:
+        Array of scores, one per sentence
+    """
+    n = len(sentences)
+    if n == 0:
+        return np.zeros(0)
+
+    matrix = _tfidf_matrix(sentences)
+    if method == 'tfidf':
+        return matrix @ matrix.mean(axis=0)
+
+    similarity = matrix @ matrix.T
+    np.fill_diagonal(similarity, 0.0)
+    row_sums = similarity.sum(axis=1, keepdims=True)
+    transition = np.divide(similarity, row_sums, out=np.full_like(similarity, 1.0 / n), where=row_sums > 0)
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(iterations):
+        updated = (1 - damping) / n + damping * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < 1e-6:
+            scores = updated
+            break
+        scores = updated
+    return scores
+
+
+def _lead_biased(scores: np.ndarray) -> np.ndarray:
+    """Slight lead bias: news articles front-load their key facts."""
+    n = len(scores)
+    return scores * (1.0 + 0.1 * (1.0 - np.arange(n) / n))
+
+
+def compress_text(text: str, token_budget: int = 700, method: str = 'textrank') -> str:
+    """
+    Select the most salient sentences of a text under a token budget.
+
+    Args:
+        text: Raw article text
+        token_budget: Maximum estimated tokens of the returned text
+        method: Sentence scoring method ('textrank' or 'tfidf')
+
+    Returns:
+        Selected sentences in their original order, or a truncated prefix of the text
+        when it has no usable sentences
+    """
+    sentences = [s for s in split_sentences(text) if not is_boilerplate(s)]
+    if not sentences:
+        return (text or '')[:token_budget * 4]
+
+    lengths = np.array([estimate_tokens(s) + 1 for s in sentences])
+    if lengths.sum() <= token_budget:
+        return ' '.join(sentences)
+
+    scores = _lead_biased(score_sentences(sentences, method))
+
+    selected = []
+    used = 0
+    for i in np.argsort(-scores, kind='stable'):
+        if used + lengths[i] <= token_budget:
+            selected.append(i)
+            used += lengths[i]
+
+    if not selected:
+        return sentences[int(np.argmax(scores))][:token_budget * 4]
+    return ' '.join(sentences[i] for i in sorted(selected))
+
+
+def top_sentences(text: str, count: int = 3, method: str = 'textrank', max_chars: int = 8000) -> List[str]:
+    """
+    Pick the most salient non-boilerplate sentences of a text.
+
+    Args:
+        text: Raw article text
+        count: Number of sentences to return
+        method: Sentence scoring method ('textrank' or 'tfidf')
+        max_chars: Only the first max_chars characters are scored, bounding the cost on long pages
+
+    Returns:
+        Up to count sentences in their original order
+    """
+    sentences = [s for s in split_sentences((text or '')[:max_chars]) if not is_boilerplate(s)]
+    if len(sentences) <= count:
+        return sentences
+    scores = _lead_biased(score_sentences(sentences, method))
+    selected = np.argsort(-scores, kind='stable')[:count]
+    return [sentences[i] for i in sorted(selected)]
@@ -1,15 +1,34 @@
 import os
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Callable, Iterator
 import logging
 from dotenv import load_dotenv
 import requests
+import httpx
 import re
+import copy
+import json
+import queue
+import textwrap
+import asyncio
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from local_cache import LocalCache
+from extractive import compress_text, top_sentences
+from rate_limiter import RateLimiter, RateLimitExhausted
+from model_routing import ModelRouter
+from hedging import HedgePolicy
+from llm_metrics import LLMUsageTracker, attributed, current_stage, in_current_context, usage_context
+from tracing import annotate, traced
 
 try:
     # Optional SDK import; we can fall back to raw HTTP if this fails
-    from groq import Groq  # type: ignore
+    from groq import Groq, RateLimitError as GroqRateLimitError  # type: ignore
 except Exception:  # pragma: no cover
     Groq = None  # Fallback to requests
+    GroqRateLimitError = ()  # catches nothing
 
 # Load environment variables
 load_dotenv()
@@ -18,13 +37,32 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Patterns for _normalize_source_lines
+_ARTICLE_HEADING_RE = re.compile(r"### Article \d+: ")
+_SOURCE_LINE_RE = re.compile(r"\*Source: .+\*")
+_SOURCE_LINK_RE = re.compile(r"\*Source:\s*\[([^\]]+)\]\(([^\)]+)\)(?:\s*-\s*[^\n\*]+)?\*")
+# A '"<number>": "' entry of a packed summary response
+_PACK_ENTRY_RE = re.compile(r'"\s*(\d+)\s*"\s*:\s*(")')
+
+# Completion tokens of a packed request are capped, so a pack holds only as many articles as
+# that cap has room for at about one 80-150 word summary each
+PACK_MAX_COMPLETION_TOKENS = 4000
+PACK_SUMMARY_TOKENS = 200
+PACK_MAX_ARTICLES = (PACK_MAX_COMPLETION_TOKENS - 100) // PACK_SUMMARY_TOKENS
+
+SUMMARY_SYSTEM_PROMPT = "You are a helpful assistant that creates clear, concise summaries of articles. Focus on the main points and provide actionable insights."
+PACKED_SUMMARY_SYSTEM_PROMPT = "You are a helpful assistant that creates clear, concise summaries of articles. You always answer with valid JSON."
+STRUCTURED_SUMMARY_SYSTEM_PROMPT = "You are a newsletter writer who condenses articles into structured fields. You always answer with valid JSON."
+INSIGHTS_SYSTEM_PROMPT = "You are an expert analyst who identifies patterns, trends, and key insights from multiple articles. Provide clear, actionable analysis."
+
 class GroqContentProcessor:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
         """
         Initialize the Groq content processor.
         
         Args:
             api_key: Groq API key. If not provided, will try to get from environment.
+            base_url: API root (e.g. a local stand-in server). Defaults to GROQ_BASE_URL or api.groq.com.
         """
         self.api_key = api_key or os.getenv('GROQ_API_KEY')
         if not self.api_key:
@@ -34,16 +72,80 @@ class GroqContentProcessor:
         # Debug: Log API key status
         logger.info(f"GroqContentProcessor initialized with API key: {bool(self.api_key)}")
         
+        self.base_url = (base_url or os.getenv('GROQ_BASE_URL') or 'https://api.groq.com').rstrip('/')
+        self.api_url = f"{self.base_url}/openai/v1/chat/completions"
+        
         # Try SDK first; if it fails due to httpx/proxies mismatch, fall back to raw HTTP
         self.client = None
         if Groq is not None:
             try:
-                self.client = Groq(api_key=self.api_key)
+                # Retries (and 429 handling) are ours; the SDK's own retries would stack on them
+                self.client = Groq(api_key=self.api_key, base_url=self.base_url, max_retries=0)
             except Exception as e:
                 logger.warning(f"Groq SDK unavailable ({e}); falling back to HTTP requests.")
         # Allow overriding via env; default to a supported Groq model
         self.model = os.getenv('GROQ_MODEL', 'llama-3.1-8b-instant')
+        # Per call type (and optionally per input size) model selection with rate-limit fallback
+        self.router = ModelRouter.from_env(self.model)
+        
+        # Packing mode: bin short articles into a single summarization request
+        self.pack_summaries = os.getenv('GROQ_PACK_SUMMARIES', 'false').lower() in ('1', 'true', 'yes')
+        self.pack_token_budget = int(os.getenv('GROQ_PACK_TOKEN_BUDGET', '3000'))
+        self.pack_max_article_chars = int(os.getenv('GROQ_PACK_MAX_ARTICLE_CHARS', '1500'))
+        
+        # Concurrency and hierarchical (map-reduce) digest settings
+        self.max_concurrency = int(os.getenv('GROQ_MAX_CONCURRENCY', '4'))
+        self.digest_chunk_size = int(os.getenv('GROQ_DIGEST_CHUNK_SIZE', '6'))
+        self.digest_single_pass_max_articles = int(os.getenv('GROQ_DIGEST_SINGLE_PASS_MAX_ARTICLES', '15'))
+        self.digest_prompt_token_budget = int(os.getenv('GROQ_DIGEST_PROMPT_TOKEN_BUDGET', '6000'))
+        
+        # Extractive pre-compression of article text before single-article prompts
+        self.precompress = os.getenv('GROQ_PRECOMPRESS', 'false').lower() in ('1', 'true', 'yes')
+        self.precompress_token_budget = int(os.getenv('GROQ_PRECOMPRESS_TOKEN_BUDGET', '500'))
+        self.precompress_method = os.getenv('GROQ_PRECOMPRESS_METHOD', 'textrank')
+        
+        # Template digest: structured summaries assembled locally with no digest LLM call
+        self.template_digest = os.getenv('GROQ_TEMPLATE_DIGEST', 'false').lower() in ('1', 'true', 'yes')
+        
+        # Long-document mode for YouTube transcripts
+        self.transcript_chunk_chars = int(os.getenv('GROQ_TRANSCRIPT_CHUNK_CHARS', '4000'))
+        self.transcript_max_chunks = int(os.getenv('GROQ_TRANSCRIPT_MAX_CHUNKS', '24'))
+        
+        # Cache for LLM summaries that are expensive to recompute (e.g. transcript chunks)
+        self.summary_cache = LocalCache(
+            cache_file=os.getenv('GROQ_SUMMARY_CACHE_FILE', 'summary_cache.json'),
+            ttl_minutes=int(os.getenv('GROQ_SUMMARY_CACHE_TTL_MINUTES', '10080'))
+        )
+        self._cache_lock = threading.Lock()
+        
+        # Rate limiting shared by the sync and async APIs (opt-in; 0 only honours Retry-After)
+        # Groq limits requests per model, so each routed model gets its own bucket
+        self.rate_limiter = RateLimiter(requests_per_minute=float(os.getenv('GROQ_REQUESTS_PER_MINUTE', '0')))
+        self._rate_limiters = {self.model: self.rate_limiter}
+        self._rate_limiters_lock = threading.Lock()
+        self.max_retries = int(os.getenv('GROQ_MAX_RETRIES', '3'))
+        
+        # Insights are built from the articles' summaries, trimmed to this many characters each
+        self.insights_chars_per_article = int(os.getenv('GROQ_INSIGHTS_CHARS_PER_ARTICLE', '400'))
+        
+        # Offline fast path: extractive summaries and template digests with no network calls.
+        # 'never' (default), 'auto' (when the stage's model is rate limited) or 'always'
+        self.offline_mode = os.getenv('GROQ_OFFLINE_MODE', 'never').lower()
+        
+        # Hedged requests for the single-pass digest call (opt-in)
+        self.hedge_digest = os.getenv('GROQ_HEDGE_DIGEST', 'false').lower() in ('1', 'true', 'yes')
+        self.hedge_policy = HedgePolicy.from_env()
+        # Hedged attempts give up on connecting sooner, so a cancelled one stuck connecting ends early
+        self.hedge_connect_timeout = float(os.getenv('GROQ_HEDGE_CONNECT_TIMEOUT', '5'))
+        
+        # Token, latency, retry and cache accounting for every LLM call
+        self.usage = LLMUsageTracker(log_file=os.getenv('GROQ_USAGE_LOG_FILE') or None)
+        
+        # Pooled async HTTP clients (with their concurrency semaphores), one per event loop
+        self._async_clients = {}
+        self._async_clients_lock = threading.Lock()
     
+    @attributed('summaries', per_article=True)
     def summarize_article(self, article: Dict[str, str], max_length: int = 500) -> str:
         """
         Summarize a single article using Groq LLM.
@@ -57,74 +159,26 @@ class GroqContentProcessor:
         """
         try:
             content = article.get('content', '')
-            title = article.get('title', 'Untitled')
-            url = article.get('url', '')
             
             if not content or len(content.strip()) < 50:
-                return f"**{title}**\n\n*Content too short or unavailable for summarization.*\n\n[Read more]({url})"
+                return self._short_content_placeholder(article)
             
-            # Check if this is a YouTube video transcript
-            is_youtube = article.get('source') == 'youtube' or 'youtube' in url.lower()
+            if self._use_offline('summaries'):
+                return self._local_summary(article)
             
-            if is_youtube:
-                prompt = f"""
-                Please create a comprehensive summary of this YouTube video transcript. 
-                The summary should be informative and detailed, helping readers understand the key concepts, findings, and insights discussed in the video.
-                
-                Title: {title}
-                URL: {url}
-                
-                Video Transcript:
-                {content[:4000]}  # Allow more content for YouTube videos
-                
-                Please provide a detailed summary that includes:
-                1. **Main Topic**: What is this video about?
-                2. **Key Concepts**: What are the main concepts, techniques, or technologies discussed?
-                3. **Important Findings**: What discoveries, results, or insights are presented?
-                4. **Technical Details**: What specific technical information or methodologies are explained?
-                5. **Implications**: What does this mean for the field or future research?
-                6. **Key Takeaways**: What are the most important points viewers should remember?
-                
-                Make the summary informative and engaging, providing enough detail for readers to understand the video's content without watching it. Aim for 200-300 words.
-                """
-            else:
-                prompt = f"""
-                Please summarize the following article in a clear, comprehensive manner. 
-                Focus on the main points and key insights. Provide enough detail to be informative.
-                
-                Title: {title}
-                URL: {url}
-                
-                Content:
-                {content[:3000]}  # Limit content to avoid token limits
-                
-                Please provide a well-structured summary with:
-                1. Main topic/key points
-                2. Important details
-                3. Key takeaways
-                """
+            if self._is_youtube(article) and len(content) > self.transcript_chunk_chars:
+                # Long transcripts are summarized chunk by chunk instead of truncated
+                long_summary = self._summarize_long_transcript(article)
+                if long_summary:
+                    return long_summary
+            
+            prompt, max_tokens = self._build_summary_prompt(article)
             
             try:
-                # Use more tokens for YouTube videos to allow detailed summaries
-                max_tokens = 1000 if is_youtube else 600
                 summary = self._chat_completion(prompt, temperature=0.3, max_tokens=max_tokens)
             except Exception as llm_err:
                 logger.warning(f"LLM summary failed, using local fallback: {llm_err}")
-                text = content[:2000]
-                words = text.split()
-                short = ' '.join(words[:100]) + ('...' if len(words) > 100 else '')
-                
-                # Add source attribution with better formatting for YouTube videos
-                # Avoid duplicating source lines if the short text already contains a source
-                if '*Source:' in short or '[Source:' in short or re.search(r"\[.+?\]\(.+?\)", short):
-                    summary = short
-                else:
-                    if is_youtube:
-                        # For YouTube videos, show channel and video title when source not present
-                        channel_title = article.get('channel_title', 'YouTube')
-                        summary = f"{short}\n\n*Source: [{title}]({url}) - {channel_title}*"
-                    else:
-                        summary = f"{short}\n\n*Source: [{title}]({url})*"
+                summary = self._local_summary(article)
             
             return summary
             
@@ -132,24 +186,471 @@ class GroqContentProcessor:
             logger.error(f"Error summarizing article {article.get('url', 'unknown')}: {str(e)}")
             return f"**{article.get('title', 'Untitled')}**\n\n*Error generating summary: {str(e)}*\n\n[Read more]({article.get('url', '')})"
     
-    def process_multiple_articles(self, articles: List[Dict[str, str]], max_length: int = 500) -> List[Dict[str, str]]:
+    @staticmethod
+    def _short_content_placeholder(article: Dict[str, str]) -> str:
+        """Summary used for articles whose content is too short to summarize."""
+        return f"**{article.get('title', 'Untitled')}**\n\n*Content too short or unavailable for summarization.*\n\n[Read more]({article.get('url', '')})"
+    
+    @staticmethod
+    def _is_youtube(article: Dict[str, str]) -> bool:
+        """Check if an article is a YouTube video transcript."""
+        return article.get('source') == 'youtube' or 'youtube' in article.get('url', '').lower()
+    
+    def _build_summary_prompt(self, article: Dict[str, str]) -> tuple:
+        """
+        Build the single-call summary prompt for an article.
+        
+        Returns:
+            (prompt, max_tokens)
+        """
+        content = article.get('content', '')
+        title = article.get('title', 'Untitled')
+        url = article.get('url', '')
+        
+        if self._is_youtube(article):
+            prompt = f"""
+            Please create a comprehensive summary of this YouTube video transcript. 
+            The summary should be informative and detailed, helping readers understand the key concepts, findings, and insights discussed in the video.
+            
+            Title: {title}
+            URL: {url}
+            
+            Video Transcript:
+            {self._prompt_content(content, 4000)}  # Allow more content for YouTube videos
+            
+            Please provide a detailed summary that includes:
+            1. **Main Topic**: What is this video about?
+            2. **Key Concepts**: What are the main concepts, techniques, or technologies discussed?
+            3. **Important Findings**: What discoveries, results, or insights are presented?
+            4. **Technical Details**: What specific technical information or methodologies are explained?
+            5. **Implications**: What does this mean for the field or future research?
+            6. **Key Takeaways**: What are the most important points viewers should remember?
+            
+            Make the summary informative and engaging, providing enough detail for readers to understand the video's content without watching it. Aim for 200-300 words.
+            """
+            # Use more tokens for YouTube videos to allow detailed summaries
+            return prompt, 1000
+        
+        prompt = f"""
+            Please summarize the following article in a clear, comprehensive manner. 
+            Focus on the main points and key insights. Provide enough detail to be informative.
+            
+            Title: {title}
+            URL: {url}
+            
+            Content:
+            {self._prompt_content(content, 3000)}  # Limit content to avoid token limits
+            
+            Please provide a well-structured summary with:
+            1. Main topic/key points
+            2. Important details
+            3. Key takeaways
+            """
+        return prompt, 600
+    
+    def _prompt_content(self, content: str, max_chars: int) -> str:
+        """Article text for a prompt: salient sentences when pre-compression is on, else a prefix."""
+        if self.precompress:
+            return compress_text(content, self.precompress_token_budget, self.precompress_method)
+        return content[:max_chars]
+    
+    def _use_offline(self, stage: str, offline: Optional[bool] = None) -> bool:
+        """
+        Whether a stage should take the offline fast path.
+        
+        Args:
+            stage: Usage stage (summaries or digest) whose routed model is checked in 'auto' mode
+            offline: Explicit choice from the caller; overrides GROQ_OFFLINE_MODE
+        """
+        if offline is not None:
+            return offline
+        if self.offline_mode == 'always':
+            return True
+        if self.offline_mode == 'auto' and self._rate_limiter_for(self.router.model_for(stage)).is_saturated():
+            logger.info(f"Model for {stage} is rate limited; using the offline fast path")
+            return True
+        return False
+    
+    def _local_summary(self, article: Dict[str, str]) -> str:
+        """Build an extractive summary locally when the LLM is unavailable or skipped."""
+        content = article.get('content', '')
+        title = article.get('title', 'Untitled')
+        url = article.get('url', '')
+        
+        sentences = top_sentences(content, count=4, method=self.precompress_method)
+        if sentences:
+            short = ' '.join(sentences)
+        else:
+            words = content[:2000].split()
+            short = ' '.join(words[:100]) + ('...' if len(words) > 100 else '')
+        
+        # Add source attribution with better formatting for YouTube videos
+        # Avoid duplicating source lines if the short text already contains a source
+        if '*Source:' in short or '[Source:' in short or re.search(r"\[.+?\]\(.+?\)", short):
+            return short
+        if self._is_youtube(article):
+            # For YouTube videos, show channel and video title when source not present
+            channel_title = article.get('channel_title', 'YouTube')
+            return f"{short}\n\n*Source: [{title}]({url}) - {channel_title}*"
+        return f"{short}\n\n*Source: [{title}]({url})*"
+    
+    @attributed('summaries', per_article=True)
+    def summarize_article_structured(self, article: Dict[str, str], writing_style: str = "professional") -> Dict:
+        """
+        Summarize an article into structured fields for template digests.
+        
+        Args:
+            article: Dictionary containing article data (title, content, etc.)
+            writing_style: Writing style the fields should be written in
+            
+        Returns:
+            Dictionary with headline, key_points (list of strings) and why_it_matters
+        """
+        content = article.get('content', '')
+        if not content or len(content.strip()) < 50:
+            return self._local_structured_summary(article)
+        
+        if self._is_youtube(article) and len(content) > self.transcript_chunk_chars:
+            long_summary = self._summarize_long_transcript(article)
+            if long_summary:
+                article = dict(article, content=long_summary)
+        
+        prompt, max_tokens = self._build_structured_summary_prompt(article, writing_style)
+        try:
+            response = self._chat_completion(prompt, system_prompt=STRUCTURED_SUMMARY_SYSTEM_PROMPT, temperature=0.3, max_tokens=max_tokens)
+        except Exception as llm_err:
+            logger.warning(f"Structured LLM summary failed, using local fallback: {llm_err}")
+            return self._local_structured_summary(article)
+        
+        fields = self._parse_structured_summary(response)
+        if fields is None:
+            logger.warning("Structured summary response could not be parsed; using local fallback")
+            return self._local_structured_summary(article)
+        return fields
+    
+    def _build_structured_summary_prompt(self, article: Dict[str, str], writing_style: str) -> tuple:
+        """
+        Build the prompt asking for a summary as headline, key points and why-it-matters fields.
+        
+        Returns:
+            (prompt, max_tokens)
+        """
+        from writing_styles import writing_style_manager
+        try:
+            style_description = writing_style_manager.get_style_description(writing_style)
+        except ValueError:
+            style_description = writing_style
+        
+        content = article.get('content', '')
+        max_chars = 4000 if self._is_youtube(article) else 3000
+        prompt = f"""
+            Summarize the following article for a newsletter written in this style: {style_description}.
+            
+            Title: {article.get('title', 'Untitled')}
+            URL: {article.get('url', '')}
+            
+            Content:
+            {self._prompt_content(content, max_chars)}
+            
+            Return ONLY a JSON object with these fields, written in the style above:
+            {{"headline": "...", "key_points": ["...", "..."], "why_it_matters": "..."}}
+            - headline: one line of at most 12 words
+            - key_points: 2-4 points, one sentence each
+            - why_it_matters: 1-2 sentences on what this means for readers
+            Do not add any other text.
+            """
+        return prompt, 400
+    
+    @staticmethod
+    def _parse_structured_summary(response: str) -> Optional[Dict]:
+        """
+        Parse a structured summary response into {headline, key_points, why_it_matters}.
+        
+        Tolerates markdown code fences and text around the JSON object. Returns None when no
+        usable fields can be decoded.
+        """
+        if not response:
+            return None
+        text = response.strip()
+        start = text.find('{')
+        end = text.rfind('}')
+        if start == -1 or end <= start:
+            return None
+        try:
+            data = json.loads(text[start:end + 1])
+        except (ValueError, TypeError):
+            return None
+        if not isinstance(data, dict):
+            return None
+        
+        key_points = data.get('key_points') or []
+        if isinstance(key_points, str):
+            key_points = [line.strip().lstrip('-*• ').strip() for line in key_points.splitlines()]
+        key_points = [str(point).strip() for point in key_points if str(point).strip()]
+        headline = str(data.get('headline') or '').strip()
+        if not headline and not key_points:
+            return None
+        return {
+            'headline': headline,
+            'key_points': key_points,
+            'why_it_matters': str(data.get('why_it_matters') or '').strip(),
+        }
+    
+    def _local_structured_summary(self, article: Dict[str, str]) -> Dict:
+        """Structured fields built locally (title and most salient sentences) without an LLM call."""
+        text = article.get('summary') or article.get('content', '')
+        text = "\n".join(line for line in text.splitlines() if '*Source:' not in line)
+        return {
+            'headline': article.get('title', 'Untitled'),
+            'key_points': top_sentences(text, count=3, method=self.precompress_method),
+            'why_it_matters': '',
+        }
+    
+    @staticmethod
+    def _render_structured_summary(fields: Dict) -> str:
+        """Markdown summary text for structured fields, for consumers that expect 'summary'."""
+        parts = [f"**{fields.get('headline', '')}**"] if fields.get('headline') else []
+        if fields.get('key_points'):
+            parts.append("\n".join(f"- {point}" for point in fields['key_points']))
+        if fields.get('why_it_matters'):
+            parts.append(f"*Why it matters:* {fields['why_it_matters']}")
+        return "\n\n".join(parts)
+    
+    def _summarize_long_transcript(self, article: Dict[str, str]) -> Optional[str]:
+        """
+        Summarize a long YouTube transcript in two levels.
+        
+        The transcript is split into time-aligned chunks using the raw_transcript snippet
+        timestamps, chunks are summarized concurrently (reusing cached chunk summaries from earlier
+        runs), and the chunk summaries are merged into one video summary.
+        
+        Returns:
+            The merged summary, or None if no chunk could be summarized
+        """
+        title = article.get('title', 'Untitled')
+        url = article.get('url', '')
+        video_id = article.get('video_id') or url
+        
+        chunks = self._chunk_transcript(article)
+        if len(chunks) < 2:
+            return None
+        logger.info(f"Summarizing long transcript for {video_id} in {len(chunks)} chunks")
+        
+        def summarize_chunk(item):
+            index, chunk = item
+            prompt = self._transcript_chunk_prompt(title, index, len(chunks), chunk)
+            try:
+                return self._cached_completion(self._transcript_chunk_cache_key(video_id, chunk), prompt, temperature=0.3, max_tokens=400)
+            except Exception as llm_err:
+                logger.warning(f"Transcript chunk {index} summary failed: {llm_err}")
+                return None
+        
+        chunk_summaries = self._map_concurrently(summarize_chunk, list(enumerate(chunks, 1)))
+        
+        sections_text = self._transcript_sections_text(chunks, chunk_summaries)
+        if not sections_text:
+            return None
+        
+        prompt = self._transcript_merge_prompt(title, url, sections_text)
+        cache_key = f"transcript_merge:{video_id}:{self.router.model_for('summaries')}:{self._content_hash(sections_text)}"
+        try:
+            return self._cached_completion(cache_key, prompt, temperature=0.3, max_tokens=1000)
+        except Exception as llm_err:
+            logger.warning(f"Transcript merge failed, returning part summaries: {llm_err}")
+            return sections_text
+    
+    def _transcript_chunk_cache_key(self, video_id: str, chunk: Dict) -> str:
+        """Cache key for one transcript chunk summary."""
+        return f"transcript_chunk:{video_id}:{self.router.model_for('summaries')}:{self._content_hash(chunk['text'])}"
+    
+    def _transcript_chunk_prompt(self, title: str, index: int, total: int, chunk: Dict) -> str:
+        """Prompt for summarizing one time-aligned transcript chunk."""
+        return f"""
+            This is part {index} of {total} of the transcript of the YouTube video "{title}",
+            covering {self._format_timestamp(chunk['start'])}-{self._format_timestamp(chunk['end'])}.
+            
+            Transcript part:
+            {chunk['text']}
+            
+            Summarize the main concepts, findings, technical details and examples discussed in this
+            part in 100-150 words. Do not add an introduction or conclusion.
+            """
+    
+    def _transcript_sections_text(self, chunks: List[Dict], chunk_summaries: List[Optional[str]]) -> str:
+        """Join chunk summaries into time-stamped sections, skipping chunks that failed."""
+        sections = [
+            f"[{self._format_timestamp(chunk['start'])}-{self._format_timestamp(chunk['end'])}] {summary}"
+            for chunk, summary in zip(chunks, chunk_summaries) if summary
+        ]
+        return "\n\n".join(sections)
+    
+    def _transcript_merge_prompt(self, title: str, url: str, sections_text: str) -> str:
+        """Prompt for merging time-stamped chunk summaries into one video summary."""
+        return f"""
+        Please create a comprehensive summary of this YouTube video from the time-stamped summaries
+        of its consecutive parts below. Cover the whole video, not just its beginning.
+        
+        Title: {title}
+        URL: {url}
+        
+        Part summaries:
+        {sections_text}
+        
+        Please provide a detailed summary that includes:
+        1. **Main Topic**: What is this video about?
+        2. **Key Concepts**: What are the main concepts, techniques, or technologies discussed?
+        3. **Important Findings**: What discoveries, results, or insights are presented?
+        4. **Technical Details**: What specific technical information or methodologies are explained?
+        5. **Implications**: What does this mean for the field or future research?
+        6. **Key Takeaways**: What are the most important points viewers should remember?
+        
+        Make the summary informative and engaging. Aim for 250-400 words.
+        """
+    
+    def _chunk_transcript(self, article: Dict[str, str]) -> List[Dict]:
+        """
+        Split a transcript into chunks aligned to snippet boundaries.
+        
+        Uses raw_transcript snippets (objects or dicts with text/start/duration) when available and
+        falls back to splitting the plain transcript text without timestamps.
+        
+        Returns:
+            List of {'start': seconds, 'end': seconds, 'text': str}
+        """
+        content = article.get('content', '')
+        max_chars = max(self.transcript_chunk_chars, len(content) // max(1, self.transcript_max_chunks) + 1)
+        snippets = article.get('raw_transcript') or []
+        
+        chunks = []
+        if snippets:
+            texts, start, end, size = [], None, 0.0, 0
+            for snippet in snippets:
+                if isinstance(snippet, dict):
+                    text = snippet.get('text', '')
+                    snippet_start = float(snippet.get('start', 0) or 0)
+                    duration = float(snippet.get('duration', 0) or 0)
+                else:
+                    text = getattr(snippet, 'text', '')
+                    snippet_start = float(getattr(snippet, 'start', 0) or 0)
+                    duration = float(getattr(snippet, 'duration', 0) or 0)
+                if texts and size + len(text) > max_chars:
+                    chunks.append({'start': start, 'end': end, 'text': ' '.join(texts)})
+                    texts, start, size = [], None, 0
+                if start is None:
+                    start = snippet_start
+                texts.append(text)
+                size += len(text) + 1
+                end = snippet_start + duration
+            if texts:
+                chunks.append({'start': start, 'end': end, 'text': ' '.join(texts)})
+            return chunks
+        
+        words = content.split()
+        texts, size = [], 0
+        for word in words:
+            if texts and size + len(word) > max_chars:
+                chunks.append({'start': 0.0, 'end': 0.0, 'text': ' '.join(texts)})
+                texts, size = [], 0
+            texts.append(word)
+            size += len(word) + 1
+        if texts:
+            chunks.append({'start': 0.0, 'end': 0.0, 'text': ' '.join(texts)})
+        return chunks
+    
+    @staticmethod
+    def _format_timestamp(seconds: float) -> str:
+        """Format seconds as h:mm:ss or m:ss."""
+        seconds = int(seconds or 0)
+        hours, remainder = divmod(seconds, 3600)
+        minutes, secs = divmod(remainder, 60)
+        if hours:
+            return f"{hours}:{minutes:02d}:{secs:02d}"
+        return f"{minutes}:{secs:02d}"
+    
+    @staticmethod
+    def _content_hash(text: str) -> str:
+        """Stable short hash used in cache keys."""
+        return hashlib.sha1((text or '').encode('utf-8')).hexdigest()[:16]
+    
+    def _cached_completion(self, cache_key: str, user_prompt: str, **kwargs) -> str:
+        """Run _chat_completion, reusing a cached response for the same key when available."""
+        with self._cache_lock:
+            cached = self.summary_cache.get(cache_key)
+        if cached and cached.get('text'):
+            logger.info(f"Using cached LLM summary for {cache_key}")
+            self.usage.record(self.router.model_for(current_stage()), cache='hit', route='cache')
+            return cached['text']
+        
+        with usage_context(cache='miss'):
+            text = self._chat_completion(user_prompt, **kwargs)
+        with self._cache_lock:
+            self.summary_cache.set(cache_key, {'text': text})
+        return text
+    
+    def _map_concurrently(self, func, items: List) -> List:
+        """Apply func to items on a bounded thread pool, preserving input order."""
+        if len(items) <= 1 or self.max_concurrency <= 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(items))) as executor:
+            return list(executor.map(in_current_context(func), items))
+    
+    @traced('llm.summarize')
+    @attributed('summaries')
+    def process_multiple_articles(self, articles: List[Dict[str, str]], max_length: int = 500, packed: Optional[bool] = None, writing_style: str = "professional", structured: Optional[bool] = None, offline: Optional[bool] = None) -> List[Dict[str, str]]:
         """
         Process and summarize multiple articles.
         
         Args:
             articles: List of article dictionaries
             max_length: Maximum length of each summary
+            packed: If True, bin short articles into shared LLM requests.
+                Defaults to the GROQ_PACK_SUMMARIES setting.
+            writing_style: Writing style for structured summaries
+            structured: If True, request structured summaries (stored under 'structured_summary')
+                for template digests. Defaults to the GROQ_TEMPLATE_DIGEST setting.
+            offline: If True, build extractive structured summaries locally with no network calls.
+                Defaults to the GROQ_OFFLINE_MODE setting.
             
         Returns:
             List of processed articles with summaries
         """
+        if packed is None:
+            packed = self.pack_summaries
+        if structured is None:
+            structured = self.template_digest
+        
+        if self._use_offline('summaries', offline):
+            logger.info(f"Summarizing {len(articles)} articles offline (extractive)")
+            return self._attach_structured_summaries(articles, [self._local_structured_summary(a) for a in articles])
+        
+        if structured:
+            logger.info(f"Processing {len(articles)} articles into structured summaries")
+            fields = self._map_concurrently(lambda article: self.summarize_article_structured(article, writing_style), articles)
+            return self._attach_structured_summaries(articles, fields)
+        
+        if packed:
+            logger.info(f"Processing {len(articles)} articles in packed mode")
+            summaries = self.summarize_articles_packed(articles, max_length)
+        else:
+            summaries = []
+            for i, article in enumerate(articles):
+                logger.info(f"Processing article {i+1}/{len(articles)}: {article.get('title', 'Untitled')}")
+                summaries.append(self.summarize_article(article, max_length))
+        
+        return self._attach_summaries(articles, summaries)
+    
+    def _attach_structured_summaries(self, articles: List[Dict[str, str]], fields: List[Dict]) -> List[Dict[str, str]]:
+        """Return copies of the articles with structured summaries and their markdown rendering attached."""
+        processed_articles = self._attach_summaries(articles, [self._render_structured_summary(f) for f in fields])
+        for processed_article, article_fields in zip(processed_articles, fields):
+            processed_article['structured_summary'] = article_fields
+        return processed_articles
+    
+    def _attach_summaries(self, articles: List[Dict[str, str]], summaries: List[str]) -> List[Dict[str, str]]:
+        """Return copies of the articles with their summaries attached."""
         processed_articles = []
         
-        for i, article in enumerate(articles):
-            logger.info(f"Processing article {i+1}/{len(articles)}: {article.get('title', 'Untitled')}")
-            
-            summary = self.summarize_article(article, max_length)
-            
+        for article, summary in zip(articles, summaries):
             processed_article = article.copy()
             processed_article['summary'] = summary
             processed_article['processed_at'] = logger.info(f"Article processed at {__import__('time').strftime('%Y-%m-%d %H:%M:%S')}")
@@ -158,7 +659,189 @@ class GroqContentProcessor:
         
         return processed_articles
     
-    def create_digest(self, articles: List[Dict[str, str]], digest_title: str = "Content Digest", writing_style: str = "professional") -> str:
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """Rough token estimate (~4 characters per token) used for budgeting prompts."""
+        return max(1, len(text or '') // 4)
+    
+    def _is_packable(self, article: Dict[str, str]) -> bool:
+        """Check whether an article is short enough to share a packed request."""
+        content = (article.get('content') or '').strip()
+        url = article.get('url', '')
+        if article.get('source') == 'youtube' or 'youtube' in url.lower():
+            return False
+        # Very short content never reaches the LLM in summarize_article
+        return 50 <= len(content) <= self.pack_max_article_chars
+    
+    def _bin_articles_for_packing(self, indexed_articles: List[tuple], token_budget: int) -> List[List[tuple]]:
+        """
+        Group (index, article) pairs into bins whose estimated prompt size stays under the token budget
+        and whose summaries fit the completion cap (at most PACK_MAX_ARTICLES per bin).
+        Order is preserved so that digests keep their freshness ordering.
+        """
+        bins = []
+        current = []
+        current_tokens = 0
+        for index, article in indexed_articles:
+            tokens = self._estimate_tokens(article.get('title', '')) + self._estimate_tokens(article.get('content', '')) + 20
+            if current and (current_tokens + tokens > token_budget or len(current) >= PACK_MAX_ARTICLES):
+                bins.append(current)
+                current = []
+                current_tokens = 0
+            current.append((index, article))
+            current_tokens += tokens
+        if current:
+            bins.append(current)
+        return bins
+    
+    def summarize_articles_packed(self, articles: List[Dict[str, str]], max_length: int = 500, token_budget: Optional[int] = None) -> List[str]:
+        """
+        Summarize articles, packing short ones into shared LLM requests.
+        
+        Short articles are binned up to a token budget and summarized in a single call that
+        returns JSON keyed by article number. Long articles, YouTube transcripts and any article
+        whose packed summary cannot be parsed are summarized individually.
+        
+        Args:
+            articles: List of article dictionaries
+            max_length: Maximum length of each summary
+            token_budget: Approximate prompt token budget per packed request
+            
+        Returns:
+            List of summaries in the same order as the input articles
+        """
+        token_budget = token_budget or self.pack_token_budget
+        summaries: List[Optional[str]] = [None] * len(articles)
+        
+        packable = [(i, a) for i, a in enumerate(articles) if self._is_packable(a)]
+        
+        for pack in self._bin_articles_for_packing(packable, token_budget):
+            if len(pack) < 2:
+                continue
+            logger.info(f"Summarizing {len(pack)} short articles in one packed request")
+            parsed = self._summarize_pack([a for _, a in pack])
+            if parsed is None:
+                logger.warning("Packed summary response could not be parsed; falling back to single calls")
+                continue
+            for position, (index, _) in enumerate(pack, 1):
+                summary = parsed.get(position)
+                if summary:
+                    summaries[index] = summary
+        
+        for i, article in enumerate(articles):
+            if summaries[i] is None:
+                logger.info(f"Processing article {i+1}/{len(articles)}: {article.get('title', 'Untitled')}")
+                summaries[i] = self.summarize_article(article, max_length)
+        
+        return summaries
+    
+    @attributed('summaries', per_article=True)
+    def _summarize_pack(self, articles: List[Dict[str, str]]) -> Optional[Dict[int, str]]:
+        """
+        Summarize several short articles in one request.
+        
+        Returns:
+            Mapping of 1-based article number to summary, or None if the call or parsing failed
+        """
+        prompt, max_tokens = self._build_pack_prompt(articles)
+        try:
+            response = self._chat_completion(
+                prompt,
+                system_prompt=PACKED_SUMMARY_SYSTEM_PROMPT,
+                temperature=0.3,
+                max_tokens=max_tokens,
+            )
+        except Exception as llm_err:
+            logger.warning(f"Packed LLM summary failed: {llm_err}")
+            return None
+        
+        return self._parse_packed_summaries(response, len(articles))
+    
+    def _build_pack_prompt(self, articles: List[Dict[str, str]]) -> tuple:
+        """
+        Build the prompt asking for per-article summaries as JSON keyed by article number.
+        
+        Returns:
+            (prompt, max_tokens)
+        """
+        articles_text = ""
+        for i, article in enumerate(articles, 1):
+            articles_text += f"\n\n### Article {i}\nTitle: {article.get('title', 'Untitled')}\nURL: {article.get('url', '')}\nContent:\n{article.get('content', '').strip()}\n"
+        
+        prompt = f"""
+        Please summarize each of the following {len(articles)} articles separately in a clear, informative manner.
+        For each article cover the main topic, important details and key takeaways in 80-150 words.
+        
+        {articles_text}
+        
+        Return ONLY a JSON object mapping each article number (as a string) to its summary in markdown,
+        for example: {{"1": "summary of article 1", "2": "summary of article 2"}}.
+        Include every article number from 1 to {len(articles)} and do not add any other text.
+        """
+        return prompt, min(350 * len(articles) + 100, PACK_MAX_COMPLETION_TOKENS)
+    
+    @staticmethod
+    def _parse_packed_summaries(response: str, expected_count: int) -> Optional[Dict[int, str]]:
+        """
+        Parse a packed summary response into {article_number: summary}.
+        
+        Tolerates markdown code fences and text around the JSON object, and recovers the complete
+        entries of a response cut off at the completion limit. Returns None when no entry can be
+        decoded; entries that are missing or empty are simply left out so the caller can
+        summarize those articles individually.
+        """
+        if not response:
+            return None
+        text = response.strip()
+        start = text.find('{')
+        end = text.rfind('}')
+        if start == -1:
+            return None
+        try:
+            data = json.loads(text[start:end + 1]) if end > start else None
+        except (ValueError, TypeError):
+            data = None
+        if data is None:
+            data = GroqContentProcessor._salvage_packed_entries(text[start:])
+            if not data:
+                return None
+            logger.warning(f"Packed summary response was incomplete; recovered {len(data)} of {expected_count} summaries")
+        if not isinstance(data, dict):
+            return None
+        
+        summaries = {}
+        for key, value in data.items():
+            try:
+                number = int(str(key).strip().lstrip('#').replace('Article', '').strip())
+            except ValueError:
+                continue
+            if isinstance(value, dict):
+                value = value.get('summary', '')
+            if not isinstance(value, str) or not value.strip():
+                continue
+            if 1 <= number <= expected_count:
+                summaries[number] = value.strip()
+        return summaries
+    
+    @staticmethod
+    def _salvage_packed_entries(text: str) -> Dict[str, str]:
+        """Complete '"<number>": "<summary>"' entries of a truncated JSON object, in order."""
+        decoder = json.JSONDecoder()
+        entries = {}
+        position = 0
+        for match in _PACK_ENTRY_RE.finditer(text):
+            if match.start() < position:
+                continue
+            try:
+                value, position = decoder.raw_decode(text, match.start(2))
+            except ValueError:
+                break
+            entries[match.group(1)] = value
+        return entries
+    
+    @traced('llm.digest')
+    @attributed('digest')
+    def create_digest(self, articles: List[Dict[str, str]], digest_title: str = "Content Digest", writing_style: str = "professional", hierarchical: Optional[bool] = None, on_token: Optional[Callable[[str], None]] = None, template: Optional[bool] = None, offline: Optional[bool] = None) -> str:
         """
         Create a comprehensive digest from multiple articles using specified writing style.
         
@@ -166,6 +849,15 @@ class GroqContentProcessor:
             articles: List of processed articles
             digest_title: Title for the digest
             writing_style: Writing style to use (professional, casual, technical, or custom)
+            hierarchical: If True, draft sections for chunks of articles concurrently and stitch them
+                with a final reduce call. Defaults to automatic selection when the article set is too
+                large for a single prompt.
+            on_token: Optional callback receiving the digest text progressively as it is generated.
+                The returned digest is the final, post-processed version.
+            template: If True, assemble the digest locally from structured summaries and the writing
+                style's templates without an LLM call. Defaults to the GROQ_TEMPLATE_DIGEST setting.
+            offline: If True, build the digest with the offline fast path (extractive key points for
+                articles without structured summaries, style templates). Defaults to GROQ_OFFLINE_MODE.
             
         Returns:
             Formatted digest content
@@ -174,395 +866,520 @@ class GroqContentProcessor:
             if not articles:
                 return f"# {digest_title}\n\nNo articles to process."
             
-            # Import writing style manager
-            from writing_styles import writing_style_manager
-            
             # Get current date and time
             current_time = __import__('time').strftime('%Y-%m-%d at %H:%M:%S')
             current_date = __import__('time').strftime('%B %d, %Y')
             
+            if template is None:
+                template = self.template_digest
+            if template or self._use_offline('digest', offline):
+                logger.info(f"Assembling template digest for {len(articles)} articles with writing style: '{writing_style}'")
+                digest = self._assemble_template_digest(articles, digest_title, writing_style, current_date)
+                if on_token:
+                    on_token(digest)
+                return digest
+            
             # Prepare content for digest generation
-            articles_text = ""
-            for i, article in enumerate(articles, 1):
-                title = article.get('title', f'Article {i}')
-                url = article.get('url', '')
-                # Use the processed summary if available, otherwise use raw content
-                summary = article.get('summary', '')
-                if summary and len(summary) > 50:
-                    content = summary
-                else:
-                    content = article.get('content', '')[:1000]  # Limit content
-                
-                articles_text += f"\n\n--- Article {i} ---\nTitle: {title}\nURL: {url}\nContent: {content}\n"
+            articles_text = self._format_articles_for_digest(articles)
+            
+            if hierarchical is None:
+                hierarchical = (len(articles) > self.digest_single_pass_max_articles or
+                                self._estimate_tokens(articles_text) > self.digest_prompt_token_budget)
+            
+            if hierarchical:
+                logger.info(f"Creating hierarchical digest for {len(articles)} articles with writing style: '{writing_style}'")
+                digest = self._create_digest_map_reduce(articles, digest_title, writing_style, current_time, current_date)
+                if on_token:
+                    on_token(digest)
+                return digest
             
             # Debug: Log the writing style being used
             logger.info(f"Creating digest with writing style: '{writing_style}'")
             
-            # Get style-specific prompt
-            try:
-                style_prompt = writing_style_manager.get_style_prompt(writing_style, articles_text)
-                logger.info(f"Successfully generated style prompt for '{writing_style}'")
-                prompt = f"""
-                {style_prompt}
-                
-                Newsletter Title: {digest_title}
-                Date: {current_date}
-                
-                Articles to include:
-                {articles_text}
-                
-                Please create a digest following the specified writing style and format requirements.
-                """
-            except (ValueError, Exception) as e:
-                # Fallback to default professional style with enhanced instructions
-                logger.warning(f"Style prompt generation failed: {e}. Using fallback style for '{writing_style}'.")
-                
-                # Create style-specific instructions based on writing_style
-                if writing_style == 'casual':
-                    style_instruction = """
-                    CRITICAL: Write in a CASUAL, FRIENDLY, and ENGAGING style:
-                    
-                    **TONE REQUIREMENTS:**
-                    - Use conversational language with personal touches
-                    - Include questions to engage readers (e.g., "What do you think?", "Have you seen this?")
-                    - Use contractions (don't, can't, won't, it's, you're)
-                    - Keep it approachable and community-focused
-                    - Add personality and warmth
-                    - Use informal greetings and expressions
-                    - Write as if talking to a friend
-                    
-                    **EXAMPLE CASUAL PHRASES TO USE:**
-                    - "Hey there!", "Check this out!", "This is pretty cool!"
-                    - "You won't believe what happened..."
-                    - "Here's something that caught my attention..."
-                    - "What's really interesting about this is..."
-                    """
-                elif writing_style == 'technical':
-                    style_instruction = """
-                    CRITICAL: You MUST write in a TECHNICAL, DETAILED, and EDUCATIONAL style. This is NOT casual or conversational.
-                    
-                    **MANDATORY TECHNICAL TONE REQUIREMENTS:**
-                    - Use formal technical terminology and concepts
-                    - Provide detailed explanations and analysis
-                    - Include technical details, methodologies, and specifications
-                    - Focus on educational content and comprehensive coverage
-                    - Use precise, technical language
-                    - Explain complex concepts thoroughly
-                    - Reference technical standards and frameworks
-                    - NO casual language like "Well", "Okay", "You see"
-                    - NO conversational phrases
-                    - NO contractions (don't, can't, won't)
-                    
-                    **REQUIRED TECHNICAL PHRASES TO USE:**
-                    - "The implementation utilizes..."
-                    - "From a technical perspective..."
-                    - "The underlying architecture demonstrates..."
-                    - "This approach leverages advanced algorithms..."
-                    - "The system architecture incorporates..."
-                    - "The methodology employs..."
-                    - "Technical analysis reveals..."
-                    - "The framework implements..."
-                    - "The algorithm demonstrates..."
-                    - "From an engineering standpoint..."
-                    
-                    **FORBIDDEN PHRASES (DO NOT USE):**
-                    - "There is one thing that I really want"
-                    - "Well, just copy it then, right?"
-                    - "You see, these virtual characters"
-                    - "Okay, why?"
-                    - Any casual or conversational language
-                    """
-                else:  # professional or default
-                    style_instruction = """
-                    CRITICAL: Write in a PROFESSIONAL, FORMAL, and BUSINESS-FOCUSED style:
-                    
-                    **TONE REQUIREMENTS:**
-                    - Use formal language and structured approach
-                    - Focus on data-driven insights and business impact
-                    - Use executive summary format with clear sections
-                    - Maintain professional terminology
-                    - Keep it objective and authoritative
-                    - Emphasize business value and ROI
-                    - Use corporate communication style
-                    
-                    **EXAMPLE PROFESSIONAL PHRASES TO USE:**
-                    - "This development represents a significant advancement..."
-                    - "The implications for the industry are substantial..."
-                    - "From a business perspective, this innovation..."
-                    - "The strategic importance of this technology..."
-                    - "Organizations should consider the following implications..."
-                    """
-                
-                prompt = f"""
-                IMPORTANT: You MUST write in the {writing_style.upper()} style. This is NOT optional.
-                
-                {style_instruction}
-                
-                Newsletter Title: {digest_title}
-                Date: {current_date}
-                
-                Articles to include:
-                {articles_text}
-                
-                REQUIRED STRUCTURE (but use {writing_style} style throughout):
-                
-                # {digest_title}
-                *{current_date}*
-                
-                ## Latest News & Updates
-                
-                For each article, create a section:
-                
-                ### [Article Title]
-                
-                [Summary written in {writing_style} style - NOT generic style]
-                
-                *Source: [Title](URL)*
-                
-                CRITICAL REQUIREMENTS:
-                - You MUST use the {writing_style} writing style throughout
-                - Do NOT use generic or default language
-                - Follow the specific tone and language patterns for {writing_style} style
-                - Keep summaries informative and engaging
-                - Focus on the actual content, not generic introductions
-                - Include source links for each article
-                - Make it suitable for email distribution
-                - Remember: You are writing in {writing_style} style, not professional style
-                """
+            prompt = self._build_digest_prompt(articles_text, digest_title, writing_style, current_date)
             
             try:
-                digest = self._chat_completion(
-                    prompt,
-                    system_prompt=f"You are a newsletter editor who MUST follow the specified writing style exactly. You are currently using the '{writing_style}' style. CRITICAL: Your writing style must match the '{writing_style}' style guidelines provided in the prompt. Do NOT use a generic or default style. NEVER use casual phrases like 'There is one thing that I really want', 'Well, just copy it then, right?', 'You see', 'Okay, why?' - these are FORBIDDEN in {writing_style} style. Use proper markdown formatting and maintain consistent structure throughout. Never use standalone '##' markers - always use proper headers like '## Article 1: Title'. ALWAYS include exactly ONE source link for each article using the format *Source: [Article Title](URL)* so readers can click to read the full content.",
-                    temperature=0.35,
-                    max_tokens=1500,
-                )
-                
-                # Format the final digest with proper header
-                formatted_digest = f"""# {digest_title}
+                header = f"""# {digest_title}
 
 *Generated on {current_time}*
 
-{digest}"""
+"""
+                if on_token:
+                    # Stream the completion so callers can render it progressively
+                    on_token(header)
+                    pieces = []
+                    stream = self._chat_completion_stream_hedged if self.hedge_digest else self._chat_completion_stream
+                    for piece in stream(
+                        prompt,
+                        system_prompt=self._digest_system_prompt(writing_style),
+                        temperature=0.35,
+                        max_tokens=1500,
+                    ):
+                        pieces.append(piece)
+                        on_token(piece)
+                    digest = "".join(pieces).strip()
+                elif self.hedge_digest:
+                    digest = "".join(self._chat_completion_stream_hedged(
+                        prompt,
+                        system_prompt=self._digest_system_prompt(writing_style),
+                        temperature=0.35,
+                        max_tokens=1500,
+                    )).strip()
+                else:
+                    digest = self._chat_completion(
+                        prompt,
+                        system_prompt=self._digest_system_prompt(writing_style),
+                        temperature=0.35,
+                        max_tokens=1500,
+                    )
+                
+                # Format the final digest with proper header
+                formatted_digest = f"{header}{digest}"
                 
                 # Normalize repeated source lines (collapse 3+ identical source lines to exactly 2)
                 formatted_digest = self._normalize_source_lines(formatted_digest)
                 return formatted_digest
                 
             except Exception as llm_err:
-                logger.warning(f"LLM digest failed, building simple digest locally: {llm_err}")
-                return self._create_fallback_digest(articles, digest_title, current_time, writing_style)
+                logger.warning(f"LLM digest failed, building offline digest locally: {llm_err}")
+                return self._assemble_template_digest(articles, digest_title, writing_style, current_date)
             
         except Exception as e:
             logger.error(f"Error creating digest: {str(e)}")
             return f"# {digest_title}\n\n*Error creating digest: {str(e)}*"
     
-    def _create_fallback_digest(self, articles: List[Dict[str, str]], digest_title: str, current_time: str, writing_style: str = "professional") -> str:
+    def _assemble_template_digest(self, articles: List[Dict[str, str]], digest_title: str, writing_style: str, current_date: str) -> str:
         """
-        Create a fallback digest when LLM processing fails, using proper writing style.
+        Fill the writing style's digest and article templates from structured summaries.
         
-        Args:
-            articles: List of processed articles
-            digest_title: Title for the digest
-            current_time: Current timestamp
-            writing_style: Writing style to apply (professional, casual, technical)
-            
-        Returns:
-            Formatted digest content
+        Articles without structured summaries get extractive key points, so this is also the
+        offline fast path and the fallback when the digest LLM call fails.
         """
-        current_date = __import__('time').strftime('%B %d, %Y')
-        
-        # Get style-specific formatting
-        style_config = self._get_fallback_style_config(writing_style)
+        from writing_styles import writing_style_manager
+        try:
+            digest_template = writing_style_manager.get_style_digest_template(writing_style)
+        except ValueError:
+            digest_template = writing_style_manager.get_style_digest_template('professional')
         
-        lines = [
-            f"# {digest_title}",
-            f"*{current_date}*",
-            "",
-            "## Latest News & Updates",
-            ""
-        ]
+        return textwrap.dedent(digest_template).strip().format(
+            title=digest_title,
+            date=current_date,
+            content="\n\n".join(self._template_sections(articles, writing_style)),
+        )
+    
+    def _template_sections(self, articles: List[Dict[str, str]], writing_style: str, start: int = 1) -> List[str]:
+        """Render one article section per article with the writing style's article template."""
+        from writing_styles import writing_style_manager, DEFAULT_ARTICLE_TEMPLATE
+        try:
+            article_template = writing_style_manager.get_style_article_template(writing_style)
+        except ValueError:
+            logger.warning(f"Unknown writing style '{writing_style}' for template digest; using professional templates")
+            article_template = DEFAULT_ARTICLE_TEMPLATE
         
-        for i, article in enumerate(articles, 1):
+        article_template = textwrap.dedent(article_template).strip()
+        sections = []
+        for number, article in enumerate(articles, start):
+            fields = article.get('structured_summary') or self._local_structured_summary(article)
+            values = {
+                'number': number,
+                'headline': fields.get('headline') or article.get('title', 'Untitled'),
+                'key_points': "\n".join(f"- {point}" for point in fields.get('key_points', [])),
+                'why_it_matters': fields.get('why_it_matters', ''),
+                'title': article.get('title', 'Untitled'),
+                'url': article.get('url', ''),
+            }
+            # Drop template lines whose optional field is empty
+            lines = [
+                line for line in article_template.split("\n")
+                if not any(f"{{{key}}}" in line and not values[key] for key in ('key_points', 'why_it_matters'))
+            ]
+            sections.append(re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).format(**values))
+        return sections
+    
+    def _format_articles_for_digest(self, articles: List[Dict[str, str]], start: int = 1) -> str:
+        """Format processed articles as the 'Articles to include' block of a digest prompt."""
+        articles_text = ""
+        for i, article in enumerate(articles, start):
             title = article.get('title', f'Article {i}')
             url = article.get('url', '')
+            # Use the processed summary if available, otherwise use raw content
             summary = article.get('summary', '')
-            
-            lines.append(f"### {title}")
-            lines.append("")
-            
-            # Use actual summary if available, otherwise create a style-appropriate excerpt
-            if summary and 'Error generating summary' not in summary:
-                # Apply style formatting to existing summary
-                formatted_summary = self._apply_style_formatting(summary, writing_style)
-                lines.append(formatted_summary)
+            if summary and len(summary) > 50:
+                content = summary
             else:
-                # Create a style-appropriate excerpt from content
-                content = article.get('content', '')
-                if content:
-                    excerpt = self._create_style_excerpt(content, writing_style, title, url)
-                    lines.append(excerpt)
-                else:
-                    lines.append(style_config['no_content_message'])
-            
-            lines.extend([
-                "",
-                f"*Source: [{title}]({url})*",
-                ""
-            ])
-        
-        return "\n".join(lines)
-    
-    def _get_fallback_style_config(self, writing_style: str) -> Dict[str, str]:
-        """Get style configuration for fallback digest generation."""
-        configs = {
-            "professional": {
-                "no_content_message": "Content summary not available. Please visit the source for detailed information.",
-                "intro_phrase": "This development represents a significant advancement in the field.",
-                "analysis_phrase": "From a business perspective, this innovation demonstrates",
-                "conclusion_phrase": "Organizations should consider the strategic implications of this development."
-            },
-            "casual": {
-                "no_content_message": "Content summary not available. Check out the source for more details!",
-                "intro_phrase": "This is pretty exciting stuff!",
-                "analysis_phrase": "What's really interesting about this is",
-                "conclusion_phrase": "This could be a game-changer for the community."
-            },
-            "technical": {
-                "no_content_message": "Technical content summary not available. Please refer to the source for implementation details.",
-                "intro_phrase": "The implementation utilizes advanced algorithms to",
-                "analysis_phrase": "From a technical perspective, this approach leverages",
-                "conclusion_phrase": "The underlying architecture demonstrates significant technical advancement."
-            }
-        }
-        return configs.get(writing_style, configs["professional"])
-    
-    def _apply_style_formatting(self, summary: str, writing_style: str) -> str:
-        """Apply writing style formatting to an existing summary."""
-        if writing_style == "casual":
-            # Make it more conversational
-            if not summary.startswith(("Hey", "Check", "This", "What")):
-                summary = f"Check this out: {summary}"
-        elif writing_style == "technical":
-            # Make it more technical
-            if not any(phrase in summary.lower() for phrase in ["implementation", "algorithm", "architecture", "methodology"]):
-                summary = f"Technical analysis reveals: {summary}"
-        elif writing_style == "professional":
-            # Make it more business-focused
-            if not any(phrase in summary.lower() for phrase in ["business", "strategic", "organization", "industry"]):
-                summary = f"Strategic analysis indicates: {summary}"
-        
-        return summary
-    
-    def _create_style_excerpt(self, content: str, writing_style: str, title: str, url: str) -> str:
-        """Create a style-appropriate excerpt from content."""
-        words = content.split()
-        config = self._get_fallback_style_config(writing_style)
-        
-        # Take more words for technical content, fewer for casual
-        word_limit = 100 if writing_style == "technical" else 75 if writing_style == "professional" else 50
-        excerpt = ' '.join(words[:word_limit]) + ('...' if len(words) > word_limit else '')
-        
-        # Add style-specific introduction
-        if writing_style == "casual":
-            return f"Hey there! {excerpt}"
-        elif writing_style == "technical":
-            return f"Technical implementation details: {excerpt}"
-        else:  # professional
-            return f"Business analysis: {excerpt}"
-
-    def _normalize_source_lines(self, text: str) -> str:
-        """Collapse repeated identical '*Source: ...*' lines.
-
-        If the same source line appears 3 or more times consecutively, reduce it to exactly 2 occurrences
-        (the newsletter format expects two source lines). This also converts any runs of 2+ identical
-        consecutive source lines into exactly 2 to avoid accidental duplicates.
-        """
+                content = article.get('content', '')[:1000]  # Limit content
+            
+            articles_text += f"\n\n--- Article {i} ---\nTitle: {title}\nURL: {url}\nContent: {content}\n"
+        return articles_text
+    
+    def _digest_system_prompt(self, writing_style: str) -> str:
+        """System prompt for newsletter editing calls in the given writing style."""
+        return f"You are a newsletter editor who MUST follow the specified writing style exactly. You are currently using the '{writing_style}' style. CRITICAL: Your writing style must match the '{writing_style}' style guidelines provided in the prompt. Do NOT use a generic or default style. NEVER use casual phrases like 'There is one thing that I really want', 'Well, just copy it then, right?', 'You see', 'Okay, why?' - these are FORBIDDEN in {writing_style} style. Use proper markdown formatting and maintain consistent structure throughout. Never use standalone '##' markers - always use proper headers like '## Article 1: Title'. ALWAYS include exactly ONE source link for each article using the format *Source: [Article Title](URL)* so readers can click to read the full content."
+    
+    def _build_digest_prompt(self, articles_text: str, digest_title: str, writing_style: str, current_date: str) -> str:
+        """Build the single-pass digest prompt for the given writing style."""
+        # Import writing style manager
+        from writing_styles import writing_style_manager
+        
+        # Get style-specific prompt
         try:
-            # Normalize Windows and Unix newlines to \n for consistent processing
-            normalized = text.replace('\r\n', '\n')
-
-            # First, process each article block separately to ensure we don't end up
-            # with more than two source lines per article. An article block starts
-            # with a heading like '### Article N:' and continues until the next
-            # article heading or end of document.
-            article_block_re = re.compile(r"(### Article \d+: .*?)(?=\n### Article \d+: |\Z)", flags=re.DOTALL)
-
-            def _dedupe_block(m: re.Match) -> str:
-                block = m.group(1)
-                # Find all source lines in this block and capture title+url
-                source_pattern = re.compile(r"\*Source:\s*\[([^\]]+)\]\(([^\)]+)\)(?:\s*-\s*[^\n\*]+)?\*")
-                matches = source_pattern.findall(block)
-
-                if not matches:
-                    # No well-formed markdown source links; fall back to removing any raw '*Source:' lines
-                    if "*Source:" not in block:
-                        return block
-                    # Remove and return block with no source lines
-                    block_without_sources = re.sub(r"\n?\*Source: [^\n]+\*\n?", "\n", block)
-                    return block_without_sources
-
-                # Build canonical mapping by URL -> first title seen
-                url_to_title = {}
-                url_order = []
-                for title, url in matches:
-                    if url not in url_to_title:
-                        url_to_title[url] = title
-                        url_order.append(url)
-
-                # Remove all existing source lines from the block
-                block_without_sources = re.sub(r"\n?\*Source: [^\n]+\*\n?", "\n", block)
-                block_without_sources = block_without_sources.rstrip('\n') + '\n\n'
-
-                # Append only one source line per unique URL
-                appended_lines = []
-                for url in url_order:
-                    title = url_to_title[url]
-                    appended_lines.append(f"*Source: [{title}]({url})*")
-                    break  # Only add one source line
-
-                block_fixed = block_without_sources + "\n".join(appended_lines) + "\n\n"
-                return block_fixed
-
-            normalized = article_block_re.sub(_dedupe_block, normalized)
-
-            # After per-block deduplication, collapse any remaining consecutive
-            # repeated source lines (e.g., produced by LLM) into exactly one line.
-            pattern2 = re.compile(r"(\*Source: .+?\*\n)(?:\1)+", flags=re.M)
-            normalized = pattern2.sub(lambda m: m.group(1), normalized)
-            
-            # Additional general deduplication for any remaining duplicate source lines
-            # This handles cases where the article block pattern didn't match
-            lines = normalized.split('\n')
-            result_lines = []
-            i = 0
-            
-            while i < len(lines):
-                line = lines[i]
-                if line.strip().startswith('*Source:') and line.strip().endswith('*'):
-                    # Found a source line, check if the next line is a duplicate
-                    if i + 1 < len(lines) and lines[i + 1].strip() == line.strip():
-                        # Skip the duplicate
-                        i += 1
-                        continue
-                result_lines.append(line)
-                i += 1
+            style_prompt = writing_style_manager.get_style_prompt(writing_style, articles_text)
+            logger.info(f"Successfully generated style prompt for '{writing_style}'")
+            prompt = f"""
+            {style_prompt}
             
-            normalized = '\n'.join(result_lines)
-
-            # Restore CRLF if original text used it
-            if '\r\n' in text:
-                normalized = normalized.replace('\n', '\r\n')
+            Newsletter Title: {digest_title}
+            Date: {current_date}
+            
+            Articles to include:
+            {articles_text}
+            
+            Please create a digest following the specified writing style and format requirements.
+            """
+        except (ValueError, Exception) as e:
+            # Fallback to default professional style with enhanced instructions
+            logger.warning(f"Style prompt generation failed: {e}. Using fallback style for '{writing_style}'.")
+            
+            # Create style-specific instructions based on writing_style
+            if writing_style == 'casual':
+                style_instruction = """
+                CRITICAL: Write in a CASUAL, FRIENDLY, and ENGAGING style:
+                
+                **TONE REQUIREMENTS:**
+                - Use conversational language with personal touches
+                - Include questions to engage readers (e.g., "What do you think?", "Have you seen this?")
+                - Use contractions (don't, can't, won't, it's, you're)
+                - Keep it approachable and community-focused
+                - Add personality and warmth
+                - Use informal greetings and expressions
+                - Write as if talking to a friend
+                
+                **EXAMPLE CASUAL PHRASES TO USE:**
+                - "Hey there!", "Check this out!", "This is pretty cool!"
+                - "You won't believe what happened..."
+                - "Here's something that caught my attention..."
+                - "What's really interesting about this is..."
+                """
+            elif writing_style == 'technical':
+                style_instruction = """
+                CRITICAL: You MUST write in a TECHNICAL, DETAILED, and EDUCATIONAL style. This is NOT casual or conversational.
+                
+                **MANDATORY TECHNICAL TONE REQUIREMENTS:**
+                - Use formal technical terminology and concepts
+                - Provide detailed explanations and analysis
+                - Include technical details, methodologies, and specifications
+                - Focus on educational content and comprehensive coverage
+                - Use precise, technical language
+                - Explain complex concepts thoroughly
+                - Reference technical standards and frameworks
+                - NO casual language like "Well", "Okay", "You see"
+                - NO conversational phrases
+                - NO contractions (don't, can't, won't)
+                
+                **REQUIRED TECHNICAL PHRASES TO USE:**
+                - "The implementation utilizes..."
+                - "From a technical perspective..."
+                - "The underlying architecture demonstrates..."
+                - "This approach leverages advanced algorithms..."
+                - "The system architecture incorporates..."
+                - "The methodology employs..."
+                - "Technical analysis reveals..."
+                - "The framework implements..."
+                - "The algorithm demonstrates..."
+                - "From an engineering standpoint..."
+                
+                **FORBIDDEN PHRASES (DO NOT USE):**
+                - "There is one thing that I really want"
+                - "Well, just copy it then, right?"
+                - "You see, these virtual characters"
+                - "Okay, why?"
+                - Any casual or conversational language
+                """
+            else:  # professional or default
+                style_instruction = """
+                CRITICAL: Write in a PROFESSIONAL, FORMAL, and BUSINESS-FOCUSED style:
+                
+                **TONE REQUIREMENTS:**
+                - Use formal language and structured approach
+                - Focus on data-driven insights and business impact
+                - Use executive summary format with clear sections
+                - Maintain professional terminology
+                - Keep it objective and authoritative
+                - Emphasize business value and ROI
+                - Use corporate communication style
+                
+                **EXAMPLE PROFESSIONAL PHRASES TO USE:**
+                - "This development represents a significant advancement..."
+                - "The implications for the industry are substantial..."
+                - "From a business perspective, this innovation..."
+                - "The strategic importance of this technology..."
+                - "Organizations should consider the following implications..."
+                """
+            
+            prompt = f"""
+            IMPORTANT: You MUST write in the {writing_style.upper()} style. This is NOT optional.
+            
+            {style_instruction}
+            
+            Newsletter Title: {digest_title}
+            Date: {current_date}
+            
+            Articles to include:
+            {articles_text}
+            
+            REQUIRED STRUCTURE (but use {writing_style} style throughout):
+            
+            # {digest_title}
+            *{current_date}*
+            
+            ## Latest News & Updates
+            
+            For each article, create a section:
+            
+            ### [Article Title]
+            
+            [Summary written in {writing_style} style - NOT generic style]
+            
+            *Source: [Title](URL)*
+            
+            CRITICAL REQUIREMENTS:
+            - You MUST use the {writing_style} writing style throughout
+            - Do NOT use generic or default language
+            - Follow the specific tone and language patterns for {writing_style} style
+            - Keep summaries informative and engaging
+            - Focus on the actual content, not generic introductions
+            - Include source links for each article
+            - Make it suitable for email distribution
+            - Remember: You are writing in {writing_style} style, not professional style
+            """
+        
+        return prompt
+    
+    def _create_digest_map_reduce(self, articles: List[Dict[str, str]], digest_title: str, writing_style: str, current_time: str, current_date: str) -> str:
+        """
+        Create a digest for a large article set in two rounds.
+        
+        Map: articles are grouped into chunks and each chunk is drafted into newsletter sections
+        concurrently. Reduce: once the drafts are in, one call reads excerpts of them and writes
+        the overview and closing that frame the sections in the chosen writing style. Section
+        drafts are stitched locally, so no article is dropped by prompt truncation and latency
+        is one round of drafts plus the reduce call, not one call per article.
+        """
+        chunks = self._chunk_articles_for_digest(articles)
+        logger.info(f"Drafting {len(chunks)} digest sections concurrently ({self.digest_chunk_size} articles per section)")
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrency, len(chunks)))) as executor:
+            sections = list(executor.map(
+                in_current_context(lambda item: self._draft_digest_section(item[1], item[0], writing_style, current_date)),
+                chunks,
+            ))
+        intro, closing = self._reduce_digest_sections(sections, digest_title, writing_style, current_date)
+        
+        return self._assemble_hierarchical_digest(digest_title, current_time, intro, sections, closing)
+    
+    def _chunk_articles_for_digest(self, articles: List[Dict[str, str]]) -> List[tuple]:
+        """Split articles into (first_article_number, chunk) pairs for the map step."""
+        chunk_size = max(1, self.digest_chunk_size)
+        return [(i + 1, articles[i:i + chunk_size]) for i in range(0, len(articles), chunk_size)]
+    
+    def _assemble_hierarchical_digest(self, digest_title: str, current_time: str, intro: str, sections: List[str], closing: str) -> str:
+        """Stitch the reduce output and section drafts into the final digest."""
+        parts = [f"# {digest_title}", "", f"*Generated on {current_time}*", ""]
+        if intro:
+            parts.extend([intro, ""])
+        parts.extend(["## Latest News & Updates", ""])
+        for section in sections:
+            parts.extend([section.strip(), ""])
+        if closing:
+            parts.extend([closing, ""])
+        
+        return self._normalize_source_lines("\n".join(parts))
+    
+    def _draft_digest_section(self, chunk: List[Dict[str, str]], start: int, writing_style: str, current_date: str) -> str:
+        """Draft the newsletter sections for one chunk of articles (map step)."""
+        prompt, max_tokens = self._build_section_prompt(chunk, start, writing_style, current_date)
+        try:
+            return self._chat_completion(
+                prompt,
+                system_prompt=self._digest_system_prompt(writing_style),
+                temperature=0.35,
+                max_tokens=max_tokens,
+            )
+        except Exception as llm_err:
+            logger.warning(f"LLM section draft failed, building section locally: {llm_err}")
+            return self._fallback_digest_section(chunk, writing_style, start)
+    
+    def _build_section_prompt(self, chunk: List[Dict[str, str]], start: int, writing_style: str, current_date: str) -> tuple:
+        """
+        Build the map-step prompt for one chunk of articles.
+        
+        Returns:
+            (prompt, max_tokens)
+        """
+        articles_text = self._format_articles_for_digest(chunk, start)
+        prompt = f"""
+        You are writing one part of a larger newsletter in the {writing_style.upper()} style.
+        Date: {current_date}
+        
+        Articles for this part:
+        {articles_text}
+        
+        For each article, in the order given, write a section:
+        
+        ### [Article Title]
+        
+        [Summary written in {writing_style} style]
+        
+        *Source: [Title](URL)*
+        
+        Do NOT write a newsletter title, greeting, introduction or conclusion - only the article sections.
+        """
+        return prompt, min(300 * len(chunk) + 200, 2500)
+    
+    def _fallback_digest_section(self, chunk: List[Dict[str, str]], writing_style: str, start: int = 1) -> str:
+        """Build the sections for one chunk locally when the LLM call fails."""
+        return "\n\n".join(self._template_sections(chunk, writing_style, start))
+    
+    def _reduce_digest_sections(self, sections: List[str], digest_title: str, writing_style: str, current_date: str) -> tuple:
+        """
+        Write the overview and closing that stitch the drafted sections together (reduce step).
+        
+        Args:
+            sections: Section drafts from the map step, in digest order
+            
+        Returns:
+            (intro, closing) markdown strings; empty strings if the call fails
+        """
+        prompt = self._build_reduce_prompt(sections, digest_title, writing_style, current_date)
+        try:
+            response = self._chat_completion(
+                prompt,
+                system_prompt=self._digest_system_prompt(writing_style),
+                temperature=0.35,
+                max_tokens=400,
+            )
+        except Exception as llm_err:
+            logger.warning(f"LLM digest reduce step failed, stitching sections without overview: {llm_err}")
+            return "", ""
+        
+        return self._parse_reduce_response(response)
+    
+    def _build_reduce_prompt(self, sections: List[str], digest_title: str, writing_style: str, current_date: str) -> str:
+        """
+        Build the reduce-step prompt asking for an overview and closing of the drafted sections.
+        Each draft is cut to an equal share of the digest prompt budget, so the prompt stays
+        bounded however many sections there are.
+        """
+        share = max(300, self.digest_prompt_token_budget * 4 // max(1, len(sections)))
+        excerpts = "\n\n".join(section.strip()[:share] for section in sections if section.strip())
+        return f"""
+        IMPORTANT: You MUST write in the {writing_style.upper()} style.
+        
+        Newsletter Title: {digest_title}
+        Date: {current_date}
+        
+        The newsletter contains these sections (excerpts):
+        {excerpts}
+        
+        Write two short pieces that frame these sections, drawing on what they actually say:
+        1. An overview of 2-4 sentences introducing the main themes, under the heading '## Overview'
+        2. A closing paragraph of 2-3 sentences
+        
+        Respond exactly in this format:
+        INTRO:
+        <overview with its heading>
+        CLOSING:
+        <closing paragraph>
+        """
+    
+    @staticmethod
+    def _parse_reduce_response(response: str) -> tuple:
+        """Split a reduce-step response into (intro, closing)."""
+        match = re.search(r"INTRO:\s*(.*?)\s*CLOSING:\s*(.*)", response, flags=re.DOTALL)
+        if not match:
+            return response.strip(), ""
+        return match.group(1).strip(), match.group(2).strip()
+    
+    def _normalize_source_lines(self, text: str) -> str:
+        """Keep one source line per article block and collapse repeated source lines.
 
-            return normalized
+        Single pass over the lines with precompiled patterns. Each '### Article N: ' block is
+        buffered until the next block starts; if it contains a markdown source link, its source
+        lines are dropped and one canonical '*Source: [title](url)*' line (the first link) is
+        appended to the block. Outside such blocks, consecutive identical source lines are
+        collapsed into one. CRLF line endings are preserved.
+        """
+        try:
+            crlf = '\r\n' in text
+            lines = text.replace('\r\n', '\n').split('\n')
+            out: List[str] = []
+            # Whether out[-1] is a source line that an identical next line replaces
+            last_is_source = False
+            
+            def emit(line: str):
+                nonlocal last_is_source
+                stripped = line.strip()
+                is_source = stripped.startswith('*Source:') and stripped.endswith('*')
+                if last_is_source and is_source and out[-1].strip() == stripped:
+                    out[-1] = line
+                else:
+                    out.append(line)
+                last_is_source = is_source
+            
+            block: Optional[List[str]] = None
+            canonical = None
+            pending_sources = 0
+            
+            def flush_block():
+                nonlocal block
+                if block is None:
+                    return
+                # A removed run of source lines leaves one empty line fewer than its length,
+                # except at the end of the block
+                block.extend([''] * pending_sources)
+                if canonical:
+                    while len(block) > 1 and block[-1] == '':
+                        block.pop()
+                    block.extend(['', f"*Source: [{canonical[0]}]({canonical[1]})*", '', ''])
+                for block_line in block:
+                    emit(block_line)
+                block = None
+            
+            for line in lines:
+                if _ARTICLE_HEADING_RE.match(line):
+                    flush_block()
+                    block, canonical, pending_sources = [line], None, 0
+                elif block is None:
+                    emit(line)
+                elif _SOURCE_LINE_RE.fullmatch(line.strip()):
+                    pending_sources += 1
+                    if canonical is None:
+                        link = _SOURCE_LINK_RE.match(line.strip())
+                        if link:
+                            canonical = link.groups()
+                else:
+                    if pending_sources:
+                        block.extend([''] * (pending_sources - 1))
+                        pending_sources = 0
+                    block.append(line)
+            flush_block()
+            
+            normalized = '\n'.join(out)
+            return normalized.replace('\n', '\r\n') if crlf else normalized
         except Exception:
             # In case of any unexpected failure, return the original text
             return text
     
+    @traced('llm.insights')
+    @attributed('insights')
     def extract_key_insights(self, articles: List[Dict[str, str]]) -> str:
         """
         Extract key insights and trends from multiple articles.
         
+        Uses the summaries produced by process_multiple_articles (structured fields when present)
+        rather than raw content, and caches the response by prompt, so re-running insights for
+        the same summaries costs no LLM call.
+        
         Args:
             articles: List of processed articles
             
@@ -573,14 +1390,65 @@ class GroqContentProcessor:
             if not articles:
                 return "No articles to analyze."
             
-            # Combine all content
-            combined_content = ""
-            for article in articles:
-                title = article.get('title', '')
-                content = article.get('content', '')[:800]
-                combined_content += f"\n\nTitle: {title}\nContent: {content}\n"
+            prompt = self._build_insights_prompt(articles)
+            insights = self._cached_completion(self._insights_cache_key(prompt), prompt, system_prompt=INSIGHTS_SYSTEM_PROMPT, temperature=0.3, max_tokens=800)
+            return f"# Key Insights & Trends\n\n{insights}"
             
-            prompt = f"""
+        except Exception as e:
+            logger.error(f"Error extracting insights: {str(e)}")
+            return f"# Key Insights & Trends\n\n*Error analyzing articles: {str(e)}*"
+    
+    def create_digest_with_insights(self, articles: List[Dict[str, str]], digest_title: str = "Content Digest", writing_style: str = "professional", **digest_kwargs) -> tuple:
+        """
+        Create the digest and extract key insights concurrently.
+        
+        The digest runs on the calling thread (so on_token callbacks stay there) while insights,
+        built from the articles' summaries, run on a worker thread.
+        
+        Args:
+            articles: List of processed articles
+            digest_title: Title for the digest
+            writing_style: Writing style to use
+            digest_kwargs: Further create_digest arguments (hierarchical, on_token, template, offline)
+            
+        Returns:
+            (digest, insights)
+        """
+        if not articles or self._use_offline('insights', digest_kwargs.get('offline')):
+            # The offline fast path makes no LLM calls, so insights are skipped
+            return self.create_digest(articles, digest_title, writing_style, **digest_kwargs), ""
+        
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            insights_future = executor.submit(in_current_context(self.extract_key_insights), articles)
+            digest = self.create_digest(articles, digest_title, writing_style, **digest_kwargs)
+            return digest, insights_future.result()
+    
+    def _insights_cache_key(self, prompt: str) -> str:
+        return f"insights:{self.router.model_for('insights')}:{self._content_hash(prompt)}"
+    
+    def _insights_article_text(self, article: Dict[str, str]) -> str:
+        """Compact text for one article in the insights prompt: structured fields, summary, else content."""
+        fields = article.get('structured_summary')
+        if fields:
+            parts = [fields.get('headline', '')] + list(fields.get('key_points', [])) + [fields.get('why_it_matters', '')]
+            return " ".join(part for part in parts if part)[:self.insights_chars_per_article]
+        
+        summary = article.get('summary', '')
+        if summary and 'Error generating summary' not in summary and 'Content too short' not in summary:
+            lines = [line.strip() for line in summary.splitlines() if line.strip() and '*Source:' not in line]
+            return " ".join(lines)[:self.insights_chars_per_article]
+        return article.get('content', '')[:800]
+
+    def _build_insights_prompt(self, articles: List[Dict[str, str]]) -> str:
+        """Build the key insights prompt from the articles' summaries (content for unsummarized articles)."""
+        # Combine all summaries
+        combined_content = ""
+        for article in articles:
+            title = article.get('title', '')
+            content = self._insights_article_text(article)
+            combined_content += f"\n\nTitle: {title}\nContent: {content}\n"
+        
+        return f"""
             Analyze the following articles and extract key insights, trends, and patterns.
             Focus on:
             1. Common themes across articles
@@ -594,42 +1462,68 @@ class GroqContentProcessor:
             
             Provide a structured analysis with clear headings and bullet points.
             """
-            
-            insights = self._chat_completion(prompt, system_prompt="You are an expert analyst who identifies patterns, trends, and key insights from multiple articles. Provide clear, actionable analysis.", temperature=0.3, max_tokens=800)
-            return f"# Key Insights & Trends\n\n{insights}"
-            
-        except Exception as e:
-            logger.error(f"Error extracting insights: {str(e)}")
-            return f"# Key Insights & Trends\n\n*Error analyzing articles: {str(e)}*"
 
-    def _chat_completion(self, user_prompt: str, system_prompt: str = "You are a helpful assistant that creates clear, concise summaries of articles. Focus on the main points and provide actionable insights.", temperature: float = 0.3, max_tokens: int = 800) -> str:
+    def _chat_completion(self, user_prompt: str, system_prompt: str = SUMMARY_SYSTEM_PROMPT, temperature: float = 0.3, max_tokens: int = 800) -> str:
         """
         Create a chat completion using the Groq SDK when available, otherwise via raw HTTP.
         This avoids crashes from httpx Client("proxies") incompatibilities.
+        
+        The model is picked by the router for the current stage and prompt size; if it stays
+        rate limited after all retries the call is sent once more to the router's fallback model.
         """
+        model, route = self._route(system_prompt + user_prompt)
+        try:
+            return self._complete_with_model(model, route, user_prompt, system_prompt, temperature, max_tokens)
+        except RateLimitExhausted:
+            fallback = self.router.fallback_for(model)
+            if not fallback:
+                raise
+            logger.warning(f"Model {model} is rate limited; falling back to {fallback}")
+            return self._complete_with_model(fallback, f"fallback:{model}", user_prompt, system_prompt, temperature, max_tokens)
+    
+    def _route(self, prompt_text: str) -> tuple:
+        """(model, reason) for a call made in the current usage stage."""
+        return self.router.route(current_stage(), self._estimate_tokens(prompt_text))
+    
+    def _rate_limiter_for(self, model: str) -> RateLimiter:
+        """Rate limiter for a model, created on first use with the default model's rate."""
+        with self._rate_limiters_lock:
+            limiter = self._rate_limiters.get(model)
+            if limiter is None:
+                limiter = RateLimiter(requests_per_minute=self.rate_limiter.requests_per_minute, burst=self.rate_limiter.capacity)
+                self._rate_limiters[model] = limiter
+            return limiter
+    
+    @traced('llm.completion')
+    def _complete_with_model(self, model: str, route: str, user_prompt: str, system_prompt: str, temperature: float, max_tokens: int) -> str:
+        """Run one chat completion on a specific model and record its usage."""
+        annotate(model=model, route=route, stage=current_stage())
+        started = time.monotonic()
+        stats = {}
         try:
             if self.client is not None:
-                response = self.client.chat.completions.create(
+                response = self._sdk_chat_create(
+                    stats,
                     messages=[
                         {"role": "system", "content": system_prompt},
                         {"role": "user", "content": user_prompt},
                     ],
-                    model=self.model,
+                    model=model,
                     temperature=temperature,
                     max_tokens=max_tokens,
                 )
-                return response.choices[0].message.content.strip()
+                text = response.choices[0].message.content.strip()
+                self._record_usage(getattr(response, 'usage', None), system_prompt + user_prompt, text, started, retries=stats.get('retries', 0), model=model, route=route)
+                return text
+        except RateLimitExhausted:
+            self._record_usage(None, "", "", started, retries=stats.get('retries', 0), success=False, model=model, route=route)
+            raise
         except Exception as sdk_err:
             logger.warning(f"Groq SDK call failed ({sdk_err}); using HTTP fallback.")
 
         # HTTP fallback
-        url = "https://api.groq.com/openai/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
         payload = {
-            "model": self.model,
+            "model": model,
             "messages": [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
@@ -637,27 +1531,109 @@ class GroqContentProcessor:
             "temperature": temperature,
             "max_tokens": max_tokens,
         }
-        resp = requests.post(url, headers=headers, json=payload, timeout=60)
-        # Surface explicit 401 errors for easier debugging
-        if resp.status_code == 401:
-            try:
-                body = resp.json()
-            except Exception:
-                body = resp.text
-            logger.error(f"Groq HTTP 401 Unauthorized: {body}")
-            raise ValueError("Groq API returned 401 Unauthorized - check GROQ_API_KEY environment variable and ensure the key is valid.")
+        try:
+            resp = self._post_chat_request(payload, stats=stats)
+        except Exception:
+            self._record_usage(None, "", "", started, retries=stats.get('retries', 0), success=False, model=model, route=route)
+            raise
+        data = resp.json()
+        text = data["choices"][0]["message"]["content"].strip()
+        self._record_usage(data.get("usage"), system_prompt + user_prompt, text, started, retries=stats.get('retries', 0), model=model, route=route)
+        return text
+    
+    def _record_usage(self, usage, prompt_text: str, completion_text: str, started: float, retries: int = 0, success: bool = True, model: Optional[str] = None, route: Optional[str] = None, **extra):
+        """
+        Record a finished call with the usage tracker.
+        
+        Args:
+            usage: Usage block from the API (SDK object or dict); tokens are estimated when missing
+            prompt_text: System and user prompt, for estimates
+            completion_text: Completion text, for estimates
+            started: time.monotonic() when the call started
+            retries: Number of retried HTTP attempts
+            success: Whether the call produced a completion
+            model: Model that served the call (defaults to the processor's model)
+            route: Routing decision that selected the model
+            extra: Additional fields stored with the call (e.g. hedge, cancelled)
+        """
+        if isinstance(usage, dict):
+            prompt_tokens, completion_tokens = usage.get('prompt_tokens'), usage.get('completion_tokens')
+        else:
+            prompt_tokens, completion_tokens = getattr(usage, 'prompt_tokens', None), getattr(usage, 'completion_tokens', None)
+        estimated = prompt_tokens is None or completion_tokens is None
+        # Cancelled hedge attempts were still billed for their prompt and partial output
+        if estimated and (success or extra.get('cancelled')):
+            prompt_tokens = self._estimate_tokens(prompt_text)
+            completion_tokens = self._estimate_tokens(completion_text)
+        self.usage.record(
+            model or self.model,
+            prompt_tokens=prompt_tokens or 0,
+            completion_tokens=completion_tokens or 0,
+            latency=time.monotonic() - started,
+            retries=retries,
+            success=success,
+            estimated=estimated and (success or bool(extra.get('cancelled'))),
+            route=route,
+            **extra,
+        )
+    
+    def _post_chat_request(self, payload: Dict, stream: bool = False, stats: Optional[Dict] = None, timeout=60) -> requests.Response:
+        """
+        POST a chat completion payload over raw HTTP and return the successful response.
+        
+        Waits on the model's rate limiter before each attempt, retries 429 responses after the
+        server's Retry-After delay (raising RateLimitExhausted once retries run out), surfaces 401
+        errors explicitly and retries a 400 once with a shortened user prompt (common cause:
+        context too large). timeout is passed to requests (seconds, or (connect, read)).
+        """
+        url = self.api_url
+        headers = self._http_headers()
+        model = payload.get("model", self.model)
+        limiter = self._rate_limiter_for(model)
+        if stream:
+            payload = dict(payload, stream=True)
+        
+        shortened = False
+        attempt = 0
+        while True:
+            limiter.acquire()
+            resp = requests.post(url, headers=headers, json=payload, timeout=timeout, stream=stream)
+            
+            if resp.status_code == 429:
+                delay = self._retry_after_seconds(resp.headers.get("Retry-After"), attempt)
+                limiter.penalize(delay)
+                resp.close()
+                if attempt >= self.max_retries:
+                    if stats is not None:
+                        stats['retries'] = attempt + int(shortened)
+                    raise RateLimitExhausted(model, delay)
+                logger.warning(f"Groq HTTP 429 rate limited; retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+                attempt += 1
+                continue
+            
+            # Surface explicit 401 errors for easier debugging
+            if resp.status_code == 401:
+                try:
+                    body = resp.json()
+                except Exception:
+                    body = resp.text
+                logger.error(f"Groq HTTP 401 Unauthorized: {body}")
+                raise ValueError("Groq API returned 401 Unauthorized - check GROQ_API_KEY environment variable and ensure the key is valid.")
 
-        if resp.status_code == 400:
-            # Capture error detail and retry with a shorter prompt (common cause: context too large)
-            try:
-                detail = resp.json()
-            except Exception:
-                detail = {"error": resp.text}
-            logger.warning(f"Groq HTTP 400: {detail}")
-            shortened = user_prompt[:1500]
-            payload["messages"][1]["content"] = shortened
-            resp = requests.post(url, headers=headers, json=payload, timeout=60)
+            if resp.status_code == 400 and not shortened:
+                # Capture error detail and retry with a shorter prompt (common cause: context too large)
+                try:
+                    detail = resp.json()
+                except Exception:
+                    detail = {"error": resp.text}
+                logger.warning(f"Groq HTTP 400: {detail}")
+                payload["messages"][1]["content"] = payload["messages"][1]["content"][:1500]
+                shortened = True
+                continue
+            break
 
+        if stats is not None:
+            stats['retries'] = attempt + int(shortened)
         try:
             resp.raise_for_status()
         except requests.HTTPError as http_err:
@@ -669,9 +1645,666 @@ class GroqContentProcessor:
             logger.error(f"Groq HTTP error {resp.status_code}: {body}")
             raise
 
+        return resp
+    
+    def _sdk_chat_create(self, stats: Dict, **kwargs):
+        """
+        Call the SDK's chat.completions.create with the same rate limiting and 429 policy as
+        _post_chat_request: wait on the model's limiter before each attempt, penalize it by the
+        Retry-After delay on a RateLimitError and retry, raising RateLimitExhausted once retries
+        run out so callers route to the fallback model. The retry count is stored in stats.
+        """
+        model = kwargs.get("model", self.model)
+        limiter = self._rate_limiter_for(model)
+        attempt = 0
+        while True:
+            limiter.acquire()
+            try:
+                response = self.client.chat.completions.create(**kwargs)
+            except GroqRateLimitError as err:
+                headers = getattr(getattr(err, 'response', None), 'headers', None) or {}
+                delay = self._retry_after_seconds(headers.get("retry-after"), attempt)
+                limiter.penalize(delay)
+                stats['retries'] = attempt
+                if attempt >= self.max_retries:
+                    raise RateLimitExhausted(model, delay)
+                logger.warning(f"Groq SDK 429 rate limited; retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+                attempt += 1
+                continue
+            stats['retries'] = attempt
+            return response
+    
+    @staticmethod
+    def _retry_after_seconds(retry_after: Optional[str], attempt: int) -> float:
+        """Delay before retrying a 429: the server's Retry-After if given, else exponential backoff."""
+        try:
+            return max(float(retry_after), 0.0)
+        except (TypeError, ValueError):
+            return float(2 ** attempt)
+    
+    def _chat_completion_stream(self, user_prompt: str, system_prompt: str = SUMMARY_SYSTEM_PROMPT, temperature: float = 0.3, max_tokens: int = 800) -> Iterator[str]:
+        """
+        Stream a chat completion, yielding text deltas as they arrive.
+        
+        Uses the Groq SDK when available and falls back to raw HTTP server-sent events if the SDK
+        fails before producing any output. The model is routed like _chat_completion.
+        """
+        model, route = self._route(system_prompt + user_prompt)
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+        yielded = False
+        started = time.monotonic()
+        pieces = []
+        usage = None
+        stats = {}
+        try:
+            if self.client is not None:
+                stream = self._sdk_chat_create(
+                    stats,
+                    messages=messages,
+                    model=model,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    stream=True,
+                )
+                for chunk in stream:
+                    # Groq reports usage on the final chunk under x_groq
+                    usage = getattr(getattr(chunk, 'x_groq', None), 'usage', None) or usage
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        yielded = True
+                        pieces.append(delta)
+                        yield delta
+                self._record_usage(usage, system_prompt + user_prompt, "".join(pieces), started, retries=stats.get('retries', 0), model=model, route=route)
+                return
+        except RateLimitExhausted:
+            # Rate limited on the SDK path: continue below on the fallback model, not a re-post
+            fallback = self.router.fallback_for(model)
+            if not fallback:
+                raise
+            logger.warning(f"Model {model} is rate limited; falling back to {fallback}")
+            model, route = fallback, f"fallback:{model}"
+        except Exception as sdk_err:
+            if yielded:
+                raise
+            logger.warning(f"Groq SDK stream failed ({sdk_err}); using HTTP fallback.")
+        
+        # HTTP fallback (server-sent events)
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        try:
+            resp = self._post_chat_request(payload, stream=True, stats=stats)
+        except RateLimitExhausted:
+            fallback = self.router.fallback_for(model)
+            if not fallback or route.startswith("fallback:"):
+                raise
+            logger.warning(f"Model {model} is rate limited; falling back to {fallback}")
+            model, route = fallback, f"fallback:{model}"
+            resp = self._post_chat_request(dict(payload, model=model), stream=True, stats=stats)
+        try:
+            for delta, event_usage in self._iter_sse_deltas(resp):
+                usage = event_usage or usage
+                if delta:
+                    pieces.append(delta)
+                    yield delta
+            self._record_usage(usage, system_prompt + user_prompt, "".join(pieces), started, retries=stats.get('retries', 0), model=model, route=route)
+        finally:
+            resp.close()
+    
+    @staticmethod
+    def _iter_sse_deltas(resp) -> Iterator[tuple]:
+        """Yield (text delta, usage block) pairs from a streamed chat completion response."""
+        for line in resp.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            try:
+                event = json.loads(data)
+            except ValueError:
+                continue
+            usage = event.get("usage") or (event.get("x_groq") or {}).get("usage")
+            choices = event.get("choices") or []
+            delta = (choices[0].get("delta") or {}).get("content") if choices else None
+            yield delta, usage
+    
+    def _chat_completion_stream_hedged(self, user_prompt: str, system_prompt: str = SUMMARY_SYSTEM_PROMPT, temperature: float = 0.3, max_tokens: int = 800) -> Iterator[str]:
+        """
+        Stream a chat completion with a hedged duplicate request, yielding the winner's text deltas.
+        
+        If the primary request has not produced its first byte within hedge_policy.delay() and the
+        hedge budget allows it, the same request is sent again. The attempt that produces the first
+        text delta wins and the other is cancelled by closing its response, which also aborts a
+        stalled read. Attempts always use raw HTTP streaming so a losing attempt can be closed
+        mid-response. A loser still waiting for response headers has nothing to close yet: it is
+        flagged, its response is closed as soon as it arrives, and its thread ends at the latest
+        when its request times out (GROQ_HEDGE_CONNECT_TIMEOUT to connect, 60s to read). An
+        attempt whose model stays rate limited retries on the router's fallback model, as
+        _chat_completion_stream does. Each attempt's usage is recorded with
+        hedge='primary'/'hedge', and cancelled attempts with cancelled=True.
+        """
+        model, route = self._route(system_prompt + user_prompt)
+        payload = {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        events = queue.Queue()
+        attempts = []
+        
+        def launch(role):
+            attempt = {'role': role, 'cancel': threading.Event(), 'resp': None}
+            attempts.append(attempt)
+            worker = in_current_context(self._hedged_attempt)
+            threading.Thread(
+                target=worker,
+                args=(len(attempts) - 1, attempt, copy.deepcopy(payload), route, events),
+                name=f"groq-hedge-{role}",
+                daemon=True,
+            ).start()
+        
+        self.hedge_policy.start_call()
+        launch('primary')
+        hedge_at = time.monotonic() + self.hedge_policy.delay()
+        winner = None
+        failed = 0
+        try:
+            while True:
+                timeout = None
+                if winner is None and hedge_at is not None:
+                    timeout = max(hedge_at - time.monotonic(), 0.0)
+                try:
+                    index, kind, value = events.get(timeout=timeout)
+                except queue.Empty:
+                    hedge_at = None
+                    if not self._rate_limiter_for(model).is_saturated() and self.hedge_policy.try_hedge():
+                        logger.info(f"No first byte from {model} after {self.hedge_policy.delay():.2f}s; sending hedged request")
+                        launch('hedge')
+                    continue
+                
+                if winner is None and kind in ('delta', 'done'):
+                    winner = index
+                    role = attempts[winner]['role']
+                    self.hedge_policy.record_win(role)
+                    if len(attempts) > 1:
+                        logger.info(f"Hedged call won by {role} attempt; cancelling the other")
+                    for other, attempt in enumerate(attempts):
+                        if other != winner:
+                            self._cancel_hedged_attempt(attempt)
+                if winner is not None and index != winner:
+                    continue
+                
+                if kind == 'delta':
+                    yield value
+                elif kind == 'done':
+                    return
+                else:
+                    failed += 1
+                    # An attempt failed before any output: wait for the other one if it is in flight
+                    if winner is None and failed < len(attempts):
+                        continue
+                    raise value
+        finally:
+            for index, attempt in enumerate(attempts):
+                if index != winner:
+                    self._cancel_hedged_attempt(attempt)
+    
+    @staticmethod
+    def _cancel_hedged_attempt(attempt: Dict):
+        """Flag a hedged attempt as cancelled and close its response if it has one."""
+        attempt['cancel'].set()
+        resp = attempt['resp']
+        if resp is not None:
+            try:
+                resp.close()
+            except Exception:
+                pass
+    
+    def _hedged_attempt(self, index: int, attempt: Dict, payload: Dict, route: str, events: queue.Queue):
+        """Run one streamed attempt of a hedged call, posting (index, kind, value) events."""
+        role, cancel = attempt['role'], attempt['cancel']
+        model = payload["model"]
+        prompt_text = payload["messages"][0]["content"] + payload["messages"][1]["content"]
+        started = time.monotonic()
+        pieces = []
+        usage = None
+        stats = {}
+        resp = None
+        timeout = (self.hedge_connect_timeout, 60)
+        try:
+            try:
+                resp = self._post_chat_request(payload, stream=True, stats=stats, timeout=timeout)
+            except RateLimitExhausted:
+                fallback = self.router.fallback_for(model)
+                if not fallback or cancel.is_set():
+                    raise
+                logger.warning(f"Model {model} is rate limited; hedged {role} attempt falling back to {fallback}")
+                model, route = fallback, f"fallback:{model}"
+                resp = self._post_chat_request(dict(payload, model=model), stream=True, stats=stats, timeout=timeout)
+            attempt['resp'] = resp
+            if cancel.is_set():
+                resp.close()
+            for delta, event_usage in self._iter_sse_deltas(resp):
+                if cancel.is_set():
+                    break
+                usage = event_usage or usage
+                if delta:
+                    if not pieces:
+                        self.hedge_policy.observe(time.monotonic() - started)
+                    pieces.append(delta)
+                    events.put((index, 'delta', delta))
+            if cancel.is_set():
+                self._record_usage(None, prompt_text, "".join(pieces), started, retries=stats.get('retries', 0), success=False, model=model, route=route, hedge=role, cancelled=True)
+                return
+            self._record_usage(usage, prompt_text, "".join(pieces), started, retries=stats.get('retries', 0), model=model, route=route, hedge=role)
+            events.put((index, 'done', None))
+        except Exception as err:
+            cancelled = cancel.is_set()
+            self._record_usage(None, prompt_text, "".join(pieces), started, retries=stats.get('retries', 0), success=False, model=model, route=route, hedge=role, cancelled=cancelled)
+            events.put((index, 'error', err))
+        finally:
+            if resp is not None:
+                resp.close()
+    
+    def _http_headers(self) -> Dict[str, str]:
+        """Headers for raw HTTP chat completion requests."""
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+    
+    def _async_pool(self) -> tuple:
+        """
+        (client, semaphore) for the running event loop.
+        
+        Each loop keeps its own client, so loops running concurrently in other threads never
+        have their client replaced under them. Clients of loops that have since closed are
+        dropped; their connections cannot be closed without their loop, so async callers
+        should await aclose() before their loop ends.
+        """
+        loop = asyncio.get_running_loop()
+        with self._async_clients_lock:
+            for stale in [other for other in self._async_clients if other.is_closed()]:
+                logger.warning("Dropping an async Groq client whose event loop closed without aclose()")
+                del self._async_clients[stale]
+            pool = self._async_clients.get(loop)
+            if pool is None:
+                pool = (
+                    httpx.AsyncClient(
+                        timeout=60,
+                        limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency),
+                    ),
+                    asyncio.Semaphore(self.max_concurrency),
+                )
+                self._async_clients[loop] = pool
+            return pool
+    
+    async def aclose(self):
+        """Close the pooled async HTTP client of the running event loop."""
+        with self._async_clients_lock:
+            pool = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if pool is not None:
+            await pool[0].aclose()
+    
+    async def _achat_completion(self, user_prompt: str, system_prompt: str = SUMMARY_SYSTEM_PROMPT, temperature: float = 0.3, max_tokens: int = 800) -> str:
+        """
+        Async chat completion over a pooled httpx connection.
+        
+        Routes the model and falls back on rate-limit exhaustion like _chat_completion.
+        Concurrency is bounded by max_concurrency.
+        """
+        model, route = self._route(system_prompt + user_prompt)
+        try:
+            return await self._acomplete_with_model(model, route, user_prompt, system_prompt, temperature, max_tokens)
+        except RateLimitExhausted:
+            fallback = self.router.fallback_for(model)
+            if not fallback:
+                raise
+            logger.warning(f"Model {model} is rate limited; falling back to {fallback}")
+            return await self._acomplete_with_model(fallback, f"fallback:{model}", user_prompt, system_prompt, temperature, max_tokens)
+    
+    @traced('llm.completion')
+    async def _acomplete_with_model(self, model: str, route: str, user_prompt: str, system_prompt: str, temperature: float, max_tokens: int) -> str:
+        """
+        Run one async chat completion on a specific model and record its usage.
+        
+        Shares the per-model rate limiters with the sync API and applies the same 429/401/400
+        handling as _post_chat_request.
+        """
+        annotate(model=model, route=route, stage=current_stage())
+        client, semaphore = self._async_pool()
+        limiter = self._rate_limiter_for(model)
+        payload = {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        
+        shortened = False
+        attempt = 0
+        started = time.monotonic()
+        async with semaphore:
+            while True:
+                await limiter.acquire_async()
+                resp = await client.post(self.api_url, headers=self._http_headers(), json=payload)
+                
+                if resp.status_code == 429:
+                    delay = self._retry_after_seconds(resp.headers.get("Retry-After"), attempt)
+                    limiter.penalize(delay)
+                    if attempt >= self.max_retries:
+                        self._record_usage(None, "", "", started, retries=attempt + int(shortened), success=False, model=model, route=route)
+                        raise RateLimitExhausted(model, delay)
+                    logger.warning(f"Groq HTTP 429 rate limited; retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+                    attempt += 1
+                    continue
+                
+                if resp.status_code == 401:
+                    logger.error(f"Groq HTTP 401 Unauthorized: {resp.text}")
+                    raise ValueError("Groq API returned 401 Unauthorized - check GROQ_API_KEY environment variable and ensure the key is valid.")
+                
+                if resp.status_code == 400 and not shortened:
+                    logger.warning(f"Groq HTTP 400: {resp.text}")
+                    payload["messages"][1]["content"] = user_prompt[:1500]
+                    shortened = True
+                    continue
+                break
+        
+        retries = attempt + int(shortened)
+        try:
+            resp.raise_for_status()
+        except httpx.HTTPStatusError:
+            logger.error(f"Groq HTTP error {resp.status_code}: {resp.text}")
+            self._record_usage(None, "", "", started, retries=retries, success=False, model=model, route=route)
+            raise
+        
         data = resp.json()
-        return data["choices"][0]["message"]["content"].strip()
+        text = data["choices"][0]["message"]["content"].strip()
+        self._record_usage(data.get("usage"), system_prompt + user_prompt, text, started, retries=retries, model=model, route=route)
+        return text
+    
+    async def _acached_completion(self, cache_key: str, user_prompt: str, **kwargs) -> str:
+        """Async counterpart of _cached_completion, sharing the same summary cache."""
+        with self._cache_lock:
+            cached = self.summary_cache.get(cache_key)
+        if cached and cached.get('text'):
+            logger.info(f"Using cached LLM summary for {cache_key}")
+            self.usage.record(self.router.model_for(current_stage()), cache='hit', route='cache')
+            return cached['text']
+        
+        with usage_context(cache='miss'):
+            text = await self._achat_completion(user_prompt, **kwargs)
+        with self._cache_lock:
+            self.summary_cache.set(cache_key, {'text': text})
+        return text
+    
+    @attributed('summaries', per_article=True)
+    async def asummarize_article(self, article: Dict[str, str], max_length: int = 500) -> str:
+        """
+        Async variant of summarize_article.
+        
+        Args:
+            article: Dictionary containing article data (title, content, etc.)
+            max_length: Maximum length of the summary
+            
+        Returns:
+            Summarized content
+        """
+        try:
+            content = article.get('content', '')
+            if not content or len(content.strip()) < 50:
+                return self._short_content_placeholder(article)
+            
+            if self._use_offline('summaries'):
+                return self._local_summary(article)
+            
+            if self._is_youtube(article) and len(content) > self.transcript_chunk_chars:
+                long_summary = await self._asummarize_long_transcript(article)
+                if long_summary:
+                    return long_summary
+            
+            prompt, max_tokens = self._build_summary_prompt(article)
+            try:
+                return await self._achat_completion(prompt, temperature=0.3, max_tokens=max_tokens)
+            except Exception as llm_err:
+                logger.warning(f"LLM summary failed, using local fallback: {llm_err}")
+                return self._local_summary(article)
+            
+        except Exception as e:
+            logger.error(f"Error summarizing article {article.get('url', 'unknown')}: {str(e)}")
+            return f"**{article.get('title', 'Untitled')}**\n\n*Error generating summary: {str(e)}*\n\n[Read more]({article.get('url', '')})"
+    
+    @attributed('summaries', per_article=True)
+    async def asummarize_article_structured(self, article: Dict[str, str], writing_style: str = "professional") -> Dict:
+        """Async variant of summarize_article_structured."""
+        content = article.get('content', '')
+        if not content or len(content.strip()) < 50:
+            return self._local_structured_summary(article)
+        
+        if self._is_youtube(article) and len(content) > self.transcript_chunk_chars:
+            long_summary = await self._asummarize_long_transcript(article)
+            if long_summary:
+                article = dict(article, content=long_summary)
+        
+        prompt, max_tokens = self._build_structured_summary_prompt(article, writing_style)
+        try:
+            response = await self._achat_completion(prompt, system_prompt=STRUCTURED_SUMMARY_SYSTEM_PROMPT, temperature=0.3, max_tokens=max_tokens)
+        except Exception as llm_err:
+            logger.warning(f"Structured LLM summary failed, using local fallback: {llm_err}")
+            return self._local_structured_summary(article)
+        
+        fields = self._parse_structured_summary(response)
+        if fields is None:
+            logger.warning("Structured summary response could not be parsed; using local fallback")
+            return self._local_structured_summary(article)
+        return fields
+    
+    async def _asummarize_long_transcript(self, article: Dict[str, str]) -> Optional[str]:
+        """Async variant of _summarize_long_transcript; chunks are summarized with asyncio.gather."""
+        title = article.get('title', 'Untitled')
+        url = article.get('url', '')
+        video_id = article.get('video_id') or url
+        
+        chunks = self._chunk_transcript(article)
+        if len(chunks) < 2:
+            return None
+        logger.info(f"Summarizing long transcript for {video_id} in {len(chunks)} chunks")
+        
+        async def summarize_chunk(index, chunk):
+            prompt = self._transcript_chunk_prompt(title, index, len(chunks), chunk)
+            try:
+                return await self._acached_completion(self._transcript_chunk_cache_key(video_id, chunk), prompt, temperature=0.3, max_tokens=400)
+            except Exception as llm_err:
+                logger.warning(f"Transcript chunk {index} summary failed: {llm_err}")
+                return None
+        
+        chunk_summaries = await asyncio.gather(*(summarize_chunk(i, c) for i, c in enumerate(chunks, 1)))
+        
+        sections_text = self._transcript_sections_text(chunks, chunk_summaries)
+        if not sections_text:
+            return None
+        
+        prompt = self._transcript_merge_prompt(title, url, sections_text)
+        cache_key = f"transcript_merge:{video_id}:{self.router.model_for('summaries')}:{self._content_hash(sections_text)}"
+        try:
+            return await self._acached_completion(cache_key, prompt, temperature=0.3, max_tokens=1000)
+        except Exception as llm_err:
+            logger.warning(f"Transcript merge failed, returning part summaries: {llm_err}")
+            return sections_text
+    
+    @attributed('summaries')
+    async def aprocess_multiple_articles(self, articles: List[Dict[str, str]], max_length: int = 500, packed: Optional[bool] = None, writing_style: str = "professional", structured: Optional[bool] = None, offline: Optional[bool] = None) -> List[Dict[str, str]]:
+        """
+        Async variant of process_multiple_articles; articles are summarized concurrently.
+        
+        Args:
+            articles: List of article dictionaries
+            max_length: Maximum length of each summary
+            packed: If True, bin short articles into shared LLM requests
+            writing_style: Writing style for structured summaries
+            structured: If True, request structured summaries for template digests
+            offline: If True, build extractive structured summaries locally
+            
+        Returns:
+            List of processed articles with summaries
+        """
+        if packed is None:
+            packed = self.pack_summaries
+        if structured is None:
+            structured = self.template_digest
+        
+        if self._use_offline('summaries', offline):
+            return self._attach_structured_summaries(articles, [self._local_structured_summary(a) for a in articles])
+        
+        if structured:
+            fields = await asyncio.gather(*(self.asummarize_article_structured(a, writing_style) for a in articles))
+            return self._attach_structured_summaries(articles, list(fields))
+        
+        if packed:
+            summaries = await self._asummarize_articles_packed(articles, max_length)
+        else:
+            summaries = await asyncio.gather(*(self.asummarize_article(a, max_length) for a in articles))
+        
+        return self._attach_summaries(articles, list(summaries))
+    
+    async def _asummarize_articles_packed(self, articles: List[Dict[str, str]], max_length: int = 500) -> List[str]:
+        """Async variant of summarize_articles_packed."""
+        summaries: List[Optional[str]] = [None] * len(articles)
+        packable = [(i, a) for i, a in enumerate(articles) if self._is_packable(a)]
+        packs = [p for p in self._bin_articles_for_packing(packable, self.pack_token_budget) if len(p) >= 2]
+        
+        async def summarize_pack(pack):
+            prompt, max_tokens = self._build_pack_prompt([a for _, a in pack])
+            try:
+                response = await self._achat_completion(prompt, system_prompt=PACKED_SUMMARY_SYSTEM_PROMPT, temperature=0.3, max_tokens=max_tokens)
+            except Exception as llm_err:
+                logger.warning(f"Packed LLM summary failed: {llm_err}")
+                return None
+            return self._parse_packed_summaries(response, len(pack))
+        
+        for pack, parsed in zip(packs, await asyncio.gather(*(summarize_pack(p) for p in packs))):
+            if parsed is None:
+                logger.warning("Packed summary response could not be parsed; falling back to single calls")
+                continue
+            for position, (index, _) in enumerate(pack, 1):
+                if parsed.get(position):
+                    summaries[index] = parsed[position]
+        
+        missing = [i for i, summary in enumerate(summaries) if summary is None]
+        for i, summary in zip(missing, await asyncio.gather(*(self.asummarize_article(articles[i], max_length) for i in missing))):
+            summaries[i] = summary
+        return summaries
+    
+    @attributed('digest')
+    async def acreate_digest(self, articles: List[Dict[str, str]], digest_title: str = "Content Digest", writing_style: str = "professional", hierarchical: Optional[bool] = None, template: Optional[bool] = None, offline: Optional[bool] = None) -> str:
+        """
+        Async variant of create_digest.
+        
+        Args:
+            articles: List of processed articles
+            digest_title: Title for the digest
+            writing_style: Writing style to use (professional, casual, technical, or custom)
+            hierarchical: Use the map-reduce digest; defaults to automatic selection
+            template: Assemble the digest from structured summaries without an LLM call
+            offline: Build the digest with the offline fast path
+            
+        Returns:
+            Formatted digest content
+        """
+        try:
+            if not articles:
+                return f"# {digest_title}\n\nNo articles to process."
+            
+            current_time = __import__('time').strftime('%Y-%m-%d at %H:%M:%S')
+            current_date = __import__('time').strftime('%B %d, %Y')
+            
+            if template is None:
+                template = self.template_digest
+            if template or self._use_offline('digest', offline):
+                return self._assemble_template_digest(articles, digest_title, writing_style, current_date)
+            articles_text = self._format_articles_for_digest(articles)
+            
+            if hierarchical is None:
+                hierarchical = (len(articles) > self.digest_single_pass_max_articles or
+                                self._estimate_tokens(articles_text) > self.digest_prompt_token_budget)
+            
+            system_prompt = self._digest_system_prompt(writing_style)
+            
+            if hierarchical:
+                async def draft(start, chunk):
+                    prompt, max_tokens = self._build_section_prompt(chunk, start, writing_style, current_date)
+                    try:
+                        return await self._achat_completion(prompt, system_prompt=system_prompt, temperature=0.35, max_tokens=max_tokens)
+                    except Exception as llm_err:
+                        logger.warning(f"LLM section draft failed, building section locally: {llm_err}")
+                        return self._fallback_digest_section(chunk, writing_style, start)
+                
+                async def reduce(sections):
+                    prompt = self._build_reduce_prompt(sections, digest_title, writing_style, current_date)
+                    try:
+                        response = await self._achat_completion(prompt, system_prompt=system_prompt, temperature=0.35, max_tokens=400)
+                    except Exception as llm_err:
+                        logger.warning(f"LLM digest reduce step failed, stitching sections without overview: {llm_err}")
+                        return "", ""
+                    return self._parse_reduce_response(response)
+                
+                sections = list(await asyncio.gather(*(draft(start, chunk) for start, chunk in self._chunk_articles_for_digest(articles))))
+                intro, closing = await reduce(sections)
+                return self._assemble_hierarchical_digest(digest_title, current_time, intro, sections, closing)
+            
+            prompt = self._build_digest_prompt(articles_text, digest_title, writing_style, current_date)
+            try:
+                digest = await self._achat_completion(prompt, system_prompt=system_prompt, temperature=0.35, max_tokens=1500)
+            except Exception as llm_err:
+                logger.warning(f"LLM digest failed, building offline digest locally: {llm_err}")
+                return self._assemble_template_digest(articles, digest_title, writing_style, current_date)
+            
+            return self._normalize_source_lines(f"# {digest_title}\n\n*Generated on {current_time}*\n\n{digest}")
+            
+        except Exception as e:
+            logger.error(f"Error creating digest: {str(e)}")
+            return f"# {digest_title}\n\n*Error creating digest: {str(e)}*"
+    
+    @attributed('insights')
+    async def aextract_key_insights(self, articles: List[Dict[str, str]]) -> str:
+        """
+        Async variant of extract_key_insights.
+        
+        Args:
+            articles: List of processed articles
+            
+        Returns:
+            Formatted insights
+        """
+        try:
+            if not articles:
+                return "No articles to analyze."
+            
+            prompt = self._build_insights_prompt(articles)
+            insights = await self._acached_completion(self._insights_cache_key(prompt), prompt, system_prompt=INSIGHTS_SYSTEM_PROMPT, temperature=0.3, max_tokens=800)
+            return f"# Key Insights & Trends\n\n{insights}"
+            
+        except Exception as e:
+            logger.error(f"Error extracting insights: {str(e)}")
+            return f"# Key Insights & Trends\n\n*Error analyzing articles: {str(e)}*"
     
+    @attributed('summaries', per_article=True)
     def process_single_article_with_prompt(self, article: Dict[str, str], custom_prompt: str) -> Dict[str, str]:
         """
         Process a single article with Groq LLM using a custom prompt.
@@ -0,0 +1,106 @@
+"""
+Hedged requests for latency-critical LLM calls.
+
+A hedged call sends a duplicate request when the first one has not produced its first
+byte within a threshold derived from recent time-to-first-byte (TTFB) samples (p95 by
+default). Whichever attempt starts answering first wins and the other is cancelled.
+Hedges are limited by a budget that refills by a fraction of a hedge per call, so at
+most roughly budget_ratio of calls are duplicated.
+"""
+import os
+import logging
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class HedgePolicy:
+    def __init__(self, percentile: float = 95.0, budget_ratio: float = 0.1, max_budget: float = 1.0,
+                 min_samples: int = 20, initial_delay: float = 2.0, min_delay: float = 0.2, window: int = 200):
+        """
+        Initialize the hedging policy.
+
+        Args:
+            percentile: TTFB percentile used as the hedge threshold
+            budget_ratio: Hedges earned per call (0.1 allows about one hedge per ten calls)
+            max_budget: Maximum number of hedges that can be saved up
+            min_samples: TTFB samples needed before the percentile replaces initial_delay
+            initial_delay: Threshold in seconds until enough samples are collected
+            min_delay: Lower bound for the threshold in seconds
+            window: Number of recent TTFB samples kept
+        """
+        self.percentile = percentile
+        self.budget_ratio = budget_ratio
+        self.max_budget = max_budget
+        self.min_samples = min_samples
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self._samples = deque(maxlen=window)
+        self._budget = max_budget
+        self._lock = threading.Lock()
+        self._stats = {'calls': 0, 'hedges': 0, 'hedge_wins': 0, 'denied': 0}
+
+    @classmethod
+    def from_env(cls) -> 'HedgePolicy':
+        """Build the policy from GROQ_HEDGE_* environment variables."""
+        return cls(
+            percentile=float(os.getenv('GROQ_HEDGE_PERCENTILE', '95')),
+            budget_ratio=float(os.getenv('GROQ_HEDGE_BUDGET', '0.1')),
+            min_samples=int(os.getenv('GROQ_HEDGE_MIN_SAMPLES', '20')),
+            initial_delay=float(os.getenv('GROQ_HEDGE_INITIAL_DELAY', '2.0')),
+        )
+
+    def observe(self, ttfb: float):
+        """Record the time to first byte of an attempt in seconds."""
+        with self._lock:
+            self._samples.append(ttfb)
+
+    def delay(self) -> float:
+        """Seconds to wait for a first byte before hedging."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < self.min_samples:
+            return self.initial_delay
+        index = min(len(samples) - 1, int(len(samples) * self.percentile / 100.0))
+        return max(self.min_delay, samples[index])
+
+    def start_call(self):
+        """Count a hedgeable call and add its share to the hedge budget."""
+        with self._lock:
+            self._stats['calls'] += 1
+            self._budget = min(self.max_budget, self._budget + self.budget_ratio)
+
+    def try_hedge(self) -> bool:
+        """Spend one hedge from the budget; False if the budget is exhausted."""
+        with self._lock:
+            if self._budget < 1.0:
+                self._stats['denied'] += 1
+                return False
+            self._budget -= 1.0
+            self._stats['hedges'] += 1
+            return True
+
+    def record_win(self, role: str):
+        """Record which attempt ('primary' or 'hedge') won a hedged call."""
+        if role == 'hedge':
+            with self._lock:
+                self._stats['hedge_wins'] += 1
+
+    def stats(self, since: Optional[Dict] = None) -> Dict:
+        """
+        Counters (calls, hedges, hedge_wins, denied), the remaining budget and the current threshold.
+
+        Args:
+            since: An earlier stats() result; counters are then reported as the change since it,
+                e.g. for one run
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            budget = self._budget
+        if since:
+            stats = {key: value - since.get(key, 0) for key, value in stats.items()}
+        stats['budget'] = round(budget, 3)
+        stats['delay'] = round(self.delay(), 4)
+        return stats
@@ -0,0 +1,264 @@
+"""
+LLM usage accounting: tokens, latency, retries, cache hits and cost per call.
+
+Calls are attributed to a pipeline run, a stage (summaries, digest, insights) and a
+source (web, rss, youtube, twitter) through context variables set with usage_context,
+so the attribution follows work onto worker threads (via contextvars.copy_context)
+and asyncio tasks without threading extra arguments through every method.
+"""
+import os
+import json
+import time
+import asyncio
+import functools
+import uuid
+import logging
+import threading
+import contextvars
+from collections import deque, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_run = contextvars.ContextVar('llm_usage_run', default=None)
+_stage = contextvars.ContextVar('llm_usage_stage', default=None)
+_source = contextvars.ContextVar('llm_usage_source', default=None)
+_cache = contextvars.ContextVar('llm_usage_cache', default=None)
+
+_CONTEXT_VARS = {'run': _run, 'stage': _stage, 'source': _source, 'cache': _cache}
+
+# USD per million (input, output) tokens; unknown models use GROQ_PRICE_INPUT/OUTPUT_PER_M
+MODEL_PRICES = {
+    'llama-3.1-8b-instant': (0.05, 0.08),
+    'llama-3.3-70b-versatile': (0.59, 0.79),
+    'llama3-8b-8192': (0.05, 0.08),
+    'llama3-70b-8192': (0.59, 0.79),
+    'gemma2-9b-it': (0.20, 0.20),
+}
+
+
+@contextmanager
+def usage_context(**values):
+    """
+    Attribute LLM calls made inside the block.
+
+    Args:
+        values: Any of run, stage, source or cache ('hit'/'miss'); None values are ignored
+    """
+    tokens = []
+    for key, value in values.items():
+        if value is not None:
+            tokens.append((_CONTEXT_VARS[key], _CONTEXT_VARS[key].set(value)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+def current_stage() -> Optional[str]:
+    """Stage of the LLM calls being made in the current context."""
+    return _stage.get()
+
+
+def source_label(article: Dict) -> str:
+    """Source family of an article for usage attribution."""
+    source = article.get('source')
+    if source in ('youtube', 'twitter'):
+        return source
+    if article.get('rss_title') is not None or article.get('rss_published') is not None:
+        return 'rss'
+    return 'web'
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimated USD cost of a call."""
+    input_price, output_price = MODEL_PRICES.get(model, (
+        float(os.getenv('GROQ_PRICE_INPUT_PER_M', '0.05')),
+        float(os.getenv('GROQ_PRICE_OUTPUT_PER_M', '0.08')),
+    ))
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+class LLMUsageTracker:
+    def __init__(self, log_file: Optional[str] = None, max_unattributed: int = 1000):
+        """
+        Initialize the usage tracker.
+
+        Args:
+            log_file: JSONL file that receives one summary line per finished run (optional)
+            max_unattributed: Number of calls made outside a run to keep in memory
+        """
+        self.log_file = log_file
+        self._lock = threading.Lock()
+        self._runs: Dict[str, List[Dict]] = {}
+        self._unattributed = deque(maxlen=max_unattributed)
+
+    def new_run_id(self) -> str:
+        """Create a run id and start collecting calls for it."""
+        run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        with self._lock:
+            self._runs[run_id] = []
+        return run_id
+
+    def record(self, model: str, prompt_tokens: int = 0, completion_tokens: int = 0, latency: float = 0.0,
+               retries: int = 0, success: bool = True, estimated: bool = False, cache: Optional[str] = None,
+               route: Optional[str] = None, **extra) -> Dict:
+        """
+        Record one LLM call (or cache hit) in the current context.
+
+        Args:
+            model: Model that served the call
+            prompt_tokens: Prompt tokens from the usage block
+            completion_tokens: Completion tokens from the usage block
+            latency: Wall time of the call in seconds, including retries
+            retries: Number of retried HTTP attempts (429s, shortened 400s)
+            success: Whether the call returned a completion (False for cancelled hedge attempts)
+            estimated: True if tokens were estimated because no usage block was returned
+            cache: 'hit' or 'miss' for cacheable calls; defaults to the context value
+            route: Routing decision that selected the model (see model_routing)
+            extra: Additional fields stored with the call
+
+        Returns:
+            The recorded call
+        """
+        call = {
+            'timestamp': time.time(),
+            'run': _run.get(),
+            'stage': _stage.get() or 'other',
+            'source': _source.get() or 'all',
+            'model': model,
+            'prompt_tokens': int(prompt_tokens or 0),
+            'completion_tokens': int(completion_tokens or 0),
+            'latency': round(latency, 4),
+            'retries': retries,
+            'success': success,
+            'estimated': estimated,
+            'cache': cache or _cache.get(),
+            'route': route or 'default',
+            'cost_usd': estimate_cost(model, prompt_tokens or 0, completion_tokens or 0),
+        }
+        call.update(extra)
+        with self._lock:
+            if call['run'] in self._runs:
+                self._runs[call['run']].append(call)
+            else:
+                self._unattributed.append(call)
+        return call
+
+    def calls(self, run_id: Optional[str] = None) -> List[Dict]:
+        """Calls recorded for a run, or the recent calls made outside any run."""
+        with self._lock:
+            return list(self._runs.get(run_id, [])) if run_id else list(self._unattributed)
+
+    def summary(self, run_id: Optional[str] = None) -> Dict:
+        """Aggregate a run's calls overall and per stage, source, model and routing decision."""
+        calls = self.calls(run_id)
+        result = self._aggregate(calls)
+        result['run_id'] = run_id
+        for key in ('stage', 'source', 'model', 'route'):
+            groups = defaultdict(list)
+            for call in calls:
+                groups[call[key]].append(call)
+            result[f'by_{key}'] = {name: self._aggregate(group) for name, group in groups.items()}
+        return result
+
+    def finish_run(self, run_id: str, extra: Optional[Dict] = None) -> Dict:
+        """
+        Summarize a run, persist the summary if a log file is configured and release its calls.
+
+        Args:
+            run_id: Run to finish
+            extra: Further run metrics to report with the summary (e.g. 'hedging')
+        """
+        result = self.summary(run_id)
+        result.update(extra or {})
+        result['finished_at'] = datetime.now().isoformat()
+        with self._lock:
+            self._runs.pop(run_id, None)
+        if self.log_file:
+            try:
+                with open(self.log_file, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(result) + '\n')
+            except Exception as e:
+                logger.warning(f"Could not persist LLM usage to {self.log_file}: {e}")
+        logger.info(
+            f"LLM usage for run {run_id}: {result['calls']} calls, {result['total_tokens']} tokens, "
+            f"{result['cache_hits']} cache hits, ${result['cost_usd']:.4f}"
+        )
+        return result
+
+    @staticmethod
+    def _aggregate(calls: List[Dict]) -> Dict:
+        sent = [c for c in calls if c['cache'] != 'hit']
+        latencies = sorted(c['latency'] for c in sent)
+        prompt_tokens = sum(c['prompt_tokens'] for c in sent)
+        completion_tokens = sum(c['completion_tokens'] for c in sent)
+        return {
+            'calls': len(sent),
+            'failed_calls': sum(1 for c in sent if not c['success'] and not c.get('cancelled')),
+            'hedged_calls': sum(1 for c in sent if c.get('hedge') == 'hedge'),
+            'cancelled_calls': sum(1 for c in sent if c.get('cancelled')),
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens,
+            'estimated_tokens': any(c['estimated'] for c in sent),
+            'retries': sum(c['retries'] for c in sent),
+            'cache_hits': sum(1 for c in calls if c['cache'] == 'hit'),
+            'cache_misses': sum(1 for c in sent if c['cache'] == 'miss'),
+            'latency_total': round(sum(latencies), 4),
+            'latency_p50': latencies[len(latencies) // 2] if latencies else 0.0,
+            'latency_max': latencies[-1] if latencies else 0.0,
+            'cost_usd': round(sum(c['cost_usd'] for c in sent), 6),
+        }
+
+
+def _articles_source(value) -> Optional[str]:
+    if isinstance(value, dict):
+        return source_label(value)
+    if isinstance(value, (list, tuple)) and value and all(isinstance(a, dict) for a in value):
+        labels = {source_label(a) for a in value}
+        return labels.pop() if len(labels) == 1 else 'mixed'
+    return None
+
+
+def attributed(stage: str, per_article: bool = False):
+    """
+    Decorator running a sync or async method inside usage_context(stage=...).
+
+    Args:
+        stage: Stage name for calls made by the method
+        per_article: Attribute calls to the source of the method's first argument
+            (an article or a list of articles)
+    """
+    def decorator(func):
+        def context_for(args):
+            source = _articles_source(args[1]) if per_article and len(args) > 1 else None
+            return usage_context(stage=stage, source=source)
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with context_for(args):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with context_for(args):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def in_current_context(func):
+    """Wrap func so that calls on other threads see the caller's usage attribution."""
+    context = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        # Each call gets its own copy: a Context cannot be entered by two threads at once
+        return context.copy().run(func, *args, **kwargs)
+    return wrapper
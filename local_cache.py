@@ -2,6 +2,7 @@
 
 import json
 import os
+import threading
 from datetime import datetime, timedelta
 from typing import Dict, Optional, Any
 import logging
@@ -18,6 +19,8 @@ class LocalCache:
         """
         self.cache_file = cache_file
         self.ttl = timedelta(minutes=ttl_minutes)
+        # Scrapers share one cache across concurrent source fetches
+        self._lock = threading.RLock()
         self.cache = self._load_cache()
 
     def _load_cache(self) -> Dict:
@@ -33,7 +36,7 @@ class LocalCache:
     def _save_cache(self):
         """Save the cache to file."""
         try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
+            with self._lock, open(self.cache_file, 'w', encoding='utf-8') as f:
                 json.dump(self.cache, f, indent=2, ensure_ascii=False)
         except Exception as e:
             logger.error(f"Error saving cache: {e}")
@@ -47,18 +50,19 @@ class LocalCache:
         Returns:
             Cached content if valid, None if expired or missing
         """
-        if key in self.cache:
-            item = self.cache[key]
-            cached_time = datetime.fromisoformat(item['cached_at'])
-            
-            # Check if cached content is still valid
-            if datetime.now() - cached_time <= self.ttl:
-                return item['content']
-            else:
-                # Remove expired content
-                logger.info(f"Cache expired for {key}")
-                del self.cache[key]
-                self._save_cache()
+        with self._lock:
+            if key in self.cache:
+                item = self.cache[key]
+                cached_time = datetime.fromisoformat(item['cached_at'])
+                
+                # Check if cached content is still valid
+                if datetime.now() - cached_time <= self.ttl:
+                    return item['content']
+                else:
+                    # Remove expired content
+                    logger.info(f"Cache expired for {key}")
+                    del self.cache[key]
+                    self._save_cache()
         return None
 
     def set(self, key: str, content: Dict[str, Any]):
@@ -68,14 +72,16 @@ class LocalCache:
             key: Cache key (typically a URL)
             content: Content to cache
         """
-        self.cache[key] = {
-            'content': content,
-            'cached_at': datetime.now().isoformat()
-        }
-        self._save_cache()
+        with self._lock:
+            self.cache[key] = {
+                'content': content,
+                'cached_at': datetime.now().isoformat()
+            }
+            self._save_cache()
 
     def clear(self):
         """Clear all cached content."""
-        self.cache = {}
-        if os.path.exists(self.cache_file):
-            os.remove(self.cache_file)
\ No newline at end of file
+        with self._lock:
+            self.cache = {}
+            if os.path.exists(self.cache_file):
+                os.remove(self.cache_file)
\ No newline at end of file
@@ -5,6 +5,7 @@ Provides basic user data and source management using JSON files
 
 import json
 import os
+import threading
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 
@@ -15,6 +16,9 @@ class LocalStorage:
         self.users_file = "users.json"
         self.sources_file = "sources.json"
         self.sessions_file = "sessions.json"
+        self.delivery_history_file = "delivery_history.json"
+        # Batch runs record several users' deliveries at once
+        self._history_lock = threading.Lock()
     
     def _load_json(self, filename: str, default: Any = None) -> Any:
         """Load data from JSON file"""
@@ -82,6 +86,18 @@ class LocalStorage:
         sessions = self._load_json(self.sessions_file, {})
         sessions[session_id] = session_data
         return self._save_json(self.sessions_file, sessions)
+    
+    def get_delivery_history(self, user_id: str) -> Dict:
+        """Get a user's delivered URLs and content hashes"""
+        history = self._load_json(self.delivery_history_file, {})
+        return history.get(user_id, {})
+    
+    def save_delivery_history(self, user_id: str, user_history: Dict) -> bool:
+        """Save a user's delivered URLs and content hashes"""
+        with self._history_lock:
+            history = self._load_json(self.delivery_history_file, {})
+            history[user_id] = user_history
+            return self._save_json(self.delivery_history_file, history)
 
 # Global instance
 local_storage = LocalStorage()
@@ -0,0 +1,78 @@
+"""
+Per-call model routing for GroqContentProcessor.
+
+Every stage uses GROQ_MODEL unless a stage model is configured; per-article summaries
+are simple and latency-bound, so a small fast model suits them, while the digest can be
+given a stronger one with GROQ_DIGEST_MODEL. Very large prompts can optionally be sent
+to a dedicated model, and a call whose model stays rate limited after all retries is
+re-sent once to a fallback model (Groq rate limits are tracked per model).
+"""
+import os
+import logging
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRouter:
+    def __init__(self, default_model: str, stage_models: Optional[Dict[str, str]] = None,
+                 large_input_model: Optional[str] = None, large_input_tokens: int = 6000,
+                 fallback_model: Optional[str] = None):
+        """
+        Initialize the router.
+
+        Args:
+            default_model: Model for stages without a route
+            stage_models: Model per stage (summaries, digest, insights)
+            large_input_model: Model for prompts over large_input_tokens (optional)
+            large_input_tokens: Estimated prompt size that selects large_input_model
+            fallback_model: Model to retry with when a model is rate limited; defaults to default_model
+        """
+        self.default_model = default_model
+        self.stage_models = dict(stage_models or {})
+        self.large_input_model = large_input_model
+        self.large_input_tokens = large_input_tokens
+        self.fallback_model = fallback_model
+
+    @classmethod
+    def from_env(cls, default_model: str) -> 'ModelRouter':
+        """Build the router from GROQ_*_MODEL environment variables."""
+        return cls(
+            default_model,
+            stage_models={
+                'summaries': os.getenv('GROQ_SUMMARY_MODEL') or default_model,
+                'digest': os.getenv('GROQ_DIGEST_MODEL') or default_model,
+                'insights': os.getenv('GROQ_INSIGHTS_MODEL') or default_model,
+            },
+            large_input_model=os.getenv('GROQ_LARGE_INPUT_MODEL') or None,
+            large_input_tokens=int(os.getenv('GROQ_LARGE_INPUT_TOKENS', '6000')),
+            fallback_model=os.getenv('GROQ_FALLBACK_MODEL') or None,
+        )
+
+    def model_for(self, stage: Optional[str]) -> str:
+        """Model configured for a stage."""
+        return self.stage_models.get(stage, self.default_model)
+
+    def route(self, stage: Optional[str], prompt_tokens: int) -> Tuple[str, str]:
+        """
+        Pick the model for a call.
+
+        Args:
+            stage: Usage stage of the call (summaries, digest, insights, or None)
+            prompt_tokens: Estimated prompt size
+
+        Returns:
+            (model, reason) where reason is recorded with the call's usage
+        """
+        if self.large_input_model and prompt_tokens > self.large_input_tokens:
+            return self.large_input_model, 'large_input'
+        if stage in self.stage_models:
+            return self.stage_models[stage], f'stage:{stage}'
+        return self.default_model, 'default'
+
+    def fallback_for(self, model: str) -> Optional[str]:
+        """Model to retry with once a model is rate limited, or None."""
+        for candidate in (self.fallback_model, self.default_model):
+            if candidate and candidate != model:
+                return candidate
+        return None
@@ -0,0 +1,250 @@
+"""
+Cheap local relevance ranking and top-K selection ahead of summarization.
+
+Every article is scored on freshness, content length and quality, source weight,
+niche keyword match and novelty against titles the user already received. The
+features are computed column-wise with pandas and NumPy and combined with per-user
+weights, and only the best articles that fit top_k and the LLM token budget go on
+to the (paid) summarization stage.
+"""
+import os
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+from extractive import _tfidf_matrix, is_boilerplate, split_sentences
+from local_storage import LocalStorage, local_storage
+
+logger = logging.getLogger(__name__)
+
+FEATURES = ('freshness', 'quality', 'source', 'keywords', 'novelty')
+
+# Tokens of prompt and response around an article's content in a summary call
+_SUMMARY_OVERHEAD_TOKENS = 400
+
+
+def _parse_weights(value: str) -> Dict[str, float]:
+    """Parse 'name=weight,name=weight' into a dict."""
+    weights = {}
+    for pair in (value or '').split(','):
+        if '=' in pair:
+            name, weight = pair.split('=', 1)
+            weights[name.strip().lower()] = float(weight)
+    return weights
+
+
+class RankingConfig:
+    def __init__(self, top_k: Optional[int] = None, token_budget: Optional[int] = None,
+                 weights: Optional[Dict[str, float]] = None, keywords: Optional[List[str]] = None,
+                 source_weights: Optional[Dict[str, float]] = None, half_life_hours: float = 24.0):
+        """
+        Describe how a user's articles are ranked and how many are summarized.
+
+        Args:
+            top_k: Articles summarized at most; None or 0 for no limit
+            token_budget: Estimated summary prompt tokens allowed for the run; None or 0 for no limit
+            weights: Weight per feature (freshness, quality, source, keywords, novelty); missing ones are 1
+            keywords: Niche keywords an article should mention
+            source_weights: Weight per source, matched against the article's host (and its parent
+                domains) or its 'source' field, e.g. {'openai.com': 2, 'twitter': 0.5}; others are 1
+            half_life_hours: Age at which an article's freshness score halves
+        """
+        self.top_k = top_k or None
+        self.token_budget = token_budget or None
+        self.weights = {feature: 1.0 for feature in FEATURES}
+        self.weights.update({k: float(v) for k, v in (weights or {}).items() if k in FEATURES})
+        self.keywords = [k.strip().lower() for k in (keywords or []) if k and k.strip()]
+        self.source_weights = {k.strip().lower(): float(v) for k, v in (source_weights or {}).items()}
+        self.half_life_hours = half_life_hours
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the ranking limits what gets summarized."""
+        return bool(self.top_k or self.token_budget)
+
+    @classmethod
+    def from_env(cls, **overrides) -> 'RankingConfig':
+        """
+        Build a config from RANKING_* environment variables.
+
+        Args:
+            **overrides: Constructor arguments taking precedence over the environment
+
+        Returns:
+            RankingConfig
+        """
+        settings = {
+            'top_k': int(os.getenv('RANKING_TOP_K', '0')),
+            'token_budget': int(os.getenv('RANKING_TOKEN_BUDGET', '0')),
+            'weights': _parse_weights(os.getenv('RANKING_WEIGHTS', '')),
+            'keywords': [k for k in os.getenv('RANKING_KEYWORDS', '').split(',') if k.strip()],
+            'source_weights': _parse_weights(os.getenv('RANKING_SOURCE_WEIGHTS', '')),
+            'half_life_hours': float(os.getenv('RANKING_HALF_LIFE_HOURS', '24')),
+        }
+        settings.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(**settings)
+
+    @classmethod
+    def for_user(cls, user_id: Optional[str], storage: Optional[LocalStorage] = None,
+                 overrides: Optional[Dict] = None) -> 'RankingConfig':
+        """
+        Build a user's config: environment defaults, then the user's saved 'ranking' settings,
+        then explicit overrides.
+
+        Args:
+            user_id: User whose saved settings apply, if any
+            storage: Storage backend; defaults to the shared local_storage
+            overrides: Settings taking precedence over the saved ones
+
+        Returns:
+            RankingConfig
+        """
+        settings = {}
+        if user_id:
+            user = (storage or local_storage).get_user(user_id) or {}
+            settings.update(user.get('ranking') or {})
+        settings.update(overrides or {})
+        return cls.from_env(**settings)
+
+    def to_dict(self) -> Dict:
+        return {
+            'top_k': self.top_k,
+            'token_budget': self.token_budget,
+            'weights': dict(self.weights),
+            'keywords': list(self.keywords),
+            'source_weights': dict(self.source_weights),
+            'half_life_hours': self.half_life_hours,
+        }
+
+
+def _source_weight(article: Dict, source_weights: Dict[str, float]) -> float:
+    host = urlsplit(article.get('url') or '').netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    labels = host.split('.')
+    for candidate in ['.'.join(labels[i:]) for i in range(len(labels) - 1)] + [str(article.get('source', '')).lower()]:
+        if candidate in source_weights:
+            return source_weights[candidate]
+    return 1.0
+
+
+def _quality(content: str) -> float:
+    """Share of substantive (non-boilerplate) sentences among the opening ones."""
+    sentences = split_sentences(content[:3000])
+    if not sentences:
+        return 0.0
+    return 1.0 - sum(is_boilerplate(s) for s in sentences[:30]) / min(len(sentences), 30)
+
+
+def _novelty(titles: List[str], delivered_titles: List[str]) -> np.ndarray:
+    """1 minus each title's highest TF-IDF cosine similarity to an already delivered title."""
+    if not delivered_titles:
+        return np.ones(len(titles))
+    matrix = _tfidf_matrix(titles + delivered_titles)
+    similarity = matrix[:len(titles)] @ matrix[len(titles):].T
+    return 1.0 - np.clip(similarity.max(axis=1), 0.0, 1.0)
+
+
+def score_articles(articles: List[Dict], config: RankingConfig,
+                   delivered_titles: Iterable[str] = ()) -> pd.DataFrame:
+    """
+    Score articles on every ranking feature.
+
+    Args:
+        articles: Scraped articles
+        config: Ranking config (weights, keywords, source weights)
+        delivered_titles: Titles the user already received, for novelty
+
+    Returns:
+        DataFrame indexed like articles with one [0, 1] column per feature, 'score' (weighted
+        mean of the features) and 'tokens' (estimated summary prompt tokens)
+    """
+    frame = pd.DataFrame({
+        'title': [a.get('title') or '' for a in articles],
+        'content': [a.get('content') or '' for a in articles],
+        'date': [a.get('publish_date') or a.get('scraped_at') for a in articles],
+    })
+    if frame.empty:
+        return frame.assign(**{feature: [] for feature in FEATURES}, score=[], tokens=[])
+
+    dates = pd.to_datetime(frame['date'], errors='coerce', utc=True, format='mixed')
+    age_hours = ((pd.Timestamp.now(tz='UTC') - dates).dt.total_seconds() / 3600).clip(lower=0)
+    frame['freshness'] = np.power(0.5, age_hours / max(config.half_life_hours, 1e-6)).fillna(0.5)
+
+    words = frame['content'].str.split().str.len().fillna(0)
+    length = np.clip(np.log1p(words) / np.log1p(600), 0.0, 1.0)
+    failed = frame['content'].str.startswith('Error') | (words == 0)
+    frame['quality'] = np.where(failed, 0.0, length * frame['content'].map(_quality))
+
+    source = np.array([_source_weight(a, config.source_weights) for a in articles])
+    frame['source'] = source / source.max() if source.max() > 0 else 0.0
+
+    if config.keywords:
+        text = (frame['title'] + ' ' + frame['title'] + ' ' + frame['content']).str.lower()
+        hits = np.column_stack([text.str.contains(k, regex=False).to_numpy() for k in config.keywords])
+        frame['keywords'] = hits.mean(axis=1)
+    else:
+        frame['keywords'] = 1.0
+
+    frame['novelty'] = _novelty(frame['title'].tolist(), list(delivered_titles))
+
+    weights = np.array([config.weights[feature] for feature in FEATURES])
+    frame['score'] = frame[list(FEATURES)].to_numpy() @ weights / max(weights.sum(), 1e-9)
+    # Summary prompts carry up to 3000 characters of content (4000 for YouTube), ~4 characters per token
+    limits = np.array([4000 if 'youtu' in (a.get('url') or '') else 3000 for a in articles])
+    frame['tokens'] = np.minimum(frame['content'].str.len(), limits) // 4 + _SUMMARY_OVERHEAD_TOKENS
+    return frame.drop(columns=['title', 'content', 'date'])
+
+
+def top_k_indices(articles: List[Dict], config: RankingConfig,
+                  delivered_titles: Iterable[str] = ()) -> Tuple[List[int], np.ndarray, Dict]:
+    """
+    Pick the best-scoring articles within top_k and the token budget.
+
+    The highest-scoring article is always kept.
+
+    Args:
+        articles: Scraped articles
+        config: Ranking config
+        delivered_titles: Titles the user already received, for novelty
+
+    Returns:
+        (kept positions in original order, score per article, report with 'considered',
+        'selected', 'estimated_tokens', 'config' and the 'dropped' titles with their scores)
+    """
+    scores = score_articles(articles, config, delivered_titles)
+    order = scores['score'].sort_values(ascending=False, kind='stable').index.to_numpy()
+    keep = np.ones(len(order), dtype=bool)
+    if config.top_k:
+        keep[config.top_k:] = False
+    if config.token_budget:
+        within = np.cumsum(scores['tokens'].to_numpy()[order]) <= config.token_budget
+        within[:1] = True
+        keep &= within
+    kept = sorted(order[keep].tolist())
+    score = scores['score'].to_numpy()
+    dropped = [{'title': articles[i].get('title', ''), 'score': round(float(score[i]), 4)} for i in order[~keep]]
+    if dropped:
+        logger.info(f"Ranking kept {len(kept)} of {len(articles)} articles for summarization")
+    return kept, score, {
+        'considered': len(articles),
+        'selected': len(kept),
+        'estimated_tokens': int(scores['tokens'].to_numpy()[kept].sum()),
+        'dropped': dropped,
+        'config': config.to_dict(),
+    }
+
+
+def select_top_k(articles: List[Dict], config: RankingConfig,
+                 delivered_titles: Iterable[str] = ()) -> Tuple[List[Dict], Dict]:
+    """
+    Keep the best-scoring articles (see top_k_indices).
+
+    Returns:
+        (kept articles in their original (digest) order, each with its 'relevance_score', report)
+    """
+    kept, score, report = top_k_indices(articles, config, delivered_titles)
+    return [{**articles[i], 'relevance_score': round(float(score[i]), 4)} for i in kept], report
@@ -0,0 +1,86 @@
+"""Request rate limiter shared by threaded and asyncio LLM calls."""
+
+import asyncio
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+class RateLimiter:
+    def __init__(self, requests_per_minute: float = 30, burst: int = None):
+        """Initialize a token-bucket rate limiter.
+
+        Args:
+            requests_per_minute: Sustained request rate allowed; 0 disables pacing, so only
+                penalize() (a server's Retry-After) holds callers back
+            burst: Maximum number of requests that may start back to back
+                (defaults to one minute's worth of requests)
+        """
+        self.requests_per_minute = requests_per_minute
+        self.enabled = requests_per_minute > 0
+        self.rate = max(requests_per_minute, 0.001) / 60.0
+        self.capacity = burst or max(1, int(requests_per_minute))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Reserve one request slot and return how long the caller must wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            if not self.enabled:
+                return max(self._blocked_until - now, 0.0)
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._blocked_until - now, 0.0)
+
+    def acquire(self) -> float:
+        """Block the calling thread until a request may be sent.
+
+        Returns:
+            Seconds spent waiting
+        """
+        wait = self._reserve()
+        if wait > 0:
+            logger.info(f"Rate limiter delaying request by {wait:.2f}s")
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        """Wait (without blocking the event loop) until a request may be sent.
+
+        Returns:
+            Seconds spent waiting
+        """
+        wait = self._reserve()
+        if wait > 0:
+            logger.info(f"Rate limiter delaying request by {wait:.2f}s")
+            await asyncio.sleep(wait)
+        return wait
+
+    def penalize(self, seconds: float):
+        """Hold back all callers for the given time, e.g. after a 429 with Retry-After."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + max(seconds, 0.0))
+
+    def is_saturated(self) -> bool:
+        """Return True if the next request would have to wait."""
+        with self._lock:
+            now = time.monotonic()
+            if self._blocked_until > now:
+                return True
+            tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            return self.enabled and tokens < 1
+
+
+class RateLimitExhausted(Exception):
+    """Raised when a model is still rate limited (HTTP 429) after all retries."""
+
+    def __init__(self, model: str, retry_after: float = 0.0):
+        super().__init__(f"Groq model {model} is rate limited (retry after {retry_after:.1f}s)")
+        self.model = model
+        self.retry_after = retry_after
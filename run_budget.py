@@ -0,0 +1,120 @@
+"""
+Wall-clock budget for one pipeline run.
+
+The budget is split into stage deadlines: sources must be fetched within the first
+share of the budget, summaries within the next share, and the digest gets the rest.
+Work that would overrun its stage deadline is skipped or abandoned (the caller falls
+back to a cheaper path), and every dropped source or degraded stage is recorded so
+the run can report what it gave up to deliver on time.
+"""
+import os
+import time
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from llm_metrics import in_current_context
+
+logger = logging.getLogger(__name__)
+
+
+class RunBudget:
+    def __init__(self, seconds: Optional[float] = None, fetch_share: float = 0.5, summary_share: float = 0.3):
+        """
+        Initialize the budget.
+
+        Args:
+            seconds: Total wall-clock budget for the run; None disables all deadlines
+            fetch_share: Share of the budget by which source fetching must finish
+            summary_share: Share of the budget available to summarization after fetching
+        """
+        self.seconds = seconds
+        self.fetch_share = fetch_share
+        self.summary_share = summary_share
+        self.started = time.monotonic()
+        self.dropped: List[Dict] = []
+        self.degraded: List[Dict] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, seconds: Optional[float]) -> 'RunBudget':
+        """Build a budget with stage shares from PIPELINE_FETCH_SHARE and PIPELINE_SUMMARY_SHARE."""
+        return cls(
+            seconds,
+            fetch_share=float(os.getenv('PIPELINE_FETCH_SHARE', '0.5')),
+            summary_share=float(os.getenv('PIPELINE_SUMMARY_SHARE', '0.3')),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.seconds is not None
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def time_left(self, stage: str = 'digest') -> float:
+        """Seconds until the stage's deadline (infinite when the budget is disabled)."""
+        if not self.enabled:
+            return float('inf')
+        shares = {
+            'fetch': self.fetch_share,
+            'summaries': self.fetch_share + self.summary_share,
+            'digest': 1.0,
+        }
+        return self.seconds * shares[stage] - self.elapsed()
+
+    def run(self, stage: str, func: Callable, *args, **kwargs) -> Tuple[bool, object]:
+        """
+        Run func, abandoning it if it does not finish before the stage's deadline.
+
+        An abandoned call keeps running on its daemon thread but its result is ignored.
+        Exceptions raised by func are re-raised.
+
+        Returns:
+            (finished, result); result is None when the call was abandoned or not started
+        """
+        if not self.enabled:
+            return True, func(*args, **kwargs)
+        timeout = self.time_left(stage)
+        if timeout <= 0:
+            return False, None
+
+        outcome = {}
+
+        def target():
+            try:
+                outcome['result'] = func(*args, **kwargs)
+            except BaseException as e:  # re-raised on the caller's thread
+                outcome['error'] = e
+
+        thread = threading.Thread(target=in_current_context(target), name=f"run-budget-{stage}", daemon=True)
+        thread.start()
+        thread.join(timeout)
+        if thread.is_alive():
+            return False, None
+        if 'error' in outcome:
+            raise outcome['error']
+        return True, outcome['result']
+
+    def drop(self, family: str, source: str, reason: str):
+        """Record a source that was skipped or abandoned."""
+        logger.warning(f"Run budget: dropped {family} source {source} ({reason})")
+        with self._lock:
+            self.dropped.append({'family': family, 'source': source, 'reason': reason, 'at': round(self.elapsed(), 2)})
+
+    def degrade(self, stage: str, mode: str, reason: str):
+        """Record a stage that switched to a cheaper path."""
+        logger.warning(f"Run budget: {stage} degraded to {mode} ({reason})")
+        with self._lock:
+            self.degraded.append({'stage': stage, 'mode': mode, 'reason': reason, 'at': round(self.elapsed(), 2)})
+
+    def report(self) -> Dict:
+        """What the run dropped or degraded, with its timing."""
+        with self._lock:
+            return {
+                'budget_seconds': self.seconds,
+                'elapsed_seconds': round(self.elapsed(), 2),
+                'over_budget': self.enabled and self.elapsed() > self.seconds,
+                'dropped': list(self.dropped),
+                'degraded': list(self.degraded),
+            }
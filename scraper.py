@@ -7,6 +7,7 @@ from typing import List, Dict, Optional, Tuple
 import logging
 from datetime import datetime
 from local_cache import LocalCache
+from tracing import traced
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -28,6 +29,7 @@ class WebScraper:
         })
         self.cache = LocalCache(ttl_minutes=cache_ttl_minutes)
     
+    @traced('scraper.scrape_url', arg='source')
     def scrape_url(self, url: str, force_fresh: bool = False) -> Dict[str, str]:
         """
         Scrape content from a single URL with caching support.
@@ -135,9 +137,11 @@ class WebScraper:
                 'title': 'Error',
                 'content': content,
                 'word_count': 0,
-                'scraped_at': time.strftime('%Y-%m-%d %H:%M:%S')
+                'scraped_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'fallback_content': True
             }
     
+    @traced('scraper.scrape_rss_feed', arg='source')
     def scrape_rss_feed(self, rss_url: str, max_items: int = 10, force_fresh: bool = True) -> List[Dict[str, str]]:
         """
         Scrape content from an RSS feed.
@@ -188,6 +192,7 @@ class WebScraper:
             logger.error(f"Error scraping RSS feed {rss_url}: {str(e)}")
             return []
     
+    @traced('scraper.scrape_multiple_urls')
     def scrape_multiple_urls(self, urls: List[str], force_fresh: bool = True) -> List[Dict[str, str]]:
         """
         Scrape content from multiple URLs with caching support.
@@ -0,0 +1,127 @@
+"""Measure peak and retained memory of a multi-tenant batch run.
+
+Usage:
+    python scripts/bench_article_memory.py [--users 10] [--feeds 15] [--items 10] [--videos 50] [--snippets 1500]
+
+Runs process_batch offline (no LLM, no network) over feeds of web articles and
+YouTube videos whose transcripts are built the way YouTubeTranscriptProcessor
+builds them, and reports tracemalloc's peak during the run and what the
+results still hold afterwards. Modes:
+
+- "objects, kept": transcripts as a list of snippet objects, and summarized
+  articles keep their transcripts and full content (the previous behavior).
+- "arrays, kept": transcripts packed into TranscriptSnippets.
+- "arrays, released": TranscriptSnippets plus releasing heavy fields once
+  summarized (the default).
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from youtube_transcript_api import FetchedTranscriptSnippet  # noqa: E402
+from youtube_transcript_api.formatters import TextFormatter  # noqa: E402
+
+from content_pipeline import ContentPipeline  # noqa: E402
+from local_storage import local_storage  # noqa: E402
+from transcript_store import TranscriptSnippets  # noqa: E402
+
+WORDS = ("model inference latency throughput cluster training dataset benchmark accuracy "
+         "compiler kernel memory bandwidth scheduler token context pricing release").split()
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+class FakeSources:
+    """Feeds and videos generated on fetch, so their memory is allocated inside the traced run."""
+
+    def __init__(self, items: int, snippets: int, packed: bool):
+        self.items = items
+        self.snippets = snippets
+        self.packed = packed
+
+    def scrape_rss_feed(self, rss_url, max_items=10, force_fresh=True):
+        rng = random.Random(rss_url)
+        return [{'title': f"{rss_url.rsplit('/', 1)[-1]} story {n}", 'url': f"{rss_url}/{n}",
+                 'content': " ".join(sentence(rng, 14) for _ in range(80)),
+                 'scraped_at': '2026-10-19T08:00:00'} for n in range(min(max_items, self.items))]
+
+    def process_youtube_urls(self, urls):
+        articles = []
+        for url in urls:
+            rng = random.Random(url)
+            fetched = [FetchedTranscriptSnippet(text=sentence(rng, 8)[:-1], start=i * 2.5, duration=2.5)
+                       for i in range(self.snippets)]
+            if self.packed:
+                snippets = TranscriptSnippets(fetched)
+                content = snippets.text
+            else:
+                snippets, content = list(fetched), TextFormatter().format_transcript(fetched)
+            articles.append({'url': url, 'title': f"Video {url.rsplit('=', 1)[-1]}",
+                             'content': content, 'source': 'youtube',
+                             'raw_transcript': snippets, 'snippet_count': len(snippets),
+                             'duration': self.snippets * 2.5})
+        return articles
+
+
+def make_jobs(users: int, feeds: int, videos: int):
+    rng = random.Random(7)
+    feed_urls = [f"https://feeds.example.com/feed{f}" for f in range(feeds)]
+    video_urls = [f"https://www.youtube.com/watch?v=vid{v:04d}" for v in range(videos)]
+    return [{'user_id': f"user{u}", 'email': f"user{u}@example.com", 'title': "Daily",
+             'rss_urls': rng.sample(feed_urls, max(1, feeds * 2 // 3)),
+             'youtube_urls': rng.sample(video_urls, max(1, videos * 2 // 3))} for u in range(users)]
+
+
+def run(mode: str, args, jobs, tmpdir: str):
+    packed, release = {"objects, kept": (False, False), "arrays, kept": (True, False),
+                       "arrays, released": (True, True)}[mode]
+    os.environ['GROQ_SUMMARY_CACHE_FILE'] = os.path.join(tmpdir, f'cache_{time.time_ns()}.json')
+    os.environ['DELIVERY_HISTORY_DAYS'] = '30'
+    pipeline = ContentPipeline(groq_api_key='bench', resend_api_key='bench')
+    pipeline.release_heavy_fields = release
+    sources = FakeSources(args.items, args.snippets, packed)
+    pipeline.scraper.scrape_rss_feed = sources.scrape_rss_feed
+    pipeline.youtube_processor.process_youtube_urls = sources.process_youtube_urls
+    pipeline.email_sender.send_content_digest = lambda **kwargs: {'id': 'bench'}
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    results = pipeline.process_batch(jobs, max_rss_items=args.items, offline=True, template_digest=True)
+    elapsed = time.perf_counter() - started
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert results['success'], results.get('error')
+    return peak, retained, elapsed, results['shared']['articles']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--feeds', type=int, default=15)
+    parser.add_argument('--items', type=int, default=10)
+    parser.add_argument('--videos', type=int, default=50)
+    parser.add_argument('--snippets', type=int, default=1500)
+    args = parser.parse_args()
+
+    jobs = make_jobs(args.users, args.feeds, args.videos)
+    print(f"{args.users} users, {args.feeds} feeds x {args.items} items, {args.videos} videos x "
+          f"{args.snippets} transcript snippets")
+    print(f"{'mode':<20}{'articles':>10}{'peak MB':>10}{'retained MB':>13}{'seconds':>9}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # Deliveries are recorded per run; keep each mode's history separate
+        for mode in ("objects, kept", "arrays, kept", "arrays, released"):
+            local_storage.delivery_history_file = os.path.join(tmpdir, f'history_{time.time_ns()}.json')
+            peak, retained, elapsed, articles = run(mode, args, jobs, tmpdir)
+            print(f"{mode:<20}{articles:>10}{peak / 2**20:>10.1f}{retained / 2**20:>13.1f}{elapsed:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
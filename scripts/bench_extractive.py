@@ -0,0 +1,124 @@
+"""Benchmark extractive pre-compression of article text.
+
+Usage:
+    python scripts/bench_extractive.py [--articles 20] [--budget 500] [--prompt-tokens-per-second 1500]
+
+Builds synthetic scraped articles (cookie banner and navigation residue, a long
+body, a footer) and compares the raw prefix the summary prompt used to send with
+extractive.compress_text: prompt tokens, share of prompt text that is article
+body, share of the body's sentences covered, and local compression time. It then
+summarizes the same articles against the local Groq stand-in server (which
+charges prompt processing time per token) with pre-compression off and on.
+No network access or API key is needed.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from extractive import compress_text, estimate_tokens, split_sentences  # noqa: E402
+from groq_processor import GroqContentProcessor  # noqa: E402
+from groq_standin_server import GroqStandinServer, StandinConfig  # noqa: E402
+
+BOILERPLATE = [
+    "We use cookies to improve your experience. By continuing you accept all cookies.",
+    "Accept all cookies. Manage preferences. Privacy policy.",
+    "Skip to main content",
+    "Home News Tech Science Business Opinion Video",
+    "Sign up for our newsletter to get the latest stories delivered to your inbox every morning.",
+    "Subscribe now and save 50% on your first year of unlimited access.",
+    "Share this article on Twitter Facebook LinkedIn",
+]
+FOOTER = [
+    "Related articles: More from this author.",
+    "Follow us on social media for daily updates.",
+    "Copyright 2024 Example Media. All rights reserved.",
+    "Terms of use | Privacy policy | Cookie settings",
+]
+SUBJECTS = "The company|Researchers|The new model|Engineers|Regulators|The startup|Analysts|The team".split("|")
+VERBS = "announced|measured|released|reported|criticized|benchmarked|deployed|funded".split("|")
+OBJECTS = ("a faster inference chip|an open source dataset|latency improvements of 40 percent|"
+           "a safety evaluation suite|a new training method|a cloud partnership|record quarterly revenue|"
+           "an agent framework for developers").split("|")
+
+
+def make_article(i: int, rng: random.Random, body_sentences: int = 60):
+    body = [f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)} "
+            f"according to source {rng.randint(1, 99)} in report {i}-{n}." for n in range(body_sentences)]
+    content = "\n".join(BOILERPLATE) + "\n" + " ".join(body) + "\n" + "\n".join(FOOTER)
+    return {'title': f"Article {i}", 'url': f"https://example.com/{i}", 'content': content}, body
+
+
+def prompt_stats(text: str, body):
+    sentences = split_sentences(text)
+    body_set = set(body)
+    body_chars = sum(len(s) for s in sentences if s in body_set)
+    covered = len(body_set.intersection(sentences))
+    return estimate_tokens(text), body_chars / max(len(text), 1), covered / len(body)
+
+
+def end_to_end(articles, precompress: bool, budget: int, pps: float, cache_dir: str):
+    server = GroqStandinServer(config=StandinConfig(latency_ms=50, prompt_tokens_per_second=pps)).start()
+    try:
+        os.environ['GROQ_BASE_URL'] = server.base_url
+        os.environ['GROQ_SUMMARY_CACHE_FILE'] = os.path.join(cache_dir, f'cache_{precompress}.json')
+        processor = GroqContentProcessor(api_key='standin')
+        processor.client = None
+        processor.precompress = precompress
+        processor.precompress_token_budget = budget
+        started = time.perf_counter()
+        processor.process_multiple_articles(articles, packed=False)
+        return time.perf_counter() - started, server.stats['prompt_tokens']
+    finally:
+        server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--articles', type=int, default=20)
+    parser.add_argument('--budget', type=int, default=500)
+    parser.add_argument('--method', choices=['textrank', 'tfidf'], default='textrank')
+    parser.add_argument('--prompt-tokens-per-second', type=float, default=1500)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    samples = [make_article(i, rng) for i in range(1, args.articles + 1)]
+    articles = [a for a, _ in samples]
+
+    totals = {"raw": [0, 0.0, 0.0, 0.0], "compressed": [0, 0.0, 0.0, 0.0]}
+    for article, body in samples:
+        started = time.perf_counter()
+        raw = article['content'][:3000]
+        raw_time = time.perf_counter() - started
+        started = time.perf_counter()
+        compressed = compress_text(article['content'], args.budget, args.method)
+        compress_time = time.perf_counter() - started
+        for label, text, elapsed in (("raw", raw, raw_time), ("compressed", compressed, compress_time)):
+            tokens, body_share, coverage = prompt_stats(text, body)
+            row = totals[label]
+            row[0] += tokens
+            row[1] += body_share
+            row[2] += coverage
+            row[3] += elapsed
+
+    n = len(samples)
+    print(f"{n} articles, budget {args.budget} tokens, method {args.method}")
+    print(f"{'content':<12}{'tokens':>10}{'body share':>12}{'coverage':>10}{'ms/article':>12}")
+    for label, (tokens, body_share, coverage, elapsed) in totals.items():
+        print(f"{label:<12}{tokens:>10}{body_share / n:>12.0%}{coverage / n:>10.0%}{elapsed / n * 1000:>12.2f}")
+
+    print(f"\nEnd to end against the stand-in ({args.prompt_tokens_per_second:.0f} prompt tokens/s):")
+    print(f"{'precompress':<12}{'seconds':>10}{'prompt tok':>12}")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for precompress in (False, True):
+            elapsed, prompt_tokens = end_to_end(articles, precompress, args.budget, args.prompt_tokens_per_second, cache_dir)
+            print(f"{str(precompress).lower():<12}{elapsed:>10.2f}{prompt_tokens:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Benchmark packed vs. unpacked article summarization.
+
+Usage:
+    python scripts/bench_packed_summaries.py [--articles 25] [--budget 3000]
+
+Runs GroqContentProcessor.process_multiple_articles over a synthetic RSS-style
+digest twice (unpacked and packed) against an offline stand-in for the LLM
+call, and reports the number of requests and estimated tokens per digest.
+No network access or API key is needed.
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from groq_processor import GroqContentProcessor  # noqa: E402
+
+WORDS = ("model release benchmark latency research open source dataset inference "
+         "training startup funding chip cloud agent policy safety evaluation").split()
+
+
+class CountingProcessor(GroqContentProcessor):
+    """Processor whose LLM call is replaced by a deterministic offline responder."""
+
+    def __init__(self):
+        super().__init__(api_key="offline-benchmark")
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def _chat_completion(self, user_prompt, system_prompt="", temperature=0.3, max_tokens=800):
+        self.requests += 1
+        self.prompt_tokens += self._estimate_tokens(system_prompt) + self._estimate_tokens(user_prompt)
+        numbers = re.findall(r"### Article (\d+)", user_prompt)
+        if numbers and "Return ONLY a JSON object" in user_prompt:
+            response = json.dumps({n: f"Summary of article {n}. " + " ".join(WORDS[:12]) for n in numbers})
+        else:
+            response = "Summary. " + " ".join(WORDS * 6)
+        self.completion_tokens += self._estimate_tokens(response)
+        return response
+
+
+def make_articles(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    articles = []
+    for i in range(count):
+        # Mostly short RSS items with the occasional long article
+        length = rng.choice([60, 90, 120, 150, 200]) if rng.random() < 0.8 else rng.choice([600, 900])
+        content = " ".join(rng.choice(WORDS) for _ in range(length))
+        articles.append({
+            'title': f"Article {i + 1}",
+            'url': f"https://example.com/news/{i + 1}",
+            'content': content,
+        })
+    return articles
+
+
+def run(packed: bool, articles, budget: int):
+    processor = CountingProcessor()
+    processor.pack_token_budget = budget
+    processor.process_multiple_articles(articles, packed=packed)
+    return processor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--articles', type=int, default=25)
+    parser.add_argument('--budget', type=int, default=3000)
+    args = parser.parse_args()
+
+    articles = make_articles(args.articles)
+    print(f"{args.articles} articles, pack token budget {args.budget}")
+    print(f"{'mode':<10}{'requests':>10}{'prompt tok':>12}{'compl tok':>12}{'total tok':>12}")
+    for label, packed in (("unpacked", False), ("packed", True)):
+        p = run(packed, articles, args.budget)
+        total = p.prompt_tokens + p.completion_tokens
+        print(f"{label:<10}{p.requests:>10}{p.prompt_tokens:>12}{p.completion_tokens:>12}{total:>12}")
+
+
+if __name__ == "__main__":
+    main()
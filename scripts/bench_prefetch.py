@@ -0,0 +1,111 @@
+"""Measure scheduled-delivery lateness with and without a prefetch phase.
+
+Usage:
+    python scripts/bench_prefetch.py [--feeds 4] [--items 5] [--fetch-ms 400] [--new-items 1] [--latency-ms 300]
+
+Runs the mixed pipeline against the local Groq stand-in server with RSS feeds
+whose page fetches take --fetch-ms each. "at delivery" starts the whole run at
+the delivery minute (the previous scheduling). "prefetched" runs
+prefetch_sources first, adds --new-items fresh items per feed, and then runs
+the delivery as a top-up. Lateness is how long after the scheduled time the
+email goes out. Emails are not sent, and no network access or API key is needed.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from content_pipeline import ContentPipeline  # noqa: E402
+from groq_standin_server import GroqStandinServer, StandinConfig  # noqa: E402
+from bench_packed_summaries import make_articles  # noqa: E402
+
+
+class SlowFeeds:
+    """RSS stand-in: every item not yet in the scrape cache costs one page fetch."""
+
+    def __init__(self, feeds: int, items: int, fetch_seconds: float):
+        self.fetch_seconds = fetch_seconds
+        self.items = {f"https://feeds.example.com/{f}": make_articles(items, seed=f) for f in range(feeds)}
+        for feed, articles in self.items.items():
+            for article in articles:
+                article['url'] = f"{feed}/{article['title'].replace(' ', '-').lower()}"
+        self.cache = {}
+
+    def add_items(self, count: int):
+        for feed, articles in self.items.items():
+            for article in make_articles(count, seed=len(articles) + 100):
+                article['title'] = f"Fresh {article['title']}"
+                article['url'] = f"{feed}/fresh-{len(articles)}"
+                articles.insert(0, article)
+
+    def scrape_rss_feed(self, rss_url, max_items=10, force_fresh=True):
+        articles = []
+        for article in self.items[rss_url][:max_items]:
+            if force_fresh or article['url'] not in self.cache:
+                time.sleep(self.fetch_seconds)
+                self.cache[article['url']] = dict(article)
+            articles.append(dict(self.cache[article['url']]))
+        return articles
+
+
+def make_pipeline(server, cache_dir, feeds):
+    os.environ['GROQ_BASE_URL'] = server.base_url
+    os.environ['GROQ_SUMMARY_CACHE_FILE'] = os.path.join(cache_dir, f'cache_{time.time_ns()}.json')
+    pipeline = ContentPipeline(groq_api_key='standin', resend_api_key='bench')
+    pipeline.processor.client = None
+    pipeline.scraper.scrape_rss_feed = feeds.scrape_rss_feed
+    pipeline.email_sender.send_content_digest = lambda **kwargs: {'id': 'bench'}
+    return pipeline
+
+
+def deliver(pipeline, feed_urls, items, prefetched=None):
+    return pipeline.process_mixed_sources(
+        rss_urls=feed_urls, max_rss_items=items, email_recipients=['bench@example.com'],
+        digest_title="Bench", template_digest=True, prefetched=prefetched, deliver_at=datetime.now()
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--feeds', type=int, default=4)
+    parser.add_argument('--items', type=int, default=5)
+    parser.add_argument('--fetch-ms', type=float, default=400)
+    parser.add_argument('--new-items', type=int, default=1)
+    parser.add_argument('--latency-ms', type=float, default=300)
+    args = parser.parse_args()
+
+    config = StandinConfig(latency_ms=args.latency_ms, latency_jitter_ms=args.latency_ms / 3,
+                           latency_dist='lognormal', tokens_per_second=800)
+    print(f"{args.feeds} feeds x {args.items} items, page fetch {args.fetch_ms:.0f}ms, "
+          f"LLM latency ~{args.latency_ms:.0f}ms, {args.new_items} new item(s) per feed at delivery")
+    print(f"{'mode':<14}{'lateness s':>12}{'summarized':>12}{'prefetch s':>12}")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for label in ("at delivery", "prefetched"):
+            server = GroqStandinServer(config=config).start()
+            try:
+                feeds = SlowFeeds(args.feeds, args.items, args.fetch_ms / 1000)
+                feed_urls = list(feeds.items)
+                pipeline = make_pipeline(server, cache_dir, feeds)
+                prefetched = None
+                prefetch_seconds = 0.0
+                if label == "prefetched":
+                    started = time.perf_counter()
+                    prefetched = pipeline.prefetch_sources(rss_urls=feed_urls, max_rss_items=args.items,
+                                                           template_digest=True)
+                    prefetch_seconds = time.perf_counter() - started
+                feeds.add_items(args.new_items)
+                results = deliver(pipeline, feed_urls, args.items, prefetched)
+                summarized = len(results['articles']) - results['prefetched']
+                print(f"{label:<14}{results['delivery_lateness_seconds']:>12.2f}{summarized:>12}"
+                      f"{prefetch_seconds:>12.2f}")
+            finally:
+                server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Benchmark source-line post-processing of large digests.
+
+Usage:
+    python scripts/bench_source_lines.py [--articles 2000] [--repeat 5]
+
+Builds a synthetic digest with '### Article N: ' sections whose source lines are
+repeated, suffixed with a channel name or malformed (as LLM drafts often are),
+and times GroqContentProcessor._normalize_source_lines (a single-pass line state
+machine) against the previous regex implementation, kept here as
+legacy_normalize_source_lines. Both outputs are checked to be identical.
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from groq_processor import GroqContentProcessor  # noqa: E402
+
+
+def legacy_normalize_source_lines(text: str) -> str:
+    """Previous implementation of GroqContentProcessor._normalize_source_lines (reference)."""
+    try:
+        normalized = text.replace('\r\n', '\n')
+
+        article_block_re = re.compile(r"(### Article \d+: .*?)(?=\n### Article \d+: |\Z)", flags=re.DOTALL)
+
+        def _dedupe_block(m: re.Match) -> str:
+            block = m.group(1)
+            source_pattern = re.compile(r"\*Source:\s*\[([^\]]+)\]\(([^\)]+)\)(?:\s*-\s*[^\n\*]+)?\*")
+            matches = source_pattern.findall(block)
+
+            if not matches:
+                if "*Source:" not in block:
+                    return block
+                block_without_sources = re.sub(r"\n?\*Source: [^\n]+\*\n?", "\n", block)
+                return block_without_sources
+
+            url_to_title = {}
+            url_order = []
+            for title, url in matches:
+                if url not in url_to_title:
+                    url_to_title[url] = title
+                    url_order.append(url)
+
+            block_without_sources = re.sub(r"\n?\*Source: [^\n]+\*\n?", "\n", block)
+            block_without_sources = block_without_sources.rstrip('\n') + '\n\n'
+
+            appended_lines = []
+            for url in url_order:
+                title = url_to_title[url]
+                appended_lines.append(f"*Source: [{title}]({url})*")
+                break
+
+            block_fixed = block_without_sources + "\n".join(appended_lines) + "\n\n"
+            return block_fixed
+
+        normalized = article_block_re.sub(_dedupe_block, normalized)
+
+        pattern2 = re.compile(r"(\*Source: .+?\*\n)(?:\1)+", flags=re.M)
+        normalized = pattern2.sub(lambda m: m.group(1), normalized)
+
+        lines = normalized.split('\n')
+        result_lines = []
+        i = 0
+        while i < len(lines):
+            line = lines[i]
+            if line.strip().startswith('*Source:') and line.strip().endswith('*'):
+                if i + 1 < len(lines) and lines[i + 1].strip() == line.strip():
+                    i += 1
+                    continue
+            result_lines.append(line)
+            i += 1
+
+        normalized = '\n'.join(result_lines)
+
+        if '\r\n' in text:
+            normalized = normalized.replace('\n', '\r\n')
+
+        return normalized
+    except Exception:
+        return text
+
+
+def build_digest(articles: int, seed: int = 7) -> str:
+    """Synthetic LLM digest with duplicated and malformed source lines."""
+    rng = random.Random(seed)
+    lines = ["# Daily Digest", "", "*Generated on 2024-01-01 at 08:00:00*", "", "## Overview",
+             "Today's stories cover models, chips and tooling.", ""]
+    for n in range(1, articles + 1):
+        source = f"*Source: [Story {n}](https://example.com/story/{n})*"
+        lines.extend([f"### Article {n}: Story {n}", ""])
+        lines.extend(f"Paragraph {p} about story {n} with **bold** and *emphasis* text." for p in range(rng.randint(2, 5)))
+        lines.append("")
+        kind = rng.random()
+        if kind < 0.4:
+            lines.extend([source] * rng.randint(2, 4))
+        elif kind < 0.6:
+            lines.extend([f"*Source: [Story {n}](https://example.com/story/{n}) - Example Channel*", source])
+        elif kind < 0.7:
+            lines.append("*Source: Example Blog*")
+        else:
+            lines.append(source)
+        lines.append("")
+    lines.extend(["## Closing", "That's all for today."])
+    return "\n".join(lines)
+
+
+def _best_of(func, text: str, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(text)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--articles', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    processor = GroqContentProcessor(api_key='bench-key')
+    digest = build_digest(args.articles)
+    assert processor._normalize_source_lines(digest) == legacy_normalize_source_lines(digest)
+
+    legacy = _best_of(legacy_normalize_source_lines, digest, args.repeat)
+    current = _best_of(processor._normalize_source_lines, digest, args.repeat)
+    print(f"Digest: {args.articles} articles, {len(digest) / 1024:.0f} KiB, {digest.count(chr(10)) + 1} lines")
+    print(f"{'implementation':<16}{'best of ' + str(args.repeat):>14}")
+    print(f"{'legacy regex':<16}{legacy * 1000:>11.1f} ms")
+    print(f"{'line scan':<16}{current * 1000:>11.1f} ms")
+    print(f"Speedup: {legacy / current:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Load-test GroqContentProcessor against the local Groq stand-in server.
+
+Usage:
+    python scripts/bench_standin_load.py [--articles 40] [--latency-ms 300] [--rate-limit 60] [--rate-window 60]
+
+Starts scripts/groq_standin_server.py in-process and summarizes a synthetic
+article set sequentially, packed and with the async API, then runs a
+hierarchical digest. Reports wall time, requests sent and 429s per mode.
+No network access or API key is needed.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from groq_processor import GroqContentProcessor  # noqa: E402
+from groq_standin_server import GroqStandinServer, StandinConfig  # noqa: E402
+from bench_packed_summaries import make_articles  # noqa: E402
+
+
+def make_processor(server, cache_dir, concurrency):
+    os.environ['GROQ_BASE_URL'] = server.base_url
+    os.environ['GROQ_SUMMARY_CACHE_FILE'] = os.path.join(cache_dir, f'cache_{time.time_ns()}.json')
+    os.environ['GROQ_MAX_CONCURRENCY'] = str(concurrency)
+    processor = GroqContentProcessor(api_key='standin')
+    processor.client = None
+    return processor
+
+
+async def run_async(processor, articles):
+    try:
+        return await processor.aprocess_multiple_articles(articles)
+    finally:
+        await processor.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--articles', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--latency-ms', type=float, default=300)
+    parser.add_argument('--latency-jitter-ms', type=float, default=100)
+    parser.add_argument('--tokens-per-second', type=float, default=800)
+    parser.add_argument('--rate-limit', type=int, default=60)
+    parser.add_argument('--rate-window', type=float, default=60)
+    args = parser.parse_args()
+
+    config = StandinConfig(latency_ms=args.latency_ms, latency_jitter_ms=args.latency_jitter_ms,
+                           latency_dist='lognormal', tokens_per_second=args.tokens_per_second,
+                           rate_limit=args.rate_limit, rate_window=args.rate_window)
+    articles = make_articles(args.articles)
+    digest_articles = [dict(a, summary=a['content'][:400]) for a in articles]
+
+    modes = (
+        ("sequential", lambda p: p.process_multiple_articles(articles, packed=False)),
+        ("packed", lambda p: p.process_multiple_articles(articles, packed=True)),
+        ("async", lambda p: asyncio.run(run_async(p, articles))),
+        ("digest", lambda p: p.create_digest(digest_articles, "Bench", hierarchical=True)),
+    )
+
+    print(f"{args.articles} articles, latency ~{args.latency_ms:.0f}ms, "
+          f"rate limit {args.rate_limit}/{args.rate_window:.0f}s, concurrency {args.concurrency}")
+    print(f"{'mode':<12}{'seconds':>10}{'requests':>10}{'429s':>8}")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for label, run in modes:
+            server = GroqStandinServer(config=config).start()
+            try:
+                processor = make_processor(server, cache_dir, args.concurrency)
+                started = time.perf_counter()
+                run(processor)
+                elapsed = time.perf_counter() - started
+                stats = server.stats
+                print(f"{label:<12}{elapsed:>10.2f}{stats['requests']:>10}{stats['rate_limited']:>8}")
+            finally:
+                server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""Local Groq-compatible stand-in server for offline load testing.
+
+Usage:
+    python scripts/groq_standin_server.py [--port 8765] [--latency-ms 300] [--latency-dist lognormal]
+                                          [--tokens-per-second 400] [--rate-limit 30] [--context-tokens 8192]
+
+Then point the processor at it:
+    GROQ_BASE_URL=http://127.0.0.1:8765 GROQ_API_KEY=anything python app.py
+
+Serves POST /openai/v1/chat/completions in the OpenAI/Groq wire format, both
+plain JSON and server-sent-event streaming. Simulates:
+
+- request latency drawn from a fixed, uniform, normal or lognormal distribution
+- completion generation at a fixed tokens-per-second rate (and optional
+  prompt processing time proportional to prompt tokens)
+- 429 responses with Retry-After once a per-model requests-per-window limit is
+  exceeded (plus an optional random 429 rate)
+- 400 context_length_exceeded errors for prompts over the context window
+
+Outputs are deterministic for a given prompt and understand the processor's
+prompt formats: packed JSON summaries, structured summaries (headline, key_points,
+why_it_matters JSON), digest sections (one "### title" section and Source line per
+article) and the INTRO:/CLOSING: reduce step.
+GET /stats returns request counters.
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+COMPLETIONS_PATH = "/openai/v1/chat/completions"
+
+WORDS = ("model release benchmark latency research open source dataset inference "
+         "training startup funding chip cloud agent policy safety evaluation").split()
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate matching GroqContentProcessor._estimate_tokens."""
+    return len(text) // 4
+
+
+class StandinConfig:
+    def __init__(self, latency_ms: float = 0, latency_jitter_ms: float = 0, latency_dist: str = "fixed",
+                 tokens_per_second: float = 0, prompt_tokens_per_second: float = 0, rate_limit: int = 0, rate_window: float = 60,
+                 random_429_rate: float = 0, context_tokens: int = 8192, api_key: str = None, seed: int = 0):
+        """Behaviour of the stand-in server.
+
+        Args:
+            latency_ms: Mean time to first byte in milliseconds
+            latency_jitter_ms: Spread of the latency distribution (uniform half-width or std deviation)
+            latency_dist: One of fixed, uniform, normal or lognormal
+            tokens_per_second: Completion generation speed; 0 returns the whole completion at once
+            prompt_tokens_per_second: Prompt processing speed added to time to first byte; 0 disables
+            rate_limit: Requests allowed per rate_window seconds; 0 disables rate limiting
+            rate_window: Length of the rate limit window in seconds
+            random_429_rate: Probability of answering any request with a 429
+            context_tokens: Maximum prompt plus completion tokens before answering 400
+            api_key: If set, requests with a different bearer token get a 401
+            seed: Seed for the latency and random-429 generator
+        """
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.latency_dist = latency_dist
+        self.tokens_per_second = tokens_per_second
+        self.prompt_tokens_per_second = prompt_tokens_per_second
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.random_429_rate = random_429_rate
+        self.context_tokens = context_tokens
+        self.api_key = api_key
+        self.seed = seed
+
+
+class GroqStandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), config: StandinConfig = None):
+        """Create the server; port 0 picks a free port (see base_url)."""
+        super().__init__(address, StandinRequestHandler)
+        self.config = config or StandinConfig()
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._recent = defaultdict(deque)
+        self.stats = {"requests": 0, "completed": 0, "streamed": 0, "rate_limited": 0,
+                      "context_exceeded": 0, "unauthorized": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "GroqStandinServer":
+        """Serve in a background thread (for tests and benchmarks)."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def count(self, key: str, amount: int = 1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def sample_latency(self) -> float:
+        """Draw one latency (seconds) from the configured distribution."""
+        c = self.config
+        with self._lock:
+            if c.latency_dist == "uniform":
+                ms = self._rng.uniform(c.latency_ms - c.latency_jitter_ms, c.latency_ms + c.latency_jitter_ms)
+            elif c.latency_dist == "normal":
+                ms = self._rng.gauss(c.latency_ms, c.latency_jitter_ms)
+            elif c.latency_dist == "lognormal" and c.latency_ms > 0:
+                # Parameterized so the distribution's mean is latency_ms with the given std deviation
+                variance = (c.latency_jitter_ms / c.latency_ms) ** 2
+                sigma = math.log1p(variance) ** 0.5
+                mu = math.log(c.latency_ms) - sigma ** 2 / 2
+                ms = self._rng.lognormvariate(mu, sigma)
+            else:
+                ms = c.latency_ms
+        return max(ms, 0.0) / 1000.0
+
+    def check_rate_limit(self, model: str) -> float:
+        """Admit a request, or return the Retry-After seconds if it must be rejected with a 429.
+
+        Like Groq, limits are tracked separately per model.
+        """
+        c = self.config
+        now = time.monotonic()
+        with self._lock:
+            if c.random_429_rate and self._rng.random() < c.random_429_rate:
+                return 1.0
+            if not c.rate_limit:
+                return 0.0
+            recent = self._recent[model]
+            while recent and now - recent[0] >= c.rate_window:
+                recent.popleft()
+            if len(recent) >= c.rate_limit:
+                return max(c.rate_window - (now - recent[0]), 0.001)
+            recent.append(now)
+            return 0.0
+
+
+def canned_completion(messages, max_tokens: int) -> str:
+    """Deterministic completion for a conversation, shaped like the processor expects."""
+    prompt = messages[-1].get("content", "") if messages else ""
+    digest = hashlib.sha1(prompt.encode("utf-8")).hexdigest()
+    rng = random.Random(digest)
+
+    def sentence(n=12):
+        return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+    if '"headline"' in prompt and '"key_points"' in prompt:
+        return json.dumps({"headline": sentence(8)[:-1], "key_points": [sentence() for _ in range(3)],
+                           "why_it_matters": sentence()})
+
+    if "Return ONLY a JSON object" in prompt:
+        numbers = re.findall(r"### Article (\d+)", prompt)
+        return json.dumps({n: f"{sentence()} {sentence()}" for n in numbers})
+
+    if "INTRO:" in prompt and "CLOSING:" in prompt:
+        return f"INTRO:\n## Today's Highlights\n{sentence()}\nCLOSING:\n{sentence()}"
+
+    articles = re.findall(r"Title: (.+)\nURL: (.+)\n", prompt)
+    if articles:
+        sections = [f"### {title}\n\n{sentence()} {sentence()}\n\n*Source: [{title}]({url})*"
+                    for title, url in articles]
+        text = "\n\n".join(sections)
+    else:
+        text = " ".join(sentence() for _ in range(8))
+
+    # Respect max_tokens the way a real model would: cut the output off
+    limit = max_tokens * 4
+    return text if len(text) <= limit else text[:limit]
+
+
+class StandinRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):  # keep load tests quiet
+        pass
+
+    def _send_json(self, status: int, body: dict, headers: dict = None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status: int, message: str, error_type: str, code: str, headers: dict = None):
+        self._send_json(status, {"error": {"message": message, "type": error_type, "code": code}}, headers)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            with self.server._lock:
+                stats = dict(self.server.stats)
+            self._send_json(200, stats)
+        else:
+            self._send_error(404, "Not found", "invalid_request_error", "not_found")
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length)
+
+        if self.path.rstrip("/") != COMPLETIONS_PATH:
+            self._send_error(404, "Not found", "invalid_request_error", "not_found")
+            return
+        server.count("requests")
+
+        auth = self.headers.get("Authorization", "")
+        if not auth.startswith("Bearer ") or (server.config.api_key and auth[len("Bearer "):] != server.config.api_key):
+            server.count("unauthorized")
+            self._send_error(401, "Invalid API Key", "invalid_request_error", "invalid_api_key")
+            return
+
+        try:
+            payload = json.loads(raw or b"{}")
+        except ValueError:
+            self._send_error(400, "Request body is not valid JSON", "invalid_request_error", "invalid_json")
+            return
+
+        retry_after = server.check_rate_limit(payload.get("model", "standin"))
+        if retry_after:
+            server.count("rate_limited")
+            self._send_error(429, "Rate limit reached. Please try again later.", "tokens", "rate_limit_exceeded",
+                             headers={"Retry-After": f"{retry_after:.3f}"})
+            return
+
+        messages = payload.get("messages") or []
+        max_tokens = int(payload.get("max_tokens") or 1024)
+        prompt_tokens = sum(estimate_tokens(m.get("content") or "") for m in messages)
+        if prompt_tokens + max_tokens > server.config.context_tokens:
+            server.count("context_exceeded")
+            self._send_error(400, f"Please reduce the length of the messages or completion. Context window is "
+                             f"{server.config.context_tokens} tokens, requested {prompt_tokens + max_tokens}.",
+                             "invalid_request_error", "context_length_exceeded")
+            return
+
+        delay = server.sample_latency()
+        if server.config.prompt_tokens_per_second:
+            delay += prompt_tokens / server.config.prompt_tokens_per_second
+        time.sleep(delay)
+        text = canned_completion(messages, max_tokens)
+        completion_tokens = max(estimate_tokens(text), 1)
+        server.count("prompt_tokens", prompt_tokens)
+        server.count("completion_tokens", completion_tokens)
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+        model = payload.get("model", "standin")
+        completion_id = f"chatcmpl-{hashlib.sha1(raw).hexdigest()[:24]}"
+
+        if payload.get("stream"):
+            self._stream(completion_id, model, text, usage)
+        else:
+            tps = server.config.tokens_per_second
+            if tps:
+                time.sleep(completion_tokens / tps)
+            self._send_json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+        server.count("completed")
+
+    def _stream(self, completion_id: str, model: str, text: str, usage: dict):
+        """Write the completion as server-sent events, one ~token (4 chars) per chunk."""
+        self.server.count("streamed")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def event(delta: dict, finish_reason=None, extra: dict = None):
+            chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+            chunk.update(extra or {})
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        tps = self.server.config.tokens_per_second
+        event({"role": "assistant", "content": ""})
+        for i in range(0, len(text), 4):
+            if tps:
+                time.sleep(1.0 / tps)
+            event({"content": text[i:i + 4]})
+        event({}, finish_reason="stop", extra={"x_groq": {"usage": usage}})
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=300)
+    parser.add_argument('--latency-jitter-ms', type=float, default=100)
+    parser.add_argument('--latency-dist', choices=['fixed', 'uniform', 'normal', 'lognormal'], default='lognormal')
+    parser.add_argument('--tokens-per-second', type=float, default=400)
+    parser.add_argument('--prompt-tokens-per-second', type=float, default=0)
+    parser.add_argument('--rate-limit', type=int, default=30, help='requests per window (0 disables)')
+    parser.add_argument('--rate-window', type=float, default=60, help='rate limit window in seconds')
+    parser.add_argument('--random-429-rate', type=float, default=0.0)
+    parser.add_argument('--context-tokens', type=int, default=8192)
+    parser.add_argument('--api-key', default=None, help='only accept this bearer token')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    config = StandinConfig(
+        latency_ms=args.latency_ms, latency_jitter_ms=args.latency_jitter_ms, latency_dist=args.latency_dist,
+        tokens_per_second=args.tokens_per_second, prompt_tokens_per_second=args.prompt_tokens_per_second,
+        rate_limit=args.rate_limit, rate_window=args.rate_window,
+        random_429_rate=args.random_429_rate, context_tokens=args.context_tokens, api_key=args.api_key,
+        seed=args.seed,
+    )
+    server = GroqStandinServer((args.host, args.port), config)
+    print(f"Groq stand-in listening on {server.base_url} (set GROQ_BASE_URL to this)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Bounded-queue stage runner for streaming pipeline runs.
+
+Each stage has its own worker threads and reads from a bounded input queue, so a slow
+stage blocks its producers (backpressure) instead of buffering everything, and the
+next stage starts as soon as the first item is ready. Per-stage metrics record items
+in and out, time spent working, waiting for input and blocked on a full output queue.
+"""
+import time
+import queue
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+from llm_metrics import in_current_context
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class StageMetrics:
+    def __init__(self, name: str, workers: int, queue_size: int):
+        self.name = name
+        self.workers = workers
+        self.queue_size = queue_size
+        self.items_in = 0
+        self.items_out = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.idle_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self.max_queue_depth = 0
+        self.first_output_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def add(self, **deltas):
+        with self._lock:
+            for field, delta in deltas.items():
+                setattr(self, field, getattr(self, field) + delta)
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'queue_size': self.queue_size,
+                'items_in': self.items_in,
+                'items_out': self.items_out,
+                'errors': self.errors,
+                'busy_seconds': round(self.busy_seconds, 3),
+                'idle_seconds': round(self.idle_seconds, 3),
+                'blocked_seconds': round(self.blocked_seconds, 3),
+                'max_queue_depth': self.max_queue_depth,
+                'first_output_at': None if self.first_output_at is None else round(self.first_output_at, 3),
+                'finished_at': None if self.finished_at is None else round(self.finished_at, 3),
+            }
+
+
+class Stage:
+    def __init__(self, name: str, func: Callable[[object], Iterable], workers: int = 1, queue_size: int = 8):
+        """
+        Describe one pipeline stage.
+
+        Args:
+            name: Stage name used in metrics and logs
+            func: Called with one input item; returns an iterable of zero or more output items
+            workers: Threads running func concurrently
+            queue_size: Capacity of the stage's input queue
+        """
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+
+
+def run_stages(items: Iterable, stages: List[Stage]) -> tuple:
+    """
+    Stream items through the stages and collect the last stage's outputs.
+
+    An exception raised by a stage for one item is logged and counted; the item is dropped
+    and the run continues.
+
+    Args:
+        items: Inputs fed to the first stage
+        stages: Stages in order
+
+    Returns:
+        (outputs in completion order, {stage name: metrics dict})
+    """
+    started = time.monotonic()
+    queues = [queue.Queue(maxsize=stage.queue_size) for stage in stages]
+    metrics = {stage.name: StageMetrics(stage.name, stage.workers, stage.queue_size) for stage in stages}
+    outputs = []
+    outputs_lock = threading.Lock()
+    remaining = {stage.name: stage.workers for stage in stages}
+    remaining_lock = threading.Lock()
+
+    def emit(position: int, item) -> float:
+        """Hand an item to the next stage (or the result list); returns seconds blocked."""
+        if position + 1 == len(stages):
+            with outputs_lock:
+                outputs.append(item)
+            return 0.0
+        waited = time.monotonic()
+        queues[position + 1].put(item)
+        blocked = time.monotonic() - waited
+        next_metrics = metrics[stages[position + 1].name]
+        with next_metrics._lock:
+            next_metrics.max_queue_depth = max(next_metrics.max_queue_depth, queues[position + 1].qsize())
+        return blocked
+
+    def worker(position: int):
+        stage = stages[position]
+        stage_metrics = metrics[stage.name]
+        inbox = queues[position]
+        while True:
+            waited = time.monotonic()
+            item = inbox.get()
+            stage_metrics.add(idle_seconds=time.monotonic() - waited)
+            if item is _DONE:
+                inbox.put(_DONE)  # let sibling workers see it too
+                break
+            stage_metrics.add(items_in=1)
+            begun = time.monotonic()
+            blocked = 0.0
+            produced = 0
+            try:
+                for output in stage.func(item) or ():
+                    blocked += emit(position, output)
+                    produced += 1
+                    with stage_metrics._lock:
+                        if stage_metrics.first_output_at is None:
+                            stage_metrics.first_output_at = time.monotonic() - started
+            except Exception as e:
+                logger.error(f"Stage {stage.name} failed on an item: {e}")
+                stage_metrics.add(errors=1)
+            stage_metrics.add(items_out=produced, blocked_seconds=blocked,
+                              busy_seconds=time.monotonic() - begun - blocked)
+        with remaining_lock:
+            remaining[stage.name] -= 1
+            last = remaining[stage.name] == 0
+        if last:
+            stage_metrics.finished_at = time.monotonic() - started
+            if position + 1 < len(stages):
+                queues[position + 1].put(_DONE)
+
+    threads = [
+        threading.Thread(target=in_current_context(worker), args=(position,), daemon=True,
+                         name=f"stage-{stage.name}-{n}")
+        for position, stage in enumerate(stages) for n in range(stage.workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for item in items:
+        queues[0].put(item)
+    queues[0].put(_DONE)
+    for thread in threads:
+        thread.join()
+    return outputs, {name: stage_metrics.to_dict() for name, stage_metrics in metrics.items()}
@@ -20,7 +20,8 @@ def test_groq_api():
     print(f"🔑 API Key found: {api_key[:10]}...")
     
     # Test API call
-    url = "https://api.groq.com/openai/v1/chat/completions"
+    base_url = os.getenv('GROQ_BASE_URL', 'https://api.groq.com').rstrip('/')
+    url = f"{base_url}/openai/v1/chat/completions"
     headers = {
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json",
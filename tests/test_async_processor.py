@@ -0,0 +1,151 @@
+"""
+Tests for the async GroqContentProcessor API and the shared rate limiter.
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from groq_processor import GroqContentProcessor
+from rate_limiter import RateLimiter
+
+
+def _completion_response(text, status_code=200, headers=None):
+    body = {'choices': [{'message': {'content': text}}]}
+    return httpx.Response(status_code, json=body, headers=headers)
+
+
+class TestAsyncProcessor(unittest.TestCase):
+    """Async methods use a pooled httpx client and the same prompts, cache and limiter as the sync API."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        cache_file = os.path.join(self.tmpdir.name, 'summary_cache.json')
+        with mock.patch.dict(os.environ, {'GROQ_SUMMARY_CACHE_FILE': cache_file}):
+            self.processor = GroqContentProcessor(api_key='test-key')
+        self.articles = [
+            {'title': f'Story {i}', 'url': f'https://example.com/{i}', 'content': f'Body of story {i}. ' * 20}
+            for i in range(1, 6)
+        ]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _run_with_transport(self, handler, coro_factory):
+        async def run():
+            loop = asyncio.get_running_loop()
+            client, semaphore = self.processor._async_pool()
+            await client.aclose()
+            self.processor._async_clients[loop] = (httpx.AsyncClient(transport=httpx.MockTransport(handler)), semaphore)
+            try:
+                return await coro_factory()
+            finally:
+                await self.processor.aclose()
+        return asyncio.run(run())
+
+    def test_process_multiple_articles_runs_concurrently(self):
+        self.processor.max_concurrency = 5
+
+        async def slow_completion(user_prompt, **kwargs):
+            await asyncio.sleep(0.2)
+            return 'Summary'
+
+        with mock.patch.object(self.processor, '_achat_completion', side_effect=slow_completion):
+            started = time.time()
+            processed = asyncio.run(self.processor.aprocess_multiple_articles(self.articles))
+            elapsed = time.time() - started
+        self.assertEqual([a['summary'] for a in processed], ['Summary'] * 5)
+        self.assertLess(elapsed, 0.2 * 3)
+
+    def test_http_429_is_retried_after_retry_after(self):
+        calls = []
+
+        def handler(request):
+            calls.append(json.loads(request.content))
+            if len(calls) == 1:
+                return _completion_response('', status_code=429, headers={'Retry-After': '0'})
+            return _completion_response('Digest body')
+
+        digest = self._run_with_transport(handler, lambda: self.processor.acreate_digest(self.articles, "Daily"))
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(calls[0]['model'], self.processor.router.model_for('digest'))
+        self.assertTrue(digest.startswith("# Daily"))
+        self.assertIn('Digest body', digest)
+
+    def test_failed_completion_falls_back_to_local_summary(self):
+        def handler(request):
+            return httpx.Response(500, text='boom')
+
+        summary = self._run_with_transport(handler, lambda: self.processor.asummarize_article(self.articles[0]))
+        self.assertIn('Story 1', summary)
+        self.assertIn('https://example.com/1', summary)
+
+    def test_each_event_loop_gets_its_own_client(self):
+        async def pool():
+            return self.processor._async_pool()
+
+        async def first_loop():
+            client, _ = await pool()
+            ready.set()
+            await asyncio.to_thread(done.wait)
+            self.assertIs((await pool())[0], client)
+            self.assertFalse(client.is_closed)
+            await self.processor.aclose()
+            return client
+
+        ready, done = threading.Event(), threading.Event()
+        results = {}
+        worker = threading.Thread(target=lambda: results.setdefault('first', asyncio.run(first_loop())))
+        worker.start()
+        ready.wait(5)
+
+        async def second_loop():
+            client, _ = await pool()
+            await self.processor.aclose()
+            return client
+
+        second = asyncio.run(second_loop())
+        done.set()
+        worker.join(5)
+        self.assertIsNot(results['first'], second)
+        self.assertTrue(results['first'].is_closed and second.is_closed)
+        self.assertEqual(self.processor._async_clients, {})
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Token bucket shared by threads and the event loop."""
+
+    def test_burst_then_waits(self):
+        limiter = RateLimiter(requests_per_minute=600, burst=2)
+        self.assertEqual(limiter.acquire(), 0)
+        self.assertEqual(limiter.acquire(), 0)
+        self.assertTrue(limiter.is_saturated())
+        waited = asyncio.run(limiter.acquire_async())
+        self.assertGreater(waited, 0)
+
+    def test_zero_rate_only_honours_penalties(self):
+        limiter = RateLimiter(requests_per_minute=0)
+        self.assertEqual(sum(limiter.acquire() for _ in range(100)), 0)
+        self.assertFalse(limiter.is_saturated())
+        limiter.penalize(0.05)
+        self.assertTrue(limiter.is_saturated())
+        self.assertGreater(limiter.acquire(), 0)
+
+    def test_penalize_holds_back_callers(self):
+        limiter = RateLimiter(requests_per_minute=600)
+        limiter.penalize(0.05)
+        self.assertTrue(limiter.is_saturated())
+        self.assertGreater(limiter.acquire(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
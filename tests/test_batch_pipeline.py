@@ -0,0 +1,171 @@
+"""
+Tests for batch runs that share fetching and summarization across users.
+"""
+import datetime
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from content_pipeline import ContentPipeline
+from local_storage import local_storage
+
+
+def _feed(rss_url, *args, **kwargs):
+    name = rss_url.rsplit('/', 1)[-1]
+    return [{'title': f'{name} story {n}', 'url': f'https://example.com/{name}/{n}',
+             'content': f'The {name} story {n} covers a model launch and its pricing in detail.'} for n in range(2)]
+
+
+class TestBatchPipeline(unittest.TestCase):
+    """Shared sources are fetched and summarized once; digests and emails are per user."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        history_file = os.path.join(self.tmpdir.name, 'delivery_history.json')
+        self.storage_patch = mock.patch.object(local_storage, 'delivery_history_file', history_file)
+        self.storage_patch.start()
+        cache_file = os.path.join(self.tmpdir.name, 'summary_cache.json')
+        with mock.patch.dict(os.environ, {'GROQ_SUMMARY_CACHE_FILE': cache_file}):
+            self.pipeline = ContentPipeline(groq_api_key='test-key', resend_api_key='test-key')
+        self.jobs = [
+            {'user_id': 'u1', 'email': 'u1@example.com', 'title': 'Daily', 'writing_style': 'casual',
+             'rss_urls': ['https://feeds/ai', 'https://feeds/chips']},
+            {'user_id': 'u2', 'email': 'u2@example.com', 'title': 'Daily', 'writing_style': 'technical',
+             'rss_urls': ['https://feeds/chips', 'https://feeds/ai']},
+            {'user_id': 'u3', 'email': 'u3@example.com', 'title': 'Daily', 'rss_urls': ['https://feeds/ai']},
+        ]
+
+    def tearDown(self):
+        self.storage_patch.stop()
+        self.tmpdir.cleanup()
+
+    def _run(self, **kwargs):
+        def summarize(articles, writing_style='professional', **_):
+            return [{**a, 'summary': f"{writing_style}: {a['title']}"} for a in articles]
+
+        with mock.patch.object(self.pipeline.scraper, 'scrape_rss_feed', side_effect=_feed) as fetch, \
+                mock.patch.object(self.pipeline.processor, 'process_multiple_articles',
+                                  side_effect=summarize) as process, \
+                mock.patch.object(self.pipeline.email_sender, 'send_content_digest',
+                                  return_value={'id': 'sent'}) as send, \
+                mock.patch.object(self.pipeline.processor, '_chat_completion', return_value='Digest body'):
+            results = self.pipeline.process_batch(self.jobs, **kwargs)
+        return results, fetch, process, send
+
+    def test_shared_sources_fetched_and_summarized_once(self):
+        results, fetch, process, send = self._run(template_digest=False)
+        self.assertTrue(results['success'])
+        self.assertEqual(sorted(call.args[0] for call in fetch.call_args_list), ['https://feeds/ai', 'https://feeds/chips'])
+        self.assertEqual(process.call_count, 1)
+        self.assertEqual(len(process.call_args.args[0]), 4)
+        self.assertEqual(results['shared'], {'sources': 2, 'source_requests': 5, 'articles': 4, 'summarized': 4})
+        self.assertEqual(sorted(call.kwargs['to_emails'][0] for call in send.call_args_list),
+                         ['u1@example.com', 'u2@example.com', 'u3@example.com'])
+
+        jobs = results['jobs']
+        self.assertEqual([a['title'] for a in jobs['u1']['articles']],
+                         ['ai story 0', 'ai story 1', 'chips story 0', 'chips story 1'])
+        self.assertEqual([a['title'] for a in jobs['u2']['articles']][:2], ['chips story 0', 'chips story 1'])
+        self.assertEqual([a['title'] for a in jobs['u3']['articles']], ['ai story 0', 'ai story 1'])
+        self.assertIn('llm_usage', results)
+
+    def test_styled_summaries_are_shared_per_style(self):
+        results, _, process, _ = self._run(template_digest=True)
+        styles = sorted((call.kwargs['writing_style'], len(call.args[0])) for call in process.call_args_list)
+        self.assertEqual(styles, [('casual', 4), ('professional', 2), ('technical', 4)])
+        self.assertTrue(results['jobs']['u2']['articles'][0]['summary'].startswith('technical:'))
+
+    def test_delivered_items_are_skipped_per_user(self):
+        self._run(template_digest=False)
+        self.jobs[2]['rss_urls'].append('https://feeds/robots')
+        results, _, process, send = self._run(template_digest=False)
+        self.assertTrue(results['jobs']['u1']['nothing_new'])
+        self.assertTrue(results['jobs']['u2']['nothing_new'])
+        self.assertEqual([a['title'] for a in results['jobs']['u3']['articles']], ['robots story 0', 'robots story 1'])
+        self.assertEqual(len(process.call_args.args[0]), 2)
+        self.assertEqual(send.call_count, 1)
+
+    def test_prefetched_summaries_are_reused(self):
+        prefetched = {'success': True, 'writing_style': 'professional', 'prefetched_at': '2026-01-01T07:50:00',
+                      'articles': [{**article, 'summary': f"prefetched: {article['title']}"}
+                                   for article in _feed('https://feeds/ai')]}
+        results, _, process, _ = self._run(template_digest=False, prefetched=prefetched)
+        self.assertEqual([a['title'] for a in process.call_args.args[0]], ['chips story 0', 'chips story 1'])
+        self.assertEqual([a['summary'] for a in results['jobs']['u3']['articles']],
+                         ['prefetched: ai story 0', 'prefetched: ai story 1'])
+
+
+class TestBatchWindows(unittest.TestCase):
+    """Batch windows run at their latest delivery time and prefetch ahead of their earliest one."""
+
+    def setUp(self):
+        import app
+        self.app = app
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        for patch in (
+            mock.patch.dict(os.environ, {'GROQ_API_KEY': 'test-key', 'RESEND_API_KEY': 'test-key',
+                                         'GROQ_SUMMARY_CACHE_FILE': os.path.join(self.tmpdir.name, 'cache.json')}),
+            mock.patch.object(app, 'BATCH_WINDOW_MINUTES', 15),
+            mock.patch.object(app, 'PREFETCH_LEAD_MINUTES', 10),
+            mock.patch.object(app.st.session_state, 'scheduler', BackgroundScheduler()),
+            mock.patch.object(app.st.session_state, 'batch_slots', {}),
+            mock.patch.object(app.st.session_state, 'prefetched', {}),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+        # Paused: jobs are replaced like in the app but only called by the test
+        app.st.session_state.scheduler.start(paused=True)
+        self.addCleanup(app.st.session_state.scheduler.shutdown, wait=False)
+
+    def _schedule(self, user_id, at):
+        hour, minute = map(int, at.split(':'))
+        self.app.schedule_batch_delivery(user_id, datetime.time(hour, minute), {
+            'user_id': user_id, 'email': f'{user_id}@example.com', 'rss_urls': [f'https://feeds/{user_id}']
+        })
+
+    def _runs_at(self, job_id):
+        job = self.app.st.session_state.scheduler.get_job(job_id)
+        if job is None:
+            return None
+        fields = {field.name: str(field) for field in job.trigger.fields}
+        return f"{int(fields['hour']):02d}:{int(fields['minute']):02d}"
+
+    def test_window_runs_at_latest_delivery_time(self):
+        self._schedule('u1', '08:03')
+        self._schedule('u2', '08:14')
+        self.assertEqual(self._runs_at('newsletter_batch_0800'), '08:14')
+        self.assertEqual(self._runs_at('prefetch_newsletter_batch_0800'), '07:53')
+
+        self.app.unschedule_batch_delivery('u2')
+        self.assertEqual(self._runs_at('newsletter_batch_0800'), '08:03')
+        self.app.unschedule_batch_delivery('u1')
+        self.assertEqual(self.app.st.session_state.scheduler.get_jobs(), [])
+
+    def test_window_prefetch_feeds_the_batch_run(self):
+        self._schedule('u1', '08:03')
+        self._schedule('u2', '08:14')
+        scheduler = self.app.st.session_state.scheduler
+        prefetched = {'success': True, 'articles': [], 'prefetched_at': datetime.datetime.now().isoformat()}
+        with mock.patch.object(ContentPipeline, 'prefetch_sources', return_value=prefetched) as prefetch:
+            job = scheduler.get_job('prefetch_newsletter_batch_0800')
+            job.func(*job.args)
+        self.assertEqual(prefetch.call_args.kwargs['rss_urls'], ['https://feeds/u1', 'https://feeds/u2'])
+
+        batch = {'success': True, 'jobs': {}, 'shared': {'sources': 2, 'source_requests': 2, 'summarized': 0}}
+        with mock.patch.object(ContentPipeline, 'process_batch', return_value=batch) as process:
+            job = scheduler.get_job('newsletter_batch_0800')
+            job.func(*job.args)
+        self.assertEqual([spec['user_id'] for spec in process.call_args.args[0]], ['u1', 'u2'])
+        self.assertIs(process.call_args.kwargs['prefetched'], prefetched)
+        self.assertEqual(self.app.st.session_state.prefetched, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+"""
+Tests for crash-safe run checkpoints and resumed pipeline runs.
+"""
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from checkpoint import RunCheckpoint, incomplete_runs
+from content_pipeline import ContentPipeline
+from email_sender import EmailSender
+from groq_processor import GroqContentProcessor
+from local_storage import local_storage
+from scraper import WebScraper
+
+
+class TestCheckpoints(unittest.TestCase):
+    """Completed stages are saved per run id and skipped when the run is retried."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        env = {'GROQ_SUMMARY_CACHE_FILE': os.path.join(self.tmpdir.name, 'summary_cache.json'),
+               'PIPELINE_CHECKPOINT_DIR': os.path.join(self.tmpdir.name, 'checkpoints')}
+        self.env = mock.patch.dict(os.environ, env)
+        self.env.start()
+        self.pipeline = ContentPipeline(groq_api_key='test-key', resend_api_key='test-key')
+        self.feed = [{'title': f'Story {n}', 'url': f'https://example.com/{n}',
+                      'content': f'Story {n} covers a model release and its serving costs.'} for n in range(3)]
+
+    def tearDown(self):
+        self.env.stop()
+        self.tmpdir.cleanup()
+
+    def _run(self, digest_error=None, send_response=None):
+        def summarize(articles, **_):
+            return [{**article, 'summary': f"Summary of {article['title']}"} for article in articles]
+
+        def digest(*args, **kwargs):
+            if digest_error:
+                raise digest_error
+            return "# Daily digest"
+
+        with mock.patch.object(self.pipeline.scraper, 'scrape_rss_feed', return_value=[dict(a) for a in self.feed]) as fetch, \
+                mock.patch.object(self.pipeline.processor, 'process_multiple_articles', side_effect=summarize) as process, \
+                mock.patch.object(self.pipeline.processor, 'create_digest', side_effect=digest), \
+                mock.patch.object(self.pipeline.email_sender, 'send_content_digest',
+                                  return_value=send_response or {'id': 'sent'}) as send:
+            results = self.pipeline.process_mixed_sources(
+                rss_urls=['https://example.com/feed'], email_recipients=['reader@example.com'], run_id='user-1-daily'
+            )
+        return results, fetch, process, send
+
+    def test_checkpoint_survives_reopen(self):
+        checkpoint = RunCheckpoint('run/1')
+        checkpoint.save('fetched', {'articles': self.feed, 'already_delivered': 0})
+        reopened = RunCheckpoint('run/1')
+        self.assertTrue(reopened.has('fetched'))
+        self.assertEqual(reopened.load('fetched')['articles'], self.feed)
+        self.assertFalse(reopened.has('summaries'))
+        self.assertEqual(os.listdir(checkpoint.directory), ['run_1.json'])
+
+    def test_retry_resumes_after_last_completed_stage(self):
+        results, _, _, send = self._run(digest_error=RuntimeError("worker killed"))
+        self.assertFalse(results['success'])
+        send.assert_not_called()
+
+        results, fetch, process, send = self._run()
+        self.assertTrue(results['success'])
+        self.assertEqual(results['resumed_from'], ['fetched', 'summaries'])
+        fetch.assert_not_called()
+        process.assert_not_called()
+        send.assert_called_once()
+        self.assertEqual([a['summary'] for a in results['articles']], [f"Summary of Story {n}" for n in range(3)])
+
+    def test_delivered_run_is_not_sent_again(self):
+        self._run()
+        results, fetch, process, send = self._run()
+        self.assertTrue(results['success'])
+        self.assertEqual(results['resumed_from'], ['fetched', 'summaries', 'digest', 'delivered'])
+        self.assertEqual(results['digest_content'], "# Daily digest")
+        fetch.assert_not_called()
+        send.assert_not_called()
+
+    def test_failed_send_is_retried(self):
+        self._run(send_response={'error': 'rate limited'})
+        results, fetch, _, send = self._run()
+        self.assertEqual(results['resumed_from'], ['fetched', 'summaries', 'digest'])
+        fetch.assert_not_called()
+        send.assert_called_once()
+
+
+class TestSchedulerResume(unittest.TestCase):
+    """A scheduled run interrupted by a restart is resumed at startup under the same run id."""
+
+    def setUp(self):
+        import app
+        self.app = app
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        for patch in (
+            mock.patch.dict(os.environ, {'GROQ_SUMMARY_CACHE_FILE': os.path.join(self.tmpdir.name, 'cache.json'),
+                                         'PIPELINE_CHECKPOINT_DIR': os.path.join(self.tmpdir.name, 'checkpoints')}),
+            mock.patch.object(local_storage, 'delivery_history_file', os.path.join(self.tmpdir.name, 'history.json')),
+            # Not started: jobs are only inspected and called by the test
+            mock.patch.object(app.st.session_state, 'scheduler', BackgroundScheduler()),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.feed = [{'title': f'Story {n}', 'url': f'https://example.com/{n}',
+                      'content': f'Story {n} covers a model release, its benchmark results and its serving costs.'}
+                     for n in range(3)]
+        app.st.session_state.scheduler.add_job(
+            app.generate_and_send_newsletter, 'cron', hour=8, minute=0, id='newsletter_user-1',
+            args=['test-key', 'test-key', 'news@example.com', 'reader@example.com', [], ['https://example.com/feed'],
+                  'Daily Newsletter', [], [], 'professional', 'user-1', '08:00', {}]
+        )
+
+    def _fire(self, job_id, digest_error=None):
+        def digest(*args, **kwargs):
+            if digest_error:
+                raise digest_error
+            return "# Daily digest"
+
+        job = self.app.st.session_state.scheduler.get_job(job_id)
+        with mock.patch.object(WebScraper, 'scrape_rss_feed', return_value=[dict(a) for a in self.feed]) as fetch, \
+                mock.patch.object(GroqContentProcessor, 'process_multiple_articles',
+                                  side_effect=lambda articles, **_: [{**a, 'summary': 'Summary'} for a in articles]), \
+                mock.patch.object(GroqContentProcessor, 'create_digest', side_effect=digest), \
+                mock.patch.object(EmailSender, 'send_content_digest', return_value={'id': 'sent'}) as send:
+            job.func(*job.args, **job.kwargs)
+        return fetch, send
+
+    def test_restart_resumes_todays_interrupted_run(self):
+        _, send = self._fire('newsletter_user-1', digest_error=RuntimeError("app restarted"))
+        send.assert_not_called()
+        run_id = self.app.scheduled_run_id('user-1', 'reader@example.com', '08:00')
+        self.assertEqual(incomplete_runs(), [run_id])
+
+        self.app.resume_interrupted_runs()
+        fetch, send = self._fire('resume_user-1')
+        fetch.assert_not_called()
+        send.assert_called_once()
+        self.assertTrue(RunCheckpoint(run_id).has('delivered'))
+        self.assertEqual(incomplete_runs(), [])
+
+    def test_delivered_runs_are_not_resumed(self):
+        self._fire('newsletter_user-1')
+        self.app.resume_interrupted_runs()
+        self.assertIsNone(self.app.st.session_state.scheduler.get_job('resume_user-1'))
+
+
+if __name__ == '__main__':
+    unittest.main()
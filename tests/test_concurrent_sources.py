@@ -0,0 +1,100 @@
+"""
+Tests for concurrent source fetching in the mixed pipeline.
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from content_pipeline import ContentPipeline
+from local_cache import LocalCache
+
+
+def _articles(source):
+    name = source.rsplit('/', 1)[-1]
+    return [{'title': name, 'url': source, 'content': f"The {name} story improved latency by ten percent today."}]
+
+
+class TestConcurrentSources(unittest.TestCase):
+    """Families and the feeds within them are fetched at once under a shared limit."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        cache_file = os.path.join(self.tmpdir.name, 'summary_cache.json')
+        with mock.patch.dict(os.environ, {'GROQ_SUMMARY_CACHE_FILE': cache_file}):
+            self.pipeline = ContentPipeline(groq_api_key='test-key', resend_api_key='test-key')
+        self.running = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+        self.failing = set()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _slow_fetch(self, source, *args, **kwargs):
+        source = source[0] if isinstance(source, list) else source
+        if source in self.failing:
+            raise ConnectionError('feed down')
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(0.3)
+        with self.lock:
+            self.running -= 1
+        return _articles(source)
+
+    def _run(self):
+        with mock.patch.object(self.pipeline.scraper, 'scrape_multiple_urls', side_effect=self._slow_fetch), \
+                mock.patch.object(self.pipeline.scraper, 'scrape_rss_feed', side_effect=self._slow_fetch), \
+                mock.patch.object(self.pipeline.twitter_processor, 'process_twitter_sources',
+                                  side_effect=self._slow_fetch):
+            started = time.monotonic()
+            results = self.pipeline.process_mixed_sources(
+                urls=['https://site/a', 'https://site/b'],
+                rss_urls=['https://site/feed1', 'https://site/feed2'],
+                twitter_urls=['https://x.com/c'],
+                offline=True,
+            )
+            return results, time.monotonic() - started
+
+    def test_wall_clock_approaches_slowest_source(self):
+        results, elapsed = self._run()
+        self.assertTrue(results['success'])
+        self.assertLess(elapsed, 0.9)
+        self.assertEqual([a['title'] for a in results['articles']], ['a', 'b', 'feed1', 'feed2', 'c'])
+
+    def test_shared_concurrency_limit(self):
+        self.pipeline.fetch_concurrency = 2
+        results, elapsed = self._run()
+        self.assertEqual(len(results['articles']), 5)
+        self.assertEqual(self.peak, 2)
+        self.assertGreaterEqual(elapsed, 0.85)
+
+    def test_failed_source_does_not_fail_the_run(self):
+        self.failing.add('https://site/feed1')
+        results, _ = self._run()
+        self.assertEqual([a['title'] for a in results['articles']], ['a', 'b', 'feed2', 'c'])
+
+    def test_local_cache_is_thread_safe(self):
+        cache = LocalCache(cache_file=os.path.join(self.tmpdir.name, 'content_cache.json'))
+
+        def writer(n):
+            for i in range(50):
+                cache.set(f"https://site/{n}/{i}", {'title': str(i)})
+                cache.get(f"https://site/{n}/{i}")
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(LocalCache(cache_file=cache.cache_file).cache), 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
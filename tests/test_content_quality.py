@@ -0,0 +1,88 @@
+"""
+Tests for the content quality gate that keeps placeholder articles away from the LLM.
+"""
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from content_pipeline import ContentPipeline
+from content_quality import ContentQualityGate
+from scraper import WebScraper
+from twitter_processor import TwitterProcessor
+from youtube_processor import YouTubeTranscriptProcessor
+
+REAL = " ".join(f"Paragraph {n} explains how the new inference chip lowers serving costs." for n in range(5))
+
+
+class TestContentQualityGate(unittest.TestCase):
+    """Fallback and thin articles are classified, templated or dropped, and counted."""
+
+    def test_built_in_placeholders_are_fallback(self):
+        gate = ContentQualityGate()
+        blocked = WebScraper()._create_fallback_content_for_blocked_sites(['https://openai.com/blog/'])[0]
+        profile = TwitterProcessor()._create_profile_content('@OpenAI')
+        video = {'url': 'https://youtube.com/watch?v=abc', 'title': 'Talk', 'source': 'youtube',
+                 'content': YouTubeTranscriptProcessor()._create_fallback_content(
+                     'abc', 'https://youtube.com/watch?v=abc', {'title': 'Talk', 'description': 'A talk.'})}
+        self.assertEqual([gate.classify(a) for a in (blocked, profile, video)], ['fallback'] * 3)
+        self.assertEqual(gate.classify({'title': 'Post', 'content': REAL}), 'real')
+
+    def test_scrape_errors_are_fallback_but_error_topics_are_real(self):
+        gate = ContentQualityGate()
+        with mock.patch('scraper.requests.Session.get', side_effect=RuntimeError('403 Forbidden')):
+            failed = WebScraper().scrape_url('https://example.com/blocked', force_fresh=True)
+        self.assertEqual(gate.classify(failed), 'fallback')
+        self.assertEqual(gate.classify({k: v for k, v in failed.items() if k != 'fallback_content'}), 'fallback')
+        sre = {'title': 'Error budgets in SRE', 'content': "Error budgets in SRE " + REAL}
+        self.assertEqual(gate.classify(sre), 'real')
+
+    def test_thin_content_ignores_boilerplate(self):
+        gate = ContentQualityGate(min_words=8)
+        banner = "Accept all cookies to continue. Subscribe to our newsletter. Sign in to read more."
+        self.assertEqual(gate.classify({'title': 'Paywall', 'content': banner}), 'thin')
+        self.assertEqual(gate.classify({'title': 'Post', 'content': banner + " " + REAL}), 'real')
+
+    def test_actions_and_counts(self):
+        gate = ContentQualityGate(fallback_action='drop', thin_action='template')
+        articles = [
+            {'title': 'Post', 'url': 'https://example.com/post', 'content': REAL},
+            {'title': 'Blocked', 'url': 'https://example.com/b', 'content': 'Canned', 'fallback_content': True},
+            {'title': 'Short', 'url': 'https://example.com/s', 'content': 'Chip prices fell today.'},
+        ]
+        kept = gate.apply(articles)
+        self.assertEqual([a['title'] for a in kept], ['Post', 'Short'])
+        self.assertNotIn('content_quality', kept[0])
+        self.assertEqual(kept[1]['content_quality'], 'thin')
+        self.assertIn('Chip prices fell today.', kept[1]['summary'])
+        self.assertEqual(kept[1]['structured_summary']['key_points'], ['Chip prices fell today.'])
+        self.assertEqual(gate.report(), {'real': 1, 'fallback': 1, 'thin': 1, 'dropped': 1})
+
+    def test_unknown_action_is_rejected(self):
+        with self.assertRaises(ValueError):
+            ContentQualityGate(fallback_action='summarize')
+
+    def test_pipeline_summarizes_only_real_articles(self):
+        feed = [
+            {'title': 'Post', 'url': 'https://example.com/post', 'content': REAL},
+            {'title': 'Blocked', 'url': 'https://example.com/b', 'content': REAL, 'fallback_content': True},
+            {'title': 'Short', 'url': 'https://example.com/s', 'content': 'Chip prices fell.'},
+        ]
+        with tempfile.TemporaryDirectory() as tmpdir, \
+                mock.patch.dict(os.environ, {'GROQ_SUMMARY_CACHE_FILE': os.path.join(tmpdir, 'cache.json')}):
+            pipeline = ContentPipeline(groq_api_key='test-key', resend_api_key='test-key')
+            with mock.patch.object(pipeline.scraper, 'scrape_rss_feed', return_value=feed), \
+                    mock.patch.object(pipeline.processor, 'process_multiple_articles',
+                                      side_effect=lambda articles, **kwargs: [{**a, 'summary': 'LLM'} for a in articles]) as process:
+                results = pipeline.process_mixed_sources(rss_urls=['https://example.com/feed'], template_digest=True)
+        self.assertTrue(results['success'])
+        self.assertEqual([a['title'] for a in process.call_args.args[0]], ['Post'])
+        self.assertEqual([a['title'] for a in results['articles']], ['Post', 'Short'])
+        self.assertEqual(results['content_quality'], {'real': 1, 'fallback': 1, 'thin': 1, 'dropped': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
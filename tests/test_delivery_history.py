@@ -0,0 +1,100 @@
+"""
+Tests for per-user delivery history and incremental digests.
+"""
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from content_pipeline import ContentPipeline
+from delivery_history import DeliveryHistory, canonical_url
+from local_storage import local_storage
+
+
+def _article(name):
+    return {'title': f'Story {name}', 'url': f'https://www.example.com/{name}/?utm_source=feed',
+            'content': f'Story {name} explains a new model release and what it costs to run.'}
+
+
+class TestDeliveryHistory(unittest.TestCase):
+    """Delivered items are remembered per user and skipped before summarization."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        history_file = os.path.join(self.tmpdir.name, 'delivery_history.json')
+        self.storage_patch = mock.patch.object(local_storage, 'delivery_history_file', history_file)
+        self.storage_patch.start()
+        cache_file = os.path.join(self.tmpdir.name, 'summary_cache.json')
+        with mock.patch.dict(os.environ, {'GROQ_SUMMARY_CACHE_FILE': cache_file}):
+            self.pipeline = ContentPipeline(groq_api_key='test-key', resend_api_key='test-key')
+        self.feed = [_article('a'), _article('b')]
+
+    def tearDown(self):
+        self.storage_patch.stop()
+        self.tmpdir.cleanup()
+
+    def _run(self, send_response=None, **kwargs):
+        def summarize(articles, **_):
+            return [{**article, 'summary': f"Summary of {article['title']}"} for article in articles]
+
+        with mock.patch.object(self.pipeline.scraper, 'scrape_rss_feed', return_value=[dict(a) for a in self.feed]), \
+                mock.patch.object(self.pipeline.processor, 'process_multiple_articles',
+                                  side_effect=summarize) as process, \
+                mock.patch.object(self.pipeline.email_sender, 'send_content_digest',
+                                  return_value=send_response or {'id': 'sent'}) as send:
+            results = self.pipeline.process_mixed_sources(
+                rss_urls=['https://example.com/feed'], email_recipients=['reader@example.com'],
+                user_id='user-1', template_digest=True, **kwargs
+            )
+        return results, process, send
+
+    def test_canonical_url_ignores_tracking_and_trivial_variants(self):
+        self.assertEqual(canonical_url('http://WWW.Example.com/a/?utm_source=x&b=2&a=1#top'),
+                         canonical_url('https://example.com/a?a=1&b=2'))
+        self.assertNotEqual(canonical_url('https://example.com/a?id=1'), canonical_url('https://example.com/a?id=2'))
+
+    def test_second_run_reports_nothing_new(self):
+        results, _, send = self._run()
+        self.assertFalse(results['nothing_new'])
+        self.assertEqual(send.call_count, 1)
+
+        results, process, send = self._run()
+        self.assertTrue(results['success'])
+        self.assertTrue(results['nothing_new'])
+        self.assertEqual(results['already_delivered'], 2)
+        self.assertEqual((process.call_count, send.call_count), (0, 0))
+
+    def test_only_the_delta_is_summarized(self):
+        self._run()
+        self.feed.append(_article('c'))
+        results, process, _ = self._run()
+        self.assertEqual([a['title'] for a in process.call_args.args[0]], ['Story c'])
+        self.assertEqual(results['already_delivered'], 2)
+
+    def test_streaming_run_skips_delivered_items(self):
+        self._run()
+        self.feed.append(_article('c'))
+        results, process, _ = self._run(streaming=True)
+        self.assertEqual(process.call_count, 1)
+        self.assertEqual([a['title'] for a in results['articles']], ['Story c'])
+        self.assertEqual(results['stages']['history'], {**results['stages']['history'], 'items_in': 3, 'items_out': 1})
+
+    def test_failed_send_is_not_recorded(self):
+        results, _, send = self._run(send_response={'error': 'down'})
+        self.assertEqual(send.call_count, 1)
+        history = DeliveryHistory('user-1')
+        self.assertFalse(history.is_delivered(self.feed[0]))
+
+    def test_republished_content_matches_by_hash(self):
+        history = DeliveryHistory('user-2')
+        history.record([self.feed[0]])
+        moved = {**self.feed[0], 'url': 'https://mirror.example.org/story-a'}
+        self.assertTrue(DeliveryHistory('user-2').is_delivered(moved))
+        self.assertFalse(DeliveryHistory('user-1').is_delivered(moved))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Tests for extractive pre-compression of article text.
+"""
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extractive import compress_text, estimate_tokens, score_sentences, split_sentences
+from groq_processor import GroqContentProcessor
+
+BANNER = ("We use cookies to improve your experience. Accept all cookies.\n"
+          "Skip to main content\nSign up for our newsletter to get stories in your inbox.\n")
+
+
+def _article_text(sentences=40):
+    body = " ".join(f"The inference chip reached {n} tokens per second in benchmark run {n}." for n in range(sentences))
+    return BANNER + body + "\nCopyright 2024 Example Media. All rights reserved."
+
+
+class TestExtractive(unittest.TestCase):
+    """Boilerplate is dropped and salient sentences are kept under the budget in order."""
+
+    def test_drops_boilerplate_and_respects_budget(self):
+        compressed = compress_text(_article_text(), token_budget=200)
+        self.assertNotIn('cookies', compressed)
+        self.assertNotIn('newsletter', compressed)
+        self.assertNotIn('All rights reserved', compressed)
+        self.assertLessEqual(estimate_tokens(compressed), 200)
+        self.assertIn('benchmark run', compressed)
+
+    def test_keeps_original_sentence_order(self):
+        compressed = compress_text(_article_text(), token_budget=150)
+        runs = [int(s.rstrip('.').split()[-1]) for s in split_sentences(compressed)]
+        self.assertEqual(runs, sorted(runs))
+
+    def test_short_text_is_returned_without_boilerplate(self):
+        text = BANNER + "Researchers released an open dataset for speech recognition today."
+        self.assertEqual(compress_text(text, token_budget=500),
+                         "Researchers released an open dataset for speech recognition today.")
+
+    def test_textrank_prefers_central_sentences(self):
+        sentences = [
+            "The new chip doubles inference speed for large language models.",
+            "Inference speed on the new chip was measured across language models.",
+            "Large language models run faster with the new inference chip.",
+            "The weather in the city was mild on the day of the launch event.",
+        ]
+        for method in ('textrank', 'tfidf'):
+            scores = score_sentences(sentences, method)
+            self.assertEqual(int(scores.argmin()), 3, method)
+
+    def test_processor_uses_compressed_content_when_enabled(self):
+        processor = GroqContentProcessor(api_key='test-key')
+        processor.precompress = True
+        processor.precompress_token_budget = 200
+        for url in ('https://example.com/chip', 'https://youtube.com/watch?v=chip'):
+            article = {'title': 'Chip', 'url': url, 'content': _article_text()}
+            with mock.patch.object(processor, '_chat_completion', return_value='Summary') as call:
+                processor.summarize_article(article)
+            prompt = call.call_args.args[0]
+            self.assertNotIn('cookies', prompt, url)
+            self.assertIn('benchmark run', prompt, url)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+"""
+Tests for hedged digest requests.
+"""
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from content_pipeline import _tracks_llm_usage
+from groq_processor import GroqContentProcessor
+from hedging import HedgePolicy
+from llm_metrics import usage_context
+from rate_limiter import RateLimitExhausted
+
+
+class _FakeStream:
+    """Streamed chat completion response that waits before its first chunk."""
+
+    def __init__(self, text, first_byte_delay):
+        self.text = text
+        self.first_byte_delay = first_byte_delay
+        self.closed = threading.Event()
+
+    def iter_lines(self, decode_unicode=True):
+        # Closing the response aborts a stalled read, as it does for a real socket
+        if self.closed.wait(self.first_byte_delay):
+            return
+        for word in self.text.split(' '):
+            if self.closed.is_set():
+                return
+            yield 'data: ' + json.dumps({'choices': [{'delta': {'content': word + ' '}}]})
+            time.sleep(0.01)
+        yield 'data: [DONE]'
+
+    def close(self):
+        self.closed.set()
+
+
+class TestHedgePolicy(unittest.TestCase):
+    """Threshold follows the TTFB percentile and hedges are limited by the budget."""
+
+    def test_delay_uses_percentile_after_min_samples(self):
+        policy = HedgePolicy(min_samples=10, initial_delay=5.0)
+        self.assertEqual(policy.delay(), 5.0)
+        for ms in range(1, 21):
+            policy.observe(ms / 10)
+        self.assertEqual(policy.delay(), 2.0)
+
+    def test_budget_limits_hedges(self):
+        policy = HedgePolicy(budget_ratio=0.25)
+        allowed = 0
+        for _ in range(8):
+            policy.start_call()
+            allowed += policy.try_hedge()
+        self.assertEqual(allowed, 2)
+        self.assertEqual(policy.stats()['denied'], 6)
+
+
+class TestHedgedDigest(unittest.TestCase):
+    """A slow first byte triggers a duplicate request; the faster one wins and the loser is closed."""
+
+    def setUp(self):
+        self.processor = GroqContentProcessor(api_key='test-key')
+        self.processor.client = None
+        self.processor.hedge_digest = True
+        self.processor.hedge_policy = HedgePolicy(initial_delay=0.1)
+        self.articles = [
+            {'title': f'Story {i}', 'url': f'https://example.com/{i}', 'summary': f'Summary of story {i}.'}
+            for i in range(1, 4)
+        ]
+
+    def _digest(self, streams):
+        run_id = self.processor.usage.new_run_id()
+        with mock.patch.object(self.processor, '_post_chat_request', side_effect=streams):
+            with usage_context(run=run_id):
+                started = time.monotonic()
+                digest = self.processor.create_digest(self.articles, "Daily", hierarchical=False)
+                elapsed = time.monotonic() - started
+        time.sleep(0.1)
+        return digest, elapsed, self.processor.usage.finish_run(run_id)
+
+    def test_slow_primary_is_hedged_and_cancelled(self):
+        slow = _FakeStream('slow answer', first_byte_delay=1.0)
+        fast = _FakeStream('fast answer', first_byte_delay=0.0)
+        digest, elapsed, usage = self._digest([slow, fast])
+        self.assertIn('fast answer', digest)
+        self.assertNotIn('slow answer', digest)
+        self.assertLess(elapsed, 0.8)
+        self.assertTrue(slow.closed.is_set())
+        stats = self.processor.hedge_policy.stats()
+        self.assertEqual((stats['hedges'], stats['hedge_wins']), (1, 1))
+        self.assertEqual((usage['calls'], usage['hedged_calls'], usage['failed_calls']), (2, 1, 0))
+
+    def test_fast_primary_is_not_hedged(self):
+        digest, _, usage = self._digest([_FakeStream('quick answer', first_byte_delay=0.0)])
+        self.assertIn('quick answer', digest)
+        self.assertEqual(self.processor.hedge_policy.stats()['hedges'], 0)
+        self.assertEqual((usage['calls'], usage['hedged_calls']), (1, 0))
+
+    def test_exhausted_budget_waits_for_primary(self):
+        self.processor.hedge_policy = HedgePolicy(initial_delay=0.05, max_budget=1.0, budget_ratio=0.0)
+        self.processor.hedge_policy._budget = 0.0
+        digest, _, usage = self._digest([_FakeStream('late answer', first_byte_delay=0.2)])
+        self.assertIn('late answer', digest)
+        self.assertEqual(usage['calls'], 1)
+
+    def test_rate_limited_attempt_uses_fallback_model(self):
+        self.processor.router.fallback_model = 'backup-model'
+        model = self.processor._route('')[0]
+        streams = [RateLimitExhausted(model), _FakeStream('backup answer', first_byte_delay=0.0)]
+        with mock.patch.object(self.processor, '_post_chat_request', side_effect=streams) as post:
+            digest = self.processor.create_digest(self.articles, "Daily", hierarchical=False)
+        self.assertIn('backup answer', digest)
+        self.assertEqual(post.call_args.args[0]['model'], 'backup-model')
+        self.assertEqual(post.call_args.kwargs['timeout'], (self.processor.hedge_connect_timeout, 60))
+
+    def test_run_usage_reports_its_hedging_counters(self):
+        class Run:
+            processor = self.processor
+
+            @_tracks_llm_usage
+            def digest(self, articles):
+                return {'digest': self.processor.create_digest(articles, "Daily", hierarchical=False)}
+
+        self._digest([_FakeStream('earlier answer', first_byte_delay=0.0)])
+        streams = [_FakeStream('slow answer', first_byte_delay=1.0), _FakeStream('fast answer', first_byte_delay=0.0)]
+        with mock.patch.object(self.processor, '_post_chat_request', side_effect=streams):
+            results = Run().digest(self.articles)
+        hedging = results['llm_usage']['hedging']
+        self.assertEqual({key: hedging[key] for key in ('calls', 'hedges', 'hedge_wins', 'denied')},
+                         {'calls': 1, 'hedges': 1, 'hedge_wins': 1, 'denied': 0})
+        self.assertEqual(hedging['delay'], self.processor.hedge_policy.delay())
+        self.assertIn('budget', hedging)
+
+    def test_failed_attempts_fall_back_to_local_digest(self):
+        with mock.patch.object(self.processor, '_post_chat_request', side_effect=RuntimeError('boom')):
+            digest = self.processor.create_digest(self.articles, "Daily", hierarchical=False)
+        self.assertIn('Story 1', digest)
+
+
+if __name__ == '__main__':
+    unittest.main()
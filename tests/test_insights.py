@@ -0,0 +1,81 @@
+"""
+Tests for key insights built from summaries and run alongside the digest.
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from groq_processor import GroqContentProcessor, INSIGHTS_SYSTEM_PROMPT
+
+
+class TestInsights(unittest.TestCase):
+    """Insights reuse summaries, are cached and overlap with digest generation."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        cache_file = os.path.join(self.tmpdir.name, 'summary_cache.json')
+        with mock.patch.dict(os.environ, {'GROQ_SUMMARY_CACHE_FILE': cache_file}):
+            self.processor = GroqContentProcessor(api_key='test-key')
+        self.articles = [
+            {'title': f'Story {i}', 'url': f'https://example.com/{i}', 'content': 'RAW PAGE TEXT ' * 200,
+             'summary': f'Story {i} summary sentence.\n\n*Source: [Story {i}](https://example.com/{i})*'}
+            for i in range(1, 4)
+        ]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_prompt_uses_summaries_and_structured_fields(self):
+        self.articles[0]['structured_summary'] = {
+            'headline': 'Chip launch', 'key_points': ['Twice as fast'], 'why_it_matters': 'Cheaper inference.'}
+        prompt = self.processor._build_insights_prompt(self.articles)
+        self.assertNotIn('RAW PAGE TEXT', prompt)
+        self.assertNotIn('*Source:', prompt)
+        self.assertIn('Chip launch Twice as fast Cheaper inference.', prompt)
+        self.assertIn('Story 2 summary sentence.', prompt)
+
+    def test_unsummarized_articles_fall_back_to_content(self):
+        article = {'title': 'Raw', 'content': 'RAW PAGE TEXT ' * 200}
+        self.assertIn('RAW PAGE TEXT', self.processor._build_insights_prompt([article]))
+
+    def test_insights_are_cached_for_the_same_summaries(self):
+        with mock.patch.object(self.processor, '_chat_completion', return_value='Trend A') as call:
+            first = self.processor.extract_key_insights(self.articles)
+            second = self.processor.extract_key_insights(self.articles)
+        self.assertEqual(call.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertIn('Trend A', first)
+
+    def test_insights_run_concurrently_with_digest(self):
+        threads = {}
+
+        def slow_completion(prompt, system_prompt=None, **kwargs):
+            time.sleep(0.3)
+            threads['insights' if system_prompt == INSIGHTS_SYSTEM_PROMPT else 'digest'] = threading.current_thread()
+            return 'Trend A' if system_prompt == INSIGHTS_SYSTEM_PROMPT else 'Digest body'
+
+        with mock.patch.object(self.processor, '_chat_completion', side_effect=slow_completion):
+            started = time.monotonic()
+            digest, insights = self.processor.create_digest_with_insights(self.articles, "Daily", hierarchical=False)
+            elapsed = time.monotonic() - started
+        self.assertIn('Digest body', digest)
+        self.assertIn('Trend A', insights)
+        self.assertLess(elapsed, 0.55)
+        self.assertIs(threads['digest'], threading.current_thread())
+
+    def test_offline_run_skips_insights(self):
+        with mock.patch.object(self.processor, '_chat_completion') as call:
+            digest, insights = self.processor.create_digest_with_insights(self.articles, "Daily", offline=True)
+        self.assertEqual(call.call_count, 0)
+        self.assertEqual(insights, "")
+        self.assertIn('# Daily', digest)
+
+
+if __name__ == '__main__':
+    unittest.main()
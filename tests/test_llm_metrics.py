@@ -0,0 +1,99 @@
+"""
+Tests for LLM token, latency and cost accounting.
+"""
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+from content_pipeline import _tracks_llm_usage
+from groq_processor import GroqContentProcessor
+from groq_standin_server import GroqStandinServer, StandinConfig
+from llm_metrics import LLMUsageTracker, usage_context
+
+
+class TestLLMUsage(unittest.TestCase):
+    """Calls are recorded with API usage and attributed to run, stage and source."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.server = GroqStandinServer(config=StandinConfig(rate_limit=3, rate_window=0.2)).start()
+        env = {
+            'GROQ_BASE_URL': self.server.base_url,
+            'GROQ_SUMMARY_CACHE_FILE': os.path.join(self.tmpdir.name, 'summary_cache.json'),
+        }
+        with mock.patch.dict(os.environ, env):
+            self.processor = GroqContentProcessor(api_key='test-key')
+        self.processor.client = None
+        self.articles = [
+            {'title': 'Web story', 'url': 'https://example.com/1', 'content': 'Body of the web story. ' * 20},
+            {'title': 'Feed story', 'url': 'https://example.com/2', 'content': 'Body of the feed story. ' * 20,
+             'rss_title': 'Feed story'},
+            {'title': 'Tweet', 'url': 'https://x.com/a/status/1', 'content': 'Body of the tweet thread. ' * 20,
+             'source': 'twitter'},
+        ]
+
+    def tearDown(self):
+        self.server.stop()
+        self.tmpdir.cleanup()
+
+    def test_run_totals_match_server_usage_and_are_split_by_stage_and_source(self):
+        tracker = self.processor.usage
+        run_id = tracker.new_run_id()
+        with usage_context(run=run_id):
+            processed = self.processor.process_multiple_articles(self.articles)
+            self.processor.create_digest(processed, "Daily", hierarchical=True)
+        usage = tracker.finish_run(run_id)
+
+        stats = self.server.stats
+        self.assertEqual(usage['calls'], stats['completed'])
+        self.assertEqual(usage['prompt_tokens'], stats['prompt_tokens'])
+        self.assertEqual(usage['completion_tokens'], stats['completion_tokens'])
+        self.assertFalse(usage['estimated_tokens'])
+        self.assertEqual(usage['retries'], stats['rate_limited'])
+        self.assertGreater(usage['cost_usd'], 0)
+        self.assertEqual(usage['by_stage']['summaries']['calls'], 3)
+        # Digest sections and the reduce call run on worker threads but stay attributed
+        self.assertEqual(usage['by_stage']['digest']['calls'], 2)
+        self.assertEqual({s: v['calls'] for s, v in usage['by_source'].items()},
+                         {'web': 1, 'rss': 1, 'twitter': 1, 'all': 2})
+        self.assertEqual(tracker.calls(run_id), [])
+
+    def test_cache_hits_and_misses(self):
+        run_id = self.processor.usage.new_run_id()
+        with usage_context(run=run_id):
+            first = self.processor._cached_completion('key', 'Summarize this.')
+            second = self.processor._cached_completion('key', 'Summarize this.')
+        usage = self.processor.usage.finish_run(run_id)
+        self.assertEqual(first, second)
+        self.assertEqual((usage['calls'], usage['cache_misses'], usage['cache_hits']), (1, 1, 1))
+
+    def test_pipeline_results_carry_usage_and_runs_are_persisted(self):
+        log_file = os.path.join(self.tmpdir.name, 'usage.jsonl')
+        self.processor.usage = LLMUsageTracker(log_file=log_file)
+
+        class Pipeline:
+            processor = self.processor
+
+            @_tracks_llm_usage
+            def process_urls(self):
+                summaries = self.processor.process_multiple_articles(self.processor_articles)
+                return {"success": True, "articles": summaries}
+
+        pipeline = Pipeline()
+        pipeline.processor_articles = self.articles[:1]
+        results = pipeline.process_urls()
+        self.assertEqual(results['llm_usage']['calls'], 1)
+        with open(log_file, encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(lines[0]['run_id'], results['llm_usage']['run_id'])
+
+
+if __name__ == '__main__':
+    unittest.main()
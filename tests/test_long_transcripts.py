@@ -0,0 +1,73 @@
+"""
+Tests for chunked summarization of long YouTube transcripts.
+"""
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from groq_processor import GroqContentProcessor
+
+
+def _video_article(minutes=60):
+    snippets = [
+        {'text': f'sentence number {i} about the topic of the lecture', 'start': i * 5.0, 'duration': 5.0}
+        for i in range(minutes * 12)
+    ]
+    return {
+        'title': 'Long Lecture',
+        'url': 'https://www.youtube.com/watch?v=abcdefghijk',
+        'source': 'youtube',
+        'video_id': 'abcdefghijk',
+        'content': ' '.join(s['text'] for s in snippets),
+        'raw_transcript': snippets,
+    }
+
+
+class TestLongTranscripts(unittest.TestCase):
+    """Long transcripts are chunked by timestamp, summarized per chunk and merged."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        cache_file = os.path.join(self.tmpdir.name, 'summary_cache.json')
+        with mock.patch.dict(os.environ, {'GROQ_SUMMARY_CACHE_FILE': cache_file}):
+            self.processor = GroqContentProcessor(api_key='test-key')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_chunks_are_time_aligned_and_cover_whole_video(self):
+        article = _video_article()
+        chunks = self.processor._chunk_transcript(article)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(chunks[0]['start'], 0.0)
+        self.assertEqual(chunks[-1]['end'], 3600.0)
+        for previous, current in zip(chunks, chunks[1:]):
+            self.assertEqual(previous['end'], current['start'])
+
+    def test_summary_covers_all_chunks_and_reuses_cache(self):
+        article = _video_article()
+        chunk_count = len(self.processor._chunk_transcript(article))
+        with mock.patch.object(self.processor, '_chat_completion', return_value='Part summary') as call:
+            summary = self.processor.summarize_article(article)
+        self.assertEqual(summary, 'Part summary')
+        self.assertEqual(call.call_count, chunk_count + 1)
+        last_part_prompt = [c.args[0] for c in call.call_args_list if f'part {chunk_count} of' in c.args[0]]
+        self.assertTrue(last_part_prompt and '-1:00:00' in last_part_prompt[0])
+
+        with mock.patch.object(self.processor, '_chat_completion', return_value='Part summary') as call:
+            self.processor.summarize_article(article)
+        self.assertEqual(call.call_count, 0)
+
+    def test_short_transcripts_use_single_call(self):
+        article = _video_article(minutes=2)
+        with mock.patch.object(self.processor, '_chat_completion', return_value='Summary') as call:
+            self.processor.summarize_article(article)
+        self.assertEqual(call.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
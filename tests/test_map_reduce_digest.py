@@ -0,0 +1,79 @@
+"""
+Tests for hierarchical (map-reduce) digest generation.
+"""
+import re
+import time
+import unittest
+import sys
+import os
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from groq_processor import GroqContentProcessor
+
+
+def _fake_completion(user_prompt, system_prompt="", temperature=0.3, max_tokens=800):
+    """Echo one section per article in the prompt, or an intro/closing for the reduce step."""
+    if 'INTRO:' in user_prompt:
+        return "INTRO:\n## Overview\nThemes of the day.\nCLOSING:\nSee you tomorrow."
+    sections = []
+    for title, url in re.findall(r"Title: (.+)\nURL: (.+)\n", user_prompt):
+        sections.append(f"### {title}\n\nSummary of {title}.\n\n*Source: [{title}]({url})*")
+    return "\n\n".join(sections)
+
+
+class TestMapReduceDigest(unittest.TestCase):
+    """Map-reduce digest keeps every article and drafts sections concurrently."""
+
+    def setUp(self):
+        self.processor = GroqContentProcessor(api_key='test-key')
+        self.articles = [
+            {'title': f'Story {i}', 'url': f'https://example.com/{i}', 'summary': f'Summary text for story {i}. ' * 5}
+            for i in range(1, 33)
+        ]
+
+    def test_large_sets_use_hierarchical_mode_and_keep_all_articles(self):
+        with mock.patch.object(self.processor, '_chat_completion', side_effect=_fake_completion) as call:
+            digest = self.processor.create_digest(self.articles, "Daily", "casual")
+        chunks = -(-len(self.articles) // self.processor.digest_chunk_size)
+        self.assertEqual(call.call_count, chunks + 1)
+        for i in range(1, 33):
+            self.assertIn(f"*Source: [Story {i}](https://example.com/{i})*", digest)
+        self.assertIn("## Overview", digest)
+        self.assertTrue(digest.startswith("# Daily"))
+
+    def test_small_sets_use_single_pass(self):
+        with mock.patch.object(self.processor, '_chat_completion', return_value="### Story 1") as call:
+            self.processor.create_digest(self.articles[:3], "Daily")
+        self.assertEqual(call.call_count, 1)
+
+    def test_sections_are_drafted_concurrently(self):
+        def slow_completion(*args, **kwargs):
+            time.sleep(0.2)
+            return _fake_completion(*args, **kwargs)
+
+        self.processor.max_concurrency = 8
+        with mock.patch.object(self.processor, '_chat_completion', side_effect=slow_completion):
+            started = time.time()
+            self.processor.create_digest(self.articles, "Daily", hierarchical=True)
+            elapsed = time.time() - started
+        # 6 concurrent section drafts, then the reduce call: two rounds, not 7 sequential calls
+        self.assertLess(elapsed, 0.2 * 4)
+
+    def test_reduce_reads_the_drafted_sections(self):
+        prompts = []
+
+        def record(user_prompt, *args, **kwargs):
+            prompts.append(user_prompt)
+            return _fake_completion(user_prompt, *args, **kwargs)
+
+        with mock.patch.object(self.processor, '_chat_completion', side_effect=record):
+            self.processor.create_digest(self.articles, "Daily", "casual", hierarchical=True)
+        self.assertIn('INTRO:', prompts[-1])
+        self.assertIn('Summary of Story 1.', prompts[-1])
+        self.assertIn('Summary of Story 32.', prompts[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
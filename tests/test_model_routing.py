@@ -0,0 +1,127 @@
+"""
+Tests for per-call model routing and rate-limit fallback.
+"""
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+from groq_processor import GroqContentProcessor
+from groq_standin_server import GroqStandinServer, StandinConfig
+from llm_metrics import usage_context
+from model_routing import ModelRouter
+
+
+class TestModelRouter(unittest.TestCase):
+    """Routing by stage and input size."""
+
+    def setUp(self):
+        self.router = ModelRouter('small', stage_models={'summaries': 'small', 'digest': 'large'},
+                                  large_input_model='long', large_input_tokens=1000)
+
+    def test_routes_by_stage_then_size(self):
+        self.assertEqual(self.router.route('summaries', 100), ('small', 'stage:summaries'))
+        self.assertEqual(self.router.route('digest', 100), ('large', 'stage:digest'))
+        self.assertEqual(self.router.route(None, 100), ('small', 'default'))
+        self.assertEqual(self.router.route('summaries', 5000), ('long', 'large_input'))
+
+    def test_fallback_prefers_configured_model(self):
+        self.assertEqual(self.router.fallback_for('large'), 'small')
+        self.assertIsNone(self.router.fallback_for('small'))
+        self.router.fallback_model = 'backup'
+        self.assertEqual(self.router.fallback_for('small'), 'backup')
+
+    def test_from_env(self):
+        with mock.patch.dict(os.environ, {'GROQ_DIGEST_MODEL': 'big', 'GROQ_SUMMARY_MODEL': 'tiny'}):
+            router = ModelRouter.from_env('default')
+        self.assertEqual(router.model_for('digest'), 'big')
+        self.assertEqual(router.model_for('summaries'), 'tiny')
+        self.assertEqual(router.model_for('insights'), 'default')
+
+    def test_from_env_uses_default_model_for_every_route(self):
+        env = {name: '' for name in ('GROQ_SUMMARY_MODEL', 'GROQ_DIGEST_MODEL', 'GROQ_INSIGHTS_MODEL',
+                                     'GROQ_LARGE_INPUT_MODEL', 'GROQ_FALLBACK_MODEL')}
+        with mock.patch.dict(os.environ, {**env, 'GROQ_MODEL': 'configured'}):
+            processor = GroqContentProcessor(api_key='test-key')
+        for stage in ('summaries', 'digest', 'insights', None):
+            self.assertEqual(processor.router.route(stage, 100000)[0], 'configured')
+        self.assertIsNone(processor.router.fallback_for('configured'))
+
+
+class TestRoutedCompletions(unittest.TestCase):
+    """Processor calls use the routed model and fall back when it stays rate limited."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        # One request per model per window: the second call to a model is rate limited
+        self.server = GroqStandinServer(config=StandinConfig(rate_limit=1, rate_window=30)).start()
+        env = {
+            'GROQ_BASE_URL': self.server.base_url,
+            'GROQ_SUMMARY_CACHE_FILE': os.path.join(self.tmpdir.name, 'summary_cache.json'),
+            'GROQ_MODEL': 'small-model',
+            'GROQ_DIGEST_MODEL': 'large-model',
+        }
+        with mock.patch.dict(os.environ, env):
+            self.processor = GroqContentProcessor(api_key='test-key')
+        self.processor.client = None
+        self.processor.max_retries = 0
+
+    def tearDown(self):
+        self.server.stop()
+        self.tmpdir.cleanup()
+
+    def test_digest_falls_back_and_routes_are_accounted(self):
+        run_id = self.processor.usage.new_run_id()
+        with usage_context(run=run_id, stage='digest'):
+            self.processor._chat_completion("Write the digest.")
+            self.processor._chat_completion("Write the digest again.")
+        usage = self.processor.usage.finish_run(run_id)
+
+        self.assertEqual(usage['by_route']['stage:digest']['calls'], 2)
+        self.assertEqual(usage['by_route']['stage:digest']['failed_calls'], 1)
+        self.assertEqual(usage['by_route']['fallback:large-model']['calls'], 1)
+        self.assertEqual(set(usage['by_model']), {'large-model', 'small-model'})
+
+    def test_rate_limit_without_fallback_raises(self):
+        with usage_context(stage='summaries'):
+            self.processor._chat_completion("Summarize.")
+            with self.assertRaises(Exception):
+                self.processor._chat_completion("Summarize again.")
+
+
+    def _sdk_processor(self):
+        with mock.patch.dict(os.environ, {'GROQ_BASE_URL': self.server.base_url, 'GROQ_MODEL': 'small-model',
+                                          'GROQ_DIGEST_MODEL': 'large-model'}):
+            processor = GroqContentProcessor(api_key='test-key')
+        self.assertEqual(processor.client.max_retries, 0)
+        processor.max_retries = 0
+        return processor
+
+    def test_sdk_rate_limit_falls_back_without_reposting(self):
+        # A RateLimitError on the SDK path is penalized and routed like an HTTP 429
+        for stream in (False, True):
+            with self.subTest(stream=stream):
+                self.server.stop()
+                self.server = GroqStandinServer(config=StandinConfig(rate_limit=1, rate_window=30)).start()
+                processor = self._sdk_processor()
+                run_id = processor.usage.new_run_id()
+                with usage_context(run=run_id, stage='digest'):
+                    processor._chat_completion("Write the digest.")
+                    if stream:
+                        self.assertTrue(''.join(processor._chat_completion_stream("Write the digest again.")))
+                    else:
+                        self.assertTrue(processor._chat_completion("Write the digest again."))
+                usage = processor.usage.finish_run(run_id)
+
+                self.assertEqual(self.server.stats['requests'], 3)
+                self.assertEqual(self.server.stats['rate_limited'], 1)
+                self.assertEqual(usage['by_route']['fallback:large-model']['calls'], 1)
+                self.assertTrue(processor._rate_limiter_for('large-model').is_saturated())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+Tests for the offline extractive fast path.
+"""
+import os
+import sys
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extractive import top_sentences
+from groq_processor import GroqContentProcessor
+
+BANNER = "We use cookies to improve your experience. Accept all cookies.\nSign up for our newsletter today.\n"
+
+
+def _article(i):
+    body = " ".join(
+        f"The open model release {i} cut inference cost by {n} percent in benchmark {n}." for n in range(1, 30)
+    )
+    return {'title': f'Release {i}', 'url': f'https://example.com/{i}', 'content': BANNER + body}
+
+
+class TestOfflineDigest(unittest.TestCase):
+    """Offline summaries and digests are extractive, styled and make no network calls."""
+
+    def setUp(self):
+        self.processor = GroqContentProcessor(api_key='test-key')
+        self.articles = [_article(i) for i in range(1, 31)]
+
+    def test_top_sentences_skip_boilerplate_and_keep_order(self):
+        sentences = top_sentences(self.articles[0]['content'], count=3)
+        self.assertEqual(len(sentences), 3)
+        self.assertFalse(any('cookies' in s for s in sentences))
+        numbers = [int(s.rstrip('.').split()[-1]) for s in sentences]
+        self.assertEqual(numbers, sorted(numbers))
+
+    def test_offline_pipeline_makes_no_network_calls(self):
+        with mock.patch.object(self.processor, '_chat_completion') as call, \
+                mock.patch('groq_processor.requests.post') as post:
+            started = time.monotonic()
+            processed = self.processor.process_multiple_articles(self.articles, offline=True)
+            digest = self.processor.create_digest(processed, "Daily", writing_style='technical', offline=True)
+            elapsed = time.monotonic() - started
+        self.assertEqual((call.call_count, post.call_count), (0, 0))
+        self.assertLess(elapsed, 2.0)
+        self.assertIn('### 30. Release 30', digest)
+        self.assertIn('**Key points**', digest)
+        self.assertIn('*Source: [Release 1](https://example.com/1)*', digest)
+        self.assertNotIn('cookies', digest)
+
+    def test_auto_mode_skips_llm_when_rate_limited(self):
+        self.processor.offline_mode = 'auto'
+        limiter = self.processor._rate_limiter_for(self.processor.router.model_for('summaries'))
+        limiter.penalize(30)
+        with mock.patch.object(self.processor, '_chat_completion') as call:
+            summary = self.processor.summarize_article(self.articles[0])
+        self.assertEqual(call.call_count, 0)
+        self.assertIn('*Source: [Release 1](https://example.com/1)*', summary)
+        self.assertNotIn('cookies', summary)
+
+    def test_failed_digest_call_falls_back_to_offline_digest(self):
+        articles = self.articles[:3]
+        with mock.patch.object(self.processor, '_chat_completion', side_effect=RuntimeError('rate limited')):
+            digest = self.processor.create_digest(articles, "Daily", writing_style='casual', hierarchical=False)
+        self.assertIn('# Daily', digest)
+        self.assertIn('### Release 2', digest)
+        self.assertIn('benchmark', digest)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+Tests for packed multi-article summarization.
+"""
+import json
+import unittest
+import sys
+import os
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from groq_processor import GroqContentProcessor, PACK_MAX_ARTICLES, PACK_SUMMARY_TOKENS
+
+
+def _article(i, words=40):
+    return {
+        'title': f'Article {i}',
+        'url': f'https://example.com/{i}',
+        'content': ' '.join(['word'] * words),
+    }
+
+
+class TestPackedSummaries(unittest.TestCase):
+    """Packing, parsing and fallback behaviour."""
+
+    def setUp(self):
+        self.processor = GroqContentProcessor(api_key='test-key')
+
+    def test_parse_accepts_code_fences(self):
+        response = '```json\n{"1": "First", "2": "Second"}\n```'
+        self.assertEqual(self.processor._parse_packed_summaries(response, 2), {1: 'First', 2: 'Second'})
+
+    def test_parse_rejects_invalid_json(self):
+        self.assertIsNone(self.processor._parse_packed_summaries('Here are your summaries: 1. ...', 2))
+
+    def test_short_articles_share_one_request(self):
+        articles = [_article(i) for i in range(1, 5)]
+        response = json.dumps({str(i): f'Summary {i}' for i in range(1, 5)})
+        with mock.patch.object(self.processor, '_chat_completion', return_value=response) as call:
+            processed = self.processor.process_multiple_articles(articles, packed=True)
+        self.assertEqual(call.call_count, 1)
+        self.assertEqual([a['summary'] for a in processed], [f'Summary {i}' for i in range(1, 5)])
+
+    def test_missing_entries_fall_back_to_single_calls(self):
+        articles = [_article(i) for i in range(1, 4)]
+        responses = [json.dumps({'1': 'Packed 1', '3': 'Packed 3'}), 'Single 2']
+        with mock.patch.object(self.processor, '_chat_completion', side_effect=responses) as call:
+            summaries = self.processor.summarize_articles_packed(articles)
+        self.assertEqual(call.call_count, 2)
+        self.assertEqual(summaries, ['Packed 1', 'Single 2', 'Packed 3'])
+
+    def test_parse_recovers_truncated_response(self):
+        response = '{"1": "First summary", "2": "Second, with a \\"quote\\"", "3": "Third summ'
+        self.assertEqual(self.processor._parse_packed_summaries(response, 3),
+                         {1: 'First summary', 2: 'Second, with a "quote"'})
+
+    def test_bins_fit_the_completion_cap(self):
+        articles = [_article(i, words=80) for i in range(1, 61)]
+        bins = self.processor._bin_articles_for_packing(list(enumerate(articles)), self.processor.pack_token_budget)
+        self.assertEqual(sum(len(b) for b in bins), 60)
+        for pack in bins:
+            self.assertLessEqual(len(pack), PACK_MAX_ARTICLES)
+            _, max_tokens = self.processor._build_pack_prompt([a for _, a in pack])
+            self.assertGreaterEqual(max_tokens, PACK_SUMMARY_TOKENS * len(pack))
+
+    def test_long_articles_are_not_packed(self):
+        articles = [_article(1, words=2000), _article(2, words=2000)]
+        with mock.patch.object(self.processor, '_chat_completion', return_value='Single') as call:
+            self.processor.summarize_articles_packed(articles)
+        self.assertEqual(call.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
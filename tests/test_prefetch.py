@@ -0,0 +1,73 @@
+"""
+Tests for prefetching sources ahead of scheduled delivery.
+"""
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from content_pipeline import ContentPipeline
+
+
+class TestPrefetch(unittest.TestCase):
+    """Delivery after a prefetch only tops up new items, assembles and sends."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        cache_file = os.path.join(self.tmpdir.name, 'summary_cache.json')
+        with mock.patch.dict(os.environ, {'GROQ_SUMMARY_CACHE_FILE': cache_file}):
+            self.pipeline = ContentPipeline(groq_api_key='test-key', resend_api_key='test-key')
+        self.items = ['one', 'two']
+        self.fetch_modes = []
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _feed(self, rss_url, max_items, force_fresh=True):
+        self.fetch_modes.append(force_fresh)
+        return [{'title': f'Story {name}', 'url': f'https://example.com/{name}?utm_source=rss',
+                 'content': f'Story {name} describes a model launch and what it costs.'} for name in self.items]
+
+    def _patches(self):
+        def summarize(articles, **kwargs):
+            return [{**a, 'summary': f"Summary of {a['title']}"} for a in articles]
+
+        return (mock.patch.object(self.pipeline.scraper, 'scrape_rss_feed', side_effect=self._feed),
+                mock.patch.object(self.pipeline.processor, 'process_multiple_articles', side_effect=summarize),
+                mock.patch.object(self.pipeline.email_sender, 'send_content_digest', return_value={'id': 'sent'}))
+
+    def test_delivery_reuses_prefetched_summaries(self):
+        feed, process, send = self._patches()
+        with feed, process as summarize, send:
+            prefetched = self.pipeline.prefetch_sources(rss_urls=['https://feeds/ai'], template_digest=True)
+            self.assertEqual(len(prefetched['articles']), 2)
+            self.items.append('three')
+            deliver_at = datetime.now() - timedelta(seconds=5)
+            results = self.pipeline.process_mixed_sources(
+                rss_urls=['https://feeds/ai'], email_recipients=['reader@example.com'], template_digest=True,
+                prefetched=prefetched, deliver_at=deliver_at
+            )
+        self.assertEqual(self.fetch_modes, [True, False])
+        self.assertEqual([a['title'] for a in summarize.call_args.args[0]], ['Story three'])
+        self.assertEqual([a['title'] for a in results['articles']], ['Story one', 'Story two', 'Story three'])
+        self.assertEqual(results['prefetched'], 2)
+        self.assertGreaterEqual(results['delivery_lateness_seconds'], 5)
+
+    def test_without_prefetch_everything_is_summarized(self):
+        feed, process, send = self._patches()
+        with feed, process as summarize, send:
+            results = self.pipeline.process_mixed_sources(rss_urls=['https://feeds/ai'], template_digest=True)
+        self.assertEqual(len(summarize.call_args.args[0]), 2)
+        self.assertEqual(results['prefetched'], 0)
+        self.assertIsNone(results['delivery_lateness_seconds'])
+
+    def test_failed_prefetch_is_ignored(self):
+        self.assertEqual(ContentPipeline._prefetched_summaries({'success': False, 'articles': []}), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
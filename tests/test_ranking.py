@@ -0,0 +1,101 @@
+"""
+Tests for local relevance ranking and top-K selection before summarization.
+"""
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from content_pipeline import ContentPipeline
+from local_storage import LocalStorage
+from ranking import RankingConfig, score_articles, select_top_k
+
+BODY = " ".join(f"Sentence {n} explains how the new inference server cuts serving costs for large models." for n in range(40))
+
+
+def _article(name, hours_old=1, content=BODY, url=None):
+    return {'title': name, 'url': url or f'https://example.com/{name.replace(" ", "-").lower()}', 'content': content,
+            'publish_date': (datetime.now() - timedelta(hours=hours_old)).isoformat()}
+
+
+class TestRanking(unittest.TestCase):
+    """Articles are scored locally and only the best are summarized."""
+
+    def test_features_prefer_fresh_substantive_matching_and_novel_items(self):
+        articles = [
+            _article('Fresh inference news', hours_old=1),
+            _article('Old inference news', hours_old=24 * 7),
+            _article('Stub page', content="Error: page could not be loaded"),
+            _article('Gardening tips', content=BODY.replace('inference server', 'tomato garden')),
+            _article('Inference server cuts costs'),
+        ]
+        config = RankingConfig(keywords=['inference'])
+        scores = score_articles(articles, config, delivered_titles=['Inference server cuts costs'])
+        self.assertGreater(scores.at[0, 'freshness'], scores.at[1, 'freshness'])
+        self.assertEqual(scores.at[2, 'quality'], 0.0)
+        self.assertEqual(scores.at[3, 'keywords'], 0.0)
+        self.assertLess(scores.at[4, 'novelty'], 0.1)
+        self.assertEqual(scores['score'].idxmax(), 0)
+
+    def test_top_k_keeps_digest_order(self):
+        articles = [_article('Old', hours_old=200), _article('Newest', hours_old=1), _article('Newer', hours_old=5)]
+        selected, report = select_top_k(articles, RankingConfig(top_k=2))
+        self.assertEqual([a['title'] for a in selected], ['Newest', 'Newer'])
+        self.assertEqual(report['dropped'][0]['title'], 'Old')
+        self.assertIn('relevance_score', selected[0])
+
+    def test_token_budget_limits_selection(self):
+        articles = [_article(f'Story {n}', hours_old=n + 1) for n in range(5)]
+        per_article = score_articles(articles, RankingConfig())['tokens'].iloc[0]
+        selected, report = select_top_k(articles, RankingConfig(token_budget=int(per_article * 2.5)))
+        self.assertEqual([a['title'] for a in selected], ['Story 0', 'Story 1'])
+        self.assertLessEqual(report['estimated_tokens'], per_article * 2.5)
+
+    def test_source_weights_match_parent_domains(self):
+        articles = [_article('Blog', url='https://blog.openai.com/a'), _article('Other', url='https://other.com/a')]
+        scores = score_articles(articles, RankingConfig(source_weights={'openai.com': 2}))
+        self.assertEqual(list(scores['source']), [1.0, 0.5])
+
+    def test_user_settings_override_env_defaults(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = LocalStorage()
+            storage.users_file = os.path.join(tmpdir, 'users.json')
+            storage.save_user('u1', {'ranking': {'top_k': 3, 'weights': {'novelty': 2}}})
+            with mock.patch.dict(os.environ, {'RANKING_TOP_K': '10', 'RANKING_KEYWORDS': 'ai,robots'}):
+                config = RankingConfig.for_user('u1', storage=storage, overrides={'token_budget': 5000})
+        self.assertEqual((config.top_k, config.token_budget), (3, 5000))
+        self.assertEqual(config.weights['novelty'], 2.0)
+        self.assertEqual(config.keywords, ['ai', 'robots'])
+
+    def _run_top_k(self, **kwargs):
+        with tempfile.TemporaryDirectory() as tmpdir, \
+                mock.patch.dict(os.environ, {'GROQ_SUMMARY_CACHE_FILE': os.path.join(tmpdir, 'cache.json')}):
+            pipeline = ContentPipeline(groq_api_key='test-key', resend_api_key='test-key')
+            feed = [_article(f'Story {n}', hours_old=n * 10 + 1) for n in range(6)]
+            with mock.patch.object(pipeline.scraper, 'scrape_rss_feed', return_value=feed), \
+                    mock.patch.object(pipeline.processor, 'process_multiple_articles',
+                                      side_effect=lambda articles, **kwargs: articles) as process:
+                results = pipeline.process_mixed_sources(rss_urls=['https://example.com/feed'], offline=True,
+                                                         ranking={'top_k': 2}, **kwargs)
+        return results, process
+
+    def test_pipeline_summarizes_only_top_k(self):
+        results, process = self._run_top_k()
+        self.assertTrue(results['success'])
+        self.assertEqual([a['title'] for a in process.call_args.args[0]], ['Story 0', 'Story 1'])
+        self.assertEqual((results['ranking']['considered'], results['ranking']['selected']), (6, 2))
+
+    def test_ranking_turns_streaming_off(self):
+        results, process = self._run_top_k(streaming=True)
+        self.assertTrue(results['success'])
+        self.assertIsNone(results['stages'])
+        process.assert_called_once()
+        self.assertEqual([a['title'] for a in process.call_args.args[0]], ['Story 0', 'Story 1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+Tests for deadline-aware pipeline runs.
+"""
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from content_pipeline import ContentPipeline
+from run_budget import RunBudget
+
+
+def _articles(name, count=1):
+    body = " ".join(f"The {name} update improved throughput by {n} percent in test {n}." for n in range(1, 12))
+    return [{'title': f'{name} {i}', 'url': f'https://example.com/{name}/{i}', 'content': body} for i in range(count)]
+
+
+class TestRunBudget(unittest.TestCase):
+    """Budgets order fetches, drop stragglers and degrade summaries and digest."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        env = {'GROQ_SUMMARY_CACHE_FILE': os.path.join(self.tmpdir.name, 'summary_cache.json'),
+               'PIPELINE_FETCH_SHARE': '0.3', 'PIPELINE_SUMMARY_SHARE': '0.4'}
+        self.env = mock.patch.dict(os.environ, env)
+        self.env.start()
+        self.pipeline = ContentPipeline(groq_api_key='test-key', resend_api_key='test-key')
+        self.fetched = []
+
+    def tearDown(self):
+        self.env.stop()
+        self.tmpdir.cleanup()
+
+    def _mock_sources(self, slow=(), delay=3.0):
+        def fetcher(family):
+            def fetch(source, *args, **kwargs):
+                source = source[0] if isinstance(source, list) else source
+                self.fetched.append(source)
+                if source in slow:
+                    time.sleep(delay)
+                return _articles(source.rsplit('/', 1)[-1])
+            return fetch
+
+        return [
+            mock.patch.object(self.pipeline.scraper, 'scrape_multiple_urls', side_effect=fetcher('urls')),
+            mock.patch.object(self.pipeline.scraper, 'scrape_rss_feed', side_effect=fetcher('rss')),
+            mock.patch.object(self.pipeline.twitter_processor, 'process_twitter_sources', side_effect=fetcher('twitter')),
+        ]
+
+    def _run(self, patches, **kwargs):
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        return self.pipeline.process_mixed_sources(
+            urls=['https://site/web'], rss_urls=['https://site/feed'], twitter_urls=['https://x.com/tweets'],
+            digest_title="Daily", **kwargs
+        )
+
+    def test_fetches_by_priority_but_keeps_digest_order(self):
+        self.pipeline.fetch_concurrency = 1
+        results = self._run(self._mock_sources(), offline=True, time_budget=30,
+                            source_priority=['twitter', 'rss', 'urls'])
+        self.assertTrue(results['success'])
+        self.assertEqual(self.fetched, ['https://x.com/tweets', 'https://site/feed', 'https://site/web'])
+        self.assertEqual([a['title'] for a in results['articles']], ['web 0', 'feed 0', 'tweets 0'])
+        self.assertEqual(results['budget']['dropped'], [])
+
+    def test_straggler_is_cancelled_and_later_sources_skipped(self):
+        self.pipeline.fetch_concurrency = 1
+        started = time.monotonic()
+        results = self._run(self._mock_sources(slow={'https://site/feed'}), offline=True, time_budget=1.0,
+                            source_priority=['urls', 'rss', 'twitter'])
+        elapsed = time.monotonic() - started
+        self.assertLess(elapsed, 1.5)
+        self.assertTrue(results['success'])
+        self.assertEqual([a['title'] for a in results['articles']], ['web 0'])
+        dropped = {d['source']: d['reason'] for d in results['budget']['dropped']}
+        self.assertTrue(dropped['https://site/feed'].startswith('cancelled'))
+        self.assertTrue(dropped['https://x.com/tweets'].startswith('skipped'))
+
+    def test_hung_llm_summaries_degrade_to_offline_digest(self):
+        def hung_completion(*args, **kwargs):
+            time.sleep(3.0)
+            return "never used"
+
+        with mock.patch.object(self.pipeline.processor, '_chat_completion', side_effect=hung_completion):
+            started = time.monotonic()
+            results = self._run(self._mock_sources(), time_budget=1.0, include_insights=True)
+            elapsed = time.monotonic() - started
+        self.assertLess(elapsed, 1.5)
+        self.assertTrue(results['success'])
+        degraded = [(d['stage'], d['mode']) for d in results['budget']['degraded']]
+        self.assertEqual(degraded, [('summaries', 'offline'), ('digest', 'offline'), ('insights', 'skipped')])
+        self.assertIn('# Daily', results['digest_content'])
+        self.assertIn('throughput', results['digest_content'])
+        self.assertEqual(results['insights'], "")
+
+    def test_late_summaries_are_packed(self):
+        budget = RunBudget(10.0, fetch_share=0.3, summary_share=0.4)
+        budget.started -= 5.5
+        with mock.patch.object(self.pipeline.processor, 'process_multiple_articles',
+                               side_effect=lambda articles, **kwargs: articles) as process:
+            self.pipeline._summarize_within_budget(_articles('late'), budget, offline=None)
+        self.assertTrue(process.call_args.kwargs['packed'])
+        self.assertEqual(budget.report()['degraded'][0]['mode'], 'packed')
+
+    def test_no_budget_runs_everything(self):
+        results = self._run(self._mock_sources(), offline=True)
+        self.assertEqual(len(results['articles']), 3)
+        self.assertIsNone(results['budget']['budget_seconds'])
+        self.assertEqual((results['budget']['dropped'], results['budget']['degraded']), ([], []))
+
+
+if __name__ == '__main__':
+    unittest.main()
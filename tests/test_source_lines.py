@@ -0,0 +1,97 @@
+"""
+Property tests for the single-pass source-line post-processor.
+"""
+import os
+import random
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+from bench_source_lines import build_digest, legacy_normalize_source_lines
+from groq_processor import GroqContentProcessor
+
+
+def _random_line(rng: random.Random, n: int) -> str:
+    """One digest line; source lines start at column 0 as the prompts and templates produce them."""
+    url = rng.choice([n, n, n + 1])
+    return rng.choice([
+        f"### Article {n}: Story {n}",
+        f"### Article {n}: ",
+        f"### Article {n}:",
+        "### Key Takeaways",
+        "## Overview",
+        "",
+        "",
+        "Plain paragraph text.",
+        "A line with *emphasis* and **bold**.",
+        "*Generated on 2024-01-01 at 08:00:00*",
+        "- bullet point",
+        f"*Source: [Story {n}](https://example.com/{url})*",
+        f"*Source: [Story {n}](https://example.com/{url})*",
+        f"*Source: [Story {n}](https://example.com/{url}) - Example Channel*",
+        "*Source: Example Blog*",
+        "*Source:*",
+        "\r",
+    ])
+
+
+def _random_digest(rng: random.Random) -> str:
+    lines = []
+    article = 1
+    for _ in range(rng.randint(0, 40)):
+        line = _random_line(rng, article)
+        if line.startswith("### Article"):
+            article += 1
+        # Source lines are often repeated back to back by the LLM
+        lines.extend([line] * (rng.randint(1, 3) if line.startswith("*Source") else 1))
+    text = "\n".join(lines)
+    if rng.random() < 0.3:
+        text += "\n"
+    if rng.random() < 0.2:
+        text = text.replace("\n", "\r\n")
+    return text
+
+
+class TestSourceLineNormalization(unittest.TestCase):
+    """The line state machine matches the previous regex implementation."""
+
+    def setUp(self):
+        self.processor = GroqContentProcessor(api_key='test-key')
+
+    def test_equivalent_to_legacy_on_random_digests(self):
+        rng = random.Random(1234)
+        for case in range(3000):
+            text = _random_digest(rng)
+            self.assertEqual(self.processor._normalize_source_lines(text), legacy_normalize_source_lines(text),
+                             f"case {case}: {text!r}")
+
+    def test_equivalent_to_legacy_on_large_digest(self):
+        digest = build_digest(300)
+        self.assertEqual(self.processor._normalize_source_lines(digest), legacy_normalize_source_lines(digest))
+
+    def test_one_canonical_source_per_article(self):
+        text = "\n".join([
+            "### Article 1: One",
+            "Body.",
+            "*Source: [One](https://example.com/1) - Channel*",
+            "*Source: [One](https://example.com/1)*",
+            "### Article 2: Two",
+            "*Source: Two Blog*",
+            "Body.",
+        ])
+        normalized = self.processor._normalize_source_lines(text)
+        self.assertEqual(normalized.count("*Source: [One](https://example.com/1)*"), 1)
+        self.assertNotIn("Channel", normalized)
+        self.assertNotIn("Two Blog", normalized)
+
+    def test_indented_source_lines_are_treated_as_source_lines(self):
+        text = "### Article 1: One\nBody.\n  *Source: [One](https://example.com/1)*  \n"
+        normalized = self.processor._normalize_source_lines(text)
+        self.assertEqual(normalized, "### Article 1: One\nBody.\n\n*Source: [One](https://example.com/1)*\n\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Integration tests running GroqContentProcessor against the local Groq stand-in server.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+from groq_processor import GroqContentProcessor
+from groq_standin_server import GroqStandinServer, StandinConfig
+
+
+class TestStandinServer(unittest.TestCase):
+    """The processor talks to the stand-in over HTTP exactly as it would to Groq."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.articles = [
+            {'title': f'Story {i}', 'url': f'https://example.com/{i}', 'content': f'Body of story {i}. ' * 20}
+            for i in range(1, 5)
+        ]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _start(self, **config):
+        server = GroqStandinServer(config=StandinConfig(**config)).start()
+        self.addCleanup(server.stop)
+        env = {
+            'GROQ_BASE_URL': server.base_url,
+            'GROQ_SUMMARY_CACHE_FILE': os.path.join(self.tmpdir.name, 'summary_cache.json'),
+        }
+        with mock.patch.dict(os.environ, env):
+            processor = GroqContentProcessor(api_key='test-key')
+        processor.client = None  # exercise the HTTP path deterministically
+        return server, processor
+
+    def test_base_url_is_used(self):
+        server, processor = self._start()
+        self.assertEqual(processor.api_url, f"{server.base_url}/openai/v1/chat/completions")
+        summary = processor.summarize_article(self.articles[0])
+        self.assertEqual(summary, processor.summarize_article(self.articles[0]))
+        self.assertEqual(server.stats['completed'], 2)
+
+    def test_429_is_retried_after_retry_after(self):
+        server, processor = self._start(rate_limit=2, rate_window=0.2)
+        processed = processor.process_multiple_articles(self.articles)
+        self.assertGreater(server.stats['rate_limited'], 0)
+        self.assertEqual(server.stats['completed'], len(self.articles))
+        for article in processed:
+            self.assertNotIn('Error generating summary', article['summary'])
+
+    def test_context_overflow_is_retried_with_shorter_prompt(self):
+        server, processor = self._start(context_tokens=1200)
+        article = {'title': 'Long', 'url': 'https://example.com/long', 'content': 'word ' * 4000}
+        processor.summarize_article(article)
+        self.assertEqual(server.stats['context_exceeded'], 1)
+        self.assertEqual(server.stats['completed'], 1)
+
+    def test_structured_summaries_are_parsed(self):
+        server, processor = self._start()
+        with self.assertNoLogs('groq_processor', level='WARNING'):
+            fields = processor.summarize_article_structured(self.articles[0])
+        self.assertTrue(fields['headline'])
+        self.assertEqual(len(fields['key_points']), 3)
+        self.assertTrue(fields['why_it_matters'])
+        self.assertEqual(server.stats['completed'], 1)
+
+    def test_stream_matches_plain_completion(self):
+        server, processor = self._start(tokens_per_second=2000)
+        streamed = "".join(processor._chat_completion_stream("Summarize this please."))
+        self.assertEqual(streamed, processor._chat_completion("Summarize this please."))
+        self.assertEqual(server.stats['streamed'], 1)
+
+    def test_async_api_against_server(self):
+        server, processor = self._start(latency_ms=20, latency_jitter_ms=5, latency_dist='lognormal')
+
+        async def run():
+            try:
+                return await processor.aprocess_multiple_articles(self.articles)
+            finally:
+                await processor.aclose()
+
+        processed = asyncio.run(run())
+        self.assertEqual(len(processed), len(self.articles))
+        self.assertEqual(server.stats['completed'], len(self.articles))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Tests for the streaming (bounded-queue) pipeline mode.
+"""
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from content_pipeline import ContentPipeline
+from stream_pipeline import Stage, run_stages
+
+
+class TestRunStages(unittest.TestCase):
+    """Stages run concurrently, apply backpressure and report metrics."""
+
+    def test_outputs_and_metrics(self):
+        outputs, metrics = run_stages(range(5), [
+            Stage('double', lambda n: [n, n]),
+            Stage('odd', lambda n: [n] if n % 2 else [], workers=2),
+        ])
+        self.assertEqual(sorted(outputs), [1, 1, 3, 3])
+        self.assertEqual((metrics['double']['items_in'], metrics['double']['items_out']), (5, 10))
+        self.assertEqual((metrics['odd']['items_in'], metrics['odd']['items_out']), (10, 4))
+
+    def test_slow_consumer_blocks_producer(self):
+        def slow(n):
+            time.sleep(0.05)
+            return [n]
+
+        outputs, metrics = run_stages(range(10), [
+            Stage('produce', lambda n: [n]),
+            Stage('consume', slow, queue_size=1),
+        ])
+        self.assertEqual(sorted(outputs), list(range(10)))
+        self.assertGreater(metrics['produce']['blocked_seconds'], 0.2)
+        self.assertLessEqual(metrics['consume']['max_queue_depth'], 1)
+
+    def test_failing_item_is_counted_and_skipped(self):
+        def fragile(n):
+            if n == 2:
+                raise ValueError('bad item')
+            return [n]
+
+        outputs, metrics = run_stages(range(4), [Stage('fragile', fragile)])
+        self.assertEqual(sorted(outputs), [0, 1, 3])
+        self.assertEqual(metrics['fragile']['errors'], 1)
+
+
+class TestStreamingPipeline(unittest.TestCase):
+    """Streaming runs summarize while slower sources are still being fetched."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        cache_file = os.path.join(self.tmpdir.name, 'summary_cache.json')
+        with mock.patch.dict(os.environ, {'GROQ_SUMMARY_CACHE_FILE': cache_file}):
+            self.pipeline = ContentPipeline(groq_api_key='test-key', resend_api_key='test-key')
+        self.events = []
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _fetch(self, source, *args, **kwargs):
+        source = source[0] if isinstance(source, list) else source
+        if source.endswith('slow'):
+            time.sleep(0.5)
+        self.events.append(('fetched', source))
+        name = source.rsplit('/', 1)[-1]
+        article = {'title': name, 'url': f'https://example.com/{name}', 'content': f'  {name} story text about a model launch and its pricing.  '}
+        if name == 'dup':
+            time.sleep(0.1)  # the first copy to reach dedupe wins
+            article['url'] = 'https://example.com/fast/'
+        return [article, {'title': 'Error', 'url': source, 'content': 'Failed to scrape'}]
+
+    def _summarize(self, articles, **kwargs):
+        self.events.append(('summarized', articles[0]['title']))
+        return [{**article, 'summary': f"Summary of {article['title']}"} for article in articles]
+
+    def test_summaries_start_before_fetching_finishes(self):
+        with mock.patch.object(self.pipeline.scraper, 'scrape_multiple_urls', side_effect=self._fetch), \
+                mock.patch.object(self.pipeline.processor, 'process_multiple_articles', side_effect=self._summarize):
+            results = self.pipeline.process_mixed_sources(
+                urls=['https://site/slow', 'https://site/fast', 'https://site/dup'],
+                digest_title="Daily", streaming=True, template_digest=True,
+            )
+        self.assertTrue(results['success'])
+        self.assertLess(self.events.index(('summarized', 'fast')), self.events.index(('fetched', 'https://site/slow')))
+        # Digest order, failed scrapes dropped, duplicate URL dropped, content trimmed
+        self.assertEqual([a['title'] for a in results['articles']], ['slow', 'fast'])
+        self.assertEqual(results['articles'][1]['content'], 'fast story text about a model launch and its pricing.')
+        stages = results['stages']
+        self.assertEqual(list(stages), ['fetch', 'extract', 'dedupe', 'summarize'])
+        self.assertEqual((stages['extract']['items_in'], stages['extract']['items_out']), (6, 3))
+        self.assertEqual((stages['dedupe']['items_in'], stages['dedupe']['items_out']), (3, 2))
+        self.assertLess(stages['summarize']['first_output_at'], stages['fetch']['finished_at'])
+
+    def test_batch_mode_reports_no_stages(self):
+        with mock.patch.object(self.pipeline.scraper, 'scrape_multiple_urls', side_effect=self._fetch):
+            results = self.pipeline.process_mixed_sources(urls=['https://site/fast'], offline=True)
+        self.assertIsNone(results['stages'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+Tests for streaming completions and progressive digest rendering.
+"""
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from groq_processor import GroqContentProcessor
+
+
+class _FakeStreamResponse:
+    status_code = 200
+
+    def __init__(self, pieces):
+        self.lines = [f"data: {json.dumps({'choices': [{'delta': {'content': p}}]})}" for p in pieces]
+        self.lines += ["", "data: [DONE]"]
+        self.closed = False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self, decode_unicode=False):
+        return iter(self.lines)
+
+    def close(self):
+        self.closed = True
+
+
+class TestStreamingDigest(unittest.TestCase):
+    """Streaming over HTTP server-sent events and the create_digest on_token callback."""
+
+    def setUp(self):
+        self.processor = GroqContentProcessor(api_key='test-key')
+        self.processor.client = None  # force the HTTP path
+
+    def test_http_stream_yields_deltas(self):
+        response = _FakeStreamResponse(["Hello", " world"])
+        with mock.patch('groq_processor.requests.post', return_value=response) as post:
+            pieces = list(self.processor._chat_completion_stream("prompt"))
+        self.assertEqual(pieces, ["Hello", " world"])
+        self.assertTrue(post.call_args.kwargs['json']['stream'])
+        self.assertTrue(response.closed)
+
+    def test_create_digest_streams_and_returns_normalized_digest(self):
+        source = "*Source: [A](https://a.example)*\n"
+        pieces = ["### Article 1: A\n\nBody\n\n", source, source, source]
+        articles = [{'title': 'A', 'url': 'https://a.example', 'summary': 'x' * 60}]
+        received = []
+        with mock.patch.object(self.processor, '_chat_completion_stream', return_value=iter(pieces)):
+            digest = self.processor.create_digest(articles, "Daily", on_token=received.append)
+        self.assertTrue(received[0].startswith("# Daily"))
+        self.assertEqual(received[1:], pieces)
+        self.assertEqual(digest.count("*Source: [A](https://a.example)*"), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+Tests for structured summaries and template-only digest assembly.
+"""
+import asyncio
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from groq_processor import GroqContentProcessor
+
+
+def _article(i):
+    return {
+        'title': f'Article {i}',
+        'url': f'https://example.com/{i}',
+        'content': f'Article {i} describes a new open model release. ' * 10,
+    }
+
+
+def _structured_response(i, why="Cheaper inference for everyone."):
+    return json.dumps({
+        'headline': f'Headline {i}',
+        'key_points': [f'Point {i}a', f'Point {i}b'],
+        'why_it_matters': why,
+    })
+
+
+class TestTemplateDigest(unittest.TestCase):
+    """Structured fields are parsed and the digest is assembled without a second LLM pass."""
+
+    def setUp(self):
+        self.processor = GroqContentProcessor(api_key='test-key')
+        self.articles = [_article(i) for i in range(1, 4)]
+
+    def _structured(self):
+        responses = [_structured_response(i) for i in range(1, 4)]
+        with mock.patch.object(self.processor, '_chat_completion', side_effect=responses):
+            return self.processor.process_multiple_articles(self.articles, structured=True)
+
+    def test_parse_accepts_code_fences_and_string_points(self):
+        response = '```json\n{"headline": "H", "key_points": "- one\\n- two", "why_it_matters": "W"}\n```'
+        self.assertEqual(self.processor._parse_structured_summary(response),
+                         {'headline': 'H', 'key_points': ['one', 'two'], 'why_it_matters': 'W'})
+        self.assertIsNone(self.processor._parse_structured_summary('Here is a summary.'))
+
+    def test_unparseable_response_falls_back_locally(self):
+        with mock.patch.object(self.processor, '_chat_completion', return_value='not json'):
+            fields = self.processor.summarize_article_structured(self.articles[0])
+        self.assertEqual(fields['headline'], 'Article 1')
+        self.assertTrue(fields['key_points'])
+
+    def test_template_digest_makes_no_llm_calls(self):
+        processed = self._structured()
+        self.assertEqual(processed[0]['structured_summary']['headline'], 'Headline 1')
+        self.assertIn('- Point 1a', processed[0]['summary'])
+
+        tokens = []
+        with mock.patch.object(self.processor, '_chat_completion') as call:
+            digest = self.processor.create_digest(processed, "Daily", template=True, on_token=tokens.append)
+        self.assertEqual(call.call_count, 0)
+        self.assertEqual(tokens, [digest])
+        self.assertTrue(digest.startswith("# Daily"))
+        for i in range(1, 4):
+            self.assertIn(f'### {i}. Headline {i}', digest)
+            self.assertIn(f'*Source: [Article {i}](https://example.com/{i})*', digest)
+        self.assertIn('**Why it matters:** Cheaper inference for everyone.', digest)
+
+    def test_style_templates_apply_and_empty_fields_are_dropped(self):
+        processed = self._structured()
+        processed[1]['structured_summary']['why_it_matters'] = ''
+        digest = self.processor.create_digest(processed, "Weekly", writing_style='casual', template=True)
+        self.assertIn('### Headline 1', digest)
+        self.assertIn('**Why you should care:** Cheaper inference for everyone.', digest)
+        self.assertEqual(digest.count('Why you should care'), 2)
+        self.assertNotIn('{', digest)
+
+    def test_articles_without_structured_fields_use_their_summary(self):
+        article = dict(self.articles[0], summary='The model weights are openly licensed. It runs on ordinary laptops without a GPU.')
+        digest = self.processor.create_digest([article], "Daily", template=True)
+        self.assertIn('### 1. Article 1', digest)
+        self.assertIn('- It runs on ordinary laptops without a GPU.', digest)
+
+    def test_async_template_digest(self):
+        async def completion(user_prompt, **kwargs):
+            return _structured_response(1)
+
+        async def run():
+            with mock.patch.object(self.processor, '_achat_completion', side_effect=completion) as call:
+                processed = await self.processor.aprocess_multiple_articles(self.articles[:1], structured=True)
+                digest = await self.processor.acreate_digest(processed, "Daily", template=True)
+            return call.call_count, digest
+
+        calls, digest = asyncio.run(run())
+        self.assertEqual(calls, 1)
+        self.assertIn('### 1. Headline 1', digest)
+
+
+if __name__ == '__main__':
+    unittest.main()
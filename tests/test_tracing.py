@@ -0,0 +1,127 @@
+"""
+Tests for per-stage tracing spans and the Chrome trace timeline of a run.
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from content_pipeline import ContentPipeline
+from llm_metrics import in_current_context
+from tracing import run_trace, span, traced
+
+REAL = " ".join(f"Paragraph {n} explains how the new inference chip lowers serving costs." for n in range(5))
+
+
+def _spans(trace):
+    """Complete events of a Chrome trace, keyed by span name (last one wins)."""
+    return {event['name']: event for event in trace['traceEvents'] if event['ph'] == 'X'}
+
+
+class Fetcher:
+    @traced('test.fetch', arg='source')
+    def fetch(self, url):
+        return [{'title': 'Post', 'content': 'héllo'}]
+
+    @traced('test.send')
+    def send(self, content):
+        return {'error': 'rejected', 'success': False}
+
+
+class TestSpans(unittest.TestCase):
+    """Spans nest across threads, measure results and export as Chrome trace events."""
+
+    def test_spans_nest_across_threads(self):
+        with run_trace('unit') as trace:
+            with span('test.stage', items_in=2):
+                worker = threading.Thread(target=in_current_context(Fetcher().fetch), args=('https://example.com',))
+                worker.start()
+                worker.join()
+        events = _spans(trace.to_chrome())
+        root, stage, fetch = events['run.unit'], events['test.stage'], events['test.fetch']
+        self.assertEqual(stage['args']['parent_id'], root['args']['span_id'])
+        self.assertEqual(fetch['args']['parent_id'], stage['args']['span_id'])
+        self.assertNotEqual(fetch['tid'], stage['tid'])
+        self.assertEqual((fetch['args']['items'], fetch['args']['bytes']), (1, 6))
+        self.assertEqual(fetch['args']['source'], 'https://example.com')
+        self.assertLessEqual(stage['ts'], fetch['ts'])
+        self.assertLessEqual(fetch['ts'] + fetch['dur'], stage['ts'] + stage['dur'] + 1)
+        threads = [event for event in trace.to_chrome()['traceEvents'] if event['ph'] == 'M']
+        self.assertEqual(len(threads), 2)
+
+    def test_outcomes(self):
+        with run_trace('unit') as trace:
+            Fetcher().send('digest')
+            with self.assertRaises(ValueError):
+                with span('test.boom'):
+                    raise ValueError("bad feed")
+        events = _spans(trace.to_chrome())
+        self.assertEqual(events['test.send']['args']['outcome'], 'failed')
+        self.assertEqual(events['test.boom']['args']['outcome'], 'error')
+        self.assertEqual(events['test.boom']['args']['error'], "ValueError: bad feed")
+
+    def test_untraced_calls_pass_through(self):
+        with span('test.stage') as current:
+            self.assertIsNone(current)
+        self.assertEqual(Fetcher().fetch('https://example.com')[0]['title'], 'Post')
+
+
+class TestPipelineTrace(unittest.TestCase):
+    """Pipeline runs return their timeline and save it next to the results."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        env = mock.patch.dict(os.environ, {'GROQ_SUMMARY_CACHE_FILE': os.path.join(self.tmpdir.name, 'cache.json')})
+        env.start()
+        self.addCleanup(env.stop)
+        self.pipeline = ContentPipeline(groq_api_key='test-key', resend_api_key='test-key')
+        feed = [{'title': f'Post {n}', 'url': f'https://example.com/{n}', 'content': REAL} for n in range(3)]
+        scrape = mock.patch.object(self.pipeline.scraper, 'scrape_rss_feed', return_value=feed)
+        scrape.start()
+        self.addCleanup(scrape.stop)
+
+    def run_pipeline(self, **kwargs):
+        with mock.patch('email_sender.resend.Emails.send', return_value={'id': 'sent'}):
+            return self.pipeline.process_mixed_sources(rss_urls=['https://example.com/feed'], offline=True,
+                                                       email_recipients=['reader@example.com'], **kwargs)
+
+    def test_run_timeline(self):
+        results = self.run_pipeline()
+        self.assertTrue(results['success'])
+        events = _spans(results['trace'])
+        for name in ('run.process_mixed_sources', 'pipeline.fetch', 'pipeline.fetch_source', 'pipeline.quality_gate',
+                     'pipeline.summarize', 'llm.summarize', 'pipeline.digest', 'llm.digest', 'pipeline.send',
+                     'email.send_content_digest'):
+            self.assertIn(name, events)
+        self.assertEqual(events['pipeline.fetch_source']['args']['parent_id'],
+                         events['pipeline.fetch']['args']['span_id'])
+        self.assertEqual(events['pipeline.summarize']['args']['items'], 3)
+        self.assertEqual(events['email.send_content_digest']['args']['recipients'], 1)
+        self.assertGreater(events['email.send_content_digest']['args']['bytes'], 0)
+
+        filename = self.pipeline.save_results(results, os.path.join(self.tmpdir.name, 'results.json'))
+        with open(filename, encoding='utf-8') as f:
+            self.assertNotIn('trace', json.load(f))
+        with open(os.path.join(self.tmpdir.name, 'results.trace.json'), encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['traceEvents'], results['trace']['traceEvents'])
+
+    def test_trace_dir_and_disabling(self):
+        trace_dir = os.path.join(self.tmpdir.name, 'traces')
+        with mock.patch.dict(os.environ, {'PIPELINE_TRACE_DIR': trace_dir}):
+            self.run_pipeline(streaming=True)
+        saved = os.listdir(trace_dir)
+        self.assertEqual(len(saved), 1)
+        with open(os.path.join(trace_dir, saved[0]), encoding='utf-8') as f:
+            self.assertIn('pipeline.stream', _spans(json.load(f)))
+        with mock.patch.dict(os.environ, {'PIPELINE_TRACING': 'false'}):
+            self.assertNotIn('trace', self.run_pipeline())
+
+
+if __name__ == '__main__':
+    unittest.main()
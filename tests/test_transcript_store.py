@@ -0,0 +1,84 @@
+"""
+Tests for compact transcript storage and releasing heavy article fields after summarization.
+"""
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from youtube_transcript_api import FetchedTranscriptSnippet
+from youtube_transcript_api.formatters import TextFormatter
+
+from checkpoint import RunCheckpoint
+from content_pipeline import ContentPipeline, SUMMARIZED_CONTENT_CHARS
+from groq_processor import GroqContentProcessor
+from transcript_store import TranscriptSnippets
+
+
+def _snippets(count=50):
+    return [FetchedTranscriptSnippet(text=f"caption line {i} about inference", start=i * 2.0, duration=2.0)
+            for i in range(count)]
+
+
+class TestTranscriptStore(unittest.TestCase):
+    """Snippets pack into arrays and read back like the snippet objects."""
+
+    def test_round_trip_matches_snippet_objects(self):
+        fetched = _snippets()
+        packed = TranscriptSnippets(fetched)
+        self.assertEqual(len(packed), 50)
+        self.assertEqual([(s.text, s.start, s.duration) for s in packed],
+                         [(s.text, s.start, s.duration) for s in fetched])
+        self.assertEqual(packed[-1].text, "caption line 49 about inference")
+        self.assertEqual(packed.text, TextFormatter().format_transcript(fetched))
+
+    def test_dicts_and_json(self):
+        packed = TranscriptSnippets([{'text': 'a', 'start': 1, 'duration': 2}, {'text': '', 'start': 3}])
+        self.assertEqual(TranscriptSnippets(json.loads(json.dumps(packed.to_list()))).to_list(), packed.to_list())
+        self.assertEqual(packed[1].text, '')
+
+    def test_chunking_uses_packed_timestamps(self):
+        with mock.patch.dict(os.environ, {'GROQ_TRANSCRIPT_CHUNK_CHARS': '400'}):
+            processor = GroqContentProcessor(api_key='test-key')
+        packed = TranscriptSnippets(_snippets())
+        article = {'content': packed.text, 'raw_transcript': packed}
+        chunks = processor._chunk_transcript(article)
+        self.assertEqual(chunks, processor._chunk_transcript({**article, 'raw_transcript': _snippets()}))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(chunks[-1]['end'], 100.0)
+
+    def test_checkpoint_stores_snippets_as_dicts(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            checkpoint = RunCheckpoint('run', directory=tmpdir)
+            checkpoint.save('fetched', {'articles': [{'raw_transcript': TranscriptSnippets(_snippets(2))}]})
+            restored = RunCheckpoint('run', directory=tmpdir).load('fetched')['articles'][0]['raw_transcript']
+        self.assertEqual(restored[1], {'text': 'caption line 1 about inference', 'start': 2.0, 'duration': 2.0})
+
+
+class TestHeavyFieldRelease(unittest.TestCase):
+    """Summarized articles drop transcripts and content the digest never reads."""
+
+    def test_summarized_articles_are_released(self):
+        packed = TranscriptSnippets(_snippets(400))
+        video = {'title': 'Talk', 'url': 'https://www.youtube.com/watch?v=abc', 'source': 'youtube',
+                 'content': packed.text, 'raw_transcript': packed}
+        with tempfile.TemporaryDirectory() as tmpdir, \
+                mock.patch.dict(os.environ, {'GROQ_SUMMARY_CACHE_FILE': os.path.join(tmpdir, 'cache.json')}):
+            pipeline = ContentPipeline(groq_api_key='test-key', resend_api_key='test-key')
+            with mock.patch.object(pipeline.youtube_processor, 'process_youtube_urls', return_value=[video]):
+                results = pipeline.process_mixed_sources(youtube_urls=[video['url']], offline=True)
+                pipeline.release_heavy_fields = False
+                kept = pipeline.process_mixed_sources(youtube_urls=[video['url']], offline=True)
+        article = results['articles'][0]
+        self.assertNotIn('raw_transcript', article)
+        self.assertEqual(article['content'], packed.text[:SUMMARIZED_CONTENT_CHARS])
+        self.assertTrue(article['summary'])
+        self.assertIs(kept['articles'][0]['raw_transcript'], packed)
+
+
+if __name__ == '__main__':
+    unittest.main()
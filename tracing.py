@@ -0,0 +1,302 @@
+"""
+Nested timing spans for pipeline runs, exported as a Chrome trace timeline.
+
+A run (process_mixed_sources, process_batch, prefetch_sources) opens a RunTrace; every traced
+call made inside it, on any thread, records a span with its start and end, the thread it ran
+on, its parent span, item counts, bytes and outcome ('ok', 'failed' for a returned error,
+'error' for a raised exception). Like llm_metrics' usage attribution, the current run and
+span live in context variables, so spans follow work onto worker threads started through
+in_current_context. Outside a run the decorators call straight through.
+
+RunTrace.to_chrome() returns the Chrome trace event format ('X' complete events), which
+chrome://tracing and https://ui.perfetto.dev open as a per-thread timeline.
+"""
+import os
+import re
+import json
+import time
+import asyncio
+import functools
+import itertools
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_trace = contextvars.ContextVar('trace_run', default=None)
+_span = contextvars.ContextVar('trace_span', default=None)
+
+_span_ids = itertools.count(1)
+
+
+def tracing_enabled() -> bool:
+    """Whether runs record spans (PIPELINE_TRACING, default true)."""
+    return os.getenv('PIPELINE_TRACING', 'true').lower() in ('true', '1', 'yes')
+
+
+class Span:
+    __slots__ = ('id', 'parent', 'name', 'category', 'thread', 'start', 'end', 'outcome', 'attrs')
+
+    def __init__(self, name: str, category: str, parent: Optional[int], attrs: Dict):
+        self.id = next(_span_ids)
+        self.parent = parent
+        self.name = name
+        self.category = category
+        self.thread = threading.get_ident()
+        self.start = time.perf_counter()
+        self.end = None
+        self.outcome = 'ok'
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        """Add attributes (counts, sizes, model, ...) to the span."""
+        self.attrs.update(attrs)
+
+    def measure(self, result):
+        """
+        Record the item count and bytes of a traced call's result, and mark results that
+        carry an error (email responses, failed scrapes) as 'failed'.
+
+        Returns:
+            The result, unchanged
+        """
+        items, size = _measure(result)
+        if items is not None:
+            self.attrs['items'] = items
+        if size:
+            self.attrs['bytes'] = size
+        if isinstance(result, dict) and (result.get('error') or result.get('success') is False):
+            self.outcome = 'failed'
+            self.attrs.setdefault('error', str(result.get('error', ''))[:200])
+        return result
+
+    @property
+    def duration(self) -> float:
+        """Seconds from start to end (or to now while the span is open)."""
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+
+class RunTrace:
+    def __init__(self, name: str, run_id: Optional[str] = None):
+        """
+        Collect the spans of one pipeline run.
+
+        Args:
+            name: Run name, e.g. the pipeline method
+            run_id: Identifier of the run, when it has one
+        """
+        self.name = name
+        self.run_id = run_id
+        self.started_at = datetime.now()
+        self.origin = time.perf_counter()
+        self.spans: List[Span] = []
+        self.threads: Dict[int, str] = {}
+        self.root: Optional[Span] = None
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+            self.threads.setdefault(span.thread, threading.current_thread().name)
+
+    def stage_seconds(self, parent: Optional[int] = None) -> Dict[str, float]:
+        """Total seconds per span name among the children of parent (the root spans by default)."""
+        with self._lock:
+            spans = list(self.spans)
+        parents = {parent} if parent is not None else {span.id for span in spans if span.parent is None}
+        children = [span for span in spans if span.parent in parents]
+        totals: Dict[str, float] = {}
+        for span in children:
+            totals[span.name] = round(totals.get(span.name, 0.0) + span.duration, 3)
+        return totals
+
+    def to_chrome(self) -> Dict:
+        """The finished spans in Chrome trace event format, timestamps in microseconds from the run start."""
+        pid = os.getpid()
+        with self._lock:
+            spans = [span for span in self.spans if span.end is not None]
+            threads = dict(self.threads)
+        events = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+                  for tid, name in threads.items()]
+        for span in sorted(spans, key=lambda s: s.start):
+            events.append({
+                'name': span.name,
+                'cat': span.category,
+                'ph': 'X',
+                'ts': round((span.start - self.origin) * 1e6, 1),
+                'dur': round((span.end - span.start) * 1e6, 1),
+                'pid': pid,
+                'tid': span.thread,
+                'args': {'span_id': span.id, 'parent_id': span.parent, 'outcome': span.outcome, **span.attrs},
+            })
+        return {
+            'traceEvents': events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'run': self.name, 'run_id': self.run_id, 'started_at': self.started_at.isoformat()},
+        }
+
+
+def current_trace() -> Optional[RunTrace]:
+    """The run being traced in the current context."""
+    return _trace.get()
+
+
+@contextmanager
+def run_trace(name: str, run_id: Optional[str] = None):
+    """
+    Trace a run: spans recorded inside the block (and on threads it starts) are collected,
+    under a root span named after the run.
+
+    Yields:
+        The RunTrace
+    """
+    trace = RunTrace(name, run_id)
+    token = _trace.set(trace)
+    try:
+        with span(f"run.{name}", category='run', run_id=run_id) as root:
+            trace.root = root
+            yield trace
+    finally:
+        _trace.reset(token)
+        stages = trace.stage_seconds()
+        if stages:
+            logger.info(f"Run timeline for {name}: " + ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in stages.items()))
+
+
+@contextmanager
+def span(name: str, category: Optional[str] = None, **attrs):
+    """
+    Time the block as a span of the current run, nested under the current span.
+
+    Args:
+        name: Span name, '<component>.<operation>'
+        category: Trace category; defaults to the component
+        attrs: Initial attributes (e.g. source, items_in)
+
+    Yields:
+        The Span, or None outside a traced run
+    """
+    trace = _trace.get()
+    if trace is None:
+        yield None
+        return
+    parent = _span.get()
+    current = Span(name, category or name.split('.', 1)[0], parent.id if parent is not None else None, attrs)
+    token = _span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.outcome = 'error'
+        current.attrs['error'] = f"{type(e).__name__}: {e}"[:200]
+        raise
+    finally:
+        current.end = time.perf_counter()
+        _span.reset(token)
+        trace.add(current)
+
+
+def annotate(**attrs):
+    """Add attributes to the current span, if any."""
+    current = _span.get()
+    if current is not None:
+        current.set(**attrs)
+
+
+def traced(name: str, arg: Optional[str] = None):
+    """
+    Decorator recording each call of a sync or async method as a span.
+
+    The span gets 'items_in' when the first argument is a list, and the result's item count,
+    bytes and outcome (see Span.measure).
+
+    Args:
+        name: Span name, '<component>.<operation>'
+        arg: Attribute under which to record the first argument (a URL, id or stage name)
+    """
+    def decorator(func):
+        def attrs_for(args):
+            attrs = {}
+            first = args[1] if len(args) > 1 else None
+            if isinstance(first, list):
+                attrs['items_in'] = len(first)
+            elif arg and first is not None:
+                attrs[arg] = str(first)[:300]
+            return attrs
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if _trace.get() is None:
+                    return await func(*args, **kwargs)
+                with span(name, **attrs_for(args)) as current:
+                    return current.measure(await func(*args, **kwargs))
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _trace.get() is None:
+                return func(*args, **kwargs)
+            with span(name, **attrs_for(args)) as current:
+                return current.measure(func(*args, **kwargs))
+        return wrapper
+    return decorator
+
+
+def save_trace(trace: Dict, filename: str) -> str:
+    """
+    Write a Chrome trace (RunTrace.to_chrome()) to a JSON file.
+
+    Returns:
+        Path to the saved file
+    """
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(trace, f, default=str)
+    logger.info(f"Trace saved to {filename}")
+    return filename
+
+
+def export_trace(trace: RunTrace, directory: Optional[str] = None) -> Optional[str]:
+    """
+    Save a finished run's timeline to PIPELINE_TRACE_DIR (or directory) as
+    '<run>-<timestamp>.trace.json'. Nothing is written when no directory is configured.
+
+    Returns:
+        Path to the saved file, or None
+    """
+    directory = directory or os.getenv('PIPELINE_TRACE_DIR')
+    if not directory:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    label = re.sub(r'[^A-Za-z0-9._-]+', '_', trace.run_id or trace.name)
+    filename = os.path.join(directory, f"{label}-{trace.started_at:%Y%m%d_%H%M%S_%f}.trace.json")
+    try:
+        return save_trace(trace.to_chrome(), filename)
+    except OSError as e:
+        logger.warning(f"Could not save trace to {filename}: {e}")
+        return None
+
+
+def _measure(result) -> tuple:
+    """(item count or None, bytes of text) of a traced call's result."""
+    if isinstance(result, str):
+        return None, _text_bytes(result)
+    if isinstance(result, dict):
+        return None, _text_bytes(result.get('content') or result.get('transcript_text'))
+    if isinstance(result, tuple):
+        # (articles, count or metrics) pairs count their articles; (digest, insights) their text
+        if result and isinstance(result[0], list):
+            return _measure(result[0])
+        return None, sum(_text_bytes(item) for item in result)
+    if isinstance(result, list):
+        size = sum(_text_bytes(item.get('content')) + _text_bytes(item.get('summary'))
+                   for item in result if isinstance(item, dict))
+        return len(result), size
+    return None, 0
+
+
+def _text_bytes(text) -> int:
+    return len(text.encode('utf-8')) if isinstance(text, str) else 0
@@ -0,0 +1,68 @@
+"""
+Compact, array-backed storage for YouTube transcript snippets.
+
+youtube_transcript_api returns one dataclass object per caption line, each with its own
+attribute dict, string and two float objects; a long video has thousands. TranscriptSnippets
+keeps the same data as one newline-joined string plus typed arrays of end offsets, start
+times and durations, and yields lightweight Snippet tuples on iteration, so code that reads
+snippet.text / .start / .duration keeps working. The joined string is exactly the plain-text
+transcript TextFormatter produces, so an article's content can share it instead of holding
+a second copy.
+"""
+from array import array
+from typing import Dict, Iterable, Iterator, List, NamedTuple
+
+
+class Snippet(NamedTuple):
+    text: str
+    start: float
+    duration: float
+
+
+class TranscriptSnippets:
+    __slots__ = ('text', 'ends', 'starts', 'durations')
+
+    def __init__(self, snippets: Iterable = ()):
+        """
+        Pack transcript snippets.
+
+        Args:
+            snippets: Snippet objects (with text/start/duration attributes) or dicts with those keys
+        """
+        texts = []
+        self.ends = array('I')
+        self.starts = array('d')
+        self.durations = array('d')
+        end = 0
+        for snippet in snippets:
+            if isinstance(snippet, dict):
+                text, start, duration = snippet.get('text', ''), snippet.get('start', 0), snippet.get('duration', 0)
+            else:
+                text = getattr(snippet, 'text', '')
+                start, duration = getattr(snippet, 'start', 0), getattr(snippet, 'duration', 0)
+            text = text or ''
+            end += len(text) + (1 if texts else 0)
+            texts.append(text)
+            self.ends.append(end)
+            self.starts.append(float(start or 0))
+            self.durations.append(float(duration or 0))
+        self.text = '\n'.join(texts)
+
+    def __len__(self) -> int:
+        return len(self.ends)
+
+    def __getitem__(self, index: int) -> Snippet:
+        if index < 0:
+            index += len(self)
+        begin = self.ends[index - 1] + 1 if index > 0 else 0
+        return Snippet(self.text[begin:self.ends[index]], self.starts[index], self.durations[index])
+
+    def __iter__(self) -> Iterator[Snippet]:
+        begin = 0
+        for end, start, duration in zip(self.ends, self.starts, self.durations):
+            yield Snippet(self.text[begin:end], start, duration)
+            begin = end + 1
+
+    def to_list(self) -> List[Dict]:
+        """Plain dicts, for JSON (checkpoints, saved results)."""
+        return [snippet._asdict() for snippet in self]
@@ -6,6 +6,7 @@ from datetime import datetime, timedelta
 import tweepy
 import requests
 from bs4 import BeautifulSoup
+from tracing import traced
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -118,6 +119,7 @@ class TwitterProcessor:
         logger.warning(f"Could not extract hashtag from input: {hashtag_input}")
         return None
     
+    @traced('twitter.process_twitter_sources')
     def process_twitter_sources(self, twitter_urls: List[str]) -> List[Dict]:
         """
         Process a list of Twitter URLs and extract content.
@@ -147,6 +149,7 @@ class TwitterProcessor:
         
         return processed_tweets
     
+    @traced('twitter.fetch_profile_tweets', arg='source')
     def _fetch_profile_tweets(self, profile_input: str) -> Optional[Dict]:
         """Fetch real tweets from a Twitter profile."""
         username = self.extract_username_from_url(profile_input)
@@ -203,6 +206,7 @@ class TwitterProcessor:
             logger.error(f"Error fetching tweets for @{username}: {e}")
             return self._create_profile_content(profile_input)
     
+    @traced('twitter.fetch_hashtag_tweets', arg='source')
     def _fetch_hashtag_tweets(self, hashtag_input: str) -> Optional[Dict]:
         """Fetch real tweets from a hashtag search."""
         hashtag = self.extract_hashtag_from_input(hashtag_input)
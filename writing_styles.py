@@ -6,6 +6,18 @@ from typing import Dict, List, Optional
 import json
 import os
 
+# Per-article block used to assemble template digests from structured summaries.
+# Placeholders: {number}, {headline}, {key_points}, {why_it_matters}, {title}, {url}
+DEFAULT_ARTICLE_TEMPLATE = """
+### {headline}
+
+{key_points}
+
+**Why it matters:** {why_it_matters}
+
+*Source: [{title}]({url})*
+"""
+
 class WritingStyleManager:
     """Manages different writing styles for newsletter generation."""
     
@@ -51,6 +63,15 @@ class WritingStyleManager:
                 
                 ## Latest News & Updates
                 {content}
+                """,
+                "article_template": """
+                ### {number}. {headline}
+                
+                {key_points}
+                
+                **Why it matters:** {why_it_matters}
+                
+                *Source: [{title}]({url})*
                 """
             },
             
@@ -89,6 +110,15 @@ class WritingStyleManager:
                 
                 ## Latest News & Updates
                 {content}
+                """,
+                "article_template": """
+                ### {headline}
+                
+                {key_points}
+                
+                **Why you should care:** {why_it_matters}
+                
+                *Source: [{title}]({url})*
                 """
             },
             
@@ -127,6 +157,16 @@ class WritingStyleManager:
                 
                 ## Latest News & Updates
                 {content}
+                """,
+                "article_template": """
+                ### {number}. {headline}
+                
+                **Key points**
+                {key_points}
+                
+                **Implications:** {why_it_matters}
+                
+                *Source: [{title}]({url})*
                 """
             }
         }
@@ -170,6 +210,25 @@ class WritingStyleManager:
         
         return style_data["digest_template"]
     
+    def get_style_article_template(self, style_id: str) -> str:
+        """Get the per-article template used for template-only digests."""
+        style_data = self.styles.get(style_id) or self.custom_styles.get(style_id)
+        if not style_data:
+            raise ValueError(f"Writing style '{style_id}' not found")
+        
+        return style_data.get("article_template", DEFAULT_ARTICLE_TEMPLATE)
+    
+    def get_style_description(self, style_id: str) -> str:
+        """Short description of a style (name and characteristics) for prompts."""
+        style_data = self.styles.get(style_id) or self.custom_styles.get(style_id)
+        if not style_data:
+            raise ValueError(f"Writing style '{style_id}' not found")
+        
+        characteristics = style_data.get("characteristics", [])
+        if characteristics:
+            return f"{style_data['name']}: {', '.join(characteristics)}"
+        return style_data["name"]
+    
     def create_custom_style_from_document(self, 
                                         document_content: str, 
                                         style_name: str,
@@ -184,7 +243,8 @@ class WritingStyleManager:
             "description": style_description,
             "characteristics": analysis["characteristics"],
             "prompt_template": self._generate_custom_prompt_template(analysis),
-            "digest_template": self._generate_custom_digest_template(analysis)
+            "digest_template": self._generate_custom_digest_template(analysis),
+            "article_template": DEFAULT_ARTICLE_TEMPLATE
         }
         
         # Generate unique style ID
@@ -7,6 +7,9 @@ from youtube_transcript_api.formatters import TextFormatter
 import googleapiclient.discovery
 from googleapiclient.errors import HttpError
 
+from transcript_store import TranscriptSnippets
+from tracing import traced
+
 # Set up logging
 import logging
 logger = logging.getLogger(__name__)
@@ -51,6 +54,7 @@ class YouTubeTranscriptProcessor:
         logger.warning(f"Could not extract video ID from URL: {url}")
         return None
     
+    @traced('youtube.get_transcript', arg='video_id')
     def get_transcript(self, video_id: str, languages: List[str] = None) -> Optional[Dict]:
         """
         Get transcript for a YouTube video with retry logic and better error handling.
@@ -93,17 +97,19 @@ class YouTubeTranscriptProcessor:
                 # Get video metadata
                 video_url = f"https://www.youtube.com/watch?v={video_id}"
                 
-                # Format transcript as text using the formatter
-                formatted_text = self.text_formatter.format_transcript(fetched_transcript)
+                # Snippets packed into arrays instead of one object per caption line; their
+                # joined text is the TextFormatter plain text, shared rather than copied
+                snippets = TranscriptSnippets(fetched_transcript)
+                formatted_text = snippets.text
                 
                 return {
                     'video_id': video_id,
                     'video_url': video_url,
                     'transcript_text': formatted_text,
-                    'transcript_data': list(fetched_transcript),
+                    'transcript_data': snippets,
                     'language': transcript.language,
-                    'duration': sum(getattr(entry, 'duration', 0) for entry in fetched_transcript),
-                    'snippet_count': len(fetched_transcript)
+                    'duration': sum(snippets.durations),
+                    'snippet_count': len(snippets)
                 }
                 
             except Exception as e:
@@ -126,6 +132,7 @@ class YouTubeTranscriptProcessor:
         logger.error(f"All attempts failed for video {video_id}")
         return None
     
+    @traced('youtube.process_youtube_urls')
     def process_youtube_urls(self, urls: List[str]) -> List[Dict]:
         """
         Process a list of YouTube URLs and extract transcripts.
@@ -355,6 +362,7 @@ This video is from the {channel_title} channel. The transcript extraction failed
                 return True
         return False
     
+    @traced('youtube.get_channel_latest_videos', arg='source')
     def get_channel_latest_videos(self, channel_url: str, max_videos: int = 5, api_key: str = None) -> List[str]:
         """
         Get the latest video URLs from a YouTube channel using YouTube Data API v3.